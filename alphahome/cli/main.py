@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import argparse
+import json
 from typing import List, Optional
 
 from .core import exitcodes
@@ -33,6 +34,21 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _prod_list(output_format: str) -> int:
+    """列出任务清单中的任务（不导入任务模块，不连接数据库）"""
+    from ..common.task_system.task_manifest import load_manifest
+
+    tasks = sorted(load_manifest().values(), key=lambda entry: entry["name"])
+    if output_format == "json":
+        fields = ("name", "type", "data_source", "table_name", "date_column")
+        print(json.dumps([{k: entry.get(k) for k in fields} for entry in tasks], ensure_ascii=False, indent=2))
+    else:
+        for entry in tasks:
+            print(f"{entry['name']:<45} {entry.get('type') or '-':<10} {entry.get('data_source') or '-':<10} "
+                  f"{entry.get('table_name') or '-'}")
+    return exitcodes.SUCCESS
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     parser = build_parser()
     args_list = list(argv or [])
@@ -48,7 +64,7 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     if args.command == "prod":
         if args.prod_command == "list":
-            return exitcodes.SUCCESS
+            return _prod_list(args.format)
         return exitcodes.INVALID_ARGS
 
     if args.command == "mv":
@@ -227,6 +227,46 @@ class ConfigManager:
         except (TypeError, ValueError):
             result["request_interval"] = 0.2
 
+        # 客户端池会话数
+        pool_val = result.get("pool_size")
+        if pool_val in (None, ""):
+            pool_val = os.environ.get("TINYSOFT_POOL_SIZE", 1)
+        try:
+            result["pool_size"] = max(1, int(pool_val))
+        except (TypeError, ValueError):
+            result["pool_size"] = 1
+
+        return result
+
+    def get_tushare_rate_limit_config(self) -> Dict[str, Any]:
+        """
+        获取 Tushare 进程级速率限制配置。
+
+        配置优先级：
+        1. config.json 的 api.tushare_rate_limit
+        2. 环境变量 TUSHARE_POINTS（仅积分）
+        """
+        config = self.load_config()
+        api_cfg = config.get("api", {})
+        limit_cfg = (
+            api_cfg.get("tushare_rate_limit", {}) if isinstance(api_cfg, dict) else {}
+        )
+        if not isinstance(limit_cfg, dict):
+            limit_cfg = {}
+
+        result = limit_cfg.copy()
+
+        points_val = result.get("points")
+        if points_val in (None, ""):
+            points_val = os.environ.get("TUSHARE_POINTS")
+        try:
+            result["points"] = int(points_val) if points_val not in (None, "") else None
+        except (TypeError, ValueError):
+            result["points"] = None
+
+        if not isinstance(result.get("endpoints"), dict):
+            result["endpoints"] = {}
+
         return result
 
     def get_task_config(
@@ -298,6 +338,11 @@ def get_tinysoft_config() -> Dict[str, Any]:
     return _config_manager.get_tinysoft_config()
 
 
+def get_tushare_rate_limit_config() -> Dict[str, Any]:
+    """获取 Tushare 进程级速率限制配置"""
+    return _config_manager.get_tushare_rate_limit_config()
+
+
 def get_task_config(
     task_name: str, key: Optional[str] = None, default: Any = None
 ) -> Any:
@@ -10,6 +10,8 @@
 - DatabaseOperationsMixin: 整合的数据库操作组件（包含所有SQL和数据操作功能）
 - SchemaManagementMixin: 表结构管理
 - UtilityMixin: 实用工具
+- WatermarkCatalogMixin: 数据水位目录（替代 MAX(date) 全表扫描）
+- SchemaRegistryMixin: 表结构注册表（结构指纹未变化时跳过保存前的 DDL 检查）
 - DBManagerCore: 核心连接管理
 - TableNameResolver: 表名解析
 
@@ -26,6 +28,8 @@ from .db_manager_core import DBManagerCore
 from .schema_management_mixin import SchemaManagementMixin
 from .table_name_resolver import TableNameResolver
 from .utility_mixin import UtilityMixin
+from .watermark_catalog_mixin import WatermarkCatalogMixin
+from .schema_registry_mixin import SchemaRegistryMixin
 from .materialized_views_schema import (
     initialize_materialized_views_schema,
     check_materialized_views_schema_exists,
@@ -40,6 +44,8 @@ __all__ = [
     "DatabaseOperationsMixin",  # 整合的数据库操作组件
     "SchemaManagementMixin",    # 表结构管理
     "UtilityMixin",             # 实用工具
+    "WatermarkCatalogMixin",    # 数据水位目录
+    "SchemaRegistryMixin",      # 表结构注册表
     
     # == 物化视图系统 ==
     "initialize_materialized_views_schema",
@@ -51,7 +57,7 @@ __architecture_info__ = {
     "version": "2.0",
     "status": "UNIFIED",
     "primary_component": "DatabaseOperationsMixin",
-    "components_count": 5,
+    "components_count": 7,
     "migration_date": "2024-12-18",
     "performance_improvement": "简化继承链，减少方法解析复杂性",
     "note": "架构已完全整合，移除了冗余组件，提供更好的性能和维护性。"
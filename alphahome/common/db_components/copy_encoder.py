@@ -0,0 +1,263 @@
+"""
+COPY 记录列式编码器
+
+将 DataFrame 转换为 asyncpg ``copy_records_to_table`` 可直接消费的记录流。
+
+与逐行逐单元格处理不同，该模块按列一次性完成：
+- 空值识别（NaN / None / NaT / pd.NA → None）
+- 字符串清洗（移除 NULL/回车/换行，制表符替换为空格，空串 → None）
+- 日期列字符串解析（YYYYMMDD / YYYY-MM-DD 批量解析，其余格式逐个回退）
+- datetime64 列的日期截断
+
+最终通过 ``zip`` 惰性地拼出记录元组，二进制编码交由 asyncpg 的 Cython 实现完成。
+保留 ``iter_copy_records_rowwise`` 作为逐行参考实现，用于等价性校验和基准测试。
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 字符串清洗映射：移除 NULL/回车/换行，制表符替换为空格
+_STRING_CLEAN_TABLE = str.maketrans({"\x00": None, "\r": None, "\n": None, "\t": " "})
+
+# object 列中无需逐值转换的推断类型（非空值原样写入）
+_PASSTHROUGH_INFERRED_TYPES = frozenset(
+    {"date", "decimal", "integer", "floating", "mixed-integer-float", "boolean", "bytes"}
+)
+
+
+def parse_date_string(
+    date_str: str, log: Optional[logging.Logger] = None
+) -> Optional[date]:
+    """解析日期字符串为Python date对象
+
+    支持的格式：
+    - YYYYMMDD (如: 20240101)
+    - YYYY-MM-DD (如: 2024-01-01)
+    - 其他pandas能识别的格式
+
+    Args:
+        date_str: 日期字符串
+        log: 解析失败时用于输出警告的 logger，默认使用模块 logger
+
+    Returns:
+        date对象或None（如果解析失败）
+    """
+    if not date_str or pd.isna(date_str):
+        return None
+
+    try:
+        # 尝试YYYYMMDD格式
+        if len(date_str) == 8 and date_str.isdigit():
+            return datetime.strptime(date_str, "%Y%m%d").date()
+
+        # 尝试YYYY-MM-DD格式
+        if len(date_str) == 10 and date_str.count("-") == 2:
+            return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+        # 使用pandas的通用日期解析
+        parsed_date = pd.to_datetime(date_str, errors="coerce")
+        if pd.notna(parsed_date):
+            return parsed_date.date()
+
+    except Exception as e:
+        (log or logger).warning(f"无法解析日期字符串 '{date_str}': {e}")
+
+    return None
+
+
+def _is_datetime_scalar(val: Any) -> bool:
+    """判断单个值是否会被 pandas 推断为 datetime64（datetime / Timestamp / np.datetime64）"""
+    return isinstance(val, (datetime, np.datetime64))
+
+
+def _encode_cell(
+    val: Any,
+    is_date_col: bool,
+    is_datelike_col: bool,
+    log: Optional[logging.Logger] = None,
+    strict_datetime_check: bool = False,
+) -> Any:
+    """单元格编码（逐行参考实现与列式回退路径共用）
+
+    ``strict_datetime_check`` 为 True 时沿用历史实现的 ``pd.Series([val])`` 类型推断，
+    仅供参考实现使用；列式回退路径使用等价的 isinstance 判断。
+    """
+    if pd.isna(val):
+        return None
+    if isinstance(val, str):
+        if is_datelike_col:
+            return parse_date_string(val, log)
+        cleaned_val = val.translate(_STRING_CLEAN_TABLE)
+        return cleaned_val if cleaned_val else None
+    if (
+        pd.api.types.is_datetime64_any_dtype(pd.Series([val]))
+        if strict_datetime_check
+        else _is_datetime_scalar(val)
+    ):
+        if is_date_col:
+            return val.date() if hasattr(val, "date") else val
+        return val
+    return val
+
+
+def iter_copy_records_rowwise(
+    df: pd.DataFrame,
+    date_columns: Set[str],
+    timestamp_columns: Set[str],
+    log: Optional[logging.Logger] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """逐行生成 COPY 记录（参考实现）
+
+    与历史 ``copy_from_dataframe`` 内部生成器语义一致，仅用于等价性校验和基准对比。
+    """
+    columns = list(df.columns)
+    datelike_columns = date_columns | timestamp_columns
+    flags = [(col in date_columns, col in datelike_columns) for col in columns]
+    for row_tuple in df.itertuples(index=False, name=None):
+        yield tuple(
+            _encode_cell(val, is_date, is_datelike, log, strict_datetime_check=True)
+            for val, (is_date, is_datelike) in zip(row_tuple, flags)
+        )
+
+
+def _to_object_array(values: Iterable[Any], size: int) -> np.ndarray:
+    """将任意序列放入一维 object 数组（避免 numpy 对嵌套对象做维度推断）"""
+    return np.fromiter(values, dtype=object, count=size)
+
+
+def _encode_string_values(
+    values: np.ndarray, is_datelike_col: bool, log: Optional[logging.Logger]
+) -> np.ndarray:
+    """编码全部为 str 的非空值"""
+    size = len(values)
+    if not is_datelike_col:
+        # isprintable() 为 True 的字符串不含任何控制字符，可跳过较慢的 translate
+        return _to_object_array(
+            (
+                (v if v.isprintable() else v.translate(_STRING_CLEAN_TABLE)) or None
+                for v in values
+            ),
+            size,
+        )
+
+    out = np.full(size, None, dtype=object)
+    compact_mask = np.fromiter(
+        (len(v) == 8 and v.isdigit() for v in values), dtype=bool, count=size
+    )
+    dashed_mask = np.fromiter(
+        (len(v) == 10 and v.count("-") == 2 for v in values), dtype=bool, count=size
+    )
+
+    resolved = np.zeros(size, dtype=bool)
+    for mask, fmt in ((compact_mask, "%Y%m%d"), (dashed_mask, "%Y-%m-%d")):
+        if not mask.any():
+            continue
+        parsed = pd.to_datetime(values[mask], format=fmt, errors="coerce")
+        ok = np.asarray(parsed.notna())
+        positions = np.flatnonzero(mask)[ok]
+        out[positions] = parsed[ok].date
+        resolved[positions] = True
+
+    # 非标准格式或批量解析失败的值交给逐个解析（与参考实现保持一致的告警和结果）
+    for pos in np.flatnonzero(~resolved):
+        out[pos] = parse_date_string(values[pos], log)
+    return out
+
+
+def _encode_column(
+    series: pd.Series,
+    is_date_col: bool,
+    is_datelike_col: bool,
+    log: Optional[logging.Logger] = None,
+) -> np.ndarray:
+    """将单列编码为 COPY 可用的 object 数组"""
+    size = len(series)
+    na_mask = series.isna().to_numpy(dtype=bool)
+    dtype = series.dtype
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        if is_date_col:
+            out = _to_object_array(series.dt.date.to_numpy(dtype=object), size)
+        else:
+            out = _to_object_array(series.astype(object).to_numpy(), size)
+        out[na_mask] = None
+        return out
+
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+        if isinstance(dtype, np.dtype):
+            out = series.astype(object).to_numpy(dtype=object, copy=True)
+        else:
+            # 扩展类型（Int64/Float64/boolean）迭代时返回 numpy 标量，保持与逐行一致
+            out = _to_object_array(iter(series.array), size)
+        out[na_mask] = None
+        return out
+
+    if pd.api.types.is_string_dtype(dtype) and not isinstance(
+        dtype, pd.CategoricalDtype
+    ):
+        non_null = series[~na_mask]
+        inferred = pd.api.types.infer_dtype(non_null, skipna=False)
+        if inferred in ("string", "empty"):
+            out = np.full(size, None, dtype=object)
+            if len(non_null):
+                out[~na_mask] = _encode_string_values(
+                    non_null.to_numpy(dtype=object), is_datelike_col, log
+                )
+            return out
+        if inferred in _PASSTHROUGH_INFERRED_TYPES:
+            out = series.to_numpy(dtype=object, copy=True)
+            out[na_mask] = None
+            return out
+
+    # 混合类型列：逐个值回退，但不再为每个值构造临时 Series
+    return _to_object_array(
+        [_encode_cell(val, is_date_col, is_datelike_col, log) for val in series],
+        size,
+    )
+
+
+def encode_copy_columns(
+    df: pd.DataFrame,
+    date_columns: Set[str],
+    timestamp_columns: Set[str],
+    log: Optional[logging.Logger] = None,
+) -> List[np.ndarray]:
+    """按列编码 DataFrame，返回与 ``df.columns`` 顺序一致的 object 数组列表"""
+    datelike_columns = date_columns | timestamp_columns
+    return [
+        _encode_column(
+            df.iloc[:, i], col in date_columns, col in datelike_columns, log
+        )
+        for i, col in enumerate(df.columns)
+    ]
+
+
+def encode_copy_records(
+    df: pd.DataFrame,
+    date_columns: Set[str],
+    timestamp_columns: Set[str],
+    log: Optional[logging.Logger] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    """列式编码 DataFrame 并惰性生成 COPY 记录
+
+    输出与 ``iter_copy_records_rowwise`` 逐行一致，可直接传给
+    ``asyncpg.Connection.copy_records_to_table``。
+
+    Args:
+        df: 待写入的 DataFrame
+        date_columns: 目标表中的 DATE 列
+        timestamp_columns: 目标表中的 TIMESTAMP 列
+        log: 日期解析失败时用于告警的 logger
+
+    Returns:
+        记录元组迭代器
+    """
+    if df.empty:
+        return iter(())
+    return zip(*encode_copy_columns(df, date_columns, timestamp_columns, log))
@@ -8,6 +8,7 @@
 """
 
 import asyncio
+import io
 import time
 from datetime import datetime, date
 from typing import Any, Dict, List, Optional, Union
@@ -16,6 +17,9 @@ import asyncpg
 import pandas as pd
 import psycopg2.extras
 
+from .copy_encoder import encode_copy_records, parse_date_string
+from .frame_decoder import build_copy_query, decode_csv_frame
+
 
 class BatchPerformanceMonitor:
     """批量操作性能监控器
@@ -147,7 +151,7 @@ class DatabaseOperationsMixin:
     **高级数据操作层**（原DataOperationsMixin功能）：
     - copy_from_dataframe: 利用PostgreSQL COPY命令实现高速数据导入
     - upsert: 基于冲突检测的智能插入或更新操作
-    - 数据预处理: 自动处理空值、特殊字符、日期格式转换
+    - 数据预处理: 按列向量化处理空值、特殊字符、日期格式转换（见 copy_encoder）
     - 临时表策略: 使用临时表提高批量操作的安全性和性能
 
     **性能监控层**（新增功能）：
@@ -379,6 +383,87 @@ class DatabaseOperationsMixin:
                 connection.rollback()
                 raise
 
+    async def fetch_dataframe(
+        self,
+        query: str,
+        *args,
+        numeric_as_float: bool = True,
+        parse_dates: bool = True,
+    ) -> pd.DataFrame:
+        """执行查询并直接解码为带类型的 DataFrame
+
+        通过 COPY ... TO STDOUT (CSV) 传输结果，由 pandas 按列解析，
+        不构造逐行的 Record 对象（见 frame_decoder）。适用于分析类大结果集读取。
+
+        Args:
+            query (str): SELECT 查询语句（不含结尾分号）
+            *args: SQL位置参数（$1, $2 ...）
+            numeric_as_float (bool): NUMERIC 列解码为 float64，否则保留 Decimal
+            parse_dates (bool): DATE / TIMESTAMP 列解码为 datetime64
+
+        Returns:
+            pd.DataFrame: 查询结果；无数据时为带列名的空 DataFrame
+        """
+        if self.pool is None:  # type: ignore
+            await self.connect()  # type: ignore
+
+        chunks: List[bytes] = []
+
+        async def _sink(data: bytes):
+            chunks.append(data)
+
+        async with self.pool.acquire() as conn:  # type: ignore
+            try:
+                statement = await conn.prepare(query)
+                columns = [(attr.name, attr.type.oid) for attr in statement.get_attributes()]
+                await conn.copy_from_query(
+                    query.strip().rstrip(";"), *args, output=_sink, format="csv", header=True
+                )
+            except Exception as e:
+                self.logger.error(  # type: ignore
+                    f"SQL查询失败 (fetch_dataframe): {str(e)}\nSQL: {query}\n位置参数: {args}"
+                )
+                raise
+
+        return decode_csv_frame(
+            b"".join(chunks), columns, numeric_as_float=numeric_as_float, parse_dates=parse_dates
+        )
+
+    def fetch_dataframe_sync(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        numeric_as_float: bool = True,
+        parse_dates: bool = True,
+    ) -> pd.DataFrame:
+        """同步执行查询并直接解码为带类型的 DataFrame（参数说明见 fetch_dataframe）"""
+        if self.mode == "async":  # type: ignore
+            # 异步模式：包装异步方法
+            return self._run_sync(  # type: ignore
+                self.fetch_dataframe(
+                    query, *(params or ()), numeric_as_float=numeric_as_float, parse_dates=parse_dates
+                )
+            )
+        elif self.mode == "sync":  # type: ignore
+            # 同步模式：直接使用 psycopg2 的 copy_expert
+            connection = self._get_sync_connection()  # type: ignore
+            try:
+                with connection.cursor() as cursor:
+                    bound_query = cursor.mogrify(query, params).decode() if params else query
+                    bound_query = bound_query.strip().rstrip(";")
+                    cursor.execute(f"SELECT * FROM ({bound_query}) AS _q LIMIT 0")
+                    columns = [(col.name, col.type_code) for col in cursor.description]
+                    buffer = io.BytesIO()
+                    cursor.copy_expert(build_copy_query(bound_query), buffer)
+            except Exception as e:
+                self.logger.error(f"同步SQL查询失败 (fetch_dataframe): {e}\nSQL: {query}\n参数: {params}")  # type: ignore
+                connection.rollback()
+                raise
+            buffer.seek(0)
+            return decode_csv_frame(
+                buffer, columns, numeric_as_float=numeric_as_float, parse_dates=parse_dates
+            )
+
     async def executemany(
         self,
         query: str,
@@ -429,27 +514,7 @@ class DatabaseOperationsMixin:
         Returns:
             date对象或None（如果解析失败）
         """
-        if not date_str or pd.isna(date_str):
-            return None
-            
-        try:
-            # 尝试YYYYMMDD格式
-            if len(date_str) == 8 and date_str.isdigit():
-                return datetime.strptime(date_str, "%Y%m%d").date()
-            
-            # 尝试YYYY-MM-DD格式
-            if len(date_str) == 10 and date_str.count('-') == 2:
-                return datetime.strptime(date_str, "%Y-%m-%d").date()
-            
-            # 使用pandas的通用日期解析
-            parsed_date = pd.to_datetime(date_str, errors='coerce')
-            if pd.notna(parsed_date):
-                return parsed_date.date()
-                
-        except Exception as e:
-            self.logger.warning(f"无法解析日期字符串 '{date_str}': {e}") # type: ignore
-            
-        return None
+        return parse_date_string(date_str, self.logger)  # type: ignore
 
     def _get_date_and_timestamp_columns_from_target(self, target: Any) -> tuple[set, set]:
         """从目标对象获取日期和时间戳列名集合
@@ -485,6 +550,7 @@ class DatabaseOperationsMixin:
         conflict_columns: Optional[List[str]] = None,
         update_columns: Optional[List[str]] = None,
         timestamp_column: Optional[str] = None,
+        watermark_column: Optional[str] = None,
     ):
         """将DataFrame数据高效复制并可选地UPSERT到数据库表中。
 
@@ -507,6 +573,8 @@ class DatabaseOperationsMixin:
                                                 如果为None且conflict_columns已指定，则更新所有非冲突列。
             timestamp_column (Optional[str]): 时间戳列名。如果指定并在冲突时更新，
                                              如果其他数据列发生变化或特定条件下，该列将自动更新为当前时间。
+            watermark_column (Optional[str]): 水位日期列名。指定且水位目录可用时，在同一事务内
+                                             根据实际写入的行推进 meta.table_watermarks 中的水位。
 
         Returns:
             int: 影响的总行数 (指通过COPY命令加载到临时表的行数)。
@@ -545,6 +613,14 @@ class DatabaseOperationsMixin:
         # 获取目标表的日期列信息
         date_columns, timestamp_columns = self._get_date_and_timestamp_columns_from_target(target)
 
+        # 水位目录：需在获取写入连接前确认目录表可用（见 WatermarkCatalogMixin）
+        track_watermark = (
+            watermark_column is not None
+            and watermark_column in df_columns
+            and hasattr(self, "ensure_watermark_catalog")
+            and await self.ensure_watermark_catalog()  # type: ignore
+        )
+
         # 创建一个唯一的临时表名
         timestamp_ms = int(datetime.now().timestamp() * 1000)
         # 从解析后的名称中获取不带schema的表名用于临时表
@@ -555,47 +631,10 @@ class DatabaseOperationsMixin:
         CREATE TEMPORARY TABLE "{temp_table}" (LIKE {resolved_table_name} INCLUDING DEFAULTS) ON COMMIT DROP;
         '''
 
-        # --- 使用生成器准备记录以减少内存占用 ---
-        async def _df_to_records_generator(df_internal: pd.DataFrame):
-            for row_tuple in df_internal.itertuples(index=False, name=None):
-                processed_values = []
-                for i, val in enumerate(row_tuple):
-                    col_name = df_columns[i]
-                    
-                    if pd.isna(val):
-                        processed_values.append(None)
-                    elif isinstance(val, str):
-                        # 检查是否是日期列
-                        if col_name in date_columns.union(timestamp_columns):
-                            # 尝试解析日期字符串
-                            parsed_date = self._parse_date_string(val)
-                            processed_values.append(parsed_date)
-                        else:
-                            # 仅清理真正有问题的字符，保留正常的空格
-                            cleaned_val = val.replace('\x00', '')  # 移除NULL字符
-                            cleaned_val = cleaned_val.replace('\r', '')  # 移除回车符
-                            cleaned_val = cleaned_val.replace('\n', '')  # 移除换行符
-                            cleaned_val = cleaned_val.replace('\t', ' ')  # 制表符替换为空格
-                            # 不要替换双引号，让asyncpg自己处理
-                            processed_values.append(cleaned_val if cleaned_val else None)
-                    elif pd.api.types.is_datetime64_any_dtype(pd.Series([val])):
-                        # 处理pandas datetime对象
-                        if pd.isnull(val): # type: ignore
-                            processed_values.append(None)
-                        else:
-                            # 如果是纯日期列，则截断时间
-                            if col_name in date_columns:
-                                processed_values.append(val.date() if hasattr(val, 'date') else val)
-                            else:
-                                # 对于时间戳列，保留完整的 datetime 对象 (asyncpg会处理)
-                                processed_values.append(val)
-                    else:
-                        processed_values.append(val)
-                
-                record = tuple(processed_values)
-                yield record
-
-        records_iterable = _df_to_records_generator(df)
+        # --- 列式编码记录：每列只做一次清洗/日期解析，按需惰性拼出记录元组 ---
+        records_iterable = encode_copy_records(
+            df, date_columns, timestamp_columns, self.logger  # type: ignore
+        )
 
         async with self.pool.acquire() as conn: # type: ignore
             async with conn.transaction():
@@ -656,30 +695,57 @@ class DatabaseOperationsMixin:
 
                             update_clause_str = ", ".join(update_clauses)
 
-                            upsert_sql = f'''
+                            write_sql = f'''
                             INSERT INTO {resolved_table_name} ({target_col_str})
                             SELECT {target_col_str} FROM "{temp_table}"
                             ON CONFLICT ({conflict_col_str}) DO UPDATE SET
-                                {update_clause_str};
+                                {update_clause_str}
                             '''
                         else:
                             # 没有要更新的列，只执行插入（忽略冲突）
-                            upsert_sql = f'''
+                            write_sql = f'''
                             INSERT INTO {resolved_table_name} ({target_col_str})
                             SELECT {target_col_str} FROM "{temp_table}"
-                            ON CONFLICT ({conflict_col_str}) DO NOTHING;
+                            ON CONFLICT ({conflict_col_str}) DO NOTHING
                             '''
 
-                        self.logger.debug(f"执行UPSERT: {upsert_sql[:200]}...") # type: ignore
-                        await conn.execute(upsert_sql)
+                        self.logger.debug(f"执行UPSERT: {write_sql[:200]}...") # type: ignore
                     else:
                         # --- 简单插入 ---
-                        insert_sql = f'''
+                        write_sql = f'''
                         INSERT INTO {resolved_table_name} ({target_col_str})
-                        SELECT {target_col_str} FROM "{temp_table}";
+                        SELECT {target_col_str} FROM "{temp_table}"
                         '''
-                        self.logger.debug(f"执行INSERT: {insert_sql[:200]}...") # type: ignore
-                        await conn.execute(insert_sql)
+                        self.logger.debug(f"执行INSERT: {write_sql[:200]}...") # type: ignore
+
+                    if track_watermark:
+                        # 4. 由 RETURNING 汇总实际写入的行（xmax = 0 表示新插入而非更新），同一事务内推进水位
+                        # 只要目标表有 update_time 列就推进 max_update_time（INSERT 模式 / 无主键路径
+                        # 不传 timestamp_column，update_time 由 DataFrame 或列默认值写入）
+                        has_update_time = await self._has_update_time_column(  # type: ignore
+                            conn, resolved_table_name, df_columns
+                        )
+                        update_time_expr = '"update_time"' if has_update_time else "NULL::timestamp"
+                        written = await conn.fetchrow(
+                            f'''
+                            WITH written AS (
+                                {write_sql}
+                                RETURNING (xmax = 0) AS inserted,
+                                          "{watermark_column}" AS wm_date,
+                                          {update_time_expr} AS wm_update_time
+                            )
+                            SELECT COUNT(*) FILTER (WHERE inserted) AS inserted_rows,
+                                   MAX(wm_date)::text AS max_date,
+                                   MAX(wm_update_time)::text AS max_update_time
+                            FROM written
+                            '''
+                        )
+                        await self._advance_watermark(  # type: ignore
+                            conn, schema, table_name, watermark_column,
+                            written["max_date"], written["max_update_time"], written["inserted_rows"],
+                        )
+                    else:
+                        await conn.execute(write_sql)
 
                     # 性能监控：记录成功操作的性能数据
                     processing_time = time.time() - start_time
@@ -716,6 +782,14 @@ class DatabaseOperationsMixin:
                         f"COPY_FROM_DATAFRAME (表: {resolved_table_name}) 失败: {str(e)} "
                         f"| 失败前耗时: {processing_time:.2f}s | 批次大小: {batch_size} 行"
                     )
+                    if isinstance(
+                        e, (asyncpg.exceptions.UndefinedTableError, asyncpg.exceptions.UndefinedColumnError)
+                    ) and hasattr(self, "invalidate_schema_registry"):
+                        # 表被外部删除或改动：清除结构注册表记录，下次保存重新同步表结构
+                        try:
+                            await self.invalidate_schema_registry(target)  # type: ignore
+                        except Exception as invalidate_error:
+                            self.logger.warning(f"清除表结构注册表记录失败: {invalidate_error}")  # type: ignore
                     raise
 
     async def upsert(
@@ -725,6 +799,7 @@ class DatabaseOperationsMixin:
         conflict_columns: List[str],
         update_columns: Optional[List[str]] = None,
         timestamp_column: Optional[str] = None,
+        watermark_column: Optional[str] = None,
     ):
         """高效的UPSERT操作（插入或更新）
 
@@ -737,6 +812,7 @@ class DatabaseOperationsMixin:
             update_columns (Optional[List[str]]): 发生冲突时要更新的列名列表。
                                                 如果为None，则更新所有非冲突列。
             timestamp_column (Optional[str]): 时间戳列名，用于智能更新时间戳
+            watermark_column (Optional[str]): 水位日期列名，见 copy_from_dataframe
 
         Returns:
             int: 影响的行数
@@ -754,6 +830,7 @@ class DatabaseOperationsMixin:
             conflict_columns=conflict_columns,
             update_columns=update_columns,
             timestamp_column=timestamp_column,
+            watermark_column=watermark_column,
         )
 
     def get_performance_statistics(self) -> Dict[str, Any]:
@@ -788,6 +865,24 @@ class DatabaseOperationsMixin:
                 'monitoring_enabled': False
             }
 
+    def record_operation_performance(
+        self, batch_size: int, processing_time: float, operation_type: str
+    ) -> Optional[Dict[str, Any]]:
+        """记录由调用方计时的批量操作（如多连接并行保存的整体吞吐量）
+
+        Returns:
+            记录后的性能摘要；性能监控关闭时返回 None
+        """
+        if not hasattr(self, '_performance_monitor') or not self._enable_performance_monitoring:
+            return None
+        self._performance_monitor.record_batch_performance(
+            batch_size=batch_size,
+            processing_time=processing_time,
+            operation_type=operation_type
+        )
+        history = self._performance_monitor.performance_history
+        return self._performance_monitor.get_performance_summary(history[-1]) if history else None
+
     def reset_performance_statistics(self):
         """重置性能统计信息
 
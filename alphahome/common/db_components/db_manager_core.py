@@ -1,6 +1,5 @@
 import asyncio
 import threading
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from urllib.parse import urlparse
 from contextlib import asynccontextmanager
@@ -56,7 +55,7 @@ class DBManagerCore:
     ---------
     - async模式：通过连接池天然支持并发
     - sync模式：使用线程本地存储确保线程安全
-    - 模式切换：通过锁机制保护临界区操作
+    - 同步接口：async模式下由常驻后台事件循环执行，多线程调用可并发并共享连接池
     
     性能特点：
     --------
@@ -104,9 +103,10 @@ class DBManagerCore:
         if self.mode == "async":
             # 异步模式：使用 asyncpg
             self.pool = None
-            self._sync_lock = threading.Lock()
-            self._loop = None
-            self._executor = None
+            self._pool_loop = None  # 创建连接池的事件循环（asyncpg 连接池只能在该循环中使用）
+            self._bridge_lock = threading.Lock()
+            self._bridge_loop = None  # 同步接口使用的常驻后台事件循环
+            self._bridge_thread = None
         elif self.mode == "sync":
             # 同步模式：使用 psycopg2
             self._parse_connection_string()
@@ -393,6 +393,7 @@ class DBManagerCore:
                         'jit': 'off'  # 关闭JIT以提高小查询性能
                     })
                 )
+                self._pool_loop = asyncio.get_running_loop()
 
                 self.logger.info(
                     f"优化的异步数据库连接池创建成功 "
@@ -475,6 +476,7 @@ class DBManagerCore:
         if self.pool is not None:
             await self.pool.close()
             self.pool = None
+            self._pool_loop = None
             self.logger.info("异步数据库连接池已关闭")
 
     def close_sync(self):
@@ -484,51 +486,79 @@ class DBManagerCore:
         统一的连接关闭接口，支持异步和同步两种模式。
         
         模式处理：
-            - async模式：通过_run_sync()包装异步close()方法
+            - async模式：在连接池所属的事件循环中关闭连接池，并停止后台事件循环线程
             - sync模式：直接关闭线程本地连接
             
-        同步模式处理：
-            - 检查线程本地连接是否存在
-            - 检查连接是否仍然有效
-            - 优雅关闭连接并清理资源
-            
-        异步模式处理：
-            - 在新线程中运行异步关闭操作
-            - 确保不阻塞当前线程
-            - 处理可能的并发冲突
-            
         Note:
             - 此方法在任何模式下都可以安全调用
             - 支持重复调用，不会产生副作用
             - 是资源清理的推荐方法
         """
         if self.mode == "async":
-            return self._run_sync(self.close())
+            owner = self._pool_loop
+            if self.pool is not None and (owner is None or owner is self._bridge_loop or owner.is_running()):
+                self._run_sync(self.close())
+            else:
+                # 连接池所属事件循环已结束，连接已随之失效
+                self.pool = None
+                self._pool_loop = None
+            self._stop_bridge_loop()
         elif self.mode == "sync":
             if hasattr(self._local, "connection") and not self._local.connection.closed:
                 self._local.connection.close()
                 self.logger.debug("同步数据库连接已关闭")
 
+    def _get_bridge_loop(self) -> asyncio.AbstractEventLoop:
+        """获取（必要时启动）常驻后台事件循环线程"""
+        with self._bridge_lock:
+            if self._bridge_loop is None or self._bridge_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=f"db-bridge-{id(self):x}", daemon=True
+                )
+                thread.start()
+                self._bridge_loop, self._bridge_thread = loop, thread
+                self.logger.debug("同步接口后台事件循环已启动")
+            return self._bridge_loop
+
+    def _stop_bridge_loop(self) -> None:
+        """停止后台事件循环线程（连接池应已关闭）"""
+        with self._bridge_lock:
+            loop, thread = self._bridge_loop, self._bridge_thread
+            self._bridge_loop = self._bridge_thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        if not loop.is_running():
+            loop.close()
+        self.logger.debug("同步接口后台事件循环已停止")
+
+    def _resolve_sync_loop(self) -> asyncio.AbstractEventLoop:
+        """确定同步调用应提交到的事件循环：连接池所属的循环，没有连接池时为后台循环"""
+        owner = self._pool_loop
+        if self.pool is not None and owner is not None and owner is not self._bridge_loop:
+            if owner.is_running():
+                # 连接池由调用方的异步代码创建且该循环仍在运行（其他线程中）：提交到该循环
+                return owner
+            # 创建连接池的循环已结束（如 asyncio.run(db.connect())），旧连接池不可再用
+            self.logger.debug("连接池所属事件循环已结束，改用后台事件循环重新建立连接池")
+            self.pool = None
+            self._pool_loop = None
+        return self._get_bridge_loop()
+
     def _run_sync(self, coro):
         """在同步上下文中运行异步代码
         
-        提供了在同步环境中执行异步操作的桥接机制。这个方法解决了
-        异步代码和同步代码之间的兼容性问题。
+        所有同步调用都提交到同一个常驻后台事件循环（asyncio.run_coroutine_threadsafe），
+        连接池在该循环中创建后持续复用：
+            - 不再为每次调用创建/销毁事件循环，连接（及其预编译语句缓存）可跨调用复用
+            - 不加全局锁，不同线程的同步调用在后台循环中并发执行，各自占用连接池中的连接
+            - 在有运行中事件循环的线程（如 Jupyter）中调用同样安全，后台循环在独立线程中运行
         
-        执行策略：
-            1. 检测当前是否有运行中的事件循环
-            2. 如果有循环：在独立线程中运行异步代码
-            3. 如果无循环：直接使用asyncio.run()运行
-            
-        线程安全：
-            - 使用锁机制保护临界区
-            - 使用线程池避免重复创建线程
-            - 确保异步操作的原子性
-            
-        资源管理：
-            - 自动创建和管理线程池
-            - 智能清理执行器资源
-            - 处理线程执行异常
+        若连接池是由调用方自己的事件循环创建的（异步代码中 await connect()），
+        则提交到该循环执行；但不能在该循环所在线程中同步调用，否则会阻塞循环自身。
             
         Args:
             coro: 需要执行的协程对象
@@ -537,25 +567,27 @@ class DBManagerCore:
             Any: 协程的执行结果
             
         Raises:
+            RuntimeError: 在连接池所属事件循环的线程中同步调用时
             Exception: 协程执行过程中的任何异常
-            
-        Note:
-            - 此方法为内部方法，主要用于模式桥接
-            - 自动处理事件循环的检测和管理
-            - 支持嵌套调用和并发执行
         """
-        with self._sync_lock:
-            try:
-                # 尝试获取当前事件循环
-                loop = asyncio.get_running_loop()
-                # 如果有运行中的循环，在新线程中运行
-                if self._executor is None:
-                    self._executor = ThreadPoolExecutor(max_workers=1)
-                future = self._executor.submit(asyncio.run, coro)
-                return future.result()
-            except RuntimeError:
-                # 没有运行中的循环，直接运行
-                return asyncio.run(coro)
+        loop = self._resolve_sync_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError(
+                "不能在连接池所属事件循环的线程中调用同步数据库接口，请直接 await 对应的异步方法"
+            )
+
+        if self.pool is None and loop is self._bridge_loop:
+            # 只建立一次连接池，避免并发的首次调用各自创建连接池
+            with self._bridge_lock:
+                if self.pool is None:
+                    asyncio.run_coroutine_threadsafe(self.connect(), loop).result()
+
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
     # === 同步方法接口 ===
 
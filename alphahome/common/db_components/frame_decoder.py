@@ -0,0 +1,95 @@
+"""
+查询结果列式解码器
+
+把 ``COPY (query) TO STDOUT WITH (FORMAT csv, HEADER)`` 的输出直接解析为带类型的 DataFrame：
+CSV 由 pandas 的 C 解析器按列解析，不经过逐行的 Record / dict 对象。
+
+列类型来自查询结果描述（类型 OID）：
+- NUMERIC → float64（numeric_as_float=False 时保留 Decimal）
+- REAL / DOUBLE PRECISION → float64
+- SMALLINT / INTEGER / BIGINT → int64（含空值时为 float64，与 pandas 一致）
+- DATE / TIMESTAMP → datetime64[ns]，TIMESTAMPTZ → datetime64[ns, UTC]（parse_dates=False 时保留字符串）
+- BOOLEAN → bool
+- 其余类型按字符串读取，空值为 None（与 fetch 返回的记录一致）
+"""
+
+import io
+from decimal import Decimal
+from typing import Dict, List, Sequence, Tuple, Union
+
+import pandas as pd
+
+# PostgreSQL 内置类型 OID
+BOOL_OID = 16
+INT_OIDS = frozenset({20, 21, 23})
+FLOAT_OIDS = frozenset({700, 701})
+NUMERIC_OID = 1700
+DATE_OID = 1082
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+
+
+def _to_decimal(value: str):
+    return Decimal(value) if value != "" else None
+
+
+def build_copy_query(query: str) -> str:
+    """把 SELECT 查询包装为 CSV 格式的 COPY TO STDOUT 语句"""
+    return f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH (FORMAT csv, HEADER)"
+
+
+def decode_csv_frame(
+    data: Union[bytes, io.BytesIO],
+    columns: Sequence[Tuple[str, int]],
+    numeric_as_float: bool = True,
+    parse_dates: bool = True,
+) -> pd.DataFrame:
+    """
+    将 COPY CSV 输出解码为 DataFrame。
+
+    Args:
+        data: COPY 输出（含表头）
+        columns: [(列名, 类型 OID)]，顺序与查询结果一致
+        numeric_as_float: NUMERIC 列是否解码为 float64
+        parse_dates: DATE / TIMESTAMP 列是否解码为 datetime64
+    """
+    buffer = io.BytesIO(data) if isinstance(data, bytes) else data
+
+    dtype: Dict[str, object] = {}
+    converters = {}
+    date_columns: List[str] = []
+    tz_columns: List[str] = []
+    string_columns: List[str] = []
+    for name, oid in columns:
+        if oid in FLOAT_OIDS or (oid == NUMERIC_OID and numeric_as_float):
+            dtype[name] = "float64"
+        elif oid == NUMERIC_OID:
+            converters[name] = _to_decimal
+        elif oid in INT_OIDS or oid == BOOL_OID:
+            continue  # 交给解析器推断：无空值为 int64 / bool
+        elif oid in (DATE_OID, TIMESTAMP_OID, TIMESTAMPTZ_OID) and parse_dates:
+            dtype[name] = object
+            (tz_columns if oid == TIMESTAMPTZ_OID else date_columns).append(name)
+        else:
+            dtype[name] = object
+            string_columns.append(name)
+
+    df = pd.read_csv(
+        buffer,
+        dtype=dtype,
+        converters=converters,
+        true_values=["t"],
+        false_values=["f"],
+        keep_default_na=False,  # 只把空字段当作 NULL，"NA" 等字符串原样保留
+        na_values=[""],
+    )
+
+    for name in date_columns:
+        df[name] = pd.to_datetime(df[name], format="ISO8601")
+    for name in tz_columns:
+        df[name] = pd.to_datetime(df[name], format="ISO8601", utc=True)
+    for name in string_columns:
+        col = df[name]
+        if col.isna().any():
+            df[name] = col.astype(object).where(col.notna(), None)
+    return df
@@ -627,6 +627,10 @@ class SchemaManagementMixin:
                     )
                     raise
 
+        # 清除该表可能残留的水位记录（如表被删除后重建），下次读取时重新播种
+        if hasattr(self, "reset_table_watermark"):
+            await self.reset_table_watermark(target)  # type: ignore
+
     async def ensure_schema_exists(self, schema_name: str):
         """确保指定的 schema 存在，如果不存在则创建。
 
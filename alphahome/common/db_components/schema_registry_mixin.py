@@ -0,0 +1,153 @@
+"""
+表结构注册表 (schema registry) Mixin
+
+记录每张任务表最近一次成功同步时的结构指纹（schema_def / 主键 / 索引等的哈希），存放在
+meta.table_schema_registry 中。BaseTask 保存数据前比对指纹：一致时跳过 table_exists、
+ensure_table_schema_compatible 以及 rawdata 视图的 CREATE OR REPLACE，避免每次写入都执行 DDL。
+
+失效约定：
+- 任务的结构定义变化 → 指纹变化 → 下次保存重新同步。
+- 写入时遇到表或列不存在（表被外部删除/重建）→ copy_from_dataframe 清除该表的记录，下次保存重新同步。
+- 数据库迁移后可调用 invalidate_schema_registry（或 BaseTask.resync_schema）强制重新同步。
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+SCHEMA_REGISTRY_SCHEMA = "meta"
+SCHEMA_REGISTRY_TABLE = "table_schema_registry"
+SCHEMA_REGISTRY_TABLE_FULL = f'"{SCHEMA_REGISTRY_SCHEMA}"."{SCHEMA_REGISTRY_TABLE}"'
+
+# 同步逻辑（建表 / 兼容处理 / rawdata 视图策略）变化时递增，使所有记录失效
+SCHEMA_SYNC_VERSION = 1
+
+CREATE_SCHEMA_REGISTRY_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SCHEMA_REGISTRY_TABLE_FULL} (
+    schema_name VARCHAR(255) NOT NULL,
+    table_name VARCHAR(255) NOT NULL,
+    task_name VARCHAR(255),
+    fingerprint VARCHAR(64) NOT NULL,
+    synced_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (schema_name, table_name)
+);
+"""
+
+UPSERT_SCHEMA_REGISTRY_SQL = f"""
+INSERT INTO {SCHEMA_REGISTRY_TABLE_FULL} (schema_name, table_name, task_name, fingerprint, synced_at)
+VALUES ($1, $2, $3, $4, NOW())
+ON CONFLICT (schema_name, table_name) DO UPDATE SET
+    task_name = EXCLUDED.task_name,
+    fingerprint = EXCLUDED.fingerprint,
+    synced_at = NOW();
+"""
+
+
+def compute_schema_fingerprint(target: Any) -> str:
+    """根据影响建表和视图同步的任务属性计算结构指纹"""
+    payload = {
+        "version": SCHEMA_SYNC_VERSION,
+        "schema_def": getattr(target, "schema_def", None),
+        "primary_keys": getattr(target, "primary_keys", None),
+        "date_column": getattr(target, "date_column", None),
+        "indexes": getattr(target, "indexes", None),
+        "auto_add_update_time": getattr(target, "auto_add_update_time", True),
+        "data_source": getattr(target, "data_source", None),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SchemaRegistryMixin:
+    """表结构注册表Mixin
+
+    核心方法：
+    --------
+    - **is_schema_synced**: 指纹是否与最近一次成功同步一致（先查进程内缓存，再查注册表）
+    - **mark_schema_synced**: 同步成功后记录指纹
+    - **invalidate_schema_registry**: 清除单表或全部记录，强制下次保存重新同步
+
+    注册表不可用（如缺少建表权限）时自动停用，is_schema_synced 始终返回 False，行为与未启用时一致。
+    """
+
+    schema_registry_enabled: bool = True
+    _schema_registry_ready: Optional[bool] = None
+
+    def _synced_fingerprints(self) -> Dict[Tuple[str, str], str]:
+        cache = getattr(self, "_schema_fingerprint_cache", None)
+        if cache is None:
+            cache = self._schema_fingerprint_cache = {}
+        return cache
+
+    async def ensure_schema_registry(self) -> bool:
+        """确保注册表存在；失败时停用注册表并返回 False"""
+        if not self.schema_registry_enabled:
+            return False
+        if self._schema_registry_ready is not None:
+            return self._schema_registry_ready
+
+        if self.pool is None:  # type: ignore
+            await self.connect()  # type: ignore
+        try:
+            async with self.pool.acquire() as conn:  # type: ignore
+                await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{SCHEMA_REGISTRY_SCHEMA}"')
+                await conn.execute(CREATE_SCHEMA_REGISTRY_TABLE_SQL)
+            self._schema_registry_ready = True
+        except Exception as e:
+            self.logger.warning(f"表结构注册表 {SCHEMA_REGISTRY_TABLE_FULL} 不可用，每次保存将执行结构检查: {e}")  # type: ignore
+            self._schema_registry_ready = False
+        return self._schema_registry_ready
+
+    async def is_schema_synced(self, target: Any) -> bool:
+        """目标表的结构指纹是否与最近一次成功同步一致"""
+        if not await self.ensure_schema_registry():
+            return False
+        key = self.resolver.get_schema_and_table(target)  # type: ignore
+        fingerprint = compute_schema_fingerprint(target)
+        cache = self._synced_fingerprints()
+        if cache.get(key) == fingerprint:
+            return True
+
+        stored = await self.fetch_val(  # type: ignore
+            f"SELECT fingerprint FROM {SCHEMA_REGISTRY_TABLE_FULL} WHERE schema_name = $1 AND table_name = $2",
+            *key,
+        )
+        if stored == fingerprint:
+            cache[key] = fingerprint
+            return True
+        return False
+
+    async def mark_schema_synced(self, target: Any) -> None:
+        """记录目标表当前的结构指纹（应在建表/兼容处理/视图同步全部成功后调用）"""
+        if not await self.ensure_schema_registry():
+            return
+        schema, table = self.resolver.get_schema_and_table(target)  # type: ignore
+        fingerprint = compute_schema_fingerprint(target)
+        await self.execute(  # type: ignore
+            UPSERT_SCHEMA_REGISTRY_SQL, schema, table, getattr(target, "name", None), fingerprint
+        )
+        self._synced_fingerprints()[(schema, table)] = fingerprint
+
+    async def invalidate_schema_registry(self, target: Optional[Any] = None) -> None:
+        """
+        清除注册表记录，使下次保存重新执行结构同步。
+
+        Args:
+            target: 目标表（表名字符串或任务对象）；为 None 时清除全部记录
+        """
+        cache = self._synced_fingerprints()
+        if target is None:
+            cache.clear()
+        else:
+            key = self.resolver.get_schema_and_table(target)  # type: ignore
+            cache.pop(key, None)
+        if not await self.ensure_schema_registry():
+            return
+
+        if target is None:
+            await self.execute(f"DELETE FROM {SCHEMA_REGISTRY_TABLE_FULL}")  # type: ignore
+            self.logger.info("表结构注册表已清空，所有任务将在下次保存时重新同步结构")  # type: ignore
+        else:
+            await self.execute(  # type: ignore
+                f"DELETE FROM {SCHEMA_REGISTRY_TABLE_FULL} WHERE schema_name = $1 AND table_name = $2", *key
+            )
@@ -82,6 +82,13 @@ class UtilityMixin:
                 )
                 return None
 
+            # 优先读取水位目录（见 WatermarkCatalogMixin），避免对原表做 MAX 扫描；
+            # 记录缺失或有未同步的写入时直接扫描原表，读取路径不播种
+            if getattr(self, "watermark_catalog_enabled", False):
+                watermark = await self.get_table_watermark(target, date_column)  # type: ignore
+                if watermark is not None:
+                    return self._watermark_value(watermark, date_column)  # type: ignore
+
             result = await self.fetch_val(query)  # type: ignore
 
             query_duration = time.time() - start_time
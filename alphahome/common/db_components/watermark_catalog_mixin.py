@@ -0,0 +1,442 @@
+"""
+数据水位目录 (watermark catalog) Mixin
+
+为每张数据表维护一行水位记录（最新日期、最新 update_time、行数），存放在
+meta.table_watermarks 中，替代每次 SMART 更新 / GUI 刷新时对原始表执行的 MAX(date) 全表扫描。
+
+一致性约定：
+- 写入序号：播种时在原表上安装语句级触发器，任何途径的写入（copy_from_dataframe、executemany、
+  原生 SQL、外部作业）都会在同一事务内把 write_seq 加一（每个事务只加一次）。
+  记录仅在 synced_seq = write_seq（水位反映了全部写入）时可信，否则读取方回退到 MAX 扫描。
+- 推进：copy_from_dataframe 在同一事务内根据实际写入的行推进水位（GREATEST + 新增行数）；
+  若本事务之前的写入均已同步，同时推进 synced_seq。事务回滚时水位一并回滚。
+- 播种：只在写入路径（BaseTask 保存前的 ensure_table_watermark）或显式回填
+  （audit_table_watermarks 修复模式）中进行，在 SHARE 锁下对原表做一次 MAX/COUNT 扫描；
+  读取路径（get_latest_date、GUI）从不播种，避免 SHARE 锁阻塞并发写入。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import asyncpg
+
+WATERMARK_SCHEMA = "meta"
+WATERMARK_TABLE = "table_watermarks"
+WATERMARK_TABLE_FULL = f'"{WATERMARK_SCHEMA}"."{WATERMARK_TABLE}"'
+
+# 支持水位目录的日期列类型（information_schema.columns.data_type）
+# 两者的文本形式都能无损转为 TIMESTAMP，写入路径据此以文本传递水位值
+WATERMARK_DATE_TYPES = ("date", "timestamp without time zone")
+
+CREATE_WATERMARK_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE_FULL} (
+    schema_name VARCHAR(255) NOT NULL,
+    table_name VARCHAR(255) NOT NULL,
+    task_name VARCHAR(255),
+    date_column VARCHAR(255) NOT NULL,
+    date_type VARCHAR(64) NOT NULL,
+    max_date TIMESTAMP,
+    max_update_time TIMESTAMP,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    seeded_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW(),
+    write_seq BIGINT NOT NULL DEFAULT 0,
+    synced_seq BIGINT NOT NULL DEFAULT 0,
+    write_xact BIGINT,
+    tracked BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (schema_name, table_name)
+);
+"""
+
+# 早期版本的目录表缺少写入序号列；旧记录 tracked = FALSE，在下一次写入路径播种前不被信任
+MIGRATE_WATERMARK_TABLE_SQL = f"""
+ALTER TABLE {WATERMARK_TABLE_FULL}
+    ADD COLUMN IF NOT EXISTS write_seq BIGINT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS synced_seq BIGINT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS write_xact BIGINT,
+    ADD COLUMN IF NOT EXISTS tracked BOOLEAN NOT NULL DEFAULT FALSE;
+"""
+
+WRITE_TRIGGER_NAME = "trg_table_watermarks_write_seq"
+WRITE_TRIGGER_FUNCTION = f'"{WATERMARK_SCHEMA}"."bump_table_write_seq"'
+
+# 语句级触发器函数：每个写入事务只加一次 write_seq。
+# SECURITY DEFINER 使没有目录权限的外部写入方也能更新序号；目录表不存在时忽略，不影响写入
+CREATE_WRITE_TRIGGER_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION {WRITE_TRIGGER_FUNCTION}() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = pg_catalog AS $$
+BEGIN
+    UPDATE {WATERMARK_TABLE_FULL}
+       SET write_seq = write_seq + 1, write_xact = txid_current()
+     WHERE schema_name = TG_TABLE_SCHEMA AND table_name = TG_TABLE_NAME
+       AND write_xact IS DISTINCT FROM txid_current();
+    RETURN NULL;
+EXCEPTION WHEN undefined_table THEN
+    RETURN NULL;
+END
+$$;
+"""
+
+# 播种/修复：以扫描结果覆盖目录记录（调用方持有原表 SHARE 锁，此前的写入均已提交）
+UPSERT_WATERMARK_SQL = f"""
+INSERT INTO {WATERMARK_TABLE_FULL} (
+    schema_name, table_name, task_name, date_column, date_type,
+    max_date, max_update_time, row_count, seeded_at, updated_at, tracked
+)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, NOW(), NOW(), TRUE)
+ON CONFLICT (schema_name, table_name) DO UPDATE SET
+    task_name = COALESCE(EXCLUDED.task_name, {WATERMARK_TABLE_FULL}.task_name),
+    date_column = EXCLUDED.date_column,
+    date_type = EXCLUDED.date_type,
+    max_date = EXCLUDED.max_date,
+    max_update_time = EXCLUDED.max_update_time,
+    row_count = EXCLUDED.row_count,
+    synced_seq = {WATERMARK_TABLE_FULL}.write_seq,
+    tracked = TRUE,
+    seeded_at = NOW(),
+    updated_at = NOW();
+"""
+
+# 写入：在数据写入事务内推进水位（仅对已播种、日期列一致的记录生效）。
+# 触发器已为本事务加过 write_seq；只有本事务之前的写入均已同步（synced_seq = write_seq - 1）时
+# 才推进 synced_seq，否则记录保持待播种状态
+ADVANCE_WATERMARK_SQL = f"""
+UPDATE {WATERMARK_TABLE_FULL} SET
+    max_date = GREATEST(max_date, $4::text::timestamp),
+    max_update_time = GREATEST(max_update_time, $5::text::timestamp),
+    row_count = row_count + $6,
+    synced_seq = CASE
+        WHEN synced_seq = write_seq - 1 AND write_xact = txid_current() THEN write_seq
+        ELSE synced_seq
+    END,
+    updated_at = NOW()
+WHERE schema_name = $1 AND table_name = $2 AND date_column = $3;
+"""
+
+
+class WatermarkCatalogMixin:
+    """数据水位目录Mixin
+
+    核心方法：
+    --------
+    - **get_table_watermark**: 获取单表水位（仅返回可信记录，不播种）
+    - **get_table_watermarks**: 一次查询批量获取多表水位（GUI 列表使用）
+    - **ensure_table_watermark**: 写入路径调用，记录缺失或过期时播种
+    - **seed_table_watermark**: 安装写入触发器并扫描原表重建单表水位
+    - **audit_table_watermarks**: 审计模式，比对目录与原表的实际值，可选修复
+    - **_advance_watermark**: 供 copy_from_dataframe 在写入事务内调用
+    - **_has_update_time_column**: 供 copy_from_dataframe 判断是否随写入推进 max_update_time
+
+    目录不可用（如缺少建表权限）时自动停用，调用方回退到直接扫描原表。
+    """
+
+    watermark_catalog_enabled: bool = True
+    _watermark_catalog_ready: Optional[bool] = None
+
+    async def ensure_watermark_catalog(self) -> bool:
+        """确保水位目录表存在；失败时停用目录并返回 False"""
+        if not self.watermark_catalog_enabled:
+            return False
+        if self._watermark_catalog_ready is not None:
+            return self._watermark_catalog_ready
+
+        if self.pool is None:  # type: ignore
+            await self.connect()  # type: ignore
+        try:
+            async with self.pool.acquire() as conn:  # type: ignore
+                await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{WATERMARK_SCHEMA}"')
+                await conn.execute(CREATE_WATERMARK_TABLE_SQL)
+                await conn.execute(MIGRATE_WATERMARK_TABLE_SQL)
+                await conn.execute(CREATE_WRITE_TRIGGER_FUNCTION_SQL)
+            self._watermark_catalog_ready = True
+        except Exception as e:
+            self.logger.warning(f"水位目录 {WATERMARK_TABLE_FULL} 不可用，回退到直接扫描原表: {e}")  # type: ignore
+            self._watermark_catalog_ready = False
+        return self._watermark_catalog_ready
+
+    @staticmethod
+    def _is_watermark_fresh(row: Optional[Dict[str, Any]]) -> bool:
+        """记录是否反映了原表的全部写入（已安装触发器且 synced_seq = write_seq）"""
+        return bool(row) and bool(row.get("tracked")) and row.get("synced_seq") == row.get("write_seq")
+
+    @staticmethod
+    def _watermark_value(row: Dict[str, Any], column: str) -> Optional[Any]:
+        """按原列类型还原水位值：DATE 列返回 date，时间戳列返回 datetime"""
+        if column == "update_time":
+            return row["max_update_time"]
+        value = row["max_date"]
+        if value is not None and row["date_type"] == "date":
+            return value.date()
+        return value
+
+    async def _get_column_types(self, conn, schema: str, table: str, columns: Iterable[str]) -> Dict[str, str]:
+        rows = await conn.fetch(
+            """
+            SELECT column_name, data_type FROM information_schema.columns
+            WHERE table_schema = $1 AND table_name = $2 AND column_name = ANY($3::text[])
+            """,
+            schema, table, list(columns),
+        )
+        return {r["column_name"]: r["data_type"] for r in rows}
+
+    async def _scan_watermark(self, conn, schema: str, table: str, date_column: str) -> Optional[Dict[str, Any]]:
+        """扫描原表得到实际水位；日期列类型不支持时返回 None"""
+        types = await self._get_column_types(conn, schema, table, [date_column, "update_time"])
+        date_type = types.get(date_column)
+        if date_type not in WATERMARK_DATE_TYPES:
+            return None
+        update_expr = (
+            'MAX("update_time")::timestamp' if types.get("update_time") in WATERMARK_DATE_TYPES else "NULL::timestamp"
+        )
+        row = await conn.fetchrow(
+            f'SELECT MAX("{date_column}")::timestamp AS max_date, {update_expr} AS max_update_time, '
+            f'COUNT(*) AS row_count FROM "{schema}"."{table}"'
+        )
+        return {
+            "date_type": date_type,
+            "max_date": row["max_date"],
+            "max_update_time": row["max_update_time"],
+            "row_count": int(row["row_count"]),
+        }
+
+    @staticmethod
+    async def _ensure_write_trigger(conn, relation: str) -> None:
+        """在原表上安装维护 write_seq 的语句级触发器（已存在时跳过）"""
+        exists = await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = to_regclass($1) AND tgname = $2)",
+            relation, WRITE_TRIGGER_NAME,
+        )
+        if not exists:
+            await conn.execute(
+                f"CREATE TRIGGER {WRITE_TRIGGER_NAME} "
+                f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {relation} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION {WRITE_TRIGGER_FUNCTION}()"
+            )
+
+    async def seed_table_watermark(self, target: Any, date_column: str) -> Optional[Dict[str, Any]]:
+        """
+        安装写入触发器，在 SHARE 锁下扫描原表并覆盖写入水位记录。
+
+        SHARE 锁会阻塞并发写入，只应在写入路径或显式回填中调用。
+
+        Returns:
+            新的水位记录；表不存在、日期列类型不支持、无法安装触发器或目录不可用时返回 None
+        """
+        if not await self.ensure_watermark_catalog():
+            return None
+        schema, table = self.resolver.get_schema_and_table(target)  # type: ignore
+        task_name = getattr(target, "name", None) or (target.get("name") if isinstance(target, dict) else None)
+
+        try:
+            async with self.pool.acquire() as conn:  # type: ignore
+                async with conn.transaction():
+                    # 先检查列类型，不支持的表无需加锁
+                    types = await self._get_column_types(conn, schema, table, [date_column])
+                    if types.get(date_column) not in WATERMARK_DATE_TYPES:
+                        return None
+                    await self._ensure_write_trigger(conn, f'"{schema}"."{table}"')
+                    await conn.execute(f'LOCK TABLE "{schema}"."{table}" IN SHARE MODE')
+                    actual = await self._scan_watermark(conn, schema, table, date_column)
+                    if actual is None:
+                        return None
+                    await conn.execute(
+                        UPSERT_WATERMARK_SQL,
+                        schema, table, task_name, date_column, actual["date_type"],
+                        actual["max_date"], actual["max_update_time"], actual["row_count"],
+                    )
+                    row = await conn.fetchrow(
+                        f"SELECT * FROM {WATERMARK_TABLE_FULL} WHERE schema_name = $1 AND table_name = $2",
+                        schema, table,
+                    )
+        except asyncpg.exceptions.UndefinedTableError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"播种水位记录失败 ({schema}.{table}): {e}")  # type: ignore
+            return None
+
+        self.logger.info(  # type: ignore
+            f"水位记录已播种: {schema}.{table} ({date_column}) max_date={row['max_date']} rows={row['row_count']}"
+        )
+        return dict(row)
+
+    async def _read_table_watermark(self, target: Any) -> Optional[Dict[str, Any]]:
+        schema, table = self.resolver.get_schema_and_table(target)  # type: ignore
+        row = await self.fetch_one(  # type: ignore
+            f"SELECT * FROM {WATERMARK_TABLE_FULL} WHERE schema_name = $1 AND table_name = $2",
+            schema, table,
+        )
+        return dict(row) if row is not None else None
+
+    async def get_table_watermark(self, target: Any, date_column: str) -> Optional[Dict[str, Any]]:
+        """
+        读取单表水位记录（只读，不播种）。
+
+        Returns:
+            可信的水位记录字典；记录缺失、过期、日期列不一致或目录不可用时返回 None
+            （调用方应回退到扫描原表）
+        """
+        if not await self.ensure_watermark_catalog():
+            return None
+        row = await self._read_table_watermark(target)
+        if not self._is_watermark_fresh(row):
+            return None
+        if date_column == "update_time" or row["date_column"] == date_column:  # type: ignore[index]
+            return row
+        return None
+
+    async def ensure_table_watermark(self, target: Any, date_column: str) -> Optional[Dict[str, Any]]:
+        """
+        写入路径调用：记录缺失、过期或日期列不一致时播种，随后的写入即可在事务内推进水位。
+
+        Returns:
+            可信的水位记录；无法播种时返回 None
+        """
+        if not await self.ensure_watermark_catalog():
+            return None
+        row = await self._read_table_watermark(target)
+        if self._is_watermark_fresh(row) and row["date_column"] == date_column:  # type: ignore[index]
+            return row
+        return await self.seed_table_watermark(target, date_column)
+
+    async def get_table_watermarks(
+        self, targets: Iterable[Any], fresh_only: bool = True
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        一次查询获取多张表的水位记录，返回 {(schema, table): 记录}；不触发播种。
+
+        fresh_only=False 时同时返回过期的记录（审计使用）。
+        """
+        if not await self.ensure_watermark_catalog():
+            return {}
+        keys = {self.resolver.get_schema_and_table(t) for t in targets}  # type: ignore
+        if not keys:
+            return {}
+        schemas, tables = zip(*sorted(keys))
+        rows = await self.fetch(  # type: ignore
+            f"""
+            SELECT w.* FROM {WATERMARK_TABLE_FULL} w
+            JOIN unnest($1::text[], $2::text[]) AS k(schema_name, table_name)
+              ON w.schema_name = k.schema_name AND w.table_name = k.table_name
+            """,
+            list(schemas), list(tables),
+        )
+        return {
+            (r["schema_name"], r["table_name"]): dict(r)
+            for r in rows
+            if not fresh_only or self._is_watermark_fresh(dict(r))
+        }
+
+    @staticmethod
+    async def _has_update_time_column(conn, relation: str, df_columns: Iterable[str]) -> bool:
+        """目标表是否有 update_time 列（写入的 DataFrame 不含该列时由默认值填充，仍需查系统目录）"""
+        if "update_time" in df_columns:
+            return True
+        return bool(await conn.fetchval(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = to_regclass($1) AND attname = 'update_time'
+                  AND attnum > 0 AND NOT attisdropped
+            )
+            """,
+            relation,
+        ))
+
+    async def _advance_watermark(
+        self,
+        conn,
+        schema: str,
+        table: str,
+        date_column: str,
+        max_date: Optional[str],
+        max_update_time: Optional[str],
+        inserted_rows: int,
+    ) -> None:
+        """
+        在调用方的写入事务内推进水位（嵌套事务即 SAVEPOINT）。
+
+        失败时只回滚水位更新并删除该表的目录记录（下次写入前重新播种），不影响数据写入。
+        """
+        if not self._watermark_catalog_ready:
+            return
+        try:
+            async with conn.transaction():
+                await conn.execute(
+                    ADVANCE_WATERMARK_SQL, schema, table, date_column, max_date, max_update_time, inserted_rows
+                )
+        except Exception as e:
+            self.logger.warning(f"推进水位失败 ({schema}.{table})，已清除目录记录待重新播种: {e}")  # type: ignore
+            await conn.execute(
+                f"DELETE FROM {WATERMARK_TABLE_FULL} WHERE schema_name = $1 AND table_name = $2", schema, table
+            )
+
+    async def reset_table_watermark(self, target: Any, date_column: Optional[str] = None) -> None:
+        """
+        将目录记录重置为空表状态（新建表后调用）；未指定日期列时仅删除记录。
+        """
+        if not await self.ensure_watermark_catalog():
+            return
+        schema, table = self.resolver.get_schema_and_table(target)  # type: ignore
+        await self.execute(  # type: ignore
+            f"DELETE FROM {WATERMARK_TABLE_FULL} WHERE schema_name = $1 AND table_name = $2", schema, table
+        )
+        if date_column:
+            await self.seed_table_watermark(target, date_column)
+
+    async def audit_table_watermarks(
+        self, targets: Iterable[Tuple[Any, str]], repair: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        审计模式：逐表扫描原表，与目录记录比对；repair=True 时也是目录的显式回填步骤。
+
+        Args:
+            targets: (目标表, 日期列) 序列；目标表可以是任务对象、表名或 {data_source, table_name} 字典
+            repair: 是否用扫描结果修复不一致/缺失的记录
+
+        Returns:
+            差异列表，每项包含 schema、table、status（missing / stale / mismatch / unsupported / table_missing）、
+            catalog 与 actual 两份水位
+        """
+        issues: List[Dict[str, Any]] = []
+        if not await self.ensure_watermark_catalog():
+            return issues
+        targets = list(targets)
+        catalog = await self.get_table_watermarks((t for t, _ in targets), fresh_only=False)
+
+        for target, date_column in targets:
+            schema, table = self.resolver.get_schema_and_table(target)  # type: ignore
+            if not await self.table_exists(target):  # type: ignore
+                if (schema, table) in catalog:
+                    issues.append({"schema": schema, "table": table, "status": "table_missing",
+                                   "catalog": catalog[(schema, table)], "actual": None})
+                    if repair:
+                        await self.reset_table_watermark(target)
+                continue
+
+            async with self.pool.acquire() as conn:  # type: ignore
+                actual = await self._scan_watermark(conn, schema, table, date_column)
+            if actual is None:
+                issues.append({"schema": schema, "table": table, "status": "unsupported",
+                               "catalog": catalog.get((schema, table)), "actual": None})
+                continue
+
+            recorded = catalog.get((schema, table))
+            if recorded is None:
+                status = "missing"
+            elif not self._is_watermark_fresh(recorded):
+                # 有未同步的写入（或尚未安装触发器），读取方会回退到扫描原表
+                status = "stale"
+            else:
+                drift = recorded["date_column"] != date_column or any(
+                    recorded[k] != actual[k] for k in ("max_date", "max_update_time", "row_count")
+                )
+                if not drift:
+                    continue
+                status = "mismatch"
+
+            issues.append({"schema": schema, "table": table, "status": status,
+                           "catalog": recorded, "actual": actual})
+            if repair:
+                await self.seed_table_watermark(target, date_column)
+
+        return issues
+
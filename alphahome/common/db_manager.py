@@ -13,6 +13,8 @@ from .db_components import (
     DBManagerCore,
     SchemaManagementMixin,
     UtilityMixin,
+    WatermarkCatalogMixin,
+    SchemaRegistryMixin,
 )
 
 
@@ -24,6 +26,8 @@ class DBManager(
     DatabaseOperationsMixin,  # 整合的数据库操作功能
     SchemaManagementMixin,    # 表结构管理功能
     UtilityMixin,             # 实用工具功能
+    WatermarkCatalogMixin,    # 数据水位目录
+    SchemaRegistryMixin,      # 表结构注册表
     DBManagerCore,            # 核心连接管理功能
 ):
     """数据库连接管理器 v2.0 - 整合架构版本
@@ -43,6 +47,8 @@ class DBManager(
       ↳ 包含所有高级数据操作（copy_from_dataframe, upsert等）
     - SchemaManagementMixin: 表结构管理（table_exists, create_table等）
     - UtilityMixin: 实用工具（get_latest_date, test_connection等）
+    - WatermarkCatalogMixin: 数据水位目录（get_table_watermark, audit_table_watermarks等）
+    - SchemaRegistryMixin: 表结构注册表（is_schema_synced, invalidate_schema_registry等）
     
     使用方式：
     --------
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+包级延迟导出 (PEP 562)
+
+包 __init__ 只声明"导出名 -> 所在子模块"的映射，首次访问属性时才导入对应子模块，
+避免 import 包时连带导入全部子模块及其重量级依赖。
+
+用法::
+
+    from ....common.lazy_import import lazy_exports
+
+    _LAZY_EXPORTS = {
+        "TushareStockDailyTask": ".tushare_stock_daily",
+    }
+    __all__ = list(_LAZY_EXPORTS)
+    __getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    生成包模块的 __getattr__ / __dir__。
+
+    Args:
+        package: 包名（通常传 __name__）
+        exports: 导出名 -> 模块名（相对模块以 "." 开头，相对于 package 解析）
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        # 缓存到包命名空间，后续访问不再经过 __getattr__
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
@@ -10,6 +10,7 @@ alphaHome 统一任务系统
 - BaseTask: 统一的任务基类
 - UnifiedTaskFactory: 统一的任务工厂
 - task_register: 统一的任务注册装饰器
+- TaskDAGScheduler: 基于任务依赖的 DAG 调度器
 
 设计目标:
 1. 统一fetchers和processors的任务架构
@@ -21,24 +22,22 @@ alphaHome 统一任务系统
 __version__ = "1.0.0"
 __author__ = "alphaHome Team"
 
-# 导入核心组件
-from .base_task import BaseTask
-from .task_decorator import task_register
-from .task_factory import (
-    UnifiedTaskFactory,
-    get_task,
-    get_tasks_by_type,
-    get_task_names_by_type,
-    get_task_types,
-)
+# 导出名 -> 所在子模块；首次访问时才导入（见 alphahome.common.lazy_import），
+# 使 task_manifest 等轻量子模块可在未安装 numpy/pandas 的环境中单独运行
+from ..lazy_import import lazy_exports
+
+_LAZY_EXPORTS = {
+    "BaseTask": ".base_task",
+    "task_register": ".task_decorator",
+    "TaskDAGScheduler": ".task_dag",
+    "derive_task_dependencies": ".task_dag",
+    "UnifiedTaskFactory": ".task_factory",
+    "get_task": ".task_factory",
+    "get_tasks_by_type": ".task_factory",
+    "get_task_names_by_type": ".task_factory",
+    "get_task_types": ".task_factory",
+}
 
 # 统一导出接口
-__all__ = [
-    "BaseTask",
-    "UnifiedTaskFactory",
-    "task_register",
-    "get_task",
-    "get_tasks_by_type",
-    "get_task_names_by_type",
-    "get_task_types",
-]
\ No newline at end of file
+__all__ = list(_LAZY_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,6 +1,7 @@
 import asyncio
 import inspect
 import logging
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, date
 from typing import Any, Callable, Dict, List, Optional, Union, Tuple
@@ -33,6 +34,8 @@ class BaseTask(ABC):
     timestamp_column_name: Optional[str] = "update_time" # 时间戳列名，None表示不使用
     data_source: Optional[str] = None  # 数据源标识（如'tushare', 'wind', 'jqdata'等）
     domain: Optional[str] = None  # 业务域标识（如'stock', 'fund', 'macro'等）
+    use_watermark_catalog: bool = True  # 保存时在同一事务内推进水位目录（meta.table_watermarks）
+    use_schema_registry: bool = True  # 结构指纹未变化时跳过保存前的建表检查与视图 DDL（meta.table_schema_registry）
     default_start_date: str = "20200101" # 默认起始日期
     transformations: Optional[Dict[str, Callable]] = None # 数据转换函数字典
     validations: Optional[List[Union[Callable, Tuple[Callable, str]]]] = None # 数据验证函数列表
@@ -41,7 +44,9 @@ class BaseTask(ABC):
 
     # 新增：数据保存批次大小
     default_save_batch_size: int = 10000  # 默认每次保存 10000 行
-    
+    # 并行保存：按主键哈希分片后在多个连接上同时写入（1 表示串行）
+    default_save_parallelism: int = 1
+
     # 新增：支持processor任务的属性
     source_tables = []        # 源数据表列表（processor任务使用）
     dependencies = []         # 依赖的其他任务（processor任务使用）
@@ -65,6 +70,7 @@ class BaseTask(ABC):
 
         # 设置保存批次大小
         self.save_batch_size = self.task_config.get("save_batch_size", self.default_save_batch_size)
+        self.save_parallelism = self.task_config.get("save_parallelism", self.default_save_parallelism)
 
         # 设置任务特定配置
         if hasattr(self, "set_config") and callable(self.set_config):
@@ -149,6 +155,8 @@ class BaseTask(ABC):
         2. 处理数据 (process_data -> _apply_transformations + 业务逻辑)
         3. 验证数据 (_validate_data)
         4. 保存数据 (_save_data)
+
+        1-4 步及后处理由 _execute_pipeline 完成，子类可重写该钩子调整各步的组织方式。
         """
         self.logger.info(f"开始执行任务: {self.name} (类型: {self.task_type})")
 
@@ -162,81 +170,8 @@ class BaseTask(ABC):
             if stop_event and stop_event.is_set():
                 raise asyncio.CancelledError("任务在 _pre_execute 后被取消")
 
-            # 获取数据
-            self.logger.info(f"获取数据，参数: {kwargs}")
-            data = await self._fetch_data(stop_event=stop_event, **kwargs)
-
-            if stop_event and stop_event.is_set():
-                raise asyncio.CancelledError("任务在 _fetch_data 后被取消")
-
-            if data is None or (isinstance(data, pd.DataFrame) and data.empty):
-                self.logger.info("没有获取到数据")
-                return {"status": "no_data", "rows": 0}
-
-            # 处理数据（模板方法模式）
-            self.logger.info(f"处理数据，共 {len(data) if isinstance(data, pd.DataFrame) else '多源'} 行")
-            # 兼容处理：支持异步和非异步的 process_data 方法
-            # - FetcherTask 及其子类使用非异步的 process_data 方法
-            # - ProcessorTaskBase 及其子类使用异步的 process_data 方法
-            result = self.process_data(data, stop_event=stop_event, **kwargs)
-            if asyncio.iscoroutine(result):
-                processed_data = await result
-            else:
-                processed_data = result
-
-            if stop_event and stop_event.is_set():
-                raise asyncio.CancelledError("任务在 process_data 后被取消")
-
-            # 再次检查处理后的数据是否为空
-            if processed_data is None or (isinstance(processed_data, pd.DataFrame) and processed_data.empty):
-                self.logger.warning("数据处理后为空")
-                return {"status": "no_data", "rows": 0}
-
-            # 验证数据（统一验证入口）
-            self.logger.debug(f"验证数据，共 {len(processed_data) if isinstance(processed_data, pd.DataFrame) else '多源'} 行")
-            validation_passed, validated_data, validation_details = self._validate_data(
-                processed_data,
-                stop_event=stop_event,
-                validation_mode=getattr(self, 'validation_mode', 'report')
-            )
-
-            if stop_event and stop_event.is_set():
-                raise asyncio.CancelledError("任务在 _validate_data 后被取消")
-
-            # 使用验证后的数据（可能被过滤）
-            final_data = validated_data
+            return await self._execute_pipeline(stop_event=stop_event, **kwargs)
 
-            # 保存数据
-            self.logger.info(f"保存数据到表 {self.table_name}")
-            save_result = await self._save_data(final_data, stop_event=stop_event)
-
-            if stop_event and stop_event.is_set():
-                raise asyncio.CancelledError("任务在 _save_data 后被取消")
-
-            # 构建最终结果，包含验证详情
-            final_result = {
-                "status": "success",
-                "table": self.table_name,
-                "rows": save_result.get("rows", 0) if isinstance(save_result, dict) else 0
-            }
-
-            # 添加验证信息
-            if not validation_passed:
-                final_result["status"] = "partial_success"
-                final_result["validation"] = False
-                final_result["validation_warning"] = "数据验证未完全通过，请检查日志"
-            else:
-                final_result["validation"] = True
-
-            # 添加验证详情
-            final_result["validation_details"] = validation_details
-
-            # 后处理
-            await self._post_execute(final_result, stop_event=stop_event)
-
-            self.logger.info(f"任务执行完成: {final_result}")
-            return final_result
-            
         except asyncio.CancelledError:
             self.logger.warning(f"任务 {self.name} 被取消。")
             return self._handle_error(asyncio.CancelledError("任务被用户取消"))
@@ -246,6 +181,107 @@ class BaseTask(ABC):
             )
             return self._handle_error(e)
 
+    async def _execute_pipeline(self, stop_event: Optional[asyncio.Event] = None, **kwargs):
+        """
+        获取 -> 处理 -> 验证 -> 保存 -> 后处理，返回任务结果。
+
+        取消与异常由 execute 统一处理。
+        """
+        # 获取数据
+        self.logger.info(f"获取数据，参数: {kwargs}")
+        data = await self._fetch_data(stop_event=stop_event, **kwargs)
+
+        if stop_event and stop_event.is_set():
+            raise asyncio.CancelledError("任务在 _fetch_data 后被取消")
+
+        if data is None or (isinstance(data, pd.DataFrame) and data.empty):
+            self.logger.info("没有获取到数据")
+            return {"status": "no_data", "rows": 0}
+
+        stage_result = await self._process_validate_save(
+            data, stop_event=stop_event, **kwargs
+        )
+        if stage_result is None:
+            return {"status": "no_data", "rows": 0}
+        save_result, validation_passed, validation_details = stage_result
+
+        # 构建最终结果，包含验证详情
+        final_result = {
+            "status": "success",
+            "table": self.table_name,
+            "rows": save_result.get("rows", 0) if isinstance(save_result, dict) else 0
+        }
+
+        # 添加验证信息
+        if not validation_passed:
+            final_result["status"] = "partial_success"
+            final_result["validation"] = False
+            final_result["validation_warning"] = "数据验证未完全通过，请检查日志"
+        else:
+            final_result["validation"] = True
+
+        # 添加验证详情
+        final_result["validation_details"] = validation_details
+
+        # 后处理
+        await self._post_execute(final_result, stop_event=stop_event)
+
+        self.logger.info(f"任务执行完成: {final_result}")
+        return final_result
+
+    async def _process_validate_save(
+        self, data, stop_event: Optional[asyncio.Event] = None, **kwargs
+    ) -> Optional[Tuple[Any, bool, Dict[str, Any]]]:
+        """
+        对一份已获取的数据依次执行 处理 -> 验证 -> 保存。
+
+        _execute_pipeline 对整份数据调用一次；子类也可按批次分别调用（如 FetcherTask 的流式模式）。
+
+        Returns:
+            (保存结果, 验证是否通过, 验证详情)；处理后数据为空时返回 None
+        """
+        # 处理数据（模板方法模式）
+        self.logger.info(f"处理数据，共 {len(data) if isinstance(data, pd.DataFrame) else '多源'} 行")
+        # 兼容处理：支持异步和非异步的 process_data 方法
+        # - FetcherTask 及其子类使用非异步的 process_data 方法
+        # - ProcessorTaskBase 及其子类使用异步的 process_data 方法
+        result = self.process_data(data, stop_event=stop_event, **kwargs)
+        if asyncio.iscoroutine(result):
+            processed_data = await result
+        else:
+            processed_data = result
+
+        if stop_event and stop_event.is_set():
+            raise asyncio.CancelledError("任务在 process_data 后被取消")
+
+        # 再次检查处理后的数据是否为空
+        if processed_data is None or (isinstance(processed_data, pd.DataFrame) and processed_data.empty):
+            self.logger.warning("数据处理后为空")
+            return None
+
+        # 验证数据（统一验证入口）
+        self.logger.debug(f"验证数据，共 {len(processed_data) if isinstance(processed_data, pd.DataFrame) else '多源'} 行")
+        validation_passed, validated_data, validation_details = self._validate_data(
+            processed_data,
+            stop_event=stop_event,
+            validation_mode=getattr(self, 'validation_mode', 'report')
+        )
+
+        if stop_event and stop_event.is_set():
+            raise asyncio.CancelledError("任务在 _validate_data 后被取消")
+
+        # 使用验证后的数据（可能被过滤）
+        final_data = validated_data
+
+        # 保存数据
+        self.logger.info(f"保存数据到表 {self.table_name}")
+        save_result = await self._save_data(final_data, stop_event=stop_event)
+
+        if stop_event and stop_event.is_set():
+            raise asyncio.CancelledError("任务在 _save_data 后被取消")
+
+        return save_result, validation_passed, validation_details
+
     # 新增：多表数据获取支持
     async def fetch_multiple_sources(self, source_configs, **kwargs):
         """支持从多个表获取数据，为processor任务提供"""
@@ -562,6 +598,7 @@ class BaseTask(ABC):
         await self._ensure_table_exists()
         if stop_event and stop_event.is_set():
             raise asyncio.CancelledError("任务在 _ensure_table_exists 后被取消")
+        await self._ensure_watermark_seeded()
 
         # 新增：在保存前根据主键去重
         if self.primary_keys and not data.empty:
@@ -627,8 +664,15 @@ class BaseTask(ABC):
         total_affected_rows = 0
         # 获取实际的保存批次大小
         save_batch_size = getattr(self, "save_batch_size", self.default_save_batch_size)
+        save_parallelism = self._get_effective_save_parallelism()
+
+        can_shard = bool(self.primary_keys) and all(pk in data.columns for pk in self.primary_keys)
 
-        if not data.empty and save_batch_size > 0 and len(data) > save_batch_size:
+        if save_parallelism > 1 and can_shard and save_batch_size > 0 and len(data) > save_batch_size:
+            total_affected_rows = await self._save_data_parallel(
+                data, save_batch_size, save_parallelism, stop_event=stop_event
+            )
+        elif not data.empty and save_batch_size > 0 and len(data) > save_batch_size:
             self.logger.info(f"数据量较大 ({len(data)} 行)，将分批保存，每批 {save_batch_size} 行。")
             num_batches = (len(data) + save_batch_size - 1) // save_batch_size
             for i in range(num_batches):
@@ -658,8 +702,83 @@ class BaseTask(ABC):
 
         return final_result
 
-    async def _ensure_table_exists(self, stop_event: Optional[asyncio.Event] = None, **kwargs):
-        """确保数据库表存在，如果不存在则创建"""
+    def _get_effective_save_parallelism(self) -> int:
+        """并行保存的连接数：受配置与连接池大小约束，至少保留 2 个连接给其他查询"""
+        try:
+            parallelism = int(getattr(self, "save_parallelism", self.default_save_parallelism) or 1)
+        except (TypeError, ValueError):
+            self.logger.warning(f"无效的 save_parallelism 配置: {self.save_parallelism}，改为串行保存")
+            return 1
+        pool = getattr(self.db, "pool", None) if isinstance(self.db, DBManager) else None
+        if pool is not None:
+            parallelism = min(parallelism, max(1, pool.get_max_size() - 2))
+        return max(1, parallelism)
+
+    async def _save_data_parallel(
+        self,
+        data: pd.DataFrame,
+        save_batch_size: int,
+        parallelism: int,
+        stop_event: Optional[asyncio.Event] = None,
+    ) -> int:
+        """
+        按主键哈希把数据分成互不相交的分片，每个分片在独立的连接上按批次串行写入。
+
+        同一主键只会出现在一个分片中，各连接的 UPSERT 锁定的行互不重叠，不会相互死锁；
+        每个批次仍是独立事务，水位目录的推进在各事务末尾完成。
+        """
+        shard_ids = pd.util.hash_pandas_object(data[self.primary_keys], index=False).to_numpy() % parallelism
+        shards = [data[shard_ids == i] for i in range(parallelism)]
+        shards = [shard for shard in shards if not shard.empty]
+        self.logger.info(
+            f"数据量较大 ({len(data)} 行)，将按主键哈希分为 {len(shards)} 个分片并行保存，每批 {save_batch_size} 行。"
+        )
+
+        async def save_shard(shard_no: int, shard: pd.DataFrame) -> int:
+            affected = 0
+            num_batches = (len(shard) + save_batch_size - 1) // save_batch_size
+            for i in range(num_batches):
+                if stop_event and stop_event.is_set():
+                    raise asyncio.CancelledError("任务在并行保存期间被取消")
+                batch_data = shard.iloc[i * save_batch_size:(i + 1) * save_batch_size].copy()
+                self.logger.debug(f"分片 {shard_no + 1}/{len(shards)}: 正在保存批次 {i + 1}/{num_batches}")
+                affected += await self._save_to_database(batch_data, stop_event=stop_event)
+            return affected
+
+        start_time = time.perf_counter()
+        workers = [asyncio.ensure_future(save_shard(i, shard)) for i, shard in enumerate(shards)]
+        try:
+            results = await asyncio.gather(*workers)
+        except BaseException:
+            # 任一分片失败（或任务取消）时停止其余分片，已提交的批次保留
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        elapsed = time.perf_counter() - start_time
+
+        total_affected_rows = sum(results)
+        if isinstance(self.db, DBManager):
+            self.db.record_operation_performance(len(data), elapsed, operation_type="parallel_save")
+        self.logger.info(
+            f"并行保存完成: {len(data)} 行 | 分片: {len(shards)} | 耗时: {elapsed:.2f}s | "
+            f"吞吐量: {len(data) / max(elapsed, 1e-9):.0f} 行/秒"
+        )
+        return total_affected_rows
+
+    async def _ensure_table_exists(
+        self, stop_event: Optional[asyncio.Event] = None, force_sync: bool = False, **kwargs
+    ):
+        """确保数据库表存在，如果不存在则创建
+
+        结构指纹与注册表中最近一次成功同步的记录一致时（见 SchemaRegistryMixin）直接返回，
+        跳过表检查、结构兼容处理和 rawdata 视图 DDL；force_sync=True 时忽略注册表重新同步。
+        """
+        use_registry = self.use_schema_registry and isinstance(self.db, DBManager)
+        if use_registry and not force_sync and await self.db.is_schema_synced(self):
+            return
+
+        synced = True
         table_exists = await self.db.table_exists(self)
         
         if stop_event and stop_event.is_set():
@@ -678,14 +797,36 @@ class BaseTask(ABC):
                 try:
                     await self.db.ensure_table_schema_compatible(self)
                 except Exception as e:
+                    synced = False
                     self.logger.warning(
                         f"表结构兼容检查失败（不影响建表流程，可能影响后续写入）: {e}"
                     )
 
         # 表创建完成后，自动创建 rawdata 视图（如果表是新创建的，或者已存在）
         # 注意：第一次调用时表刚创建，后续调用时表已存在都会尝试创建视图
-        await self._create_rawdata_view_if_needed()
+        synced = await self._create_rawdata_view_if_needed() and synced
 
+        # 仅在全部步骤成功后记录指纹，失败的步骤会在下次保存时重试
+        if use_registry and synced:
+            try:
+                await self.db.mark_schema_synced(self)
+            except Exception as e:
+                self.logger.warning(f"记录表结构指纹失败（不影响数据保存）: {e}")
+
+    async def _ensure_watermark_seeded(self) -> None:
+        """写入前确保水位目录记录可信（缺失或有未同步的外部写入时在 SHARE 锁下重新播种）"""
+        if not (self.use_watermark_catalog and self.date_column and isinstance(self.db, DBManager)):
+            return
+        try:
+            await self.db.ensure_table_watermark(self, self.date_column)
+        except Exception as e:
+            self.logger.warning(f"水位目录播种失败（不影响数据保存，读取时回退到扫描原表）: {e}")
+
+    async def resync_schema(self) -> None:
+        """忽略表结构注册表，强制重新执行建表检查、结构兼容处理和 rawdata 视图同步（用于数据库迁移后）"""
+        if isinstance(self.db, DBManager):
+            await self.db.invalidate_schema_registry(self)
+        await self._ensure_table_exists(force_sync=True)
 
     async def _create_table(self, stop_event: Optional[asyncio.Event] = None, **kwargs):
         """通过调用DB Manager中的方法来创建数据表和索引"""
@@ -703,10 +844,13 @@ class BaseTask(ABC):
            以便源表增列后视图仍为 `SELECT *`，避免长期停留在旧列清单上。
         
         为了确保系统稳定性，该方法的失败不会中断主数据采集流程。
+
+        Returns:
+            bool: 视图已同步或无需同步时为 True，出错时为 False
         """
         # 跳过非主要数据源（rawdata 本身不需要映射）
         if not self.data_source or self.data_source == 'rawdata':
-            return
+            return True
         
         schema = self.data_source  # 例如 'tushare', 'akshare'
         table = self.table_name    # 例如 'stock_basic'
@@ -727,7 +871,8 @@ class BaseTask(ABC):
                 self.logger.warning(
                     f"创建 rawdata 视图失败（不影响数据采集）: {e}"
                 )
-            return
+                return False
+            return True
         
         # 非 tushare 源：检查 tushare 是否已有同名表
         try:
@@ -740,7 +885,7 @@ class BaseTask(ABC):
                 self.logger.info(
                     f"跳过 {schema}.{table} 的 rawdata 视图创建：tushare 优先"
                 )
-                return
+                return True
 
             # 始终 OR REPLACE：源 schema 表结构演进后，rawdata 视图需同步列集合
             await self.db.create_rawdata_view(
@@ -752,24 +897,32 @@ class BaseTask(ABC):
             self.logger.info(
                 f"已同步 rawdata.{table} 视图 -> {schema}.{table}（OR REPLACE）"
             )
+            return True
         except Exception as e:
             self.logger.warning(
                 f"创建 rawdata 视图时出错（不影响数据采集）: {e}"
             )
+            return False
 
 
     async def _save_to_database(self, data, stop_event: Optional[asyncio.Event] = None, **kwargs):
         """将DataFrame保存到数据库（提供给子类重写的高级接口）"""
 
+        watermark_column = self.date_column if self.use_watermark_catalog else None
+
         # 检查是否强制使用INSERT模式
         if self.use_insert_mode:
             self.logger.info(f"任务 {self.name} 使用INSERT模式保存数据，跳过重复数据检查")
-            return await self.db.copy_from_dataframe(df=data, target=self)
+            return await self.db.copy_from_dataframe(
+                df=data, target=self, watermark_column=watermark_column
+            )
 
         # 原有的UPSERT逻辑
         if not self.primary_keys:
             self.logger.warning(f"任务 {self.name} 未定义主键 (primary_keys)，将使用简单的 COPY 插入，可能导致重复数据。")
-            return await self.db.copy_from_dataframe(df=data, target=self)
+            return await self.db.copy_from_dataframe(
+                df=data, target=self, watermark_column=watermark_column
+            )
 
         df_columns = list(data.columns)
         update_columns = [
@@ -784,6 +937,7 @@ class BaseTask(ABC):
                 conflict_columns=self.primary_keys,
                 update_columns=update_columns,
                 timestamp_column="update_time" if self.auto_add_update_time else None,
+                watermark_column=watermark_column,
             )
             return affected_rows
         except Exception as e:
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务依赖图与 DAG 调度器
+
+依赖来源（均来自任务类元数据，无需手工维护执行顺序）：
+1. 显式声明：任务类的 ``dependencies`` 属性；
+2. 隐式推导：任务方法引用了依赖基础表的批次工具/日历函数时，
+   自动依赖对应的生产任务（如交易日批次依赖交易日历任务，按股票代码分批依赖 stock_basic 任务）。
+
+只有本次运行集合内的任务才会成为依赖边；不在集合内的上游视为已就绪（使用库中已有数据）。
+
+``TaskDAGScheduler`` 同时调度所有数据源，按数据源限制并发，
+并在某个任务的全部上游结束后立即启动它。
+"""
+
+import asyncio
+import logging
+import types
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 被引用的函数名 -> 提供其所需基础数据的任务
+IMPLICIT_DEPENDENCY_RULES: Dict[str, str] = {
+    "generate_trade_day_batches": "tushare_others_tradecal",
+    "generate_single_date_batches": "tushare_others_tradecal",
+    "get_trade_days_between": "tushare_others_tradecal",
+    "get_trade_cal": "tushare_others_tradecal",
+    "get_last_trade_day": "tushare_others_tradecal",
+    "get_next_trade_day": "tushare_others_tradecal",
+    "shift_trade_day": "tushare_others_tradecal",
+    "count_trade_days": "tushare_others_tradecal",
+    "get_period_end_trade_days": "tushare_others_tradecal",
+    "get_trade_calendar_index": "tushare_others_tradecal",
+    "get_trade_calendar_index_sync": "tushare_others_tradecal",
+    "generate_stock_code_batches": "tushare_stock_basic",
+    "generate_fund_code_batches": "tushare_fund_basic",
+}
+
+
+def _iter_code_names(code: types.CodeType) -> Iterable[str]:
+    """递归收集代码对象（含内部函数/闭包）引用的全局名与导入名"""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _iter_code_names(const)
+
+
+def referenced_names(task_class: type) -> Set[str]:
+    """返回任务类（含父类）方法中引用的名称集合"""
+    names: Set[str] = set()
+    for klass in task_class.__mro__:
+        if klass is object:
+            continue
+        for attr in vars(klass).values():
+            func = attr.__func__ if isinstance(attr, (classmethod, staticmethod)) else attr
+            code = getattr(func, "__code__", None)
+            if isinstance(code, types.CodeType):
+                names.update(_iter_code_names(code))
+    return names
+
+
+def derive_task_dependencies(
+    task_classes: Mapping[str, type],
+    rules: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Set[str]]:
+    """
+    根据任务元数据推导依赖关系。
+
+    Args:
+        task_classes: 任务名 -> 任务类（即本次运行集合）
+        rules: 隐式依赖规则，默认 ``IMPLICIT_DEPENDENCY_RULES``
+
+    Returns:
+        任务名 -> 其依赖的任务名集合（仅包含运行集合内的任务）
+    """
+    rules = IMPLICIT_DEPENDENCY_RULES if rules is None else rules
+    dependencies: Dict[str, Set[str]] = {}
+    for task_name, task_class in task_classes.items():
+        deps = set(getattr(task_class, "dependencies", None) or [])
+        names = referenced_names(task_class)
+        deps.update(provider for ref, provider in rules.items() if ref in names)
+        deps.discard(task_name)
+        dependencies[task_name] = {dep for dep in deps if dep in task_classes}
+    return dependencies
+
+
+def find_cycle(dependencies: Mapping[str, Set[str]]) -> Optional[List[str]]:
+    """检测依赖环，存在时返回环上的任务名列表"""
+    visiting: Set[str] = set()
+    done: Set[str] = set()
+    path: List[str] = []
+
+    def _visit(node: str) -> Optional[List[str]]:
+        visiting.add(node)
+        path.append(node)
+        for dep in sorted(dependencies.get(node, ())):
+            if dep in visiting:
+                return path[path.index(dep):] + [dep]
+            if dep not in done:
+                cycle = _visit(dep)
+                if cycle:
+                    return cycle
+        visiting.discard(node)
+        path.pop()
+        done.add(node)
+        return None
+
+    for node in sorted(dependencies):
+        if node not in done:
+            cycle = _visit(node)
+            if cycle:
+                return cycle
+    return None
+
+
+class TaskDAGScheduler:
+    """按依赖关系和数据源并发上限调度任务
+
+    - 不同数据源的任务同时运行，各自受 ``source_limits`` 约束；
+    - 任务在所有上游结束后立即启动；上游失败不会阻止下游执行（下游仍可使用库中已有数据），
+      但会记录警告并在结果中标注 ``failed_dependencies``。
+    """
+
+    def __init__(
+        self,
+        run_task: Callable[[str], Awaitable[Dict[str, Any]]],
+        dependencies: Mapping[str, Set[str]],
+        source_of: Callable[[str], str],
+        source_limits: Mapping[str, int],
+        default_limit: int = 1,
+        log: Optional[logging.Logger] = None,
+    ):
+        self.run_task = run_task
+        self.dependencies = {name: set(deps) for name, deps in dependencies.items()}
+        self.source_of = source_of
+        self.source_limits = dict(source_limits)
+        self.default_limit = max(1, int(default_limit))
+        self.logger = log or logger
+
+    @staticmethod
+    def _is_failed(result: Dict[str, Any]) -> bool:
+        return result.get("status") in ("failed", "error")
+
+    async def run(self, task_names: List[str]) -> List[Dict[str, Any]]:
+        """执行全部任务，返回与 ``task_names`` 顺序一致的结果列表"""
+        task_set = set(task_names)
+        deps = {
+            name: self.dependencies.get(name, set()) & task_set for name in task_names
+        }
+        cycle = find_cycle(deps)
+        if cycle:
+            raise ValueError(f"任务依赖存在环: {' -> '.join(cycle)}")
+
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        for name in task_names:
+            source = self.source_of(name)
+            if source not in semaphores:
+                limit = self.source_limits.get(source, self.default_limit)
+                semaphores[source] = asyncio.Semaphore(max(1, int(limit)))
+
+        dependents: Dict[str, List[str]] = {name: [] for name in task_names}
+        remaining = {name: len(deps[name]) for name in task_names}
+        for name in task_names:
+            for dep in deps[name]:
+                dependents[dep].append(name)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        running: Dict[asyncio.Task, str] = {}
+
+        async def _run_one(name: str) -> Dict[str, Any]:
+            async with semaphores[self.source_of(name)]:
+                return await self.run_task(name)
+
+        def _launch(name: str):
+            failed_deps = sorted(d for d in deps[name] if self._is_failed(results[d]))
+            if failed_deps:
+                self.logger.warning(f"[{name}] 上游任务失败: {failed_deps}，仍将执行")
+            running[asyncio.create_task(_run_one(name))] = name
+
+        for name in task_names:
+            if remaining[name] == 0:
+                _launch(name)
+
+        try:
+            while running:
+                finished, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for fut in finished:
+                    name = running.pop(fut)
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        self.logger.error(f"[{name}] 任务执行异常: {e}")
+                        result = {
+                            "task_name": name,
+                            "status": "error",
+                            "error": str(e),
+                            "attempts": 1,
+                        }
+                    failed_deps = sorted(
+                        d for d in deps[name] if self._is_failed(results[d])
+                    )
+                    if failed_deps and isinstance(result, dict):
+                        result.setdefault("failed_dependencies", failed_deps)
+                    results[name] = result
+                    for child in dependents[name]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            _launch(child)
+        finally:
+            for fut in running:
+                fut.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return [results[name] for name in task_names]
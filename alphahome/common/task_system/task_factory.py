@@ -1,3 +1,4 @@
+import importlib
 import inspect
 import logging
 from typing import Any, Dict, List, Optional, Type
@@ -10,6 +11,7 @@ from ..config_manager import (
     reload_config as _reload_config,
 )
 from ..db_manager import DBManager
+from . import task_manifest
 from .base_task import BaseTask
 
 logger = logging.getLogger("unified_task_factory")
@@ -20,12 +22,16 @@ class UnifiedTaskFactory:
 
     管理所有类型任务实例的创建、数据库连接和分类管理。
     支持fetch、processor等多种任务类型的统一管理。
+
+    任务名称/类型/数据源等元信息优先从任务清单 (task_manifest.json) 读取，
+    任务模块只在创建实例（get_task_class）时才导入并完成注册。
     """
 
     # 类变量
     _db_manager: Optional[DBManager] = None
     _task_instances: Dict[str, BaseTask] = {}
     _task_registry: Dict[str, Type[BaseTask]] = {}
+    _task_manifest: Optional[Dict[str, Dict[str, Any]]] = None
     _initialized: bool = False
 
     @classmethod
@@ -40,6 +46,61 @@ class UnifiedTaskFactory:
         task_type = getattr(task_class, 'task_type', 'unknown')
         logger.debug(f"注册任务类型: {task_name} (类型: {task_type})")
 
+    @classmethod
+    def _get_manifest(cls) -> Dict[str, Dict[str, Any]]:
+        """任务清单 {task_name: entry}，首次访问时读取"""
+        if cls._task_manifest is None:
+            cls._task_manifest = task_manifest.load_manifest()
+        return cls._task_manifest
+
+    @staticmethod
+    def _class_meta(task_name: str, task_class: Type[BaseTask]) -> Dict[str, Any]:
+        """已导入任务类的元信息（字段与清单条目一致）"""
+        return {
+            "name": task_name,
+            "module": task_class.__module__,
+            "class_name": task_class.__name__,
+            "type": getattr(task_class, 'task_type', 'unknown'),
+            "data_source": getattr(task_class, 'data_source', None),
+            "domain": getattr(task_class, 'domain', None),
+            "table_name": getattr(task_class, 'table_name', None),
+            "date_column": getattr(task_class, 'date_column', None),
+            "description": getattr(task_class, 'description', ''),
+            "source_tables": getattr(task_class, 'source_tables', []),
+            "dependencies": getattr(task_class, 'dependencies', []),
+        }
+
+    @classmethod
+    def _get_task_meta(cls) -> Dict[str, Dict[str, Any]]:
+        """清单与已注册任务合并后的元信息；已导入的任务以类属性为准"""
+        meta = dict(cls._get_manifest())
+        for name, task_class in cls._task_registry.items():
+            meta[name] = cls._class_meta(name, task_class)
+        return meta
+
+    @classmethod
+    def get_task_class(cls, task_name: str) -> Type[BaseTask]:
+        """获取任务类；未注册时按清单导入其模块（触发 @task_register 注册）"""
+        task_class = cls._task_registry.get(task_name)
+        if task_class is not None:
+            return task_class
+
+        entry = cls._get_manifest().get(task_name)
+        if entry is None:
+            raise ValueError(
+                f"未注册的任务类型: {task_name}，请先调用 register_task 方法注册"
+            )
+
+        importlib.import_module(entry["module"])
+        task_class = cls._task_registry.get(task_name)
+        if task_class is None:
+            raise ValueError(
+                f"模块 {entry['module']} 未注册任务 {task_name}，任务清单可能已过期，"
+                f"请运行 python -m alphahome.common.task_system.task_manifest 重新生成"
+            )
+        logger.debug(f"按需导入任务模块: {entry['module']} ({task_name})")
+        return task_class
+
     @classmethod
     async def initialize(cls, db_url=None):
         """初始化任务工厂，连接数据库"""
@@ -150,7 +211,7 @@ class UnifiedTaskFactory:
         if not cls._initialized:
             raise RuntimeError("UnifiedTaskFactory 尚未初始化，请先调用 initialize() 方法")
 
-        all_tasks = list(cls._task_registry.keys())
+        all_tasks = list(cls._get_task_meta().keys())
         logger.debug(f"获取到所有 {len(all_tasks)} 个已注册任务: {all_tasks}")
         return all_tasks
 
@@ -160,14 +221,15 @@ class UnifiedTaskFactory:
         if not cls._initialized:
             raise RuntimeError("UnifiedTaskFactory 尚未初始化，请先调用 initialize() 方法")
             
+        # 返回的是任务类，需导入对应模块
+        filtered_tasks = {
+            name: cls.get_task_class(name)
+            for name, meta in cls._get_task_meta().items()
+            if task_type is None or meta.get("type") == task_type
+        }
         if task_type is None:
-            return cls._task_registry.copy()
-            
-        filtered_tasks = {}
-        for name, task_class in cls._task_registry.items():
-            if hasattr(task_class, 'task_type') and task_class.task_type == task_type:
-                filtered_tasks[name] = task_class
-        
+            return filtered_tasks
+
         logger.debug(f"获取到 {len(filtered_tasks)} 个 {task_type} 类型任务: {list(filtered_tasks.keys())}")
         return filtered_tasks
 
@@ -180,10 +242,10 @@ class UnifiedTaskFactory:
         if task_type is None:
             return cls.get_all_task_names()
             
-        filtered_tasks = []
-        for name, task_class in cls._task_registry.items():
-            if hasattr(task_class, 'task_type') and task_class.task_type == task_type:
-                filtered_tasks.append(name)
+        filtered_tasks = [
+            name for name, meta in cls._get_task_meta().items()
+            if meta.get("type") == task_type
+        ]
         
         logger.debug(f"获取到 {len(filtered_tasks)} 个 {task_type} 类型任务: {filtered_tasks}")
         return sorted(filtered_tasks)
@@ -194,10 +256,7 @@ class UnifiedTaskFactory:
         if not cls._initialized:
             raise RuntimeError("UnifiedTaskFactory 尚未初始化，请先调用 initialize() 方法")
             
-        types = set()
-        for task_class in cls._task_registry.values():
-            if hasattr(task_class, 'task_type'):
-                types.add(task_class.task_type)
+        types = {meta.get("type") for meta in cls._get_task_meta().values() if meta.get("type")}
         
         result = sorted(list(types))
         logger.debug(f"获取到 {len(result)} 种任务类型: {result}")
@@ -209,18 +268,26 @@ class UnifiedTaskFactory:
         if not cls._initialized:
             raise RuntimeError("UnifiedTaskFactory 尚未初始化，请先调用 initialize() 方法")
             
-        if task_name not in cls._task_registry:
+        task_class = cls._task_registry.get(task_name)
+        if task_class is not None:
+            meta = cls._class_meta(task_name, task_class)
+        elif task_name in cls._get_manifest():
+            meta = cls._get_manifest()[task_name]
+        else:
             raise ValueError(f"未注册的任务类型: {task_name}")
-            
-        task_class = cls._task_registry[task_name]
+
         return {
             "name": task_name,
-            "type": getattr(task_class, 'task_type', 'unknown'),
-            "description": getattr(task_class, 'description', ''),
-            "table_name": getattr(task_class, 'table_name', None),
-            "source_tables": getattr(task_class, 'source_tables', []),
-            "dependencies": getattr(task_class, 'dependencies', []),
-            "class_name": task_class.__name__,
+            "type": meta.get("type") or 'unknown',
+            "description": meta.get("description") or '',
+            "table_name": meta.get("table_name"),
+            "source_tables": list(meta.get("source_tables") or []),
+            "dependencies": list(meta.get("dependencies") or []),
+            "class_name": meta.get("class_name"),
+            "data_source": meta.get("data_source"),
+            "domain": meta.get("domain"),
+            "date_column": meta.get("date_column"),
+            "module": meta.get("module"),
         }
 
     @classmethod
@@ -243,12 +310,7 @@ class UnifiedTaskFactory:
             if not cls._initialized:
                 raise RuntimeError("UnifiedTaskFactory ailed to initialize.")
 
-        if task_name not in cls._task_registry:
-            raise ValueError(
-                f"未注册的任务类型: {task_name}，请先调用 register_task 方法注册"
-            )
-
-        task_class = cls._task_registry[task_name]
+        task_class = cls.get_task_class(task_name)
         
         # 准备构造函数所需的所有参数
         constructor_kwargs = task_init_kwargs.copy()
@@ -285,18 +347,12 @@ class UnifiedTaskFactory:
             await cls.initialize()
 
         if task_name not in cls._task_instances:
-            # 如果任务实例不存在，创建它
-            if task_name not in cls._task_registry:
-                raise ValueError(
-                    f"未注册的任务类型: {task_name}，请先调用 register_task 方法注册"
-                )
+            # 如果任务实例不存在，创建它（按需导入任务模块）
+            task_class = cls.get_task_class(task_name)
 
             # 获取任务特定配置
             task_config = get_task_config(task_name)
 
-            # 使用注册表中的任务类创建实例
-            task_class = cls._task_registry[task_name]
-
             # 检查任务类构造函数是否接受api_token参数
             init_params = inspect.signature(task_class.__init__).parameters
             constructor_kwargs = {}
@@ -325,7 +381,7 @@ class UnifiedTaskFactory:
             raise RuntimeError("UnifiedTaskFactory 尚未初始化，请先调用 initialize() 方法")
             
         stats = {
-            "total_tasks": len(cls._task_registry),
+            "total_tasks": len(cls._get_task_meta()),
             "task_types": cls.get_task_types(),
             "tasks_by_type": {}
         }
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务清单 (task manifest)
+
+以静态方式（AST 解析源码，不导入任何任务模块）收集所有 @task_register 任务的元信息，
+生成 task_manifest.json。UnifiedTaskFactory 据此回答任务名称/类型/数据源等查询，
+仅在真正创建任务实例时才导入对应模块，从而避免 CLI/GUI 启动时导入全部任务模块
+（以及 pandas、akshare、pyTSL 等重量级依赖）。
+
+新增或修改任务后需重新生成清单：
+
+    python -m alphahome.common.task_system.task_manifest            # 重新生成
+    python -m alphahome.common.task_system.task_manifest --check    # 校验是否过期
+"""
+
+import argparse
+import ast
+import json
+import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("task_manifest")
+
+MANIFEST_VERSION = 1
+MANIFEST_PATH = Path(__file__).with_name("task_manifest.json")
+
+# 扫描根包：所有注册任务均位于该包下
+TASK_PACKAGE = "alphahome.fetchers.tasks"
+
+# 写入清单的类属性 -> 清单字段
+MANIFEST_ATTRS = {
+    "task_type": "type",
+    "data_source": "data_source",
+    "domain": "domain",
+    "table_name": "table_name",
+    "date_column": "date_column",
+    "description": "description",
+    "source_tables": "source_tables",
+    "dependencies": "dependencies",
+}
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+_UNRESOLVED = object()
+
+
+def _module_file(module: str) -> Optional[Path]:
+    """模块名 -> 源文件路径（包返回 __init__.py）"""
+    base = _PROJECT_ROOT.joinpath(*module.split("."))
+    if base.is_dir() and (base / "__init__.py").exists():
+        return base / "__init__.py"
+    if base.with_suffix(".py").exists():
+        return base.with_suffix(".py")
+    return None
+
+
+def _resolve_relative(module: str, is_package: bool, level: int, target: Optional[str]) -> str:
+    parts = module.split(".")
+    if not is_package:
+        parts = parts[:-1]
+    if level > 1:
+        parts = parts[: len(parts) - (level - 1)]
+    if target:
+        parts.extend(target.split("."))
+    return ".".join(parts)
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return _UNRESOLVED
+
+
+def _decorator_name(node: ast.AST) -> Tuple[Optional[str], Optional[ast.Call]]:
+    call = node if isinstance(node, ast.Call) else None
+    func = call.func if call else node
+    if isinstance(func, ast.Name):
+        return func.id, call
+    if isinstance(func, ast.Attribute):
+        return func.attr, call
+    return None, call
+
+
+def _top_level(body: List[ast.stmt]):
+    """模块顶层语句，展开 try/if 块（兼容 try: 相对导入 except ImportError: 绝对导入 的写法）"""
+    for node in body:
+        if isinstance(node, ast.Try):
+            yield from _top_level(node.body)
+            for handler in node.handlers:
+                yield from _top_level(handler.body)
+        elif isinstance(node, ast.If):
+            yield from _top_level(node.body)
+            yield from _top_level(node.orelse)
+        else:
+            yield node
+
+
+@lru_cache(maxsize=None)
+def _parse_module(module: str) -> Optional[Dict[str, Any]]:
+    """解析模块：类定义（基类/类属性/注册装饰器）、from-import 映射及被导入的模块"""
+    path = _module_file(module)
+    if path is None:
+        return None
+    tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    is_package = path.name == "__init__.py"
+
+    imports: Dict[str, Tuple[str, str]] = {}
+    imported_modules: List[str] = []
+    classes: Dict[str, Dict[str, Any]] = {}
+    for node in _top_level(tree.body):
+        if isinstance(node, ast.ImportFrom):
+            source = (
+                _resolve_relative(module, is_package, node.level, node.module)
+                if node.level
+                else node.module
+            )
+            imported_modules.append(source)
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                imports.setdefault(alias.asname or alias.name, (source, alias.name))
+                # from . import submodule
+                if _module_file(f"{source}.{alias.name}") is not None:
+                    imported_modules.append(f"{source}.{alias.name}")
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id in ("_LAZY_EXPORTS", "_LAZY_PACKAGES") for t in node.targets
+        ):
+            # 延迟导出的包 __init__（见 alphahome.common.lazy_import），视同 from-import
+            value = _literal(node.value)
+            if isinstance(value, dict):
+                for export, source in value.items():
+                    source = _resolve_relative(module, is_package, 1, source[1:]) if source.startswith(".") else source
+                    imported_modules.append(source)
+                    imports.setdefault(export, (source, export))
+            elif isinstance(value, (tuple, list)):
+                imported_modules.extend(f"{module}.{sub}" for sub in value)
+        elif isinstance(node, ast.ClassDef):
+            attrs: Dict[str, Any] = {}
+            for stmt in node.body:
+                if isinstance(stmt, ast.Assign):
+                    targets = [t.id for t in stmt.targets if isinstance(t, ast.Name)]
+                    value = stmt.value
+                elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None and isinstance(stmt.target, ast.Name):
+                    targets, value = [stmt.target.id], stmt.value
+                else:
+                    continue
+                for target in targets:
+                    if target == "name" or target in MANIFEST_ATTRS:
+                        attrs[target] = _literal(value)
+
+            register = None
+            for deco in node.decorator_list:
+                deco_name, call = _decorator_name(deco)
+                if deco_name == "task_register":
+                    register = {"name": None}
+                    if call is not None and call.args:
+                        arg = _literal(call.args[0])
+                        if isinstance(arg, str):
+                            register["name"] = arg
+
+            classes[node.name] = {
+                "bases": [b.id for b in node.bases if isinstance(b, ast.Name)],
+                "attrs": attrs,
+                "register": register,
+            }
+    return {"imports": imports, "imported_modules": imported_modules, "classes": classes}
+
+
+def _locate_class(module: str, name: str, depth: int = 0) -> Optional[Tuple[str, str]]:
+    """沿 from-import（含包 __init__ 的再导出）定位类的定义位置"""
+    parsed = _parse_module(module)
+    if parsed is None or depth > 10:
+        return None
+    if name in parsed["classes"]:
+        return module, name
+    if name in parsed["imports"]:
+        source, original = parsed["imports"][name]
+        return _locate_class(source, original, depth + 1)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _class_attrs(module: str, name: str) -> Dict[str, Any]:
+    """合并继承链上的类属性（子类覆盖基类，多继承时左侧基类优先）"""
+    parsed = _parse_module(module)
+    info = parsed["classes"][name]
+    merged: Dict[str, Any] = {}
+    for base in reversed(info["bases"]):
+        located = _locate_class(module, base)
+        if located is not None:
+            merged.update(_class_attrs(*located))
+    merged.update(info["attrs"])
+    return merged
+
+
+def _iter_task_modules(package: str) -> List[str]:
+    """
+    导入 package 时实际会被加载的包内模块（沿 from-import 闭包遍历）。
+
+    与"导入即注册"的结果保持一致：未被包 __init__ 导出的独立模块（如已废弃任务）不进入清单。
+    """
+    seen = {package}
+    queue = [package]
+    while queue:
+        parsed = _parse_module(queue.pop())
+        if parsed is None:
+            continue
+        for source in parsed["imported_modules"]:
+            if (source == package or source.startswith(package + ".")) and source not in seen:
+                seen.add(source)
+                queue.append(source)
+    return sorted(seen)
+
+
+def build_manifest(package: str = TASK_PACKAGE) -> Dict[str, Any]:
+    """扫描任务包源码，构建清单（不导入任何任务模块）"""
+    tasks: Dict[str, Dict[str, Any]] = {}
+    for module in _iter_task_modules(package):
+        parsed = _parse_module(module)
+        if parsed is None:
+            continue
+        for class_name, info in parsed["classes"].items():
+            if info["register"] is None:
+                continue
+            attrs = _class_attrs(module, class_name)
+            task_name = info["register"]["name"] or attrs.get("name")
+            if not isinstance(task_name, str) or not task_name:
+                task_name = class_name
+            if task_name in tasks:
+                # 与 UnifiedTaskFactory.register_task 一致：先注册者生效
+                logger.warning(f"任务 {task_name} 重复定义于 {module}.{class_name}，已忽略")
+                continue
+
+            entry = {"name": task_name, "module": module, "class_name": class_name}
+            for attr, key in MANIFEST_ATTRS.items():
+                value = attrs.get(attr)
+                entry[key] = None if value is _UNRESOLVED else value
+            if entry["type"] is None:
+                entry["type"] = "unknown"
+            for key in ("source_tables", "dependencies"):
+                entry[key] = list(entry[key] or [])
+            tasks[task_name] = entry
+
+    return {
+        "version": MANIFEST_VERSION,
+        "package": package,
+        "tasks": [tasks[name] for name in sorted(tasks)],
+    }
+
+
+def load_manifest(path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """读取清单，返回 {task_name: entry}；文件缺失或损坏时返回空字典"""
+    path = Path(path) if path else MANIFEST_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"任务清单不存在: {path}，将退回到导入即注册模式")
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"任务清单读取失败: {path}: {e}")
+        return {}
+
+    if data.get("version") != MANIFEST_VERSION:
+        logger.warning(f"任务清单版本不匹配 ({data.get('version')} != {MANIFEST_VERSION})，已忽略")
+        return {}
+    return {entry["name"]: entry for entry in data.get("tasks", [])}
+
+
+def write_manifest(manifest: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    path = Path(path) if path else MANIFEST_PATH
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="生成/校验任务清单 task_manifest.json")
+    parser.add_argument("--check", action="store_true", help="仅校验清单是否与源码一致，不写文件")
+    parser.add_argument("--output", type=Path, default=MANIFEST_PATH, help="清单输出路径")
+    args = parser.parse_args(argv)
+
+    manifest = build_manifest()
+    if args.check:
+        current = load_manifest(args.output)
+        expected = {entry["name"]: entry for entry in manifest["tasks"]}
+        if current != expected:
+            stale = sorted(set(current) ^ set(expected)) or sorted(
+                name for name in expected if current.get(name) != expected[name]
+            )
+            print(f"任务清单已过期，差异任务: {stale[:20]}")
+            return 1
+        print(f"任务清单与源码一致 ({len(expected)} 个任务)")
+        return 0
+
+    path = write_manifest(manifest, args.output)
+    print(f"已写入 {len(manifest['tasks'])} 个任务到 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,7 @@ class DCIndexFeaturesDailyMV(IncrementalTableView):
     incremental_days = 30  # 增量刷新最近 30 天
     date_column = "trade_date"
     _lookback_days = 30  # 窗口函数需要回溯天数
+    changes_propagate_forward = True  # 历史日期变更会影响之后窗口内的结果
 
     create_sql = """
         CREATE TABLE features.mv_dc_index_features_daily AS
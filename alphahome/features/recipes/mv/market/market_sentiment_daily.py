@@ -54,6 +54,7 @@ class MarketSentimentDailyMV(IncrementalTableView):
     
     # 窗口函数需要的额外回溯天数（新高新低需要 252 天历史）
     _lookback_days = 280
+    changes_propagate_forward = True  # 历史日期变更会影响之后窗口内的结果
 
     create_sql = """
         CREATE TABLE features.mv_market_sentiment_daily AS
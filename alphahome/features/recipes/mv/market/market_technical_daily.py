@@ -51,6 +51,7 @@ class MarketTechnicalDailyMV(IncrementalTableView):
     
     # 窗口函数需要的额外回溯天数（60 日波动率需要最多 60 天历史）
     _lookback_days = 90
+    changes_propagate_forward = True  # 历史日期变更会影响之后窗口内的结果
 
     create_sql = """
         CREATE TABLE features.mv_market_technical_daily AS
@@ -11,10 +11,14 @@
 - 测试 GUI 的全量/增量刷新功能
 """
 
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 
 from alphahome.features.registry import feature_register
 from alphahome.features.storage.python_feature import PythonFeatureTable
+from alphahome.features.storage.rolling import RollingFrame
 
 
 @feature_register
@@ -28,6 +32,8 @@ class StockSmaDailyFeature(PythonFeatureTable):
     refresh_strategy = "incremental"
     incremental_days = 30
     date_column = "trade_date"
+    windows = (5, 10, 20)
+    lookback_trading_days = max(windows)
 
     def get_create_sql(self) -> str:
         """返回创建表的 SQL。"""
@@ -87,16 +93,8 @@ class StockSmaDailyFeature(PythonFeatureTable):
 
         self.logger.info(f"计算 SMA 特征: {start_date} - {end_date}")
 
-        # 为了计算 SMA20，需要向前多取 20 个交易日的数据
-        # 这里简化处理，向前多取 30 天
-        from datetime import datetime, timedelta
-
-        try:
-            start_dt = datetime.strptime(start_date, "%Y%m%d")
-            # 向前多取 60 天以确保有足够数据计算 SMA
-            extended_start = (start_dt - timedelta(days=60)).strftime("%Y%m%d")
-        except ValueError:
-            extended_start = start_date
+        # 按交易日历向前多取 SMA20 所需的交易日
+        extended_start = await self.lookback_start(start_date)
 
         # 查询原始数据
         sql = f"""
@@ -111,16 +109,10 @@ class StockSmaDailyFeature(PythonFeatureTable):
         ORDER BY ts_code, trade_date
         """
 
-        result = await self._db_manager.fetch(sql)
-
-        if not result:
-            self.logger.warning("没有查询到数据")
-            return pd.DataFrame()
-
-        # 转换为 DataFrame
-        df = pd.DataFrame([dict(r) for r in result])
+        df = await self.fetch_frame(sql)
 
         if df.empty:
+            self.logger.warning("没有查询到数据")
             return pd.DataFrame()
 
         self.logger.info(f"查询到 {len(df)} 条原始数据")
@@ -128,28 +120,25 @@ class StockSmaDailyFeature(PythonFeatureTable):
         # 将 Decimal 转换为 float（PostgreSQL 返回的数值类型）
         df["close"] = df["close"].astype(float)
 
-        # 按股票分组计算 SMA
-        def calc_sma(group):
-            group = group.sort_values("trade_date")
-            group["sma5"] = group["close"].rolling(window=5, min_periods=5).mean()
-            group["sma10"] = group["close"].rolling(window=10, min_periods=10).mean()
-            group["sma20"] = group["close"].rolling(window=20, min_periods=20).mean()
-
-            # 计算比率
-            group["sma5_ratio"] = (group["close"] / group["sma5"] - 1).round(4)
-            group["sma10_ratio"] = (group["close"] / group["sma10"] - 1).round(4)
-            group["sma20_ratio"] = (group["close"] / group["sma20"] - 1).round(4)
-
-            return group
-
-        df = df.groupby("ts_code", group_keys=False).apply(calc_sma)
+        # 按股票分组的向量化滚动计算
+        frame = RollingFrame(df)
+        df = frame.df
+        close = frame.values("close")
+        for window in self.windows:
+            sma = frame.rolling_mean(close, window)
+            df[f"sma{window}"] = sma
+            with np.errstate(invalid="ignore", divide="ignore"):
+                df[f"sma{window}_ratio"] = np.round(close / sma - 1, 4)
 
         # 只保留目标日期范围内的数据
-        df = df[df["trade_date"].astype(str).str.replace("-", "") >= start_date]
-        df = df[df["trade_date"].astype(str).str.replace("-", "") <= end_date]
+        trade_dates = pd.to_datetime(df["trade_date"])
+        in_range = (trade_dates >= pd.Timestamp(start_date)) & (
+            trade_dates <= pd.Timestamp(end_date)
+        )
+        df = df[in_range]
 
         # 删除 SMA 计算失败的行（数据不足）
-        df = df.dropna(subset=["sma5", "sma10", "sma20"])
+        df = df.dropna(subset=[f"sma{window}" for window in self.windows])
 
         # 添加更新时间（使用 Python datetime，带时区）
         from datetime import timezone
@@ -162,7 +151,7 @@ class StockSmaDailyFeature(PythonFeatureTable):
             "sma5_ratio", "sma10_ratio", "sma20_ratio",
             "updated_at"
         ]
-        df = df[columns]
+        df = df[columns].reset_index(drop=True)
 
         self.logger.info(f"计算完成，共 {len(df)} 条结果")
 
@@ -10,7 +10,9 @@ from .validator import MaterializedViewValidator
 from .database_init import FeaturesDatabaseInit
 from .base_view import BaseFeatureView
 from .python_feature import PythonFeatureTable
+from .rolling import RollingFrame, lookback_start_date
 from .incremental_view import IncrementalFeatureView, IncrementalTableView
+from .refresh_orchestrator import FeatureRefreshOrchestrator, build_recipe_dependencies
 
 __all__ = [
     "MaterializedViewSQL",
@@ -19,6 +21,10 @@ __all__ = [
     "FeaturesDatabaseInit",
     "BaseFeatureView",
     "PythonFeatureTable",
+    "RollingFrame",
+    "lookback_start_date",
     "IncrementalFeatureView",
     "IncrementalTableView",
+    "FeatureRefreshOrchestrator",
+    "build_recipe_dependencies",
 ]
@@ -13,6 +13,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from .refresh import MaterializedViewRefresh
+from .validator import MaterializedViewValidator
 
 logger = logging.getLogger(__name__)
 
@@ -276,6 +277,29 @@ class BaseFeatureView(ABC):
         result = await self._db_manager.fetch(sql)
         return result[0]["cnt"] if result else 0
 
+    async def validate_quality(self, previous_row_count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        在数据库端执行 quality_checks（下推模式，不拉取数据）。
+
+        Args:
+            previous_row_count: 上次刷新的行数（用于 row_count_change 检查）
+
+        Returns:
+            List[Dict[str, Any]]: 各检查的报告（结构同 MaterializedViewValidator.validate_*）
+        """
+        if self._db_manager is None:
+            raise RuntimeError("db_manager 未设置")
+        if not self.quality_checks:
+            return []
+
+        validator = MaterializedViewValidator(logger=self.logger)
+        return await validator.validate_in_database(
+            self._db_manager,
+            self.full_name,
+            self.quality_checks,
+            previous_row_count=previous_row_count,
+        )
+
     # ==========================================================================
     # 元数据管理
     # ==========================================================================
@@ -16,20 +16,60 @@ PostgreSQL 原生不支持增量刷新物化视图，但对于按日期分区的
 - 历史数据稳定不变
 
 刷新策略：
-- incremental: 增量刷新（默认最近 30 天）
+- incremental: 增量刷新（默认按水位线 + 源表变更检测；incremental_mode="window" 为固定最近 N 天）
 - full: 全量刷新（清空重建）
+
+水位线增量（incremental_mode="watermark"）：
+1. 水位线 = 目标表中已物化的最大日期
+2. 源表中 update_time 晚于上次成功刷新的行，其日期即为"变更日期"；
+   没有 update_time 的源表只在其最大日期超过水位线时贡献新增日期
+3. 只重算变更日期合并后的区间（窗口类配方可设 changes_propagate_forward，从最早变更日期重算到今天）
+4. 目标表为按月 RANGE 分区表时，受影响的月份切片在影子表中重算后整体替换分区，而不是 DELETE
 """
 
 import logging
 from abc import abstractmethod
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .base_view import BaseFeatureView
 from .refresh_log import log_mv_refresh
 
 logger = logging.getLogger(__name__)
 
+DateRange = Tuple[date, date]
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).replace("-", "")[:8], "%Y%m%d").date()
+
+
+def coalesce_date_ranges(dates: Iterable[Any], max_gap_days: int = 7) -> List[DateRange]:
+    """将离散日期合并为闭区间列表（相邻日期间隔不超过 ``max_gap_days`` 视为连续）"""
+    ordered = sorted({_to_date(d) for d in dates})
+    ranges: List[DateRange] = []
+    for d in ordered:
+        if ranges and (d - ranges[-1][1]).days <= max_gap_days:
+            ranges[-1] = (ranges[-1][0], d)
+        else:
+            ranges.append((d, d))
+    return ranges
+
+
+def month_slices(start: date, end: date) -> List[DateRange]:
+    """返回覆盖 [start, end] 的自然月区间 [月初, 下月初)"""
+    slices: List[DateRange] = []
+    cursor = start.replace(day=1)
+    while cursor <= end:
+        nxt = (cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
+        slices.append((cursor, nxt))
+        cursor = nxt
+    return slices
+
 
 class IncrementalFeatureView(BaseFeatureView):
     """
@@ -40,14 +80,30 @@ class IncrementalFeatureView(BaseFeatureView):
     - get_incremental_sql(start_date, end_date): 增量计算的 SQL
 
     配置属性：
-    - incremental_days: 增量刷新的天数范围（默认 30 天）
+    - incremental_days: 增量刷新的天数范围（默认 30 天；水位线模式下作为无法确定水位线时的回退）
     - date_column: 日期列名（默认 trade_date）
+    - incremental_mode: watermark（水位线 + 变更检测）/ window（固定最近 N 天）
+    - change_tracking_column: 源表中用于变更检测的时间戳列（默认 update_time）
+    - source_date_columns: 源表日期列覆盖（默认与 date_column 相同）
+    - changes_propagate_forward: 变更会影响之后日期的结果（窗口函数类配方），从最早变更日重算到今天
     """
 
     # 增量刷新配置
     incremental_days: int = 30  # 默认刷新最近 30 天
     date_column: str = "trade_date"  # 日期列名
     refresh_strategy: str = "incremental"  # 默认使用增量刷新
+    incremental_mode: str = "watermark"  # watermark / window
+    change_tracking_column: str = "update_time"
+    source_date_columns: Dict[str, str] = {}
+    changes_propagate_forward: bool = False
+    range_merge_gap_days: int = 7  # 变更日期合并为区间时允许的最大间隔
+    change_detection_margin_minutes: int = 10  # 与上次刷新时间比较时的安全余量
+
+    # 表列信息缓存（full_name -> 列名列表），避免每次刷新查询 information_schema
+    _column_cache: Dict[str, List[str]] = {}
+    # 源表是否支持变更检测的缓存（(table, 日期列) -> (日期列, 是否有变更时间列)）
+    # source_date_columns 按视图类设置，同一张表在不同视图中可能使用不同的日期列
+    _source_capability_cache: Dict[Tuple[str, str], Tuple[Optional[str], bool]] = {}
 
     async def _is_materialized_view(self) -> bool:
         """检查当前对象是否为物化视图（而非普通表）。"""
@@ -106,16 +162,242 @@ class IncrementalFeatureView(BaseFeatureView):
             # 使用父类的全量刷新逻辑
             return await super().refresh(strategy=actual_strategy)
 
+    # ------------------------------------------------------------------
+    # 水位线与变更检测
+    # ------------------------------------------------------------------
+
+    async def _get_table_columns(self, conn, table_name: Optional[str] = None) -> List[str]:
+        """获取目标表列名（按 ordinal_position，进程内缓存）"""
+        table_name = table_name or self.view_name
+        cache_key = f"{self._schema}.{table_name}"
+        cached = IncrementalFeatureView._column_cache.get(cache_key)
+        if cached:
+            return cached
+
+        columns_sql = """
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_schema = $1 AND table_name = $2
+        ORDER BY ordinal_position
+        """
+        cols = await conn.fetch(columns_sql, self._schema, table_name)
+        col_names = [r["column_name"] for r in (cols or [])]
+        if not col_names:
+            raise RuntimeError(f"无法获取表列信息: {self._schema}.{table_name}")
+        IncrementalFeatureView._column_cache[cache_key] = col_names
+        return col_names
+
+    def _invalidate_column_cache(self) -> None:
+        IncrementalFeatureView._column_cache.pop(self.full_name, None)
+
+    async def _get_watermark(self, conn) -> Optional[date]:
+        """目标表中已物化的最大日期"""
+        row = await conn.fetchrow(
+            f"SELECT MAX({self.date_column}) AS watermark FROM {self.full_name}"
+        )
+        value = row["watermark"] if row else None
+        return _to_date(value) if value is not None else None
+
+    async def _get_last_success_time(self, conn) -> Optional[datetime]:
+        """上次成功刷新的开始时间（来自 features.mv_refresh_log）"""
+        try:
+            row = await conn.fetchrow(
+                """
+                SELECT MAX(started_at) AS last_success
+                FROM features.mv_refresh_log
+                WHERE view_name = $1 AND schema_name = $2 AND success
+                """,
+                self.view_name,
+                self._schema,
+            )
+        except Exception as e:
+            self.logger.warning(f"读取刷新日志失败，无法进行变更检测: {e}")
+            return None
+        return row["last_success"] if row else None
+
+    async def _get_source_capability(self, conn, table: str) -> Tuple[Optional[str], bool]:
+        """返回源表的 (日期列, 是否有变更时间列)，日期列不存在时为 None"""
+        date_col = self.source_date_columns.get(table, self.date_column)
+        cache_key = (table, date_col)
+        cached = IncrementalFeatureView._source_capability_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        schema, _, name = table.rpartition(".")
+        rows = await conn.fetch(
+            """
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = $1 AND table_name = $2
+            """,
+            schema or "public",
+            name,
+        )
+        columns = {r["column_name"] for r in (rows or [])}
+        capability = (
+            date_col if date_col in columns else None,
+            self.change_tracking_column in columns,
+        )
+        IncrementalFeatureView._source_capability_cache[cache_key] = capability
+        return capability
+
+    async def _detect_changed_dates(
+        self, conn, watermark: date, since: datetime, end: date
+    ) -> List[date]:
+        """
+        收集各源表中需要重算的日期。
+
+        since 来自 mv_refresh_log.started_at（TIMESTAMPTZ），而变更时间列是按本地时间写入的
+        TIMESTAMP（无时区），因此以 timestamptz 传参，在 SQL 中换算为会话时区的本地时间再比较。
+        """
+        changed: set = set()
+        for table in self.source_tables:
+            date_col, tracked = await self._get_source_capability(conn, table)
+            if date_col is None:
+                self.logger.debug(f"源表 {table} 无日期列 {self.date_column}，跳过变更检测")
+                continue
+            if tracked:
+                rows = await conn.fetch(
+                    f"""
+                    SELECT DISTINCT {date_col} AS d FROM {table}
+                    WHERE {self.change_tracking_column} > ($1::timestamptz AT TIME ZONE current_setting('TimeZone'))
+                      AND {date_col} <= $2
+                    """,
+                    since,
+                    end,
+                )
+                changed.update(_to_date(r["d"]) for r in rows if r["d"] is not None)
+            else:
+                row = await conn.fetchrow(f"SELECT MAX({date_col}) AS d FROM {table}")
+                latest = row["d"] if row else None
+                if latest is not None and _to_date(latest) > watermark:
+                    # 无变更时间列：只能感知水位线之后的新日期
+                    changed.update(
+                        watermark + timedelta(days=i)
+                        for i in range(1, (min(_to_date(latest), end) - watermark).days + 1)
+                    )
+        return sorted(changed)
+
+    async def _plan_refresh_ranges(self, conn, today: date) -> Optional[List[DateRange]]:
+        """
+        计算本次需要重算的日期区间。
+
+        Returns:
+            区间列表（可能为空，表示无需刷新）；None 表示无法确定水位线，需回退到固定窗口
+        """
+        watermark = await self._get_watermark(conn)
+        since = await self._get_last_success_time(conn)
+        if watermark is None or since is None:
+            return None
+
+        since = since - timedelta(minutes=self.change_detection_margin_minutes)
+        changed = await self._detect_changed_dates(conn, watermark, since, today)
+        if not changed:
+            return []
+        if self.changes_propagate_forward:
+            return [(changed[0], today)]
+        return coalesce_date_ranges(changed, self.range_merge_gap_days)
+
+    async def _is_range_partitioned(self, conn) -> bool:
+        row = await conn.fetchrow(
+            """
+            SELECT c.relkind = 'p' AS partitioned
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = $1 AND c.relname = $2
+            """,
+            self._schema,
+            self.view_name,
+        )
+        return bool(row and row["partitioned"])
+
+    def _partition_name(self, month_start: date) -> str:
+        return f"{self.view_name}_p{month_start.strftime('%Y%m')}"
+
+    async def _insert_range(self, conn, table_full_name: str, start: date, end: date) -> None:
+        """将 get_incremental_sql 的结果按显式列名写入指定表"""
+        col_names = await self._get_table_columns(conn)
+        incremental_sql = self.get_incremental_sql(
+            start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+        )
+        # 显式列名插入，避免“表列顺序”与“SELECT 列顺序”不一致导致的类型错位
+        insert_cols = ", ".join([f'"{c}"' for c in col_names])
+        select_cols = ", ".join([f'd."{c}"' for c in col_names])
+        await conn.execute(
+            f"""
+            INSERT INTO {table_full_name} ({insert_cols})
+            SELECT {select_cols}
+            FROM (
+            {incremental_sql}
+            ) AS d;
+            """
+        )
+
+    async def _count_range(self, conn, start: date, end: date) -> int:
+        row = await conn.fetchrow(
+            f"""
+            SELECT COUNT(*) AS cnt FROM {self.full_name}
+            WHERE {self.date_column} >= '{start:%Y%m%d}'
+              AND {self.date_column} <= '{end:%Y%m%d}';
+            """
+        )
+        return row["cnt"] if row else 0
+
+    async def _replace_range(self, conn, start: date, end: date) -> int:
+        """在单个事务内删除并重算 [start, end]"""
+        async with conn.transaction():
+            await conn.execute(
+                f"""
+                DELETE FROM {self.full_name}
+                WHERE {self.date_column} >= '{start:%Y%m%d}'
+                  AND {self.date_column} <= '{end:%Y%m%d}';
+                """
+            )
+            await self._insert_range(conn, self.full_name, start, end)
+            return await self._count_range(conn, start, end)
+
+    async def _swap_partition(self, conn, month_start: date, next_month: date) -> int:
+        """在影子表中重算整个月份切片，然后替换对应分区"""
+        partition = self._partition_name(month_start)
+        shadow = f"{partition}__new"
+        shadow_full = f"{self._schema}.{shadow}"
+        partition_full = f"{self._schema}.{partition}"
+
+        await conn.execute(f"DROP TABLE IF EXISTS {shadow_full};")
+        await conn.execute(
+            f"CREATE TABLE {shadow_full} (LIKE {self.full_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);"
+        )
+        try:
+            await self._insert_range(
+                conn, shadow_full, month_start, next_month - timedelta(days=1)
+            )
+            async with conn.transaction():
+                exists = await conn.fetchrow(
+                    "SELECT to_regclass($1) IS NOT NULL AS exists", partition_full
+                )
+                if exists and exists["exists"]:
+                    await conn.execute(
+                        f"ALTER TABLE {self.full_name} DETACH PARTITION {partition_full};"
+                    )
+                    await conn.execute(f"DROP TABLE {partition_full};")
+                await conn.execute(
+                    f"ALTER TABLE {self.full_name} ATTACH PARTITION {shadow_full} "
+                    f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}');"
+                )
+                await conn.execute(f"ALTER TABLE {shadow_full} RENAME TO {partition};")
+        except Exception:
+            await conn.execute(f"DROP TABLE IF EXISTS {shadow_full};")
+            raise
+        row = await conn.fetchrow(f"SELECT COUNT(*) AS cnt FROM {partition_full};")
+        return row["cnt"] if row else 0
+
     async def _incremental_refresh(self) -> Dict[str, Any]:
         """
         执行增量刷新。
 
         流程：
         1. 检查是否为物化视图（物化视图不支持 DELETE，需回退到全量刷新）
-        2. 计算日期范围
-        3. 删除范围内的旧数据
-        4. 插入新计算的数据
-        5. 更新元数据
+        2. 根据水位线和源表变更确定重算区间（无法确定时回退到最近 incremental_days 天）
+        3. 逐区间在各自事务内删除并重算；分区表按月替换分区
+        4. 记录刷新日志
         """
         # 检查是否为物化视图 - 物化视图无法 DELETE，需回退到全量刷新
         is_matview = await self._is_materialized_view()
@@ -129,79 +411,57 @@ class IncrementalFeatureView(BaseFeatureView):
         import asyncpg
 
         start_time = datetime.now()
-
-        # 计算日期范围（自然日）
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=self.incremental_days)
-
-        start_date_str = start_date.strftime("%Y%m%d")
-        end_date_str = end_date.strftime("%Y%m%d")
-
-        self.logger.info(
-            f"开始增量刷新 {self.full_name}, "
-            f"日期范围: {start_date_str} ~ {end_date_str}"
-        )
+        today = start_time.date()
+        window_range = (today - timedelta(days=self.incremental_days), today)
 
         try:
-            # 重要：使用单连接 + 单事务执行 delete+insert，避免刷新中间态（空表/半成品）被读到
             conn_str = self._db_manager.connection_string
             conn = await asyncpg.connect(conn_str, command_timeout=7200)
             try:
-                async with conn.transaction():
-                    # Step 1: 删除旧数据
-                    delete_sql = f"""
-                    DELETE FROM {self.full_name}
-                    WHERE {self.date_column} >= '{start_date_str}'
-                      AND {self.date_column} <= '{end_date_str}';
-                    """
-                    await conn.execute(delete_sql)
-
-                    # Step 2: 插入新数据
-                    incremental_sql = self.get_incremental_sql(start_date_str, end_date_str)
-
-                    # 显式列名插入，避免“表列顺序”与“SELECT 列顺序”不一致导致的类型错位
-                    columns_sql = """
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_schema = $1 AND table_name = $2
-                    ORDER BY ordinal_position
-                    """
-                    cols = await conn.fetch(columns_sql, self._schema, self.view_name)
-                    col_names = [r["column_name"] for r in (cols or [])]
-                    if not col_names:
-                        raise RuntimeError(f"无法获取表列信息: {self.full_name}")
-
-                    insert_cols = ", ".join([f'"{c}"' for c in col_names])
-                    select_cols = ", ".join([f'd."{c}"' for c in col_names])
-
-                    insert_sql = f"""
-                    INSERT INTO {self.full_name} ({insert_cols})
-                    SELECT {select_cols}
-                    FROM (
-                    {incremental_sql}
-                    ) AS d;
-                    """
-                    await conn.execute(insert_sql)
-
-                    # Step 3: 获取影响范围内行数（便于 UI 展示“本次刷新覆盖量”）
-                    count_sql = f"""
-                    SELECT COUNT(*) AS cnt FROM {self.full_name}
-                    WHERE {self.date_column} >= '{start_date_str}'
-                      AND {self.date_column} <= '{end_date_str}';
-                    """
-                    row = await conn.fetchrow(count_sql)
-                    rows_affected = row["cnt"] if row else 0
+                ranges: Optional[List[DateRange]] = None
+                if self.incremental_mode == "watermark":
+                    ranges = await self._plan_refresh_ranges(conn, today)
+                    if ranges is None:
+                        self.logger.info(
+                            f"{self.full_name} 无水位线或无成功刷新记录，回退到最近 {self.incremental_days} 天"
+                        )
+                if ranges is None:
+                    ranges = [window_range]
+
+                if ranges:
+                    date_range = f"{ranges[0][0]:%Y%m%d}~{ranges[-1][1]:%Y%m%d}"
+                else:
+                    date_range = "unchanged"
+                self.logger.info(
+                    f"开始增量刷新 {self.full_name}, 重算区间: "
+                    f"{[f'{s:%Y%m%d}~{e:%Y%m%d}' for s, e in ranges] or '无变更'}"
+                )
+
+                rows_affected = 0
+                if ranges and await self._is_range_partitioned(conn):
+                    months: Dict[date, date] = {}
+                    for range_start, range_end in ranges:
+                        months.update(month_slices(range_start, range_end))
+                    for month_start, next_month in sorted(months.items()):
+                        rows_affected += await self._swap_partition(
+                            conn, month_start, next_month
+                        )
+                else:
+                    for range_start, range_end in ranges:
+                        rows_affected += await self._replace_range(
+                            conn, range_start, range_end
+                        )
             finally:
                 await conn.close()
 
-            # Step 4: 记录刷新日志
+            # 记录刷新日志（无变更也记录，作为下次变更检测的起点）
             duration = (datetime.now() - start_time).total_seconds()
             await self._log_refresh(
                 strategy="incremental",
                 success=True,
                 duration=duration,
                 rows_affected=rows_affected,
-                date_range=f"{start_date_str}~{end_date_str}"
+                date_range=date_range
             )
 
             self.logger.info(
@@ -219,7 +479,10 @@ class IncrementalFeatureView(BaseFeatureView):
                 "row_count": rows_affected,
                 "refresh_strategy": "incremental",
                 "strategy": "incremental",
-                "date_range": f"{start_date_str}~{end_date_str}"
+                "date_range": date_range,
+                "refreshed_ranges": [
+                    (f"{s:%Y%m%d}", f"{e:%Y%m%d}") for s, e in ranges
+                ],
             }
 
         except Exception as e:
@@ -375,16 +638,7 @@ class IncrementalTableView(IncrementalFeatureView):
                 full_select_sql = self.get_incremental_sql(far_past, far_future)
 
                 # 获取列信息
-                columns_sql = """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_schema = $1 AND table_name = $2
-                ORDER BY ordinal_position
-                """
-                cols = await conn.fetch(columns_sql, self._schema, self.view_name)
-                col_names = [r["column_name"] for r in (cols or [])]
-                if not col_names:
-                    raise RuntimeError(f"无法获取表列信息: {self.full_name}")
+                col_names = await self._get_table_columns(conn)
 
                 insert_cols = ", ".join([f'"{c}"' for c in col_names])
                 select_cols = ", ".join([f'd."{c}"' for c in col_names])
@@ -526,6 +780,7 @@ class IncrementalTableView(IncrementalFeatureView):
             # 获取创建 SQL
             create_sql = self.get_create_sql()
             self.logger.info(f"创建表: {self.full_name}")
+            self._invalidate_column_cache()
 
             # 执行创建
             await self._db_manager.execute(create_sql)
@@ -572,6 +827,7 @@ class IncrementalTableView(IncrementalFeatureView):
             sql = f"DROP TABLE {if_exists_clause}{self.full_name};"
             self.logger.info(f"删除表: {self.full_name}")
             await self._db_manager.execute(sql)
+            self._invalidate_column_cache()
             await self._deactivate_metadata()
             self.logger.info(f"表 {self.full_name} 删除成功")
             return True
@@ -12,18 +12,25 @@ Python 计算特征基类
 刷新策略：
 - incremental: 增量刷新（计算最近 N 天的数据）
 - full: 全量刷新（清空重建）
+
+写入方式：
+计算结果先通过二进制 COPY 写入临时 staging 表，再以单条 INSERT ... SELECT 合并到目标表。
+增量刷新的"删除旧区间 + 写入新数据"在同一事务内完成；全量刷新支持两种模式：
+- truncate: 同一事务内 TRUNCATE + 写入，读者要么看到旧数据，要么看到新数据
+- swap: 写入影子表后在事务内重命名交换，读者几乎不被阻塞
 """
 
 import logging
 from abc import abstractmethod
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
 import pandas as pd
 
+from ...common.db_components.copy_encoder import encode_copy_records
 from .base_view import BaseFeatureView
 from .refresh_log import log_mv_refresh
+from .rolling import lookback_start_date
 
 logger = logging.getLogger(__name__)
 
@@ -39,12 +46,16 @@ class PythonFeatureTable(BaseFeatureView):
     配置属性：
     - incremental_days: 增量刷新的天数范围（默认 30 天）
     - date_column: 日期列名（默认 trade_date）
+    - full_refresh_mode: 全量刷新模式（truncate / swap）
+    - lookback_trading_days: 计算窗口需要向前多取的交易日数（配合 RollingFrame 使用）
     """
 
     # 增量刷新配置
     incremental_days: int = 30  # 默认刷新最近 30 天
     date_column: str = "trade_date"  # 日期列名
     refresh_strategy: str = "incremental"  # 默认使用增量刷新
+    full_refresh_mode: str = "truncate"  # 全量刷新模式: truncate / swap
+    lookback_trading_days: int = 0  # 滚动窗口所需的回看交易日数
 
     # 标记这是 Python 计算的特征
     is_python_feature: bool = True
@@ -64,6 +75,33 @@ class PythonFeatureTable(BaseFeatureView):
         """
         pass
 
+    async def fetch_frame(self, sql: str, *args) -> pd.DataFrame:
+        """执行查询并直接构造 DataFrame（避免逐行转换为 dict）。
+
+        DBManager 提供 fetch_dataframe 时按列解码（NUMERIC → float64，DATE → datetime64）。
+        """
+        if self._db_manager is None:
+            raise RuntimeError("db_manager 未设置")
+
+        fetch_dataframe = getattr(self._db_manager, "fetch_dataframe", None)
+        if fetch_dataframe is not None:
+            return await fetch_dataframe(sql, *args)
+
+        rows = await self._db_manager.fetch(sql, *args)
+        if not rows:
+            return pd.DataFrame()
+        if isinstance(rows[0], dict):
+            return pd.DataFrame(rows)
+        return pd.DataFrame.from_records(
+            [tuple(r) for r in rows], columns=list(rows[0].keys())
+        )
+
+    async def lookback_start(self, start_date: str) -> str:
+        """按交易日历返回 ``start_date`` 之前 ``lookback_trading_days`` 个交易日。"""
+        return await lookback_start_date(
+            start_date, self.lookback_trading_days, db_manager=self._db_manager
+        )
+
     async def exists(self) -> bool:
         """检查表是否存在。"""
         if self._db_manager is None:
@@ -176,23 +214,22 @@ class PythonFeatureTable(BaseFeatureView):
             conn = await asyncpg.connect(conn_str, command_timeout=7200)
 
             try:
-                # Step 1: 删除旧数据
+                # Step 1: 计算新数据
+                df = await self.compute(start_date, end_date)
+
+                # Step 2: 删除旧数据并写入新数据（同一事务，读者不会看到空窗口）
                 delete_sql = f"""
                 DELETE FROM {self.full_name}
                 WHERE {self.date_column} >= '{start_date}'
                   AND {self.date_column} <= '{end_date}';
                 """
-                await conn.execute(delete_sql)
-
-                # Step 2: 计算新数据
-                df = await self.compute(start_date, end_date)
-
-                if df is not None and not df.empty:
-                    # Step 3: 插入新数据
-                    await self._insert_dataframe(conn, df)
-                    row_count = len(df)
-                else:
-                    row_count = 0
+                async with conn.transaction():
+                    await conn.execute(delete_sql)
+                    if df is not None and not df.empty:
+                        await self._insert_dataframe(conn, df)
+                        row_count = len(df)
+                    else:
+                        row_count = 0
 
             finally:
                 await conn.close()
@@ -254,19 +291,18 @@ class PythonFeatureTable(BaseFeatureView):
             conn = await asyncpg.connect(conn_str, command_timeout=7200)
 
             try:
-                # Step 1: 清空表
-                truncate_sql = f"TRUNCATE TABLE {self.full_name};"
-                await conn.execute(truncate_sql)
-
-                # Step 2: 计算全量数据（使用一个很大的日期范围）
+                # Step 1: 计算全量数据（使用一个很大的日期范围）
                 df = await self.compute("19000101", "20991231")
+                row_count = 0 if df is None else len(df)
 
-                if df is not None and not df.empty:
-                    # Step 3: 插入数据
-                    await self._insert_dataframe(conn, df)
-                    row_count = len(df)
+                # Step 2: 原子地替换表内容
+                if self.full_refresh_mode == "swap":
+                    await self._swap_in_dataframe(conn, df)
                 else:
-                    row_count = 0
+                    async with conn.transaction():
+                        await conn.execute(f"TRUNCATE TABLE {self.full_name};")
+                        if row_count:
+                            await self._insert_dataframe(conn, df)
 
             finally:
                 await conn.close()
@@ -295,6 +331,7 @@ class PythonFeatureTable(BaseFeatureView):
                 "duration_seconds": duration,
                 "refresh_strategy": "full",
                 "strategy": "full",
+                "full_refresh_mode": self.full_refresh_mode,
             }
 
         except Exception as e:
@@ -313,55 +350,174 @@ class PythonFeatureTable(BaseFeatureView):
             self.logger.error(f"全量刷新 {self.full_name} 失败: {error_msg}")
             raise
 
-    async def _insert_dataframe(self, conn, df: pd.DataFrame) -> None:
+    async def _get_date_and_timestamp_columns(self, conn, table_name: str):
+        """查询目标表的 DATE / TIMESTAMP 列，用于 COPY 编码时的日期解析。"""
+        rows = await conn.fetch(
+            """
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = $1 AND table_name = $2
+            """,
+            self._schema,
+            table_name,
+        )
+        date_columns = {r["column_name"] for r in rows if r["data_type"] == "date"}
+        timestamp_columns = {
+            r["column_name"] for r in rows if r["data_type"].startswith("timestamp")
+        }
+        return date_columns, timestamp_columns
+
+    async def _insert_dataframe(
+        self, conn, df: pd.DataFrame, table_name: Optional[str] = None
+    ) -> None:
         """
-        将 DataFrame 插入到表中。
+        将 DataFrame 写入表中：二进制 COPY 到临时 staging 表，再 INSERT ... SELECT。
 
         Args:
             conn: asyncpg 连接
             df: 要插入的数据
+            table_name: 目标表名（不含 schema），默认当前特征表
         """
         if df.empty:
             return
 
-        # 转换类型以兼容 asyncpg
-        df = df.copy()
-        for col in df.columns:
-            # 将 numpy datetime64 转换为 Python datetime
-            if df[col].dtype == 'datetime64[ns]':
-                df[col] = df[col].dt.to_pydatetime()
-            # 将 numpy 类型转换为 Python 原生类型
-            elif hasattr(df[col].dtype, 'name') and 'int' in df[col].dtype.name:
-                df[col] = df[col].astype(object).where(df[col].notna(), None)
-            elif hasattr(df[col].dtype, 'name') and 'float' in df[col].dtype.name:
-                df[col] = df[col].astype(object).where(df[col].notna(), None)
-
-        # 获取列名
+        table_name = table_name or self.view_name
+        target = f'"{self._schema}"."{table_name}"'
+        staging = f"_stg_{table_name}"
         columns = list(df.columns)
         col_str = ", ".join([f'"{c}"' for c in columns])
-        placeholders = ", ".join([f"${i+1}" for i in range(len(columns))])
 
-        insert_sql = f"""
-        INSERT INTO {self.full_name} ({col_str})
-        VALUES ({placeholders})
+        date_columns, timestamp_columns = await self._get_date_and_timestamp_columns(
+            conn, table_name
+        )
+        records = encode_copy_records(df, date_columns, timestamp_columns, self.logger)
+
+        # ON COMMIT DROP 的临时表必须处于事务中；外层已有事务时这里是 savepoint
+        async with conn.transaction():
+            await conn.execute(
+                f'CREATE TEMPORARY TABLE "{staging}" '
+                f"(LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            await conn.copy_records_to_table(
+                staging, records=records, columns=columns, timeout=3600
+            )
+            await conn.execute(
+                f'INSERT INTO {target} ({col_str}) SELECT {col_str} FROM "{staging}"'
+            )
+            await conn.execute(f'DROP TABLE "{staging}"')
+
+    async def _swap_in_dataframe(self, conn, df: Optional[pd.DataFrame]) -> None:
         """
+        全量刷新的表交换模式：先写入影子表，再在事务内重命名替换正式表。
 
-        # 转换为 records 列表
-        data = []
-        for _, row in df.iterrows():
-            # 将每行转换为 tuple，确保类型正确
-            row_data = []
-            for val in row:
-                if pd.isna(val):
-                    row_data.append(None)
-                elif isinstance(val, np.generic):
-                    row_data.append(val.item())
-                else:
-                    row_data.append(val)
-            data.append(tuple(row_data))
+        影子表通过 ``LIKE ... INCLUDING ALL`` 复制结构、默认值和索引；
+        交换前把正式表的所有者和授权（表级、列级）复制到影子表，交换后把索引改回原名。
+        依赖该表的视图会阻止交换（事务回滚，旧表保持不变）。
+        """
+        shadow = f"{self.view_name}__swap"
+        retired = f"{self.view_name}__old"
+        shadow_full = f'"{self._schema}"."{shadow}"'
+        retired_full = f'"{self._schema}"."{retired}"'
+
+        await conn.execute(f"DROP TABLE IF EXISTS {shadow_full}")
+        await conn.execute(
+            f"CREATE TABLE {shadow_full} (LIKE {self.full_name} INCLUDING ALL)"
+        )
+        try:
+            if df is not None and not df.empty:
+                await self._insert_dataframe(conn, df, table_name=shadow)
+            async with conn.transaction():
+                await self._copy_owner_and_grants(conn, self.full_name, shadow_full)
+                index_renames = await self._match_index_names(
+                    conn, self.full_name, shadow_full
+                )
+                await conn.execute(f"DROP TABLE IF EXISTS {retired_full}")
+                await conn.execute(
+                    f'ALTER TABLE {self.full_name} RENAME TO "{retired}"'
+                )
+                await conn.execute(
+                    f'ALTER TABLE {shadow_full} RENAME TO "{self.view_name}"'
+                )
+                await conn.execute(f"DROP TABLE {retired_full}")
+                # 旧表删除后原索引名才可用；约束对应的索引改名时约束名随之改变
+                for shadow_index, index_name in index_renames:
+                    await conn.execute(
+                        f'ALTER INDEX "{self._schema}"."{shadow_index}" RENAME TO "{index_name}"'
+                    )
+        except Exception:
+            await conn.execute(f"DROP TABLE IF EXISTS {shadow_full}")
+            raise
+
+    @staticmethod
+    async def _copy_owner_and_grants(conn, source: str, target: str) -> None:
+        """将 source 表的所有者和授权复制到 target 表（target 上其余的授权被撤销）。"""
+        owner = await conn.fetchval(
+            "SELECT quote_ident(pg_get_userbyid(relowner)) FROM pg_class WHERE oid = to_regclass($1)",
+            source,
+        )
+        await conn.execute(f"ALTER TABLE {target} OWNER TO {owner}")
+
+        # 表级授权 attname 为 NULL；所有者自身的权限随 OWNER TO 一并转移，不重复授予
+        acl_sql = """
+            SELECT CASE WHEN acl.grantee = 0 THEN 'PUBLIC'
+                        ELSE quote_ident(pg_get_userbyid(acl.grantee)) END AS grantee,
+                   NULL::text AS attname, acl.privilege_type, acl.is_grantable
+            FROM pg_class c, aclexplode(c.relacl) acl
+            WHERE c.oid = to_regclass($1) AND acl.grantee <> c.relowner
+            UNION ALL
+            SELECT CASE WHEN acl.grantee = 0 THEN 'PUBLIC'
+                        ELSE quote_ident(pg_get_userbyid(acl.grantee)) END,
+                   quote_ident(a.attname), acl.privilege_type, acl.is_grantable
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid, aclexplode(a.attacl) acl
+            WHERE a.attrelid = to_regclass($1) AND a.attnum > 0 AND NOT a.attisdropped
+              AND acl.grantee <> c.relowner
+        """
+        # 影子表可能因 ALTER DEFAULT PRIVILEGES 带有默认授权，先清掉
+        for grantee in {r["grantee"] for r in await conn.fetch(acl_sql, target)}:
+            await conn.execute(f"REVOKE ALL ON {target} FROM {grantee}")
+
+        for r in await conn.fetch(acl_sql, source):
+            privilege = r["privilege_type"]
+            if r["attname"]:
+                privilege = f'{privilege} ({r["attname"]})'
+            grant_option = " WITH GRANT OPTION" if r["is_grantable"] else ""
+            await conn.execute(
+                f"GRANT {privilege} ON {target} TO {r['grantee']}{grant_option}"
+            )
+
+    @staticmethod
+    async def _match_index_names(conn, source: str, target: str) -> List[Tuple[str, str]]:
+        """
+        按索引定义（唯一性、访问方法、列、谓词）将 target 的索引与 source 的索引配对。
+
+        Returns:
+            [(target 索引名, source 索引名)]，仅包含名称不同的索引
+        """
+        index_sql = """
+            SELECT c.relname AS index_name, pg_get_indexdef(i.indexrelid) AS definition,
+                   i.indisunique
+            FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = to_regclass($1)
+            ORDER BY c.relname
+        """
 
-        # 批量插入
-        await conn.executemany(insert_sql, data)
+        def signature(row) -> Tuple[bool, str]:
+            # "CREATE INDEX name ON schema.table USING btree (...)" 去掉索引名和表名
+            return row["indisunique"], row["definition"].split(" USING ", 1)[1]
+
+        unmatched: Dict[Tuple[bool, str], List[str]] = {}
+        for row in await conn.fetch(index_sql, source):
+            unmatched.setdefault(signature(row), []).append(row["index_name"])
+
+        renames = []
+        for row in await conn.fetch(index_sql, target):
+            names = unmatched.get(signature(row))
+            if names:
+                index_name = names.pop(0)
+                if index_name != row["index_name"]:
+                    renames.append((row["index_name"], index_name))
+        return renames
 
     async def _log_refresh(
         self,
@@ -0,0 +1,189 @@
+"""features.storage 特征批量刷新编排器
+
+按配方的 ``source_tables`` 构建依赖图（某配方的来源表是另一个配方的产出表时形成依赖边），
+复用任务系统的 ``TaskDAGScheduler``：互不依赖的配方并发刷新，上游刷新结束后立即启动下游。
+
+- 各配方的 refresh 使用独立连接（物化视图走连接池，数据表配方自行建立长超时连接）
+- 存在无谓词唯一索引且已填充的物化视图，全量刷新时使用 REFRESH MATERIALIZED VIEW CONCURRENTLY
+- 汇总结果中给出串行耗时之和、实际墙钟耗时与节省的时间
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Type
+
+from ...common.task_system.task_dag import TaskDAGScheduler
+
+logger = logging.getLogger(__name__)
+
+FEATURE_SCHEMA = "features"
+
+
+def recipe_target_table(recipe_cls: Type, schema: str = FEATURE_SCHEMA) -> str:
+    """返回配方产出表的完整名称（schema.view_name）"""
+    view_name = getattr(recipe_cls, "materialized_view_name", "") or f"mv_{recipe_cls.name}"
+    return f"{schema}.{view_name}"
+
+
+def build_recipe_dependencies(
+    recipe_classes: Mapping[str, Type], schema: str = FEATURE_SCHEMA
+) -> Dict[str, Set[str]]:
+    """
+    根据 ``source_tables`` 推导配方间依赖。
+
+    Args:
+        recipe_classes: 配方名 -> 配方类（本次刷新集合）
+
+    Returns:
+        配方名 -> 其依赖的配方名集合（仅包含集合内的配方）
+    """
+    producers = {
+        recipe_target_table(cls, schema).lower(): name
+        for name, cls in recipe_classes.items()
+    }
+    dependencies: Dict[str, Set[str]] = {}
+    for name, cls in recipe_classes.items():
+        deps: Set[str] = set()
+        for table in getattr(cls, "source_tables", None) or []:
+            table = str(table).strip().lower()
+            if "." not in table:
+                table = f"{schema}.{table}"
+            producer = producers.get(table)
+            if producer and producer != name:
+                deps.add(producer)
+        dependencies[name] = deps
+    return dependencies
+
+
+class FeatureRefreshOrchestrator:
+    """
+    特征配方并发刷新编排器
+
+    Args:
+        db_manager: DBManager 异步实例
+        max_concurrency: 同时刷新的配方数上限
+        use_concurrent_refresh: 是否对具备唯一索引的物化视图使用 CONCURRENTLY 刷新
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        max_concurrency: int = 4,
+        use_concurrent_refresh: bool = True,
+        schema: str = FEATURE_SCHEMA,
+        log: Optional[logging.Logger] = None,
+    ):
+        self._db_manager = db_manager
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.use_concurrent_refresh = use_concurrent_refresh
+        self._schema = schema
+        self.logger = log or logger
+
+    async def _load_matview_index_status(self) -> Dict[str, bool]:
+        """返回 schema 内物化视图 -> 是否可以 CONCURRENTLY 刷新"""
+        sql = """
+        SELECT c.relname AS view_name,
+               c.relispopulated AND bool_or(
+                   COALESCE(i.indisunique AND i.indpred IS NULL, FALSE)
+               ) AS can_concurrent
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_index i ON i.indrelid = c.oid
+        WHERE n.nspname = $1 AND c.relkind = 'm'
+        GROUP BY c.relname, c.relispopulated
+        """
+        try:
+            rows = await self._db_manager.fetch(sql, self._schema)
+        except Exception as e:
+            self.logger.warning(f"读取物化视图索引信息失败，将不使用 CONCURRENTLY 刷新: {e}")
+            return {}
+        return {r["view_name"]: bool(r["can_concurrent"]) for r in (rows or [])}
+
+    @staticmethod
+    def _resolve_strategy(
+        recipe_cls: Type, strategy: str, matviews: Mapping[str, bool], view_name: str
+    ) -> Optional[str]:
+        actual = getattr(recipe_cls, "refresh_strategy", "full") if strategy == "default" else strategy
+        if view_name in matviews and actual in ("full", "concurrent"):
+            return "concurrent" if matviews[view_name] else "full"
+        return actual
+
+    async def refresh(
+        self,
+        recipes: Optional[Iterable[Type]] = None,
+        strategy: str = "default",
+    ) -> Dict[str, Any]:
+        """
+        按依赖顺序并发刷新配方。
+
+        Args:
+            recipes: 配方类列表（默认 FeatureRegistry 中的全部配方）
+            strategy: 刷新策略（"default" 表示各配方默认策略，或 "full" / "incremental"）
+
+        Returns:
+            {
+                "results": [...],            # 与输入顺序一致的各配方刷新结果
+                "success_count": int,
+                "fail_count": int,
+                "wall_seconds": float,       # 实际耗时
+                "serial_seconds": float,     # 各配方耗时之和（串行执行所需时间）
+                "time_saved_seconds": float,
+            }
+        """
+        if recipes is None:
+            from ..registry import FeatureRegistry
+
+            recipes = FeatureRegistry.discover()
+
+        recipe_classes: Dict[str, Type] = {cls.name: cls for cls in recipes}
+        names = list(recipe_classes)
+        dependencies = build_recipe_dependencies(recipe_classes, self._schema)
+        matviews = (
+            await self._load_matview_index_status() if self.use_concurrent_refresh else {}
+        )
+
+        async def _run(name: str) -> Dict[str, Any]:
+            recipe_cls = recipe_classes[name]
+            instance = recipe_cls(db_manager=self._db_manager)
+            actual = self._resolve_strategy(recipe_cls, strategy, matviews, instance.view_name)
+            self.logger.info(f"刷新特征 {instance.full_name} (策略: {actual})")
+            started = time.perf_counter()
+            try:
+                result = await instance.refresh(strategy=actual)
+            except Exception as e:
+                result = {"status": "failed", "error_message": str(e)}
+            result = dict(result or {})
+            result["name"] = name
+            result["elapsed_seconds"] = time.perf_counter() - started
+            return result
+
+        scheduler = TaskDAGScheduler(
+            run_task=_run,
+            dependencies=dependencies,
+            source_of=lambda _name: "features",
+            source_limits={"features": self.max_concurrency},
+            log=self.logger,
+        )
+
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = await scheduler.run(names)
+        wall_seconds = time.perf_counter() - started
+
+        serial_seconds = sum(r.get("elapsed_seconds", 0.0) for r in results)
+        success_count = sum(1 for r in results if r.get("status") == "success")
+        summary = {
+            "results": results,
+            "success_count": success_count,
+            "fail_count": len(results) - success_count,
+            "wall_seconds": wall_seconds,
+            "serial_seconds": serial_seconds,
+            "time_saved_seconds": max(0.0, serial_seconds - wall_seconds),
+        }
+        self.logger.info(
+            f"特征批量刷新完成: 成功 {success_count}/{len(results)}, "
+            f"耗时 {wall_seconds:.1f}s (串行 {serial_seconds:.1f}s, "
+            f"节省 {summary['time_saved_seconds']:.1f}s)"
+        )
+        return summary
@@ -0,0 +1,178 @@
+"""
+Python 特征滚动窗口计算引擎
+
+为 ``PythonFeatureTable`` 配方提供按标的分组的向量化滚动计算：
+数据按 (symbol, date) 排序后，每个标的是一段连续数组，
+窗口统计量由整列一次性的 NumPy 累积和差分得到，不再逐组调用 Python 函数。
+
+- rolling_sum / rolling_mean / rolling_std: 累积和（窗口不跨越标的边界，NaN 不计入有效样本）
+- ewm_mean: 指数加权均值，委托 pandas 的分组 EWM（Cython 实现，同样不逐组回调 Python）
+- lookback_start_date: 按交易日历把"向前 N 个交易日"换算成查询起始日期
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[str, np.ndarray, pd.Series]
+
+
+class RollingFrame:
+    """
+    按 (symbol, date) 排序后的连续数组视图。
+
+    Args:
+        df: 原始数据
+        symbol_column: 标的列名
+        date_column: 日期列名
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        symbol_column: str = "ts_code",
+        date_column: str = "trade_date",
+    ):
+        self.symbol_column = symbol_column
+        self.date_column = date_column
+        self.df = df.sort_values(
+            [symbol_column, date_column], kind="mergesort"
+        ).reset_index(drop=True)
+
+        size = len(self.df)
+        codes = self.df[symbol_column].to_numpy()
+        changed = np.empty(size, dtype=bool)
+        if size:
+            changed[0] = True
+            changed[1:] = codes[1:] != codes[:-1]
+        # group_ids: 每行所属分组编号；group_start: 每行所在分组的起始下标
+        self.group_ids = np.cumsum(changed) - 1
+        self.group_start = np.flatnonzero(changed)[self.group_ids]
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def values(self, column: ArrayLike) -> np.ndarray:
+        """取列（或直接传入的数组）为 float64 数组"""
+        if isinstance(column, str):
+            column = self.df[column]
+        if isinstance(column, pd.Series):
+            return pd.to_numeric(column, errors="coerce").to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+        return np.asarray(column, dtype=np.float64)
+
+    def _window_sums(self, values: np.ndarray, window: int, squares: bool = False):
+        """返回窗口内 (有效样本数, 平移后的和, 平移后的平方和, 平移量)"""
+        if window < 1:
+            raise ValueError(f"window 必须为正整数，收到 {window}")
+        size = len(values)
+        valid = ~np.isnan(values)
+
+        # 以每个分组首个值作为平移量，降低长序列累积和的数值误差
+        shift = values[self.group_start] if size else values
+        shift = np.where(np.isnan(shift), 0.0, shift)
+        centered = np.where(valid, values - shift, 0.0)
+
+        idx = np.arange(size)
+        lo = np.maximum(idx - window + 1, self.group_start)
+        hi = idx + 1
+
+        count_cs = np.concatenate(([0], np.cumsum(valid)))
+        sum_cs = np.concatenate(([0.0], np.cumsum(centered)))
+        counts = count_cs[hi] - count_cs[lo]
+        sums = sum_cs[hi] - sum_cs[lo]
+        sq_sums = None
+        if squares:
+            sq_cs = np.concatenate(([0.0], np.cumsum(centered * centered)))
+            sq_sums = sq_cs[hi] - sq_cs[lo]
+        return counts, sums, sq_sums, shift
+
+    def rolling_sum(
+        self, column: ArrayLike, window: int, min_periods: Optional[int] = None
+    ) -> np.ndarray:
+        """分组滚动求和，有效样本数不足 ``min_periods``（默认等于窗口）时为 NaN"""
+        values = self.values(column)
+        counts, sums, _, shift = self._window_sums(values, window)
+        result = sums + shift * counts
+        return np.where(counts >= (min_periods or window), result, np.nan)
+
+    def rolling_mean(
+        self, column: ArrayLike, window: int, min_periods: Optional[int] = None
+    ) -> np.ndarray:
+        """分组滚动均值（与 ``groupby().rolling(window, min_periods).mean()`` 一致）"""
+        values = self.values(column)
+        counts, sums, _, shift = self._window_sums(values, window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = shift + sums / counts
+        return np.where(counts >= (min_periods or window), result, np.nan)
+
+    def rolling_std(
+        self,
+        column: ArrayLike,
+        window: int,
+        min_periods: Optional[int] = None,
+        ddof: int = 1,
+    ) -> np.ndarray:
+        """分组滚动标准差（与 ``groupby().rolling(...).std(ddof)`` 一致）"""
+        values = self.values(column)
+        counts, sums, sq_sums, _ = self._window_sums(values, window, squares=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (sq_sums - sums * sums / counts) / (counts - ddof)
+        var = np.maximum(var, 0.0)
+        required = max(min_periods or window, ddof + 1)
+        return np.where(counts >= required, np.sqrt(var), np.nan)
+
+    def ewm_mean(
+        self,
+        column: ArrayLike,
+        span: float,
+        adjust: bool = False,
+        min_periods: int = 0,
+    ) -> np.ndarray:
+        """分组指数加权均值"""
+        values = self.values(column)
+        if not len(values):
+            return values
+        result = (
+            pd.Series(values)
+            .groupby(self.group_ids, sort=False)
+            .ewm(span=span, adjust=adjust, min_periods=min_periods)
+            .mean()
+        )
+        # 结果索引为 (分组, 原下标)；分组连续且有序，按原下标还原即可
+        return result.droplevel(0).sort_index().to_numpy()
+
+
+async def lookback_start_date(
+    start_date: str,
+    trading_days: int,
+    db_manager: Optional[Any] = None,
+    exchange: str = "SSE",
+) -> str:
+    """
+    返回 ``start_date`` 之前第 ``trading_days`` 个交易日（YYYYMMDD）。
+
+    交易日历不可用时，按 1.5 倍日历日加 15 天的保守估计回退。
+    """
+    if trading_days <= 0:
+        return start_date
+
+    try:
+        from alphahome.fetchers.tools.calendar import get_last_trade_day
+
+        day = await get_last_trade_day(
+            start_date, n=trading_days, exchange=exchange, db_manager=db_manager
+        )
+        if day:
+            return str(day)
+    except Exception as e:
+        logger.warning(f"读取交易日历失败，改用日历日估算回看区间: {e}")
+
+    start_dt = datetime.strptime(start_date, "%Y%m%d")
+    return (start_dt - timedelta(days=int(trading_days * 1.5) + 15)).strftime("%Y%m%d")
@@ -10,6 +10,11 @@ features.storage 数据质量检查器
 
 数据质量问题被暴露而不是掩盖，用户需要手动复查。
 
+两种运行方式，报告结构一致：
+- DataFrame 模式（validate_*）：对已加载到内存的数据检查
+- 下推模式（validate_in_database）：把检查配置编译为一条聚合 SQL 在数据库端执行，
+  无需把整张表传输到 Python
+
 迁移自: 旧 processors.materialized_views.validator（已删除）
 """
 
@@ -21,6 +26,20 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL 列类型 -> 加载为 DataFrame 后的 dtype（下推模式的类型检查使用）
+PG_TO_PANDAS_DTYPE = {
+    'smallint': 'int64',
+    'integer': 'int64',
+    'bigint': 'int64',
+    'real': 'float64',
+    'double precision': 'float64',
+    'numeric': 'float64',
+    'boolean': 'bool',
+    'timestamp without time zone': 'datetime64[ns]',
+}
+
+NUMERIC_PG_TYPES = ('smallint', 'integer', 'bigint', 'real', 'double precision', 'numeric')
+
 
 class MaterializedViewValidator:
     """
@@ -93,21 +112,7 @@ class MaterializedViewValidator:
                     'threshold': threshold
                 })
         
-        if issues:
-            status = 'warning'
-            message = f"Null values detected in {len(issues)} column(s) exceeding threshold"
-            details = {'columns_with_issues': issues}
-        else:
-            status = 'pass'
-            message = f"All {len(columns)} columns passed null check"
-            details = {}
-        
-        return {
-            'check_name': check_name,
-            'status': status,
-            'message': message,
-            'details': details
-        }
+        return self._null_report(columns, issues)
     
     async def validate_outliers(
         self,
@@ -185,21 +190,7 @@ class MaterializedViewValidator:
                     'threshold': threshold
                 })
         
-        if issues:
-            status = 'warning'
-            message = f"Outliers detected in {len(issues)} column(s)"
-            details = {'columns_with_issues': issues}
-        else:
-            status = 'pass'
-            message = f"All {len(columns)} columns passed outlier check"
-            details = {}
-        
-        return {
-            'check_name': check_name,
-            'status': status,
-            'message': message,
-            'details': details
-        }
+        return self._outlier_report(columns, issues)
     
     async def validate_row_count_change(
         self,
@@ -329,32 +320,7 @@ class MaterializedViewValidator:
         
         # 检查重复行
         duplicate_mask = data.duplicated(subset=columns, keep=False)
-        duplicate_count = duplicate_mask.sum()
-        duplicate_percentage = duplicate_count / len(data) if len(data) > 0 else 0
-        
-        if duplicate_count > 0:
-            status = 'error'
-            message = f"Found {duplicate_count} duplicate rows based on {columns}"
-            details = {
-                'duplicate_count': int(duplicate_count),
-                'duplicate_percentage': float(duplicate_percentage),
-                'key_columns': columns
-            }
-        else:
-            status = 'pass'
-            message = f"No duplicates found based on {columns}"
-            details = {
-                'duplicate_count': 0,
-                'duplicate_percentage': 0.0,
-                'key_columns': columns
-            }
-        
-        return {
-            'check_name': check_name,
-            'status': status,
-            'message': message,
-            'details': details
-        }
+        return self._duplicate_report(columns, int(duplicate_mask.sum()), len(data))
     
     async def validate_types(
         self,
@@ -412,20 +378,346 @@ class MaterializedViewValidator:
                     'status': 'error'
                 })
         
-        if issues:
-            status = 'error'
-            message = f"Type mismatch in {len(issues)} column(s)"
-            details = {'columns_with_issues': issues}
-        else:
-            status = 'pass'
-            message = f"All {len(columns)} columns have correct types"
-            details = {}
+        return self._type_report(columns, issues)
+    
+    # =========================================================================
+    # 下推模式
+    # =========================================================================
+    
+    async def validate_in_database(
+        self,
+        db_manager,
+        table: str,
+        checks: Dict[str, Any],
+        previous_row_count: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        在数据库端执行质量检查（下推模式）
+        
+        把 checks 编译为一条聚合 SQL：
+        - null_check: count(*) FILTER (WHERE col IS NULL)
+        - outlier_check: percentile_cont / avg / stddev_samp 求边界后按边界计数
+        - duplicate_check: GROUP BY ... HAVING count(*) > 1
+        - row_count_change: count(*)
+        type_check 读取 pg_attribute 的列类型（information_schema.columns 不包含物化视图），
+        按 PG_TO_PANDAS_DTYPE 对应到 dtype（期望类型也可直接写 PostgreSQL 类型名）。
+        
+        参数：
+        - db_manager: DBManager 实例
+        - table: 表名（schema.table）
+        - checks: 与 BaseFeatureView.quality_checks 相同的配置，键为检查名
+        - previous_row_count: 上次刷新的行数（可选，用于 row_count_change）
+        
+        返回：
+        报告列表，每项与对应 validate_* 方法的返回结构一致
+        """
+        schema, table_name = table.split('.', 1) if '.' in table else ('public', table)
+        table_sql = f'"{schema}"."{table_name}"'
+        # format_type(..., NULL) 返回不带长度/精度的基础类型名，与 PG_TO_PANDAS_DTYPE 的键一致
+        rows = await db_manager.fetch(
+            """
+            SELECT attname AS column_name, format_type(atttypid, NULL) AS data_type
+            FROM pg_attribute
+            WHERE attrelid = to_regclass($1) AND attnum > 0 AND NOT attisdropped
+            ORDER BY attnum
+            """,
+            table_sql,
+        )
+        column_types = {r['column_name']: r['data_type'] for r in rows}
+        if not column_types:
+            raise ValueError(f"Table {table} not found")
+        
+        plan = self._compile_pushdown_plan(checks, column_types)
+        sql = self._compile_pushdown_sql(table_sql, plan)
+        result = await db_manager.fetch(sql)
+        stats = dict(result[0])
+        total = int(stats['row_count'])
+        
+        reports = []
+        for check_name in checks:
+            if check_name == 'null_check':
+                reports.append(self._null_report_from_stats(plan['null'], stats, total))
+            elif check_name == 'outlier_check':
+                reports.append(self._outlier_report_from_stats(plan['outlier'], stats))
+            elif check_name == 'duplicate_check':
+                columns = plan['duplicate']['columns']
+                if plan['duplicate']['missing']:
+                    reports.append({
+                        'check_name': 'duplicate_check',
+                        'status': 'error',
+                        'message': f"Columns not found: {plan['duplicate']['missing']}",
+                        'details': {}
+                    })
+                elif not columns:
+                    reports.append(self._duplicate_report(columns, 0, total))
+                else:
+                    reports.append(self._duplicate_report(columns, int(stats['duplicate_count']), total))
+            elif check_name == 'type_check':
+                reports.append(self._type_report_from_columns(checks[check_name], column_types))
+            elif check_name == 'row_count_change':
+                reports.append(await self.validate_row_count_change(
+                    None, checks[check_name],
+                    previous_row_count=previous_row_count,
+                    current_row_count=total,
+                ))
+            else:
+                self.logger.warning(f"Unknown quality check: {check_name}")
+        return reports
+    
+    def _compile_pushdown_plan(
+        self,
+        checks: Dict[str, Any],
+        column_types: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """按表的实际列筛选各检查涉及的列（缺失列、非数值列的处理与 DataFrame 模式一致）"""
+        null_config = checks.get('null_check', {})
+        null_columns = []
+        for col in null_config.get('columns', []):
+            if col not in column_types:
+                self.logger.warning(f"Column {col} not found in data")
+                continue
+            null_columns.append(col)
         
+        outlier_config = checks.get('outlier_check', {})
+        method = outlier_config.get('method', 'iqr')
+        outlier_columns = []
+        if method not in ('iqr', 'zscore', 'percentile'):
+            self.logger.warning(f"Unknown outlier detection method: {method}")
+        else:
+            for col in outlier_config.get('columns', []):
+                if col not in column_types:
+                    self.logger.warning(f"Column {col} not found in data")
+                elif column_types[col] not in NUMERIC_PG_TYPES:
+                    self.logger.warning(f"Column {col} is not numeric, skipping outlier check")
+                else:
+                    outlier_columns.append(col)
+        
+        duplicate_columns = checks.get('duplicate_check', {}).get('columns', [])
         return {
-            'check_name': check_name,
-            'status': status,
-            'message': message,
-            'details': details
+            'null': {
+                'configured': null_config.get('columns', []),
+                'columns': null_columns,
+                'threshold': null_config.get('threshold', 0.0),
+            },
+            'outlier': {
+                'configured': outlier_config.get('columns', []),
+                'columns': outlier_columns,
+                'method': method,
+                'threshold': outlier_config.get('threshold', 3.0),
+            },
+            'duplicate': {
+                'columns': duplicate_columns,
+                'missing': [col for col in duplicate_columns if col not in column_types],
+            },
+        }
+    
+    @staticmethod
+    def _compile_pushdown_sql(table_sql: str, plan: Dict[str, Any]) -> str:
+        """
+        编译单条聚合 SQL，返回一行：
+        row_count, null_{i}, nonnull_{i}, lower_{i}, upper_{i}, outlier_{i}, duplicate_count
+        """
+        stats_items = ['count(*) AS row_count']
+        for i, col in enumerate(plan['null']['columns']):
+            stats_items.append(f'count(*) FILTER (WHERE "{col}" IS NULL) AS null_{i}')
+        
+        method = plan['outlier']['method']
+        k = float(plan['outlier']['threshold'])
+        outlier_items = []
+        for i, col in enumerate(plan['outlier']['columns']):
+            value = f'"{col}"::double precision'
+            # DataFrame 模式先 dropna()，PG 的 'NaN' 也要排除（NaN 在 PG 中大于任何数值）
+            valid = f"FILTER (WHERE {value} <> 'NaN')"
+            if method == 'iqr':
+                q1 = f'percentile_cont(0.25) WITHIN GROUP (ORDER BY {value}) {valid}'
+                q3 = f'percentile_cont(0.75) WITHIN GROUP (ORDER BY {value}) {valid}'
+                lower, upper = f'{q1} - {k} * ({q3} - {q1})', f'{q3} + {k} * ({q3} - {q1})'
+            elif method == 'zscore':
+                # 与 pandas 一致使用样本标准差；标准差为 0 时边界为 NULL，不判出异常值
+                std = f'NULLIF(stddev_samp({value}) {valid}, 0)'
+                lower, upper = f'avg({value}) {valid} - {k} * {std}', f'avg({value}) {valid} + {k} * {std}'
+            else:
+                lower = f'percentile_cont({k}) WITHIN GROUP (ORDER BY {value}) {valid}'
+                upper = f'percentile_cont({1 - k}) WITHIN GROUP (ORDER BY {value}) {valid}'
+            stats_items += [f'count({value}) {valid} AS nonnull_{i}', f'{lower} AS lower_{i}', f'{upper} AS upper_{i}']
+            outlier_items.append(
+                f"count(*) FILTER (WHERE {value} <> 'NaN' AND ({value} < stats.lower_{i} OR {value} > stats.upper_{i}))"
+                f" AS outlier_{i}"
+            )
+        
+        sql = f"WITH stats AS (\n    SELECT {', '.join(stats_items)}\n    FROM {table_sql}\n)\nSELECT stats.*"
+        if outlier_items:
+            sql += ', outliers.*'
+        duplicate_columns = plan['duplicate']['columns']
+        if duplicate_columns and not plan['duplicate']['missing']:
+            sql += ', duplicates.duplicate_count'
+        sql += '\nFROM stats'
+        if outlier_items:
+            sql += f"\nCROSS JOIN LATERAL (\n    SELECT {', '.join(outlier_items)}\n    FROM {table_sql}\n) outliers"
+        if duplicate_columns and not plan['duplicate']['missing']:
+            key_str = ', '.join(f'"{col}"' for col in duplicate_columns)
+            sql += (
+                "\nCROSS JOIN (\n    SELECT COALESCE(sum(cnt), 0)::bigint AS duplicate_count FROM (\n"
+                f"        SELECT count(*) AS cnt FROM {table_sql} GROUP BY {key_str} HAVING count(*) > 1\n"
+                "    ) dup\n) duplicates"
+            )
+        return sql
+    
+    def _null_report_from_stats(self, plan: Dict[str, Any], stats: Dict[str, Any], total: int) -> Dict[str, Any]:
+        if not plan['configured']:
+            return {
+                'check_name': 'null_check',
+                'status': 'pass',
+                'message': 'No columns specified for null check',
+                'details': {}
+            }
+        issues = []
+        for i, col in enumerate(plan['columns']):
+            null_count = int(stats[f'null_{i}'])
+            null_percentage = null_count / total if total > 0 else 0
+            if null_percentage > plan['threshold']:
+                issues.append({
+                    'column': col,
+                    'null_count': null_count,
+                    'null_percentage': float(null_percentage),
+                    'threshold': plan['threshold']
+                })
+        return self._null_report(plan['configured'], issues)
+    
+    def _outlier_report_from_stats(self, plan: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+        if not plan['configured']:
+            return {
+                'check_name': 'outlier_check',
+                'status': 'pass',
+                'message': 'No columns specified for outlier check',
+                'details': {}
+            }
+        issues = []
+        for i, col in enumerate(plan['columns']):
+            nonnull = int(stats[f'nonnull_{i}'])
+            outlier_count = int(stats[f'outlier_{i}'])
+            if nonnull == 0 or outlier_count == 0:
+                continue
+            issues.append({
+                'column': col,
+                'method': plan['method'],
+                'outlier_count': outlier_count,
+                'outlier_percentage': float(outlier_count / nonnull),
+                'threshold': plan['threshold']
+            })
+        return self._outlier_report(plan['configured'], issues)
+    
+    def _type_report_from_columns(self, config: Dict[str, Any], column_types: Dict[str, str]) -> Dict[str, Any]:
+        columns = config.get('columns', {})
+        if not columns:
+            return {
+                'check_name': 'type_check',
+                'status': 'pass',
+                'message': 'No columns specified for type check',
+                'details': {}
+            }
+        issues = []
+        for col, expected_type in columns.items():
+            pg_type = column_types.get(col)
+            if pg_type is None:
+                issues.append({
+                    'column': col,
+                    'expected_type': expected_type,
+                    'actual_type': 'MISSING',
+                    'status': 'error'
+                })
+                continue
+            actual_type = PG_TO_PANDAS_DTYPE.get(pg_type, 'object')
+            if expected_type not in (actual_type, pg_type):
+                issues.append({
+                    'column': col,
+                    'expected_type': expected_type,
+                    'actual_type': actual_type,
+                    'status': 'error'
+                })
+        return self._type_report(columns, issues)
+    
+    # =========================================================================
+    # 报告构建（两种模式共用）
+    # =========================================================================
+    
+    @staticmethod
+    def _null_report(columns: List[str], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if issues:
+            return {
+                'check_name': 'null_check',
+                'status': 'warning',
+                'message': f"Null values detected in {len(issues)} column(s) exceeding threshold",
+                'details': {'columns_with_issues': issues}
+            }
+        return {
+            'check_name': 'null_check',
+            'status': 'pass',
+            'message': f"All {len(columns)} columns passed null check",
+            'details': {}
+        }
+    
+    @staticmethod
+    def _outlier_report(columns: List[str], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if issues:
+            return {
+                'check_name': 'outlier_check',
+                'status': 'warning',
+                'message': f"Outliers detected in {len(issues)} column(s)",
+                'details': {'columns_with_issues': issues}
+            }
+        return {
+            'check_name': 'outlier_check',
+            'status': 'pass',
+            'message': f"All {len(columns)} columns passed outlier check",
+            'details': {}
+        }
+    
+    @staticmethod
+    def _duplicate_report(columns: List[str], duplicate_count: int, total: int) -> Dict[str, Any]:
+        if not columns:
+            return {
+                'check_name': 'duplicate_check',
+                'status': 'pass',
+                'message': 'No columns specified for duplicate check',
+                'details': {}
+            }
+        if duplicate_count > 0:
+            return {
+                'check_name': 'duplicate_check',
+                'status': 'error',
+                'message': f"Found {duplicate_count} duplicate rows based on {columns}",
+                'details': {
+                    'duplicate_count': duplicate_count,
+                    'duplicate_percentage': float(duplicate_count / total) if total > 0 else 0.0,
+                    'key_columns': columns
+                }
+            }
+        return {
+            'check_name': 'duplicate_check',
+            'status': 'pass',
+            'message': f"No duplicates found based on {columns}",
+            'details': {
+                'duplicate_count': 0,
+                'duplicate_percentage': 0.0,
+                'key_columns': columns
+            }
+        }
+    
+    @staticmethod
+    def _type_report(columns: Dict[str, Any], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if issues:
+            return {
+                'check_name': 'type_check',
+                'status': 'error',
+                'message': f"Type mismatch in {len(issues)} column(s)",
+                'details': {'columns_with_issues': issues}
+            }
+        return {
+            'check_name': 'type_check',
+            'status': 'pass',
+            'message': f"All {len(columns)} columns have correct types",
+            'details': {}
         }
     
     # =========================================================================
@@ -18,11 +18,17 @@ from ..common.task_system import (
     get_task_types,
 )
 
-# 导入所有具体的数据采集任务（这会触发任务注册）
-from . import tasks
+# 具体的数据采集任务不在此处导入：任务元信息由 UnifiedTaskFactory 从任务清单读取，
+# 创建任务实例时才按需导入对应模块（见 common/task_system/task_manifest.py）。
 
-# 注册所有任务到统一工厂 (此步骤已不再需要，因为注册是即时的)
-# register_tasks_to_factory()
+
+def __getattr__(name):
+    # 兼容 `alphahome.fetchers.tasks` 属性访问
+    if name == "tasks":
+        import importlib
+
+        return importlib.import_module(".tasks", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 主要导出
 __all__ = [
@@ -22,6 +22,8 @@ class FetcherTask(BaseTask, ABC):
     - 调用 get_batch_list 生成批次。
     - 并发执行数据获取请求，并处理重试逻辑。
     - 聚合所有批次的结果并返回一个 DataFrame。
+    - 可选的流式模式（streaming_mode）：批次完成后立即经有界队列进入
+      处理/验证/保存，峰值内存由队列深度和并发数决定，而非全量数据。
 
     子类需要实现 `get_batch_list`, `prepare_params` 和 `fetch_batch` 方法，
     以处理特定于数据源的批处理、API参数准备和数据获取逻辑。
@@ -37,6 +39,8 @@ class FetcherTask(BaseTask, ABC):
     default_max_retries = 3
     default_retry_delay = 2
     smart_lookback_days = 10
+    default_streaming_mode = False  # 流式获取-保存（需 process_data 可按批次独立执行）
+    default_stream_queue_size = 4   # 流式模式下等待保存的已完成批次上限
 
     def __init__(
         self,
@@ -85,6 +89,10 @@ class FetcherTask(BaseTask, ABC):
         self.max_retries = int(task_config.get("max_retries", cls.default_max_retries))
         self.retry_delay = int(task_config.get("retry_delay", cls.default_retry_delay))
         self.smart_lookback_days = int(task_config.get("smart_lookback_days", cls.smart_lookback_days))
+        self.streaming_mode = bool(task_config.get("streaming_mode", cls.default_streaming_mode))
+        self.stream_queue_size = max(
+            1, int(task_config.get("stream_queue_size", cls.default_stream_queue_size))
+        )
 
         # 处理数据保存批次大小配置 (优先使用save_batch_size，向后兼容batch_size)
         self.save_batch_size = int(
@@ -95,7 +103,7 @@ class FetcherTask(BaseTask, ABC):
         self.logger.debug(
             f"'{self.name}': Applied config - concurrent_limit={self.concurrent_limit}, "
             f"max_retries={self.max_retries}, retry_delay={self.retry_delay}, "
-            f"save_batch_size={self.save_batch_size}"
+            f"save_batch_size={self.save_batch_size}, streaming_mode={self.streaming_mode}"
         )
 
     @abstractmethod
@@ -154,6 +162,59 @@ class FetcherTask(BaseTask, ABC):
             
         return {"start_date": start, "end_date": end}
 
+    async def _fetch_batch_with_retry(
+        self,
+        batch: Any,
+        semaphore: asyncio.Semaphore,
+        stop_event: Optional[asyncio.Event] = None,
+    ) -> Dict[str, Any]:
+        """获取单个批次（含重试），返回 {"success", "batch", "data"/"error"}。"""
+        last_error = None
+        for attempt in range(self.max_retries):
+            if stop_event and stop_event.is_set():
+                raise asyncio.CancelledError
+            try:
+                async with semaphore:
+                    params = await self.prepare_params(batch)
+                    return {
+                        "success": True,
+                        "batch": batch,
+                        "data": await self.fetch_batch(params, stop_event=stop_event),
+                    }
+            except asyncio.CancelledError:
+                raise  # Propagate cancellation
+            except Exception as e:
+                last_error = e
+                self.logger.warning(
+                    f"'{self.name}' - Batch {batch} failed on attempt {attempt + 1}/{self.max_retries}. Error: {e}"
+                )
+                if attempt + 1 == self.max_retries:
+                    self.logger.error(f"'{self.name}' - Batch {batch} failed after all retries.")
+                    return {
+                        "success": False,
+                        "batch": batch,
+                        "error": str(last_error),
+                    }
+                await asyncio.sleep(self.retry_delay * (attempt + 1))
+        return {
+            "success": False,
+            "batch": batch,
+            "error": str(last_error) if last_error else "unknown batch failure",
+        }
+
+    def _format_failed_batches(
+        self, failed_batches: List[Dict[str, Any]], total: int, action: str
+    ) -> str:
+        """生成失败批次的统一报告文本。"""
+        sample_errors = "; ".join(
+            f"batch={item.get('batch')}, error={item.get('error')}"
+            for item in failed_batches[:3]
+        )
+        return (
+            f"'{self.name}' - {len(failed_batches)}/{total} batches failed; "
+            f"{action}. Sample errors: {sample_errors}"
+        )
+
     async def _execute_batches(self, batches: List[Any], stop_event: Optional[asyncio.Event] = None) -> List[Any]:
         """
         使用信号量并发执行所有批次的数据获取，并包含重试逻辑。
@@ -164,48 +225,13 @@ class FetcherTask(BaseTask, ABC):
         semaphore = asyncio.Semaphore(self.concurrent_limit)
         progress_bar = tqdm(total=len(batches), desc=f"Executing {self.name}", unit="batch")
         failed_batches: List[Dict[str, Any]] = []
-        
-        async def process_batch_with_retry(batch):
-            last_error = None
-            for attempt in range(self.max_retries):
-                if stop_event and stop_event.is_set():
-                    progress_bar.close()
-                    raise asyncio.CancelledError
-                try:
-                    async with semaphore:
-                        params = await self.prepare_params(batch)
-                        return {
-                            "success": True,
-                            "batch": batch,
-                            "data": await self.fetch_batch(params, stop_event=stop_event),
-                        }
-                except asyncio.CancelledError:
-                    raise  # Propagate cancellation
-                except Exception as e:
-                    last_error = e
-                    self.logger.warning(
-                        f"'{self.name}' - Batch {batch} failed on attempt {attempt + 1}/{self.max_retries}. Error: {e}"
-                    )
-                    if attempt + 1 == self.max_retries:
-                        self.logger.error(f"'{self.name}' - Batch {batch} failed after all retries.")
-                        return {
-                            "success": False,
-                            "batch": batch,
-                            "error": str(last_error),
-                        }
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
-            return {
-                "success": False,
-                "batch": batch,
-                "error": str(last_error) if last_error else "unknown batch failure",
-            }
 
         tasks = []
         for batch in batches:
             if stop_event and stop_event.is_set():
                 self.logger.warning(f"'{self.name}' - Stop signal detected before creating all tasks. Halting batch creation.")
                 break # 停止创建新的批处理任务
-            tasks.append(asyncio.create_task(process_batch_with_retry(batch)))
+            tasks.append(asyncio.create_task(self._fetch_batch_with_retry(batch, semaphore, stop_event)))
 
         results = []
         for future in asyncio.as_completed(tasks):
@@ -221,6 +247,7 @@ class FetcherTask(BaseTask, ABC):
                     results.append(result)
             except asyncio.CancelledError:
                 self.logger.warning(f"'{self.name}' - Batch processing was cancelled.")
+                progress_bar.close()
                 # Ensure remaining tasks are cancelled
                 for t in tasks:
                     if not t.done():
@@ -232,80 +259,183 @@ class FetcherTask(BaseTask, ABC):
         progress_bar.close()
 
         if failed_batches:
-            sample_errors = "; ".join(
-                f"batch={item.get('batch')}, error={item.get('error')}"
-                for item in failed_batches[:3]
-            )
             raise RuntimeError(
-                f"'{self.name}' - {len(failed_batches)}/{len(batches)} batches failed; "
-                f"aborting save to avoid partial data. Sample errors: {sample_errors}"
+                self._format_failed_batches(
+                    failed_batches, len(batches), "aborting save to avoid partial data"
+                )
             )
 
         return results
 
-    async def _fetch_data(self, stop_event: Optional[asyncio.Event] = None, **kwargs) -> Optional[pd.DataFrame]:
+    async def _execute_batches_streaming(
+        self, batches: List[Any], stop_event: Optional[asyncio.Event] = None, **kwargs
+    ) -> Dict[str, Any]:
         """
-        实现 BaseTask 的数据获取钩子。
-        这是数据获取任务的主入口点。
+        流式执行批次：获取完成的批次经有界队列逐个进入 处理 -> 验证 -> 保存。
+
+        每个获取协程在结果入队前一直占用并发槽位，因此同一时刻驻留内存的批次数
+        不超过 concurrent_limit（获取中/等待入队）+ stream_queue_size（队列中）+ 1（保存中）。
+
+        失败批次与非流式模式一样在全部批次结束后统一抛出 RuntimeError；
+        区别在于此时成功批次已经写入数据库（UPSERT 幂等，可直接重跑）。
         """
-        self.logger.info(f"'{self.name}' - Starting _fetch_data with update_type='{self.update_type}'...")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.stream_queue_size)
+        semaphore = asyncio.Semaphore(self.concurrent_limit)
+        # 槽位覆盖 获取 + 等待入队 全过程（重试等待期间也不释放），保证内存有界
+        slots = asyncio.Semaphore(self.concurrent_limit)
+        progress_bar = tqdm(total=len(batches), desc=f"Streaming {self.name}", unit="batch")
+
+        async def produce(batch):
+            try:
+                async with slots:
+                    result = await self._fetch_batch_with_retry(batch, semaphore, stop_event)
+                    await queue.put(result)
+            except asyncio.CancelledError:
+                # 通知消费者停止；消费者自身取消时队列已无人读取，使用非阻塞写入
+                if not queue.full():
+                    queue.put_nowait({"cancelled": True, "batch": batch})
+                raise
+
+        tasks = []
+        for batch in batches:
+            if stop_event and stop_event.is_set():
+                self.logger.warning(f"'{self.name}' - Stop signal detected before creating all tasks. Halting batch creation.")
+                break
+            tasks.append(asyncio.create_task(produce(batch)))
 
+        failed_batches: List[Dict[str, Any]] = []
+        summary: Dict[str, Any] = {
+            "rows": 0,
+            "saved_batches": 0,
+            "validation_passed": True,
+            "failed_validations": {},
+            "original_rows": 0,
+            "result_rows": 0,
+        }
         try:
-            # 首先处理全量更新，因为它最简单
-            if self.update_type == UpdateTypes.FULL:
-                start_date, end_date = self.default_start_date, datetime.now().strftime("%Y%m%d")
-            
-            # 手动模式：直接使用传入的日期，这是最优先的
-            elif self.update_type == UpdateTypes.MANUAL:
-                if not self.start_date or not self.end_date:
-                    self.logger.error("手动模式需要提供 start_date 和 end_date。")
-                    return None
-                start_date, end_date = self.start_date, self.end_date
-            
-            # 智能增量模式：动态确定日期范围
-            elif self.update_type == UpdateTypes.SMART:
-                date_range = await self._determine_date_range()
-                if not date_range:
-                    self.logger.warning(
-                        f"任务 {self.name}: 无法确定智能增量更新的日期范围，将跳过执行。"
-                    )
-                    return None
-                start_date, end_date = date_range["start_date"], date_range["end_date"]
+            for _ in range(len(tasks)):
+                batch_result = await queue.get()
+                progress_bar.update(1)
+                if batch_result.get("cancelled") or (stop_event and stop_event.is_set()):
+                    raise asyncio.CancelledError("流式批次处理被取消")
+                if not batch_result.get("success"):
+                    failed_batches.append(batch_result)
+                    continue
 
-            else:
-                self.logger.error(f"未知的更新类型: {self.update_type}")
-                return None
+                data = batch_result.get("data")
+                if data is None or (isinstance(data, pd.DataFrame) and data.empty):
+                    continue
+
+                stage_result = await self._process_validate_save(
+                    data, stop_event=stop_event, **kwargs
+                )
+                del data, batch_result
+                if stage_result is None:
+                    continue
+
+                save_result, validation_passed, details = stage_result
+                summary["rows"] += save_result.get("rows", 0) if isinstance(save_result, dict) else 0
+                summary["saved_batches"] += 1
+                summary["validation_passed"] &= validation_passed
+                summary["failed_validations"].update(details.get("failed_validations", {}))
+                summary["original_rows"] += details.get("original_rows", 0)
+                summary["result_rows"] += details.get("result_rows", 0)
+        except asyncio.CancelledError:
+            self.logger.warning(f"'{self.name}' - Streaming batch processing was cancelled.")
+            raise
+        finally:
+            progress_bar.close()
+            # 消费端异常或取消时，停止仍在获取/等待入队的批次
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
+
+        if failed_batches:
+            raise RuntimeError(
+                self._format_failed_batches(
+                    failed_batches,
+                    len(batches),
+                    f"{summary['saved_batches']} successful batches were already saved",
+                )
+            )
 
-            # 记录本次执行实际生效的日期范围（供子类在 process_data 中做窗口过滤/增强模式使用）
-            self._effective_start_date = start_date
-            self._effective_end_date = end_date
+        return summary
 
-            # 确保日期范围有效
-            if not start_date or not end_date:
-                self.logger.info(f"'{self.name}' - No date range determined. Task finished.")
+    async def _generate_batches(self, **kwargs) -> Optional[List[Any]]:
+        """
+        根据更新类型确定日期范围并生成批次列表。
+
+        Returns:
+            批次列表；无需执行时返回 None 或空列表
+        """
+        # 首先处理全量更新，因为它最简单
+        if self.update_type == UpdateTypes.FULL:
+            start_date, end_date = self.default_start_date, datetime.now().strftime("%Y%m%d")
+
+        # 手动模式：直接使用传入的日期，这是最优先的
+        elif self.update_type == UpdateTypes.MANUAL:
+            if not self.start_date or not self.end_date:
+                self.logger.error("手动模式需要提供 start_date 和 end_date。")
                 return None
+            start_date, end_date = self.start_date, self.end_date
 
-            # 将实例属性中的日期更新到 kwargs，以确保传递给 get_batch_list 的是一致的
-            if self.start_date:
-                kwargs['start_date'] = self.start_date
-            if self.end_date:
-                kwargs['end_date'] = self.end_date
+        # 智能增量模式：动态确定日期范围
+        elif self.update_type == UpdateTypes.SMART:
+            date_range = await self._determine_date_range()
+            if not date_range:
+                self.logger.warning(
+                    f"任务 {self.name}: 无法确定智能增量更新的日期范围，将跳过执行。"
+                )
+                return None
+            start_date, end_date = date_range["start_date"], date_range["end_date"]
 
-            # 确保 update_type 被传递给 get_batch_list
-            kwargs['update_type'] = self.update_type
+        else:
+            self.logger.error(f"未知的更新类型: {self.update_type}")
+            return None
 
-            # 将计算出的日期范围和 kwargs 合并，传递给 get_batch_list
-            batch_gen_params = {**kwargs, **{"start_date": start_date, "end_date": end_date}}
-            from ..tools.calendar import reset_calendar_db_manager, set_calendar_db_manager
+        # 记录本次执行实际生效的日期范围（供子类在 process_data 中做窗口过滤/增强模式使用）
+        self._effective_start_date = start_date
+        self._effective_end_date = end_date
 
-            calendar_token = set_calendar_db_manager(self.db)
-            try:
-                batches = await self.get_batch_list(**batch_gen_params)
-            finally:
-                reset_calendar_db_manager(calendar_token)
-            
+        # 确保日期范围有效
+        if not start_date or not end_date:
+            self.logger.info(f"'{self.name}' - No date range determined. Task finished.")
+            return None
+
+        # 将实例属性中的日期更新到 kwargs，以确保传递给 get_batch_list 的是一致的
+        if self.start_date:
+            kwargs['start_date'] = self.start_date
+        if self.end_date:
+            kwargs['end_date'] = self.end_date
+
+        # 确保 update_type 被传递给 get_batch_list
+        kwargs['update_type'] = self.update_type
+
+        # 将计算出的日期范围和 kwargs 合并，传递给 get_batch_list
+        batch_gen_params = {**kwargs, **{"start_date": start_date, "end_date": end_date}}
+        from ..tools.calendar import reset_calendar_db_manager, set_calendar_db_manager
+
+        calendar_token = set_calendar_db_manager(self.db)
+        try:
+            batches = await self.get_batch_list(**batch_gen_params)
+        finally:
+            reset_calendar_db_manager(calendar_token)
+
+        if not batches:
+            self.logger.info(f"'{self.name}' - No batches to process. Task finished.")
+            return None
+        return batches
+
+    async def _fetch_data(self, stop_event: Optional[asyncio.Event] = None, **kwargs) -> Optional[pd.DataFrame]:
+        """
+        实现 BaseTask 的数据获取钩子。
+        这是数据获取任务的主入口点。
+        """
+        self.logger.info(f"'{self.name}' - Starting _fetch_data with update_type='{self.update_type}'...")
+
+        try:
+            batches = await self._generate_batches(**kwargs)
             if not batches:
-                self.logger.info(f"'{self.name}' - No batches to process. Task finished.")
                 return None
 
             raw_results = await self._execute_batches(batches, stop_event=stop_event)
@@ -331,6 +461,67 @@ class FetcherTask(BaseTask, ABC):
             # Re-raise the exception to be handled by the main execute loop
             raise
 
+    async def _execute_pipeline(self, stop_event: Optional[asyncio.Event] = None, **kwargs):
+        """启用流式管道时改走 _execute_streaming，否则沿用 BaseTask 的整体获取-保存流程。"""
+        if self._use_streaming_pipeline():
+            return await self._execute_streaming(stop_event=stop_event, **kwargs)
+        return await super()._execute_pipeline(stop_event=stop_event, **kwargs)
+
+    def _use_streaming_pipeline(self) -> bool:
+        """
+        启用 streaming_mode 且子类未重写 _fetch_data 时使用流式管道。
+
+        重写了 _fetch_data 的任务通常依赖全量数据（如跨批次合并），保持原有行为。
+        """
+        return self.streaming_mode and type(self)._fetch_data is FetcherTask._fetch_data
+
+    async def _execute_streaming(self, stop_event: Optional[asyncio.Event] = None, **kwargs):
+        """流式执行：批次获取与处理/验证/保存重叠进行。"""
+        self.logger.info(
+            f"'{self.name}' - Starting streaming pipeline with update_type='{self.update_type}', "
+            f"queue_size={self.stream_queue_size}, concurrent_limit={self.concurrent_limit}..."
+        )
+
+        batches = await self._generate_batches(**kwargs)
+        if not batches:
+            self.logger.info("没有获取到数据")
+            return {"status": "no_data", "rows": 0}
+
+        summary = await self._execute_batches_streaming(batches, stop_event=stop_event, **kwargs)
+
+        if stop_event and stop_event.is_set():
+            raise asyncio.CancelledError("任务在流式保存后被取消")
+
+        if summary["saved_batches"] == 0:
+            self.logger.info("没有获取到数据")
+            return {"status": "no_data", "rows": 0}
+
+        final_result = {
+            "status": "success",
+            "table": self.table_name,
+            "rows": summary["rows"],
+        }
+        if not summary["validation_passed"]:
+            final_result["status"] = "partial_success"
+            final_result["validation"] = False
+            final_result["validation_warning"] = "数据验证未完全通过，请检查日志"
+        else:
+            final_result["validation"] = True
+
+        final_result["validation_details"] = {
+            "status": "passed" if summary["validation_passed"] else "failed",
+            "failed_validations": summary["failed_validations"],
+            "original_rows": summary["original_rows"],
+            "result_rows": summary["result_rows"],
+            "validation_mode": getattr(self, "validation_mode", "report"),
+            "streamed_batches": summary["saved_batches"],
+        }
+
+        await self._post_execute(final_result, stop_event=stop_event)
+
+        self.logger.info(f"任务执行完成: {final_result}")
+        return final_result
+
     async def get_latest_date(self) -> Optional[date]:
         """获取当前任务对应表中的最新日期。"""
         if not self.table_name or not self.date_column:
@@ -338,16 +529,10 @@ class FetcherTask(BaseTask, ABC):
             return None
         
         try:
-            table_exists = await self.db.table_exists(self.get_full_table_name())
-            if not table_exists:
-                self.logger.info(f"'{self.name}' - Table '{self.get_full_table_name()}' does not exist. Cannot get latest date.")
-                return None
-                
-            query = f"SELECT MAX({self.date_column}) as latest_date FROM {self.get_full_table_name()}"
-            result = await self.db.fetch_one(query)
+            # 经 DBManager.get_latest_date 读取：优先使用水位目录，缺失时才扫描原表
+            latest_date = await self.db.get_latest_date(self, self.date_column)
 
-            if result and result["latest_date"]:
-                latest_date = result["latest_date"]
+            if latest_date:
                 if isinstance(latest_date, datetime):
                     return latest_date.date()
                 elif isinstance(latest_date, date):
@@ -7,15 +7,18 @@ Tinysoft pyTSL API 封装层
 特性：
 - pyTSL 依赖可用性检查
 - 统一登录与鉴权错误处理
-- 同步接口到异步封装（asyncio.to_thread）
-- 请求间隔控制
+- 多会话客户端池：N 个已登录的 pyTSL.Client，每个会话绑定专用线程
+- 会话健康检查，鉴权错误时按会话强制重登
+- 按会话的请求间隔控制 + 可选的全局请求速率上限
 """
 
 import asyncio
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from functools import partial
-from typing import Any, Iterable, List, Optional
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import pandas as pd
 
@@ -37,17 +40,45 @@ class TinySoftDependencyError(TinySoftAPIError):
     """缺少 pyTSL 依赖。"""
 
 
+class _TinySoftSession:
+    """
+    客户端池中的一个会话：独立的 pyTSL.Client 及其专用线程。
+
+    pyTSL.Client 不保证线程安全，同一会话的所有调用都在同一个线程中串行执行。
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client = None
+        self.last_request_time = 0.0
+        self.last_health_check: Optional[float] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tinysoft-session-{index}")
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
 class TinySoftAPI:
     """
     Tinysoft API 客户端
 
-    通过 pyTSL.Client 登录并调用 query。
+    维护 pool_size 个已登录的 pyTSL.Client 会话，并发请求各自占用一个空闲会话：
+    - 请求间隔（request_interval）按会话计算，会话之间互不等待
+    - max_requests_per_second 为所有会话合计的请求速率上限（None 表示不限制）
+    - 会话空闲超过 health_check_interval 秒后，下次使用前先检查登录状态
+    - 请求返回鉴权错误时，仅对该会话强制重登后重试一次
     """
 
     DEFAULT_HOST = "tsl.tinysoft.com.cn"
     DEFAULT_PORT = 443
     DEFAULT_TIMEOUT_MS = 30_000
     DEFAULT_REQUEST_INTERVAL = 0.2
+    DEFAULT_POOL_SIZE = 1
+    DEFAULT_HEALTH_CHECK_INTERVAL = 60.0
 
     def __init__(
         self,
@@ -60,6 +91,9 @@ class TinySoftAPI:
         service: str = "",
         timeout_ms: int = DEFAULT_TIMEOUT_MS,
         request_interval: float = DEFAULT_REQUEST_INTERVAL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_requests_per_second: Optional[float] = None,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
         logger: Optional[logging.Logger] = None,
     ):
         self.user = (user or "").strip()
@@ -70,9 +104,15 @@ class TinySoftAPI:
         self.service = service or ""
         self.timeout_ms = int(timeout_ms)
         self.request_interval = float(request_interval)
+        self.pool_size = max(1, int(pool_size or 1))
+        self.max_requests_per_second = (
+            float(max_requests_per_second) if max_requests_per_second else None
+        )
+        self.health_check_interval = float(health_check_interval)
         self.logger = logger or logging.getLogger(__name__)
 
-        self._client = None
+        self._sessions: List[_TinySoftSession] = []
+        self._idle_sessions: Optional[asyncio.Queue] = None
         self._client_lock = asyncio.Lock()
         self._request_lock = asyncio.Lock()
         self._last_request_time = 0.0
@@ -84,22 +124,68 @@ class TinySoftAPI:
                 "pyTSL 未安装，无法使用 Tinysoft 数据源。"
             )
 
-    async def _wait_for_request_slot(self) -> None:
-        async with self._request_lock:
-            now = time.monotonic()
-            elapsed = now - self._last_request_time
-            if elapsed < self.request_interval:
-                await asyncio.sleep(self.request_interval - elapsed)
-            self._last_request_time = time.monotonic()
-
-    async def _get_client(self):
-        if self._client is not None:
-            return self._client
+    async def _wait_for_request_slot(self, session: _TinySoftSession) -> None:
+        # 全局速率上限：所有会话的请求按最小间隔依次放行
+        if self.max_requests_per_second:
+            async with self._request_lock:
+                min_gap = 1.0 / self.max_requests_per_second
+                elapsed = time.monotonic() - self._last_request_time
+                if elapsed < min_gap:
+                    await asyncio.sleep(min_gap - elapsed)
+                self._last_request_time = time.monotonic()
+
+        # 会话内请求间隔（会话同一时间只被一个请求占用，无需加锁）
+        elapsed = time.monotonic() - session.last_request_time
+        if elapsed < self.request_interval:
+            await asyncio.sleep(self.request_interval - elapsed)
+        session.last_request_time = time.monotonic()
+
+    async def _ensure_sessions(self) -> None:
+        if self._idle_sessions is not None:
+            return
 
         async with self._client_lock:
-            if self._client is None:
-                self._client = await asyncio.to_thread(self._build_client_sync)
-        return self._client
+            if self._idle_sessions is not None:
+                return
+            sessions = [_TinySoftSession(i) for i in range(self.pool_size)]
+            try:
+                for session in sessions:
+                    session.client = await session.run(self._build_client_sync)
+            except Exception:
+                for session in sessions:
+                    session.shutdown()
+                raise
+            idle: asyncio.Queue = asyncio.Queue()
+            for session in sessions:
+                idle.put_nowait(session)
+            self._sessions = sessions
+            self._idle_sessions = idle
+            if self.pool_size > 1:
+                self.logger.debug("Tinysoft 客户端池已创建: %s 个会话", self.pool_size)
+
+    @asynccontextmanager
+    async def _session(self):
+        """
+        占用一个已登录的空闲会话，使用完毕后归还。
+
+        会话绑定到获取它的队列：请求期间 logout() 拆除了客户端池时，会话不再归还。
+        """
+        while True:
+            await self._ensure_sessions()
+            idle: asyncio.Queue = self._idle_sessions  # type: ignore[assignment]
+            session = await idle.get()
+            if session is not None:
+                break
+            # 等待期间客户端池已被注销：把唤醒标记传给下一个等待者，自己改用新池
+            idle.put_nowait(None)
+        try:
+            last_check = session.last_health_check
+            if last_check is None or time.monotonic() - last_check >= self.health_check_interval:
+                await self._login_session(session)
+            yield session
+        finally:
+            if self._idle_sessions is idle:
+                idle.put_nowait(session)
 
     def _build_client_sync(self):
         self._ensure_dependency()
@@ -129,9 +215,9 @@ class TinySoftAPI:
         except Exception as e:
             raise TinySoftAPIError(f"初始化 pyTSL.Client 失败: {e}") from e
 
-    async def _safe_last_error(self, client) -> Any:
+    async def _safe_last_error(self, session: _TinySoftSession) -> Any:
         try:
-            return await asyncio.to_thread(client.last_error)
+            return await session.run(session.client.last_error)
         except Exception:
             return None
 
@@ -148,37 +234,95 @@ class TinySoftAPI:
         msg = (message or "").lower()
         return error_code in {-1, -13} or "login" in msg or "invalid user" in msg
 
-    async def login(self, force: bool = False) -> None:
-        client = await self._get_client()
+    @staticmethod
+    def _result_status(result) -> Tuple[int, str]:
+        try:
+            error_code = int(result.error())
+        except Exception:
+            error_code = -999
+        try:
+            message = str(result.message())
+        except Exception:
+            message = "unknown error"
+        return error_code, message
+
+    async def _login_session(self, session: _TinySoftSession, force: bool = False) -> None:
+        client = session.client
         try:
             if not force:
-                is_logined = int(await asyncio.to_thread(client.is_logined))
+                is_logined = int(await session.run(client.is_logined))
                 if is_logined == 1:
+                    session.last_health_check = time.monotonic()
                     return
 
-            result = int(await asyncio.to_thread(client.login))
+            result = int(await session.run(client.login))
             if result == 1:
-                self.logger.debug("Tinysoft 登录成功")
+                session.last_health_check = time.monotonic()
+                self.logger.debug("Tinysoft 会话 %s 登录成功", session.index)
                 return
 
-            last_error = await self._safe_last_error(client)
+            last_error = await self._safe_last_error(session)
             raise TinySoftAuthError(f"Tinysoft 登录失败: {last_error}")
         except TinySoftAuthError:
             raise
         except Exception as e:
             raise TinySoftAuthError(f"Tinysoft 登录异常: {e}") from e
 
+    async def login(self, force: bool = False) -> None:
+        """登录客户端池中的全部会话（force=True 时强制重登）。"""
+        await self._ensure_sessions()
+        # 会话的调用都在其专用线程中串行执行，这里无需占用会话
+        for session in self._sessions:
+            await self._login_session(session, force=force)
+
     async def logout(self) -> None:
-        if self._client is None:
-            return
-        client = self._client
-        try:
-            is_logined = int(await asyncio.to_thread(client.is_logined))
-            if is_logined == 1:
-                await asyncio.to_thread(client.logout)
-        except Exception:
-            # 注销失败不影响主流程
-            pass
+        sessions, idle = self._sessions, self._idle_sessions
+        self._sessions, self._idle_sessions = [], None
+        if idle is not None:
+            # 唤醒仍在等待空闲会话的请求（见 _session）
+            idle.put_nowait(None)
+        for session in sessions:
+            try:
+                is_logined = int(await session.run(session.client.is_logined))
+                if is_logined == 1:
+                    await session.run(session.client.logout)
+            except Exception:
+                # 注销失败不影响主流程
+                pass
+            finally:
+                session.shutdown()
+
+    async def _call_with_relogin(
+        self,
+        session: _TinySoftSession,
+        method: str,
+        *args,
+        stop_event: Optional[asyncio.Event] = None,
+        **kwargs,
+    ):
+        """在会话线程中调用 pyTSL 方法；鉴权错误时强制重登该会话后重试一次。"""
+        for attempt in range(1, 3):
+            if stop_event and stop_event.is_set():
+                raise asyncio.CancelledError(f"Tinysoft {method} 被取消")
+
+            await self._wait_for_request_slot(session)
+            result = await session.run(getattr(session.client, method), *args, **kwargs)
+            if result is None or attempt == 2:
+                return result
+
+            error_code, message = self._result_status(result)
+            if error_code == 0 or not self._is_login_error(error_code, message):
+                return result
+
+            self.logger.warning(
+                "Tinysoft %s 鉴权失败，会话 %s 强制重登后重试: code=%s, message=%s",
+                method,
+                session.index,
+                error_code,
+                message,
+            )
+            await self._login_session(session, force=True)
+        return None
 
     async def query(
         self,
@@ -203,9 +347,6 @@ class TinySoftAPI:
         if stop_event and stop_event.is_set():
             raise asyncio.CancelledError("Tinysoft query 被取消")
 
-        client = await self._get_client()
-        await self.login()
-
         timeout = int(timeout_ms or self.timeout_ms)
         use_service = self.service if service is None else service
         normalized_fields = self._normalize_fields(fields)
@@ -226,52 +367,27 @@ class TinySoftAPI:
         if cyclefilter is not None:
             kwargs["cyclefilter"] = cyclefilter
 
-        # 鉴权错误触发强制重登后重试一次
-        for attempt in range(1, 3):
-            if stop_event and stop_event.is_set():
-                raise asyncio.CancelledError("Tinysoft query 被取消")
-
-            await self._wait_for_request_slot()
-
-            query_call = partial(client.query, **kwargs)
-            result = await asyncio.to_thread(query_call)
+        async with self._session() as session:
+            result = await self._call_with_relogin(session, "query", stop_event=stop_event, **kwargs)
 
             if result is None:
                 return pd.DataFrame(columns=normalized_fields or [])
 
-            try:
-                error_code = int(result.error())
-            except Exception:
-                error_code = -999
-            try:
-                message = str(result.message())
-            except Exception:
-                message = "unknown error"
-
-            if error_code == 0:
-                try:
-                    df = result.dataframe()
-                    if isinstance(df, pd.DataFrame):
-                        return df
-                except Exception as e:
-                    raise TinySoftAPIError(f"转换 Tinysoft 结果为 DataFrame 失败: {e}") from e
-
-                return pd.DataFrame(columns=normalized_fields or [])
-
-            if attempt == 1 and self._is_login_error(error_code, message):
-                self.logger.warning(
-                    "Tinysoft query 鉴权失败，尝试强制重登后重试: code=%s, message=%s",
-                    error_code,
-                    message,
+            error_code, message = self._result_status(result)
+            if error_code != 0:
+                raise TinySoftAPIError(
+                    f"Tinysoft query 失败: code={error_code}, message={message}, stock={stock}, cycle={cycle}"
                 )
-                await self.login(force=True)
-                continue
 
-            raise TinySoftAPIError(
-                f"Tinysoft query 失败: code={error_code}, message={message}, stock={stock}, cycle={cycle}"
-            )
+            try:
+                # 结果转换也在会话线程中完成，避免阻塞事件循环
+                df = await session.run(result.dataframe)
+            except Exception as e:
+                raise TinySoftAPIError(f"转换 Tinysoft 结果为 DataFrame 失败: {e}") from e
 
-        raise TinySoftAPIError("Tinysoft query 未返回有效结果")
+        if isinstance(df, pd.DataFrame):
+            return df
+        return pd.DataFrame(columns=normalized_fields or [])
 
     # ------------------------------------------------------------------
     # exec / call / call_dataframe — 通用 TSL 接口
@@ -282,14 +398,7 @@ class TinySoftAPI:
         if result is None:
             return pd.DataFrame() if as_dataframe else None
 
-        try:
-            error_code = int(result.error())
-        except Exception:
-            error_code = -999
-        try:
-            message = str(result.message())
-        except Exception:
-            message = "unknown error"
+        error_code, message = self._result_status(result)
 
         if error_code != 0:
             raise TinySoftAPIError(
@@ -326,11 +435,8 @@ class TinySoftAPI:
         if stop_event and stop_event.is_set():
             raise asyncio.CancelledError("Tinysoft exec 被取消")
 
-        client = await self._get_client()
-        await self.login()
-        await self._wait_for_request_slot()
-
-        result = await asyncio.to_thread(client.exec, tsl_code)
+        async with self._session() as session:
+            result = await self._call_with_relogin(session, "exec", tsl_code, stop_event=stop_event)
         return await self._parse_result(result, as_dataframe=as_dataframe)
 
     async def call(
@@ -354,14 +460,13 @@ class TinySoftAPI:
         if stop_event and stop_event.is_set():
             raise asyncio.CancelledError("Tinysoft call 被取消")
 
-        client = await self._get_client()
-        await self.login()
-        await self._wait_for_request_slot()
-
         call_kwargs = {}
         if code:
             call_kwargs["code"] = code
-        result = await asyncio.to_thread(client.call, func_name, *args, **call_kwargs)
+        async with self._session() as session:
+            result = await self._call_with_relogin(
+                session, "call", func_name, *args, stop_event=stop_event, **call_kwargs
+            )
         return await self._parse_result(result, as_dataframe=as_dataframe)
 
     async def call_dataframe(
@@ -74,6 +74,18 @@ class TinySoftTask(FetcherTask, abc.ABC):
                 self.tinysoft_config.get("request_interval"),
                 self.request_interval,
             ),
+            pool_size=self._coerce_int(
+                self.tinysoft_config.get("pool_size"),
+                TinySoftAPI.DEFAULT_POOL_SIZE,
+            ),
+            max_requests_per_second=self._coerce_float(
+                self.tinysoft_config.get("max_requests_per_second"),
+                0.0,
+            ),
+            health_check_interval=self._coerce_float(
+                self.tinysoft_config.get("health_check_interval"),
+                TinySoftAPI.DEFAULT_HEALTH_CHECK_INTERVAL,
+            ),
             logger=self.logger,
         )
 
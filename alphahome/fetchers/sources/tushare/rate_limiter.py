@@ -0,0 +1,306 @@
+"""
+Tushare 进程级速率限制器
+
+同一进程内所有 TushareAPI 实例共享一组按接口划分的令牌桶：
+- 请求发出前预约令牌并在锁外等待，平滑地把请求摊到整个时间窗口，而不是等服务端返回 40203 后再退避；
+- 令牌桶容量即突发额度，补充速率按 ``(每分钟上限 - 突发额度) / 60`` 计算，
+  保证任意 60 秒窗口内的请求数不超过每分钟上限；
+- 服务端返回 40203 时调用 ``penalize`` 冻结该接口的令牌桶，所有任务同时暂停；
+- ``get_stats`` 输出每个接口的实时利用率、等待次数与累计等待时长，便于调参。
+
+默认限额按 Tushare 积分档位推导，可通过 config.json 的 ``api.tushare_rate_limit`` 覆盖。
+"""
+
+import asyncio
+import bisect
+import collections
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# 积分档位 -> 默认每分钟请求上限（按档位下限匹配）
+POINTS_TIER_LIMITS: Dict[int, int] = {
+    0: 50,
+    2000: 200,
+    5000: 500,
+    10000: 1000,
+}
+
+# 接口级内置上限（与积分档位取较小值；配置中的接口覆盖始终优先）
+DEFAULT_ENDPOINT_LIMITS: Dict[str, int] = {
+    "daily": 800,
+    "stock_basic": 200,
+    "trade_cal": 100,
+    "index_weight": 500,
+    "eco_cal": 20,
+    "yc_cb": 20,
+}
+
+# 未配置积分档位时的默认每分钟上限（与历史行为一致）
+DEFAULT_LIMIT_PER_MINUTE = 100
+
+# 默认突发额度：相当于多少秒的配额
+DEFAULT_BURST_SECONDS = 5.0
+
+_WINDOW_SECONDS = 60.0
+
+
+def limit_for_points(points: int) -> int:
+    """根据积分返回默认每分钟请求上限"""
+    tiers = sorted(POINTS_TIER_LIMITS)
+    idx = bisect.bisect_right(tiers, int(points)) - 1
+    return POINTS_TIER_LIMITS[tiers[max(idx, 0)]]
+
+
+class TokenBucket:
+    """单个接口的令牌桶（线程安全，允许预约为负的令牌数以实现排队）"""
+
+    def __init__(
+        self,
+        limit_per_minute: int,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._recent: collections.deque = collections.deque()
+        self._blocked_until = 0.0
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self.total_wait_seconds = 0.0
+        self.rejections = 0
+        self.reconfigure(limit_per_minute, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = self._clock()
+
+    def reconfigure(self, limit_per_minute: int, burst: Optional[int] = None):
+        """更新限额；已有令牌数按新容量截断"""
+        limit = max(1, int(limit_per_minute))
+        if burst is None:
+            burst = round(limit * DEFAULT_BURST_SECONDS / _WINDOW_SECONDS)
+        burst = min(max(1, int(burst)), limit)
+        with self._lock:
+            self.limit_per_minute = limit
+            self.burst = burst
+            # 窗口内：突发额度 + 补充量 <= 每分钟上限
+            self.refill_rate = max(limit - burst, 1) / _WINDOW_SECONDS
+            if hasattr(self, "_tokens"):
+                self._tokens = min(self._tokens, float(burst))
+
+    def _refill(self, now: float):
+        if now > self._last_refill:
+            self._tokens = min(
+                float(self.burst),
+                self._tokens + (now - self._last_refill) * self.refill_rate,
+            )
+            self._last_refill = now
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回调用方发出请求前需要等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._blocked_until)
+            self._refill(start)
+            self._tokens -= 1.0
+            wait = (start - now) + max(0.0, -self._tokens) / self.refill_rate
+
+            self.total_requests += 1
+            if wait > 0:
+                self.throttled_requests += 1
+                self.total_wait_seconds += wait
+            self._recent.append(now + wait)
+            return wait
+
+    def penalize(self, seconds: float):
+        """服务端拒绝（40203）：冻结令牌桶 ``seconds`` 秒并清空突发额度"""
+        with self._lock:
+            now = self._clock()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            # 冻结期间不补充令牌
+            self._last_refill = max(self._last_refill, self._blocked_until)
+            self.rejections += 1
+
+    def blocked_for(self) -> float:
+        """剩余冻结秒数"""
+        with self._lock:
+            return max(0.0, self._blocked_until - self._clock())
+
+    def stats(self) -> Dict[str, Any]:
+        """实时统计：最近 60 秒请求数、利用率、等待情况等"""
+        with self._lock:
+            now = self._clock()
+            self._refill(max(now, self._blocked_until))
+            while self._recent and self._recent[0] <= now - _WINDOW_SECONDS:
+                self._recent.popleft()
+            # 已预约但尚未到发送时刻的请求不计入最近窗口
+            sent_last_minute = sum(1 for t in self._recent if t <= now)
+            return {
+                "limit_per_minute": self.limit_per_minute,
+                "burst": self.burst,
+                "tokens_available": round(max(self._tokens, 0.0), 3),
+                "queued": len(self._recent) - sent_last_minute,
+                "requests_last_minute": sent_last_minute,
+                "utilisation": round(sent_last_minute / self.limit_per_minute, 4),
+                "total_requests": self.total_requests,
+                "throttled_requests": self.throttled_requests,
+                "total_wait_seconds": round(self.total_wait_seconds, 3),
+                "rejections": self.rejections,
+                "blocked_for": round(max(0.0, self._blocked_until - now), 3),
+            }
+
+
+class TushareRateLimiter:
+    """按接口管理令牌桶的进程级速率限制器"""
+
+    def __init__(
+        self,
+        points: Optional[int] = None,
+        default_per_minute: Optional[int] = None,
+        endpoints: Optional[Mapping[str, Any]] = None,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.configure(
+            points=points,
+            default_per_minute=default_per_minute,
+            endpoints=endpoints,
+            burst_seconds=burst_seconds,
+        )
+
+    def configure(
+        self,
+        points: Optional[int] = None,
+        default_per_minute: Optional[int] = None,
+        endpoints: Optional[Mapping[str, Any]] = None,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+    ):
+        """
+        设置限额规则，已创建的令牌桶会按新规则重新配置。
+
+        Args:
+            points: Tushare 积分，用于推导默认每分钟上限
+            default_per_minute: 显式指定默认每分钟上限（优先于积分档位）
+            endpoints: 接口级覆盖，值可以是每分钟上限（int），
+                或 ``{"per_minute": int, "burst": int}``
+            burst_seconds: 未指定 burst 时，突发额度相当于多少秒的配额
+        """
+        with self._lock:
+            self.points = int(points) if points else None
+            if default_per_minute:
+                self.default_per_minute = int(default_per_minute)
+            elif self.points is not None:
+                self.default_per_minute = limit_for_points(self.points)
+            else:
+                self.default_per_minute = DEFAULT_LIMIT_PER_MINUTE
+            self.burst_seconds = float(burst_seconds)
+            self._overrides: Dict[str, Dict[str, Any]] = {}
+            for api_name, value in (endpoints or {}).items():
+                if isinstance(value, Mapping):
+                    self._overrides[api_name] = dict(value)
+                else:
+                    self._overrides[api_name] = {"per_minute": value}
+            for api_name, bucket in self._buckets.items():
+                bucket.reconfigure(*self._resolve_limits(api_name))
+
+    def _resolve_limits(self, api_name: str):
+        """返回 (每分钟上限, 突发额度)"""
+        override = self._overrides.get(api_name, {})
+        limit = override.get("per_minute")
+        if not limit:
+            builtin = DEFAULT_ENDPOINT_LIMITS.get(api_name)
+            if builtin is None:
+                limit = self.default_per_minute
+            elif self.points is not None:
+                # 内置值仅作为接口自身上限，不能超过积分档位
+                limit = min(builtin, self.default_per_minute)
+            else:
+                limit = builtin
+        limit = max(1, int(limit))
+        burst = override.get("burst")
+        if burst is None:
+            burst = round(limit * self.burst_seconds / _WINDOW_SECONDS)
+        return limit, burst
+
+    def bucket(self, api_name: str) -> TokenBucket:
+        """获取或创建指定接口的令牌桶"""
+        bucket = self._buckets.get(api_name)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(api_name)
+                if bucket is None:
+                    limit, burst = self._resolve_limits(api_name)
+                    bucket = TokenBucket(limit, burst, clock=self._clock)
+                    self._buckets[api_name] = bucket
+                    logger.debug(
+                        f"为 API {api_name} 创建令牌桶，每分钟上限: {limit}，突发额度: {burst}"
+                    )
+        return bucket
+
+    async def acquire(self, api_name: str) -> float:
+        """等待直到可以向 ``api_name`` 发出一个请求，返回实际等待秒数"""
+        wait = self.bucket(api_name).reserve()
+        if wait > 0:
+            logger.debug(f"速率控制 ({api_name}): 预约令牌，等待 {wait:.2f} 秒")
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, api_name: str, seconds: float):
+        """服务端返回速率限制错误时冻结该接口，所有共享该限制器的任务一起暂停"""
+        self.bucket(api_name).penalize(seconds)
+        logger.warning(f"速率控制 ({api_name}): 收到服务端限流，暂停该接口 {seconds:.1f} 秒")
+
+    def blocked_for(self, api_name: str) -> float:
+        return self.bucket(api_name).blocked_for()
+
+    def get_stats(self, api_name: Optional[str] = None) -> Dict[str, Any]:
+        """返回单个接口或全部接口的实时统计"""
+        if api_name is not None:
+            return self.bucket(api_name).stats()
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {name: bucket.stats() for name, bucket in sorted(buckets.items())}
+
+
+_shared_limiter: Optional[TushareRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def _load_limiter_config() -> Dict[str, Any]:
+    try:
+        from alphahome.common.config_manager import get_tushare_rate_limit_config
+
+        return get_tushare_rate_limit_config()
+    except Exception as e:
+        logger.warning(f"读取 Tushare 速率限制配置失败，使用默认限额: {e}")
+        return {}
+
+
+def get_rate_limiter() -> TushareRateLimiter:
+    """获取进程级共享的速率限制器（首次调用时按配置文件初始化）"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                cfg = _load_limiter_config()
+                _shared_limiter = TushareRateLimiter(
+                    points=cfg.get("points"),
+                    default_per_minute=cfg.get("default_per_minute"),
+                    endpoints=cfg.get("endpoints"),
+                    burst_seconds=cfg.get("burst_seconds", DEFAULT_BURST_SECONDS),
+                )
+    return _shared_limiter
+
+
+def reset_rate_limiter(limiter: Optional[TushareRateLimiter] = None):
+    """替换（或清空以便下次重新加载配置）进程级速率限制器"""
+    global _shared_limiter
+    with _shared_lock:
+        _shared_limiter = limiter
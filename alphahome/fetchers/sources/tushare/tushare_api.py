@@ -1,5 +1,4 @@
 import asyncio
-import collections
 import logging
 import os
 import time
@@ -8,10 +7,11 @@ from typing import Any, Dict, List, Optional, Union
 
 import aiohttp
 import pandas as pd
-from aiolimiter import AsyncLimiter
 
 from alphahome.fetchers.exceptions import TushareAuthError
 
+from .rate_limiter import TushareRateLimiter, get_rate_limiter
+
 
 def _concat_dataframes(frames: List[pd.DataFrame]) -> pd.DataFrame:
     nonempty_frames = [df for df in frames if df is not None and not df.empty]
@@ -31,23 +31,15 @@ def _concat_dataframes(frames: List[pd.DataFrame]) -> pd.DataFrame:
     return pd.concat(cleaned_frames, ignore_index=True, sort=False).reindex(columns=columns)
 
 
+class _OffsetLimitSplitRequired(Exception):
+    """分页请求触发 50101 offset 上限错误，需要转入按时间拆分。"""
+
+
 class TushareAPI:
     """Tushare API 客户端，负责处理与 Tushare 的 HTTP 通信"""
 
-    # --- 新的速率和并发控制配置 ---
-    # 1. 每分钟最大请求数 (用于滑动窗口速率控制)
-    _api_max_requests_per_minute: Dict[str, int] = {
-        "daily": 800,  # 股票日线数据 (示例值，请根据Tushare文档调整)
-        "stock_basic": 200,  # 股票基本信息 (示例值)
-        "trade_cal": 100,  # 交易日历 (示例值)
-        "index_weight": 500,  # 指数成分和权重 (明确设为每分钟500次)
-        "eco_cal": 20,  # 财经日历 (每分钟最多20次)
-        "yc_cb": 20,  # 收益率曲线 (每分钟最多20次)
-        # ... 其他API ...
-    }
-    _default_max_requests_per_minute: int = 100  # 未指定API的默认每分钟请求数
-
-    # 2. 并发请求数上限 (用于 asyncio.Semaphore)
+    # --- 并发控制配置（速率控制由进程级共享的 TushareRateLimiter 负责） ---
+    # 并发请求数上限 (用于 asyncio.Semaphore)
     _api_concurrency_limits: Dict[str, int] = {
         "daily": 80,  # 示例并发
         "stock_basic": 20,  # 示例并发
@@ -59,22 +51,16 @@ class TushareAPI:
     }
     _default_concurrency_limit: int = 20  # 未指定API的默认并发数
 
-    _rate_limit_window_seconds: int = 60  # 速率控制的时间窗口 (60秒 = 1分钟)
-
     # --- 运行时实例存储 ---
     _api_semaphores: Dict[str, asyncio.Semaphore] = {}  # 并发信号量实例
-    _api_request_timestamps: Dict[str, collections.deque] = {}  # 滑动窗口时间戳记录
-    _api_rate_limit_locks: Dict[str, asyncio.Lock] = {}  # 新增：用于速率控制的锁
-
-    # 旧的配置 (将被上面的新配置取代或整合)
-    # _api_rate_limits = { ... } # 将被 _api_max_requests_per_minute 和 _api_concurrency_limits 取代
-    # _default_limit = 50        # 将被 _default_max_requests_per_minute 和 _default_concurrency_limit 取代
 
     def __init__(
         self,
         token: str,
         logger: Optional[logging.Logger] = None,
         rate_limit_delay: int = 65,
+        page_parallelism: int = 1,
+        rate_limiter: Optional[TushareRateLimiter] = None,
     ):
         """
         初始化 TushareAPI 客户端。
@@ -83,108 +69,28 @@ class TushareAPI:
             token (str): 你的 Tushare token。
             logger (Optional[logging.Logger]): 日志记录器实例。
             rate_limit_delay (int): 触发速率限制后的等待时间（秒）。
+            page_parallelism (int): 单次查询同时在途的分页请求数，1 表示逐页顺序分页。
+            rate_limiter (Optional[TushareRateLimiter]): 速率限制器，默认使用进程级共享实例。
         """
         self.token = token
         self.http_url = "http://api.tushare.pro"
         self.logger = logger or logging.getLogger(__name__)
         self._session = None  # aiohttp.ClientSession
-        self._rate_limiter = AsyncLimiter(
-            120, 60
-        )  # Tushare pro版限制，每分钟120次
-        self._api_rate_limits = {}  # 用于存储特定API的限制
+        self._rate_limiter = rate_limiter or get_rate_limiter()
         self.rate_limit_delay = rate_limit_delay
+        self.page_parallelism = max(1, int(page_parallelism))
 
-        # 为所有预定义的API初始化信号量和时间戳队列 (类级别共享，但在此确保实例创建)
-        # 合并已知API列表，避免重复
-        all_known_apis = set(self._api_max_requests_per_minute.keys()) | set(
-            self._api_concurrency_limits.keys()
-        )
-
-        for api_name in all_known_apis:
-            # 初始化信号量
-            if api_name not in TushareAPI._api_semaphores:
-                limit = self._api_concurrency_limits.get(
-                    api_name, self._default_concurrency_limit
-                )
-                TushareAPI._api_semaphores[api_name] = asyncio.Semaphore(limit)
-                if self.logger:
-                    self.logger.debug(
-                        f"为 API {api_name} 创建并发信号量，限制: {limit}"
-                    )
-
-            # 初始化速率限制锁
-            if api_name not in TushareAPI._api_rate_limit_locks:
-                TushareAPI._api_rate_limit_locks[api_name] = asyncio.Lock()
-                if self.logger:
-                    self.logger.debug(f"为 API {api_name} 创建速率控制锁")
-
-            # 初始化时间戳队列
-            if api_name not in TushareAPI._api_request_timestamps:
-                TushareAPI._api_request_timestamps[api_name] = collections.deque()
-                if self.logger:
-                    self.logger.debug(f"为 API {api_name} 创建速率控制时间戳队列")
-
-    # @classmethod (set_api_rate_limit, set_default_rate_limit) 需要更新以适应新配置结构
-    # 例如: set_api_max_requests(api_name, count_per_minute) 和 set_api_concurrency(api_name, count)
+        # 为所有预定义的API初始化信号量 (类级别共享，但在此确保实例创建)
+        for api_name in self._api_concurrency_limits:
+            self._get_semaphore_for_api(api_name)
 
     async def _wait_for_rate_limit_slot(self, api_name: str):
-        """使用滑动窗口日志算法等待速率限制的空位，并使用锁确保原子性。"""
-        lock = self._get_rate_limit_lock_for_api(api_name)
+        """在共享令牌桶中预约请求槽位，并在发出请求前完成等待。"""
+        await self._rate_limiter.acquire(api_name)
 
-        while True:
-            time_to_wait = 0
-            # 在循环的每次迭代开始时，进入一个受锁保护的临界区
-            async with lock:
-                # 动态创建时间戳队列（如果需要）
-                if api_name not in TushareAPI._api_request_timestamps:
-                    TushareAPI._api_request_timestamps[api_name] = collections.deque()
-                    if self.logger:
-                        self.logger.debug(
-                            f"动态为 API {api_name} 创建速率控制时间戳队列 (使用默认速率)"
-                        )
-
-                timestamps_deque = TushareAPI._api_request_timestamps[api_name]
-                limit_per_window = self._api_max_requests_per_minute.get(
-                    api_name, self._default_max_requests_per_minute
-                )
-
-                current_time = time.monotonic()
-
-                # 清理窗口外的旧时间戳
-                while (
-                    timestamps_deque
-                    and timestamps_deque[0]
-                    <= current_time - self._rate_limit_window_seconds
-                ):
-                    timestamps_deque.popleft()
-
-                # 检查是否还有空位
-                if len(timestamps_deque) < limit_per_window:
-                    timestamps_deque.append(current_time)
-                    self.logger.debug(
-                        f"速率控制 ({api_name}): 允许请求。窗口内 {self._rate_limit_window_seconds}s 请求数: {len(timestamps_deque)}/{limit_per_window}"
-                    )
-                    # 成功获取槽位，可以退出循环并执行请求
-                    break
-                else:
-                    # 没有空位，计算需要等待的时间
-                    # 这个计算在锁内完成是安全的
-                    time_to_wait = (
-                        (timestamps_deque[0] + self._rate_limit_window_seconds)
-                        - current_time
-                        + 0.01  # 添加一个微小的时间以确保我们等待到槽位释放之后
-                    )
-                    if time_to_wait <= 0:
-                        # 最小等待时间，避免潜在的CPU空转或时间计算不精确导致负数
-                        time_to_wait = 0.05
-
-            # **重要**: 在锁之外执行等待
-            # 这样，当一个协程在等待时，其他协程可以获取锁并检查队列
-            if time_to_wait > 0:
-                self.logger.debug(
-                    f"速率控制 ({api_name}): 超出限制 ({len(timestamps_deque) if api_name in TushareAPI._api_request_timestamps else 'N/A'}/{limit_per_window})。将在锁外等待 {time_to_wait:.2f} 秒..."
-                )
-                await asyncio.sleep(time_to_wait)
+    def get_rate_limit_stats(self, api_name: Optional[str] = None) -> Dict[str, Any]:
+        """返回共享速率限制器的实时统计（利用率、等待次数、被拒次数等）。"""
+        return self._rate_limiter.get_stats(api_name)
 
     def _get_semaphore_for_api(self, api_name: str) -> asyncio.Semaphore:
         """获取或创建指定API的并发信号量"""
@@ -195,84 +101,238 @@ class TushareAPI:
             TushareAPI._api_semaphores[api_name] = asyncio.Semaphore(limit)
             if self.logger:
                 self.logger.debug(
-                    f"动态为 API {api_name} 创建并发信号量，限制: {limit}"
+                    f"为 API {api_name} 创建并发信号量，限制: {limit}"
                 )
         return TushareAPI._api_semaphores[api_name]
 
-    def _get_rate_limit_lock_for_api(self, api_name: str) -> asyncio.Lock:
-        """获取或创建指定API的速率限制锁"""
-        if api_name not in TushareAPI._api_rate_limit_locks:
-            TushareAPI._api_rate_limit_locks[api_name] = asyncio.Lock()
-            if self.logger:
-                self.logger.debug(f"动态为 API {api_name} 创建速率控制锁")
-        return TushareAPI._api_rate_limit_locks[api_name]
-
     async def query(
         self,
         api_name: str,
         fields: Optional[Union[str, List[str]]] = None,
         max_retries: int = 3,
         stop_event: Optional[asyncio.Event] = None,
+        page_parallelism: Optional[int] = None,
         **params,
     ) -> Optional[pd.DataFrame]:
         """
         执行查询，自动处理分页。这是外部调用的主要方法。
+
+        Args:
+            page_parallelism: 同时在途的分页请求数，None 时使用实例默认值；
+                大于 1 时启用推测式并行分页。
         """
         return await self._fetch_with_pagination(
             api_name=api_name,
             fields=fields,
             max_retries=max_retries,
             stop_event=stop_event,
+            page_parallelism=page_parallelism,
             **params,
         )
 
+    @staticmethod
+    def _fields_to_str(value: Optional[Union[str, List[str]]]) -> str:
+        if not value:
+            return ""
+        if isinstance(value, list):
+            return ",".join(value)
+        return value
+
+    @staticmethod
+    def _retry_delay_seconds(attempt: int) -> float:
+        # 指数退避：1s, 2s, 4s... 上限 30s（不加抖动，便于可预测与测试）
+        return min(2 ** (attempt - 1), 30)
+
+    @staticmethod
+    async def _sleep_with_stop(seconds: float, stop_event: Optional[asyncio.Event] = None):
+        end_time = time.monotonic() + seconds
+        while True:
+            if stop_event and stop_event.is_set():
+                raise asyncio.CancelledError
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(1.0, remaining))
+
+    async def _request_page(
+        self,
+        session: aiohttp.ClientSession,
+        api_name: str,
+        payload: Dict[str, Any],
+        max_retries: int,
+        params: Dict[str, Any],
+        stop_event: Optional[asyncio.Event] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        请求单个分页（含速率控制、并发控制和页内重试）。
+
+        Returns:
+            code == 0 的响应 JSON
+
+        Raises:
+            _OffsetLimitSplitRequired: 触发可按时间拆分的 50101 offset 上限错误
+            ValueError: 其他 API 错误
+        """
+        result: Optional[Dict[str, Any]] = None
+        last_error: Optional[BaseException] = None
+
+        for attempt in range(1, max_retries + 1):
+            if stop_event and stop_event.is_set():
+                raise asyncio.CancelledError
+
+            try:
+                # 允许 40203（速率限制）在内部等待并继续请求，不计入连接层重试策略
+                while True:
+                    await self._wait_for_rate_limit_slot(api_name)
+                    current_semaphore = self._get_semaphore_for_api(api_name)
+                    async with current_semaphore:
+                        if self.logger:
+                            self.logger.debug(
+                                f"并发控制 ({api_name}): 获取 Semaphore 许可 (当前并发上限: {current_semaphore._value if hasattr(current_semaphore, '_value') else 'N/A'})"
+                            )
+
+                        async with session.post(self.http_url, json=payload) as response:
+                            if response.status != 200:
+                                error_text = await response.text()
+                                self.logger.error(
+                                    f"Tushare API 请求失败 ({api_name}): 状态码: {response.status}, URL: {self.http_url}, Payload: {payload}, 响应: {error_text}"
+                                )
+                                if 500 <= response.status < 600 and attempt < max_retries:
+                                    delay = self._retry_delay_seconds(attempt)
+                                    self.logger.warning(
+                                        f"Tushare API 服务器错误 ({api_name})，将重试 {attempt}/{max_retries}，等待 {delay:.1f}s。状态码: {response.status}"
+                                    )
+                                    await self._sleep_with_stop(delay, stop_event)
+                                    continue
+                                raise ValueError(
+                                    f"Tushare API 请求失败({api_name})，状态码: {response.status}, 响应: {error_text}"
+                                )
+
+                            result = await response.json()
+
+                    if result.get("code") == 40203:
+                        error_msg = result.get("msg", "未知错误")
+                        self.logger.warning(
+                            f"Tushare API 返回速率限制错误 ({api_name}): {error_msg}。将暂停该接口 {self.rate_limit_delay} 秒后重试当前页面的请求。"
+                        )
+                        # 冻结共享令牌桶，使同一进程内其他任务也停止向该接口发请求
+                        self._rate_limiter.penalize(api_name, float(self.rate_limit_delay))
+                        await self._sleep_with_stop(
+                            self._rate_limiter.blocked_for(api_name), stop_event
+                        )
+                        result = None
+                        continue
+
+                    break
+
+                if result is None:
+                    raise RuntimeError(f"Tushare API ({api_name}) 未获得有效响应。参数: {params}")
+
+                if result.get("code") != 0:
+                    error_msg = result.get("msg", "未知错误")
+                    self.logger.error(
+                        f"Tushare API 返回错误 ({api_name}): Code: {result.get('code')}, Msg: {error_msg}, Payload: {payload}"
+                    )
+                    if result.get("code") == 50101 and self._is_offset_limit_50101(error_msg, params):
+                        raise _OffsetLimitSplitRequired(error_msg)
+                    raise ValueError(
+                        f"Tushare API 返回错误 ({api_name}): Code: {result.get('code')}, Msg: {error_msg}"
+                    )
+
+                break
+
+            except (
+                aiohttp.client_exceptions.ServerDisconnectedError,
+                aiohttp.ClientConnectionError,
+                aiohttp.ClientPayloadError,
+                aiohttp.ClientOSError,
+                asyncio.TimeoutError,
+            ) as e:
+                last_error = e
+                if attempt >= max_retries:
+                    raise
+                delay = self._retry_delay_seconds(attempt)
+                self.logger.warning(
+                    f"Tushare API 连接异常 ({api_name})，将重试 {attempt}/{max_retries}，等待 {delay:.1f}s。错误: {e}"
+                )
+                await self._sleep_with_stop(delay, stop_event)
+                continue
+
+        if result is None and last_error is not None:
+            raise last_error
+
+        return result
+
+    async def _split_on_offset_limit(
+        self,
+        error_msg: str,
+        api_name: str,
+        fields: Optional[Union[str, List[str]]],
+        max_retries: int,
+        stop_event: Optional[asyncio.Event],
+        page_parallelism: Optional[int],
+        **params,
+    ) -> Optional[pd.DataFrame]:
+        """50101 offset 上限错误：转入智能时间拆分。"""
+        self.logger.warning(
+            f"Tushare API 返回offset限制错误 ({api_name}): {error_msg}。将启动智能时间拆分处理。"
+        )
+        try:
+            return await self._handle_offset_limit_error(
+                api_name=api_name,
+                fields=fields,
+                max_retries=max_retries,
+                stop_event=stop_event,
+                page_parallelism=page_parallelism,
+                **params,
+            )
+        except Exception as split_error:
+            self.logger.error(
+                f"智能时间拆分处理失败 ({api_name}): {split_error}"
+            )
+            raise ValueError(
+                f"Tushare API 50101错误且智能拆分失败 ({api_name}): {split_error}"
+            )
+
+    def _build_page_payload(
+        self,
+        api_name: str,
+        fields_str: str,
+        params: Dict[str, Any],
+        offset: int,
+        effective_page_size: int,
+    ) -> Dict[str, Any]:
+        page_params = params.copy()
+        if "limit" not in page_params:
+            page_params["limit"] = effective_page_size
+        if "offset" not in page_params:
+            page_params["offset"] = offset
+        return {
+            "api_name": api_name,
+            "token": self.token,
+            "params": page_params,
+            "fields": fields_str,
+        }
+
     async def _fetch_with_pagination(
         self,
         api_name: str,
         fields: Optional[Union[str, List[str]]],
         max_retries: int,
         stop_event: Optional[asyncio.Event] = None,
+        page_parallelism: Optional[int] = None,
         **params,
     ) -> Optional[pd.DataFrame]:
         """
         执行查询并自动处理分页（增强版）：
         - 复用单个 aiohttp session 覆盖整个分页过程
         - 针对 `ServerDisconnectedError`/连接异常/超时等做页内重试
+        - page_parallelism > 1 时推测式并行请求后续 offset 页（见 _fetch_pages_parallel）
         """
-
-        def _fields_to_str(value: Optional[Union[str, List[str]]]) -> str:
-            if not value:
-                return ""
-            if isinstance(value, list):
-                return ",".join(value)
-            return value
-
-        def _retry_delay_seconds(attempt: int) -> float:
-            # 指数退避：1s, 2s, 4s... 上限 30s（不加抖动，便于可预测与测试）
-            return min(2 ** (attempt - 1), 30)
-
-        async def _sleep_with_stop(seconds: float):
-            end_time = time.monotonic() + seconds
-            while True:
-                if stop_event and stop_event.is_set():
-                    raise asyncio.CancelledError
-                remaining = end_time - time.monotonic()
-                if remaining <= 0:
-                    return
-                await asyncio.sleep(min(1.0, remaining))
-
-        all_data: List[pd.DataFrame] = []
-        offset = 0
-
+        parallelism = page_parallelism if page_parallelism is not None else self.page_parallelism
         limit = params.get("limit")
         effective_page_size = limit if limit is not None and limit > 0 else 5000
-
-        has_more = True
-        consecutive_empty_pages = 0
-        max_consecutive_empty_before_stop = 3
-        request_count = 0
-
-        fields_str = _fields_to_str(fields)
+        fields_str = self._fields_to_str(fields)
 
         timeout = aiohttp.ClientTimeout(
             total=120,
@@ -281,172 +341,185 @@ class TushareAPI:
         )
 
         async with aiohttp.ClientSession(timeout=timeout) as session:
-            while has_more:
-                request_count += 1
-                self.logger.debug(
-                    f"TushareAPI.query ({api_name}): 开始第 {request_count} 次分页请求. Offset: {offset}, EffectivePageSize: {effective_page_size}, Params: {params}"
+            try:
+                # 调用方显式指定 offset 时每页 offset 固定，无法推测后续页
+                if parallelism > 1 and "offset" not in params:
+                    all_data = await self._fetch_pages_parallel(
+                        session,
+                        api_name,
+                        fields_str,
+                        max_retries,
+                        stop_event,
+                        parallelism,
+                        effective_page_size,
+                        params,
+                    )
+                else:
+                    all_data = await self._fetch_pages_sequential(
+                        session,
+                        api_name,
+                        fields_str,
+                        max_retries,
+                        stop_event,
+                        effective_page_size,
+                        params,
+                    )
+            except _OffsetLimitSplitRequired as e:
+                split_result = await self._split_on_offset_limit(
+                    str(e),
+                    api_name=api_name,
+                    fields=fields,
+                    max_retries=max_retries,
+                    stop_event=stop_event,
+                    page_parallelism=page_parallelism,
+                    **params,
                 )
+                return split_result
 
-                page_params = params.copy()
-                if "limit" not in page_params:
-                    page_params["limit"] = effective_page_size
-                if "offset" not in page_params:
-                    page_params["offset"] = offset
-
-                payload = {
-                    "api_name": api_name,
-                    "token": self.token,
-                    "params": page_params,
-                    "fields": fields_str,
-                }
+        if not all_data:
+            return pd.DataFrame()
 
-                result: Optional[Dict[str, Any]] = None
-                last_error: Optional[BaseException] = None
+        combined_data = _concat_dataframes(all_data)
+        if combined_data.empty:
+            return pd.DataFrame()
+        self.logger.debug(
+            f"API {api_name} (参数: {params}) 通过分页共获取 {len(combined_data)} 条记录。"
+        )
+        return combined_data
 
-                for attempt in range(1, max_retries + 1):
-                    if stop_event and stop_event.is_set():
-                        raise asyncio.CancelledError
+    async def _fetch_pages_sequential(
+        self,
+        session: aiohttp.ClientSession,
+        api_name: str,
+        fields_str: str,
+        max_retries: int,
+        stop_event: Optional[asyncio.Event],
+        effective_page_size: int,
+        params: Dict[str, Any],
+    ) -> List[pd.DataFrame]:
+        """逐页顺序分页：上一页返回后再请求下一页。"""
+        all_data: List[pd.DataFrame] = []
+        offset = 0
+        has_more = True
+        consecutive_empty_pages = 0
+        max_consecutive_empty_before_stop = 3
+        request_count = 0
 
-                    try:
-                        # 允许 40203（速率限制）在内部等待并继续请求，不计入连接层重试策略
-                        while True:
-                            await self._wait_for_rate_limit_slot(api_name)
-                            current_semaphore = self._get_semaphore_for_api(api_name)
-                            async with current_semaphore:
-                                if self.logger:
-                                    self.logger.debug(
-                                        f"并发控制 ({api_name}): 获取 Semaphore 许可 (当前并发上限: {current_semaphore._value if hasattr(current_semaphore, '_value') else 'N/A'})"
-                                    )
+        while has_more:
+            request_count += 1
+            self.logger.debug(
+                f"TushareAPI.query ({api_name}): 开始第 {request_count} 次分页请求. Offset: {offset}, EffectivePageSize: {effective_page_size}, Params: {params}"
+            )
 
-                                async with session.post(self.http_url, json=payload) as response:
-                                    if response.status != 200:
-                                        error_text = await response.text()
-                                        self.logger.error(
-                                            f"Tushare API 请求失败 ({api_name}): 状态码: {response.status}, URL: {self.http_url}, Payload: {payload}, 响应: {error_text}"
-                                        )
-                                        if 500 <= response.status < 600 and attempt < max_retries:
-                                            delay = _retry_delay_seconds(attempt)
-                                            self.logger.warning(
-                                                f"Tushare API 服务器错误 ({api_name})，将重试 {attempt}/{max_retries}，等待 {delay:.1f}s。状态码: {response.status}"
-                                            )
-                                            await _sleep_with_stop(delay)
-                                            continue
-                                        raise ValueError(
-                                            f"Tushare API 请求失败({api_name})，状态码: {response.status}, 响应: {error_text}"
-                                        )
+            payload = self._build_page_payload(
+                api_name, fields_str, params, offset, effective_page_size
+            )
+            result = await self._request_page(
+                session, api_name, payload, max_retries, params, stop_event
+            )
 
-                                    result = await response.json()
+            if result is None:
+                return []
 
-                            if result.get("code") == 40203:
-                                error_msg = result.get("msg", "未知错误")
-                                self.logger.warning(
-                                    f"Tushare API 返回速率限制错误 ({api_name}): {error_msg}。将等待 {self.rate_limit_delay} 秒后重试当前页面的请求。"
-                                )
-                                await _sleep_with_stop(float(self.rate_limit_delay))
-                                result = None
-                                continue
+            data = result.get("data", {})
+            if not data:
+                break
 
-                            break
+            columns = data.get("fields", [])
+            items = data.get("items", [])
 
-                        if result is None:
-                            raise RuntimeError(f"Tushare API ({api_name}) 未获得有效响应。参数: {params}")
+            self.logger.debug(
+                f"TushareAPI.query ({api_name}): 第 {request_count} 次分页请求返回 {len(items)} 条记录."
+            )
 
-                        if result.get("code") != 0:
-                            error_msg = result.get("msg", "未知错误")
-                            self.logger.error(
-                                f"Tushare API 返回错误 ({api_name}): Code: {result.get('code')}, Msg: {error_msg}, Payload: {payload}"
-                            )
-                            if result.get("code") == 50101 and self._is_offset_limit_50101(error_msg, params):
-                                self.logger.warning(
-                                    f"Tushare API 返回offset限制错误 ({api_name}): {error_msg}。将启动智能时间拆分处理。"
-                                )
-                                try:
-                                    split_result = await self._handle_offset_limit_error(
-                                        api_name=api_name,
-                                        fields=fields,
-                                        max_retries=max_retries,
-                                        stop_event=stop_event,
-                                        **params,
-                                    )
-                                    return split_result
-                                except Exception as split_error:
-                                    self.logger.error(
-                                        f"智能时间拆分处理失败 ({api_name}): {split_error}"
-                                    )
-                                    raise ValueError(
-                                        f"Tushare API 50101错误且智能拆分失败 ({api_name}): {split_error}"
-                                    )
-                            raise ValueError(
-                                f"Tushare API 返回错误 ({api_name}): Code: {result.get('code')}, Msg: {error_msg}"
-                            )
+            if not items:
+                consecutive_empty_pages += 1
+                self.logger.debug(
+                    f"({api_name}) 本次分页获取 0 条记录. Offset: {offset}. 已连续空页: {consecutive_empty_pages}"
+                )
+                if not all_data and consecutive_empty_pages >= 1:
+                    has_more = False
+                elif consecutive_empty_pages >= max_consecutive_empty_before_stop:
+                    has_more = False
 
-                        break
-
-                    except (
-                        aiohttp.client_exceptions.ServerDisconnectedError,
-                        aiohttp.ClientConnectionError,
-                        aiohttp.ClientPayloadError,
-                        aiohttp.ClientOSError,
-                        asyncio.TimeoutError,
-                    ) as e:
-                        last_error = e
-                        if attempt >= max_retries:
-                            raise
-                        delay = _retry_delay_seconds(attempt)
-                        self.logger.warning(
-                            f"Tushare API 连接异常 ({api_name})，将重试 {attempt}/{max_retries}，等待 {delay:.1f}s。错误: {e}"
-                        )
-                        await _sleep_with_stop(delay)
-                        continue
+                if not has_more:
+                    break
+            else:
+                consecutive_empty_pages = 0
+                all_data.append(pd.DataFrame(items, columns=columns))
 
-                if result is None and last_error is not None:
-                    raise last_error
+            if len(items) < effective_page_size:
+                has_more = False
+            else:
+                offset += len(items)
 
-                if result is None:
-                    return pd.DataFrame()
+        return all_data
 
-                data = result.get("data", {})
-                if not data:
-                    break
+    async def _fetch_pages_parallel(
+        self,
+        session: aiohttp.ClientSession,
+        api_name: str,
+        fields_str: str,
+        max_retries: int,
+        stop_event: Optional[asyncio.Event],
+        parallelism: int,
+        effective_page_size: int,
+        params: Dict[str, Any],
+    ) -> List[pd.DataFrame]:
+        """
+        推测式并行分页：保持 parallelism 个 offset 页同时在途，按 offset 顺序消费结果。
+
+        - 每个页请求仍各自经过速率窗口和 API 并发信号量，不突破既有限制
+        - 遇到第一个短页（条目数 < 页大小）或空页即停止，取消其后仍在途的请求，
+          且忽略其后页的结果/错误（如超出 offset 上限的推测页返回的 50101）
+        - 按顺序消费到的页若触发 50101，则与顺序模式一样转入时间拆分
+        """
+        all_data: List[pd.DataFrame] = []
+        in_flight: Dict[int, asyncio.Task] = {}
+        next_offset = 0
+        expected_offset = 0
+
+        def _launch():
+            nonlocal next_offset
+            payload = self._build_page_payload(
+                api_name, fields_str, params, next_offset, effective_page_size
+            )
+            in_flight[next_offset] = asyncio.create_task(
+                self._request_page(session, api_name, payload, max_retries, params, stop_event)
+            )
+            next_offset += effective_page_size
 
-                columns = data.get("fields", [])
-                items = data.get("items", [])
+        try:
+            for _ in range(parallelism):
+                _launch()
 
+            while True:
+                task = in_flight.pop(expected_offset)
+                result = await task
+                if result is None:
+                    return []
+
+                data = result.get("data", {})
+                items = data.get("items", []) if data else []
                 self.logger.debug(
-                    f"TushareAPI.query ({api_name}): 第 {request_count} 次分页请求返回 {len(items)} 条记录."
+                    f"TushareAPI.query ({api_name}): 并行分页 offset={expected_offset} 返回 {len(items)} 条记录 (在途 {len(in_flight)})."
                 )
-
-                if not items:
-                    consecutive_empty_pages += 1
-                    self.logger.debug(
-                        f"({api_name}) 本次分页获取 0 条记录. Offset: {offset}. 已连续空页: {consecutive_empty_pages}"
-                    )
-                    if not all_data and consecutive_empty_pages >= 1:
-                        has_more = False
-                    elif consecutive_empty_pages >= max_consecutive_empty_before_stop:
-                        has_more = False
-
-                    if not has_more:
-                        break
-                else:
-                    consecutive_empty_pages = 0
-                    all_data.append(pd.DataFrame(items, columns=columns))
+                if items:
+                    all_data.append(pd.DataFrame(items, columns=data.get("fields", [])))
 
                 if len(items) < effective_page_size:
-                    has_more = False
-                else:
-                    offset += len(items)
+                    break
 
-        if not all_data:
-            return pd.DataFrame()
+                expected_offset += effective_page_size
+                _launch()
+        finally:
+            # 短页之后的推测请求全部作废
+            for pending in in_flight.values():
+                pending.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
 
-        combined_data = _concat_dataframes(all_data)
-        if combined_data.empty:
-            return pd.DataFrame()
-        self.logger.debug(
-            f"API {api_name} (参数: {params}) 通过分页共获取 {len(combined_data)} 条记录。"
-        )
-        return combined_data
+        return all_data
 
     async def _fetch_with_pagination_legacy(
         self,
@@ -675,6 +748,7 @@ class TushareAPI:
         fields: Optional[Union[str, List[str]]],
         max_retries: int,
         stop_event: Optional[asyncio.Event],
+        page_parallelism: Optional[int] = None,
         **params,
     ) -> Optional[pd.DataFrame]:
         """
@@ -688,6 +762,7 @@ class TushareAPI:
             fields: 查询字段列表
             max_retries: 最大重试次数
             stop_event: 停止事件
+            page_parallelism: 子批次分页并行度（None 时使用实例默认值）
             **params: 查询参数，必须包含start_date和end_date
 
         Returns:
@@ -760,6 +835,7 @@ class TushareAPI:
                     fields=fields,
                     max_retries=max_retries,
                     stop_event=stop_event,
+                    page_parallelism=page_parallelism,
                     **sub_params
                 )
 
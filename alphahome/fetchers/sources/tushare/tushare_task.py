@@ -40,6 +40,7 @@ class TushareTask(FetcherTask, abc.ABC):
     # Tushare 特有配置
     default_page_size = 5000
     default_rate_limit_delay = 65
+    default_page_parallelism = 1  # 单次查询同时在途的分页请求数（>1 启用推测式并行分页）
 
     # 必须由具体任务定义的属性
     api_name: Optional[str] = None
@@ -94,6 +95,9 @@ class TushareTask(FetcherTask, abc.ABC):
         self.rate_limit_delay = int(
             task_config.get("rate_limit_delay", cls.default_rate_limit_delay)
         )
+        self.page_parallelism = max(
+            1, int(task_config.get("page_parallelism", cls.default_page_parallelism))
+        )
 
     async def prepare_params(self, batch_params: Dict) -> Dict:
         """
@@ -125,6 +129,7 @@ class TushareTask(FetcherTask, abc.ABC):
                 fields=self.fields,
                 limit=self.page_size,
                 stop_event=stop_event,
+                page_parallelism=self.page_parallelism,
                 **clean_params  # 将清理后的批处理参数解包传递
             )
 
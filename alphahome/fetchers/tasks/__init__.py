@@ -1,12 +1,33 @@
 # 任务包
-from .finance import *  # 导入所有财务任务类
-from .fund import *  # 导入所有基金任务类
-from .fastrategy import *  # 导入所有基金投顾策略任务类
-from .future import *  # 导入所有期货任务类
-from .hk import *  # 导入所有港股任务类
-from .index import *  # 导入所有指数任务类
-from .macro import *  # 导入所有宏观数据任务类
-from .option import *  # 导入所有期权任务类
-from .others import *  # 导入所有其他任务类
-from .stock import *  # 导入所有股票任务类
-from .cbond import *  # 导入所有可转债任务类
\ No newline at end of file
+#
+# 各子包按需（PEP 562）导入任务模块；导入本包不会加载任何任务模块。
+# 任务名称/类型等元信息由 UnifiedTaskFactory 从 task_manifest.json 读取，
+# 创建任务实例时才导入对应模块并完成 @task_register 注册。
+import importlib
+
+from ...common.lazy_import import lazy_exports
+
+_LAZY_PACKAGES = (
+    "finance",  # 财务任务
+    "fund",  # 基金任务
+    "fastrategy",  # 基金投顾策略任务
+    "future",  # 期货任务
+    "hk",  # 港股任务
+    "index",  # 指数任务
+    "macro",  # 宏观数据任务
+    "option",  # 期权任务
+    "others",  # 其他任务
+    "stock",  # 股票任务
+    "cbond",  # 可转债任务
+)
+
+# 子包 __init__ 仅含导出映射，导入开销可忽略
+_LAZY_EXPORTS = {
+    name: f".{package}"
+    for package in _LAZY_PACKAGES
+    for name in importlib.import_module(f".{package}", __name__).__all__
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
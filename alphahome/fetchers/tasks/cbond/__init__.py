@@ -1,12 +1,17 @@
 # cbond 包初始化文件
-from .tushare_cbond_basic import TushareCBondBasicTask
-from .tushare_cbond_daily import TushareCBondDailyTask
-from .tushare_cbond_factor_pro import TushareCbondFactorProTask
-from .tushare_cbond_issue import TushareCBondIssueTask
-from .tushare_cbond_call import TushareCBondCallTask
-from .tushare_cbond_rate import TushareCBondRateTask
-# from .tushare_cbond_price_chg import TushareCBondPriceChgTask
-from .tushare_cbond_share import TushareCBondShareTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareCBondBasicTask": ".tushare_cbond_basic",
+    "TushareCBondDailyTask": ".tushare_cbond_daily",
+    "TushareCbondFactorProTask": ".tushare_cbond_factor_pro",
+    "TushareCBondIssueTask": ".tushare_cbond_issue",
+    "TushareCBondCallTask": ".tushare_cbond_call",
+    "TushareCBondRateTask": ".tushare_cbond_rate",
+    # "TushareCBondPriceChgTask": ".tushare_cbond_price_chg",
+    "TushareCBondShareTask": ".tushare_cbond_share",
+}
 
 __all__ = [
     "TushareCBondBasicTask",
@@ -18,3 +23,5 @@ __all__ = [
     # "TushareCBondPriceChgTask",
     "TushareCBondShareTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,9 +1,16 @@
-from .excel_fastrategy_basic import ExcelFastategyBasicTask
-from .excel_fastrategy_fof_versus import ExcelFastategyFofVersusTask
-from .excel_fastrategy_portfolio import ExcelFastategyPortfolioTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "ExcelFastategyBasicTask": ".excel_fastrategy_basic",
+    "ExcelFastategyFofVersusTask": ".excel_fastrategy_fof_versus",
+    "ExcelFastategyPortfolioTask": ".excel_fastrategy_portfolio",
+}
 
 __all__ = [
     "ExcelFastategyBasicTask",
     "ExcelFastategyFofVersusTask",
     "ExcelFastategyPortfolioTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
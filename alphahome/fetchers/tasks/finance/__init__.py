@@ -14,14 +14,19 @@
 - 财报披露计划 (disclosure)
 """
 
-from .tushare_fina_balancesheet import TushareFinaBalancesheetTask
-from .tushare_fina_cashflow import TushareFinaCashflowTask
-from .tushare_fina_disclosure import TushareFinaDisclosureTask
-from .tushare_fina_express import TushareFinaExpressTask
-from .tushare_fina_forecast import TushareFinaForecastTask
-from .tushare_fina_income import TushareFinaIncomeTask
-from .tushare_fina_indicator import TushareFinaIndicatorTask
-from .tushare_fina_mainbz import TushareFinaMainbzTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareFinaBalancesheetTask": ".tushare_fina_balancesheet",
+    "TushareFinaCashflowTask": ".tushare_fina_cashflow",
+    "TushareFinaDisclosureTask": ".tushare_fina_disclosure",
+    "TushareFinaExpressTask": ".tushare_fina_express",
+    "TushareFinaForecastTask": ".tushare_fina_forecast",
+    "TushareFinaIncomeTask": ".tushare_fina_income",
+    "TushareFinaIndicatorTask": ".tushare_fina_indicator",
+    "TushareFinaMainbzTask": ".tushare_fina_mainbz",
+}
 
 __all__ = [
     "TushareFinaBalancesheetTask",
@@ -33,3 +38,5 @@ __all__ = [
     "TushareFinaDisclosureTask",
     "TushareFinaMainbzTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
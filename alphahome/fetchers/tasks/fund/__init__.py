@@ -1,18 +1,23 @@
-from .tushare_fund_adjfactor import TushareFundAdjFactorTask
-from .tushare_fund_basic import TushareFundBasicTask
-from .tushare_fund_daily import TushareFundDailyTask
-from .tushare_fund_etf_basic import TushareFundEtfBasicTask
-from .tushare_fund_etf_index import TushareFundEtfIndexTask
-from .tushare_fund_factor_pro import TushareFundFactorProTask
-from .tushare_fund_manager import TushareFundManagerTask
-from .tushare_fund_nav import TushareFundNavTask
-from .tushare_fund_portfolio import TushareFundPortfolioTask
-from .tushare_fund_share import TushareFundShareTask
-from .tushare_fund_dividend import TushareFundDividendTask
-from .akshare_fund_cf_em import AkShareFundCfEmTask
-from .akshare_fund_purchase_em import AkShareFundPurchaseEmTask
-from .excel_fund_analysis_outlook import ExcelFundAnalysisOutlookTask
-from .tinysoft_fund_minute import TinySoftFundMinuteTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareFundAdjFactorTask": ".tushare_fund_adjfactor",
+    "TushareFundBasicTask": ".tushare_fund_basic",
+    "TushareFundDailyTask": ".tushare_fund_daily",
+    "TushareFundEtfBasicTask": ".tushare_fund_etf_basic",
+    "TushareFundEtfIndexTask": ".tushare_fund_etf_index",
+    "TushareFundFactorProTask": ".tushare_fund_factor_pro",
+    "TushareFundManagerTask": ".tushare_fund_manager",
+    "TushareFundNavTask": ".tushare_fund_nav",
+    "TushareFundPortfolioTask": ".tushare_fund_portfolio",
+    "TushareFundShareTask": ".tushare_fund_share",
+    "TushareFundDividendTask": ".tushare_fund_dividend",
+    "AkShareFundCfEmTask": ".akshare_fund_cf_em",
+    "AkShareFundPurchaseEmTask": ".akshare_fund_purchase_em",
+    "ExcelFundAnalysisOutlookTask": ".excel_fund_analysis_outlook",
+    "TinySoftFundMinuteTask": ".tinysoft_fund_minute",
+}
 
 __all__ = [
     "TushareFundBasicTask",
@@ -31,3 +36,5 @@ __all__ = [
     "ExcelFundAnalysisOutlookTask",
     "TinySoftFundMinuteTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,7 +1,12 @@
-from .tushare_future_basic import TushareFutureBasicTask
-from .tushare_future_daily import TushareFutureDailyTask
-from .tushare_future_holding import TushareFutureHoldingTask
-from .tushare_future_mapping import TushareFutureMappingTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareFutureBasicTask": ".tushare_future_basic",
+    "TushareFutureDailyTask": ".tushare_future_daily",
+    "TushareFutureHoldingTask": ".tushare_future_holding",
+    "TushareFutureMappingTask": ".tushare_future_mapping",
+}
 
 __all__ = [
     "TushareFutureBasicTask",
@@ -9,3 +14,5 @@ __all__ = [
     "TushareFutureHoldingTask",
     "TushareFutureMappingTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,10 +1,16 @@
 # Initializes the hk tasks module
-from .tushare_hk_basic import TushareHKBasicTask
+from ....common.lazy_import import lazy_exports
 
-# from .tushare_hk_dailyadj import TushareHkDailyadjTask # 新增的任务
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareHKBasicTask": ".tushare_hk_basic",
+    # "TushareHkDailyadjTask": ".tushare_hk_dailyadj",  # 新增的任务
+}
 
 __all__ = [
     # "TushareHKAdjFactorTask", # 已删除
     "TushareHKBasicTask",
     # "TushareHkDailyadjTask"
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,15 +1,20 @@
-from .tushare_index_basic import TushareIndexBasicTask
-from .tushare_index_cidaily import TushareIndexCiDailyTask
-from .tushare_index_cimember import TushareIndexCiMemberTask
-from .tushare_index_factor import TushareIndexFactorProTask
-from .tushare_index_swdaily import TushareIndexSwDailyTask
-from .tushare_index_swmember import TushareIndexSwmemberTask
-from .tushare_index_weight import TushareIndexWeightTask
-from .tushare_index_dailybasic import TushareIndexDailyBasicTask
-from .tushare_index_global import TushareIndexGlobalTask
-from .akshare_index_csindex_all import AkShareIndexCsindexAllTask
-from .akshare_index_stock_cons_csindex import AkShareIndexStockConsCsindexTask
-from .akshare_index_stock_cons_weight_csindex import AkShareIndexStockConsWeightCsindexTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareIndexBasicTask": ".tushare_index_basic",
+    "TushareIndexCiDailyTask": ".tushare_index_cidaily",
+    "TushareIndexCiMemberTask": ".tushare_index_cimember",
+    "TushareIndexFactorProTask": ".tushare_index_factor",
+    "TushareIndexSwDailyTask": ".tushare_index_swdaily",
+    "TushareIndexSwmemberTask": ".tushare_index_swmember",
+    "TushareIndexWeightTask": ".tushare_index_weight",
+    "TushareIndexDailyBasicTask": ".tushare_index_dailybasic",
+    "TushareIndexGlobalTask": ".tushare_index_global",
+    "AkShareIndexCsindexAllTask": ".akshare_index_csindex_all",
+    "AkShareIndexStockConsCsindexTask": ".akshare_index_stock_cons_csindex",
+    "AkShareIndexStockConsWeightCsindexTask": ".akshare_index_stock_cons_weight_csindex",
+}
 
 __all__ = [
     "TushareIndexBasicTask",
@@ -25,3 +30,5 @@ __all__ = [
     # "AkShareIndexStockConsCsindexTask",
     # "AkShareIndexStockConsWeightCsindexTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,23 +1,26 @@
-from .tushare_macro_cpi import TushareMacroCpiTask
-# from .tushare_macro_hibor import TushareMacroHiborTask 
-from .tushare_macro_pmi import TushareMacroPmiTask
-from .tushare_macro_ppi import TushareMacroPpiTask
-from .tushare_macro_shibor import TushareMacroShiborTask
-from .tushare_macro_ecocal import TushareMacroEcocalTask
-from .tushare_macro_yieldcurve import TushareMacroYieldCurveTask
-from .tushare_macro_sf import TushareMacroSFTTask
-from .tushare_macro_cnm import TushareMacroCNMTask
-from .macro_release_calendar import MacroReleaseCalendarTask
+from ....common.lazy_import import lazy_exports
 
-# AkShare 数据源任务
-from .akshare_macro_bond_rate import AkShareMacroBondRateTask
-from .akshare_macro_china_rmb_fixing import AkShareMacroChinaRmbFixingTask
-from .akshare_macro_china_market_margin import (
-    AkShareMacroChinaMarketMarginSHTask,
-    AkShareMacroChinaMarketMarginSZTask,
-)
-from .akshare_macro_ths_rmb_loan import AkShareMacroThsRmbLoanTask
-from .akshare_macro_ths_rmb_deposit import AkShareMacroThsRmbDepositTask
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareMacroCpiTask": ".tushare_macro_cpi",
+    # "TushareMacroHiborTask": ".tushare_macro_hibor",
+    "TushareMacroPmiTask": ".tushare_macro_pmi",
+    "TushareMacroPpiTask": ".tushare_macro_ppi",
+    "TushareMacroShiborTask": ".tushare_macro_shibor",
+    "TushareMacroEcocalTask": ".tushare_macro_ecocal",
+    "TushareMacroYieldCurveTask": ".tushare_macro_yieldcurve",
+    "TushareMacroSFTTask": ".tushare_macro_sf",
+    "TushareMacroCNMTask": ".tushare_macro_cnm",
+    "MacroReleaseCalendarTask": ".macro_release_calendar",
+
+    # AkShare 数据源任务
+    "AkShareMacroBondRateTask": ".akshare_macro_bond_rate",
+    "AkShareMacroChinaRmbFixingTask": ".akshare_macro_china_rmb_fixing",
+    "AkShareMacroChinaMarketMarginSHTask": ".akshare_macro_china_market_margin",
+    "AkShareMacroChinaMarketMarginSZTask": ".akshare_macro_china_market_margin",
+    "AkShareMacroThsRmbLoanTask": ".akshare_macro_ths_rmb_loan",
+    "AkShareMacroThsRmbDepositTask": ".akshare_macro_ths_rmb_deposit",
+}
 
 __all__ = [
     # Tushare 宏观任务
@@ -39,3 +42,5 @@ __all__ = [
     "AkShareMacroThsRmbLoanTask",
     "AkShareMacroThsRmbDepositTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,4 +1,11 @@
-from .tushare_option_basic import TushareOptionBasicTask
-from .tushare_option_daily import TushareOptionDailyTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareOptionBasicTask": ".tushare_option_basic",
+    "TushareOptionDailyTask": ".tushare_option_daily",
+}
 
 __all__ = ["TushareOptionBasicTask", "TushareOptionDailyTask"]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -1,4 +1,11 @@
-from .tushare_others_hktradecal import TushareOthersHktradecalTask
-from .tushare_others_tradecal import TushareOthersTradecalTask
+from ....common.lazy_import import lazy_exports
+
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareOthersHktradecalTask": ".tushare_others_hktradecal",
+    "TushareOthersTradecalTask": ".tushare_others_tradecal",
+}
 
 __all__ = ["TushareOthersTradecalTask", "TushareOthersHktradecalTask"]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -13,6 +13,7 @@ from typing import Any, Dict, List, Optional
 import pandas as pd
 
 from ...sources.tushare.tushare_task import TushareTask
+from ...tools.calendar import invalidate_trade_calendar
 from ....common.task_system.task_decorator import task_register
 from ....common.constants import UpdateTypes
 
@@ -141,6 +142,11 @@ class TushareOthersTradecalTask(TushareTask):
         return None
 
 
+    async def _post_execute(self, result, stop_event=None, **kwargs):
+        await super()._post_execute(result, stop_event=stop_event, **kwargs)
+        # 日历表已更新：清除进程内的交易日历索引和缓存，之后的调用重新加载
+        invalidate_trade_calendar()
+
     def process_data(self, df: pd.DataFrame, **kwargs: Any) -> pd.DataFrame:
         """处理从API获取的原始数据框（重写基类扩展点）"""
         if not isinstance(df, pd.DataFrame) or df.empty:
@@ -1,49 +1,54 @@
 # 股票数据任务包
-from .tushare_stock_adjfactor import TushareStockAdjFactorTask
-from .tushare_stock_basic import TushareStockBasicTask
-from .tushare_stock_chips import TushareStockChipsTask
-from .tushare_stock_daily import TushareStockDailyTask
-from .tushare_stock_dailybasic import TushareStockDailyBasicTask
-from .tushare_stock_weekly import TushareStockWeeklyTask
-from .tushare_stock_monthly import TushareStockMonthlyTask
-from .tushare_stock_dividend import TushareStockDividendTask
-from .tushare_stock_factor import TushareStockFactorProTask
-from .tushare_stock_report_rc import TushareStockReportRcTask
-from .tushare_stock_holdernumber import TushareStockHolderNumberTask
-from .tushare_stock_moneyflow import TushareStockMoneyFlowTask
-from .tushare_stock_limitlist import TushareStockLimitListTask
-from .tushare_stock_margin import TushareStockMarginTask
-from .tushare_stock_margindetail import TushareStockMarginDetailTask
-from .tushare_stock_thsindex import TushareStockThsIndexTask
-from .tushare_stock_thsdaily import TushareStockThsDailyTask
-from .tushare_stock_thsmember import TushareStockThsMemberTask
-from .tushare_stock_dcindex import TushareStockDcIndexTask
-from .tushare_stock_dcdaily import TushareStockDcDailyTask
-from .tushare_stock_dcmember import TushareStockDcMemberTask
-from .tushare_stock_kpllist import TushareStockKplListTask
-from .tushare_stock_kplconcept import TushareStockKplConceptTask
-from .tushare_stock_kplmember import TushareStockKplMemberTask  
-from .tushare_stock_ahcomparison import TushareStockAHComparisonTask
-from .tushare_stock_st import TushareStockSTTask
-from .tushare_stock_limitprice import TushareStockLimitPriceTask
-from .tushare_stock_namechange import TushareStockNameChangeTask
-from .tushare_stock_sharefloat import TushareStockShareFloatTask
-from .tushare_stock_pledgestat import TushareStockPledgeStatTask
-from .tushare_stock_repurchase import TushareStockRepurchaseTask
-from .tushare_stock_holdertrade import TushareStockHolderTradeTask
-from .tushare_stock_toplist import TushareStockTopListTask
-from .tushare_stock_topinst import TushareStockTopInstTask
-from .tushare_stock_blocktrade import TushareStockBlockTradeTask
-from .tushare_stock_moneyflow_hsgt import TushareStockMoneyflowHsgtTask
-from .tushare_stock_hsgt_top10 import TushareStockHsgtTop10Task
-from .tushare_stock_hk_hold import TushareStockHkHoldTask
+from ....common.lazy_import import lazy_exports
 
-from .akshare_stock_limitup_reason import AkShareStockLimitupReasonTask
-from .akshare_stock_analyst_rank_em import AkShareStockAnalystRankEmTask
-from .tinysoft_stock_minute import TinySoftStockMinuteTask
-from .tinysoft_stock_suspend import TinySoftStockSuspendTask
-from .tinysoft_stock_industry_versioned import TinySoftStockIndustryVersionedTask
-from .tinysoft_stock_fina_pit_ext import TinySoftStockFinaPitExtTask
+# 导出名 -> 任务模块；首次访问时才导入（见 alphahome.common.lazy_import）
+_LAZY_EXPORTS = {
+    "TushareStockAdjFactorTask": ".tushare_stock_adjfactor",
+    "TushareStockBasicTask": ".tushare_stock_basic",
+    "TushareStockChipsTask": ".tushare_stock_chips",
+    "TushareStockDailyTask": ".tushare_stock_daily",
+    "TushareStockDailyBasicTask": ".tushare_stock_dailybasic",
+    "TushareStockWeeklyTask": ".tushare_stock_weekly",
+    "TushareStockMonthlyTask": ".tushare_stock_monthly",
+    "TushareStockDividendTask": ".tushare_stock_dividend",
+    "TushareStockFactorProTask": ".tushare_stock_factor",
+    "TushareStockReportRcTask": ".tushare_stock_report_rc",
+    "TushareStockHolderNumberTask": ".tushare_stock_holdernumber",
+    "TushareStockMoneyFlowTask": ".tushare_stock_moneyflow",
+    "TushareStockLimitListTask": ".tushare_stock_limitlist",
+    "TushareStockMarginTask": ".tushare_stock_margin",
+    "TushareStockMarginDetailTask": ".tushare_stock_margindetail",
+    "TushareStockThsIndexTask": ".tushare_stock_thsindex",
+    "TushareStockThsDailyTask": ".tushare_stock_thsdaily",
+    "TushareStockThsMemberTask": ".tushare_stock_thsmember",
+    "TushareStockDcIndexTask": ".tushare_stock_dcindex",
+    "TushareStockDcDailyTask": ".tushare_stock_dcdaily",
+    "TushareStockDcMemberTask": ".tushare_stock_dcmember",
+    "TushareStockKplListTask": ".tushare_stock_kpllist",
+    "TushareStockKplConceptTask": ".tushare_stock_kplconcept",
+    "TushareStockKplMemberTask": ".tushare_stock_kplmember",
+    "TushareStockAHComparisonTask": ".tushare_stock_ahcomparison",
+    "TushareStockSTTask": ".tushare_stock_st",
+    "TushareStockLimitPriceTask": ".tushare_stock_limitprice",
+    "TushareStockNameChangeTask": ".tushare_stock_namechange",
+    "TushareStockShareFloatTask": ".tushare_stock_sharefloat",
+    "TushareStockPledgeStatTask": ".tushare_stock_pledgestat",
+    "TushareStockRepurchaseTask": ".tushare_stock_repurchase",
+    "TushareStockHolderTradeTask": ".tushare_stock_holdertrade",
+    "TushareStockTopListTask": ".tushare_stock_toplist",
+    "TushareStockTopInstTask": ".tushare_stock_topinst",
+    "TushareStockBlockTradeTask": ".tushare_stock_blocktrade",
+    "TushareStockMoneyflowHsgtTask": ".tushare_stock_moneyflow_hsgt",
+    "TushareStockHsgtTop10Task": ".tushare_stock_hsgt_top10",
+    "TushareStockHkHoldTask": ".tushare_stock_hk_hold",
+
+    "AkShareStockLimitupReasonTask": ".akshare_stock_limitup_reason",
+    "AkShareStockAnalystRankEmTask": ".akshare_stock_analyst_rank_em",
+    "TinySoftStockMinuteTask": ".tinysoft_stock_minute",
+    "TinySoftStockSuspendTask": ".tinysoft_stock_suspend",
+    "TinySoftStockIndustryVersionedTask": ".tinysoft_stock_industry_versioned",
+    "TinySoftStockFinaPitExtTask": ".tinysoft_stock_fina_pit_ext",
+}
 
 __all__ = [
     "TushareStockBasicTask",
@@ -91,3 +96,5 @@ __all__ = [
     "TinySoftStockIndustryVersionedTask",
     "TinySoftStockFinaPitExtTask",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS)
@@ -12,6 +12,7 @@ Tinysoft 行业分类版本化任务（C2）
 from __future__ import annotations
 
 import asyncio
+import bisect
 import json
 import re
 from datetime import date
@@ -406,6 +407,19 @@ class TinySoftStockIndustryVersionedTask(TinySoftTask):
 
         return pd.concat(merged_frames, ignore_index=True)
 
+    @staticmethod
+    def _level_rank(record: Dict[str, Any], position: int) -> tuple:
+        """
+        同一层级多条有效记录时的取值顺序（取最大者）：入选日期、最新标识（空为 0）、属性代码（空值最大），
+        完全相同时取原始顺序靠后的记录。
+        """
+        flag = record.get("latest_flag")
+        if flag is None or (not isinstance(flag, str) and pd.isna(flag)):
+            flag = 0
+        code = record.get("industry_attr_code")
+        code_missing = code is None or (not isinstance(code, str) and pd.isna(code))
+        return (record["entry_date_dt"], flag, code_missing, "" if code_missing else code, position)
+
     def _build_snapshots(
         self,
         group_df: pd.DataFrame,
@@ -415,9 +429,15 @@ class TinySoftStockIndustryVersionedTask(TinySoftTask):
         include_empty: bool,
         source_table_id: int,
     ) -> List[Dict[str, Any]]:
+        """
+        按入选/剔除事件扫描重建行业快照。
+
+        快照日期为各入选日期（及 start_bound）；某日有效的记录为 入选日期 <= 该日 且 剔除日期为空或 >= 该日。
+        记录按入选日期依次加入各层级的有序列表，剔除日期早于当前快照日的记录在成为层级最大值时惰性移除
+        （快照日期递增，已失效的记录不会再次有效），每只股票只需排序和扫描一次。
+        """
         rows: List[Dict[str, Any]] = []
-        g = group_df.copy()
-        g = g.dropna(subset=["entry_date_dt"])
+        g = group_df.dropna(subset=["entry_date_dt"])
         if g.empty:
             return rows
 
@@ -425,6 +445,33 @@ class TinySoftStockIndustryVersionedTask(TinySoftTask):
         if start_bound:
             snapshot_dates.add(start_bound)
 
+        first = g.iloc[0]
+        base: Dict[str, Any] = {
+            "ts_code": first.get("ts_code"),
+            "tsl_code": first.get("tsl_code"),
+            "industry_source": first.get("source_attr_code") or "unknown",
+            "source_name": first.get("source_attr_name"),
+        }
+        field_map_json = json.dumps(
+            {
+                "table_id": source_table_id,
+                "date_field": "入选日期",
+                "remove_field": "剔除日期",
+                "level_fields": {
+                    "1": {"name": "industry_l1", "code": "level1_code"},
+                    "2": {"name": "industry_l2", "code": "level2_code"},
+                    "3": {"name": "industry_l3", "code": "level3_code"},
+                },
+            },
+            ensure_ascii=False,
+        )
+
+        records = g.to_dict("records")
+        entry_order = sorted(range(len(records)), key=lambda i: records[i]["entry_date_dt"])
+        next_entry = 0
+        # 层级 -> 按 _level_rank 升序排列的 (rank, 剔除日期, 记录)
+        active_by_level: Dict[Any, List[tuple]] = {}
+
         for snap_date in sorted(snapshot_dates):
             if start_bound and snap_date < start_bound:
                 continue
@@ -432,22 +479,34 @@ class TinySoftStockIndustryVersionedTask(TinySoftTask):
                 continue
 
             snap_ts = pd.Timestamp(snap_date)
-            active = g[
-                (g["entry_date_dt"] <= snap_ts)
-                & (
-                    g["remove_date_dt"].isna()
-                    | (g["remove_date_dt"] >= snap_ts)
+            while next_entry < len(entry_order) and records[entry_order[next_entry]]["entry_date_dt"] <= snap_ts:
+                position = entry_order[next_entry]
+                record = records[position]
+                remove_ts = record.get("remove_date_dt")
+                if remove_ts is not None and pd.isna(remove_ts):
+                    remove_ts = None
+                # rank 含原始位置，互不相同，比较不会落到后面的元素
+                bisect.insort(
+                    active_by_level.setdefault(record["level"], []),
+                    (self._level_rank(record, position), remove_ts, record),
                 )
-            ].copy()
-            if active.empty:
+                next_entry += 1
+
+            current: Dict[Any, Dict[str, Any]] = {}
+            for level, entries in active_by_level.items():
+                while entries and entries[-1][1] is not None and entries[-1][1] < snap_ts:
+                    entries.pop()
+                if entries:
+                    current[level] = entries[-1][2]
+            if not current:
                 continue
 
             out: Dict[str, Any] = {
-                "ts_code": g.iloc[0].get("ts_code"),
-                "tsl_code": g.iloc[0].get("tsl_code"),
+                "ts_code": base["ts_code"],
+                "tsl_code": base["tsl_code"],
                 "trade_date": snap_date,
-                "industry_source": g.iloc[0].get("source_attr_code") or "unknown",
-                "source_name": g.iloc[0].get("source_attr_name"),
+                "industry_source": base["industry_source"],
+                "source_name": base["source_name"],
                 "industry_l1": None,
                 "industry_l2": None,
                 "industry_l3": None,
@@ -457,38 +516,19 @@ class TinySoftStockIndustryVersionedTask(TinySoftTask):
                 "level3_code": None,
                 "source_table_id": source_table_id,
             }
-
             for level, name_key, code_key in [
                 (1, "industry_l1", "level1_code"),
                 (2, "industry_l2", "level2_code"),
                 (3, "industry_l3", "level3_code"),
             ]:
-                level_df = active[active["level"] == level].copy()
-                if level_df.empty:
+                last = current.get(level)
+                if last is None:
                     continue
-                level_df["latest_flag"] = level_df["latest_flag"].fillna(0)
-                level_df = level_df.sort_values(
-                    ["entry_date_dt", "latest_flag", "industry_attr_code"],
-                    ascending=[True, True, True],
-                )
-                last = level_df.iloc[-1]
                 out[name_key] = self._clean_text(last.get("industry_attr_name"))
                 out[code_key] = self._clean_text(last.get("industry_attr_code"))
 
             out["industry_code"] = out["level3_code"] or out["level2_code"] or out["level1_code"]
-            out["field_map_json"] = json.dumps(
-                {
-                    "table_id": source_table_id,
-                    "date_field": "入选日期",
-                    "remove_field": "剔除日期",
-                    "level_fields": {
-                        "1": {"name": "industry_l1", "code": "level1_code"},
-                        "2": {"name": "industry_l2", "code": "level2_code"},
-                        "3": {"name": "industry_l3", "code": "level3_code"},
-                    },
-                },
-                ensure_ascii=False,
-            )
+            out["field_map_json"] = field_map_json
 
             if not include_empty and not any([out["industry_l1"], out["industry_l2"], out["industry_l3"], out["industry_code"]]):
                 continue
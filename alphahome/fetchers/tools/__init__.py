@@ -9,4 +9,11 @@ __all__ = [
     "get_last_trade_day",
     "get_next_trade_day",
     "get_trade_days_between",
+    "shift_trade_day",
+    "count_trade_days",
+    "get_period_end_trade_days",
+    "get_trade_calendar_index",
+    "get_trade_calendar_index_sync",
+    "invalidate_trade_calendar",
+    "TradeCalendarIndex",
 ]
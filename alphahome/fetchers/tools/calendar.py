@@ -5,16 +5,23 @@ import inspect
 import json
 import logging
 import os
+import time
 from datetime import timedelta
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import asyncpg
 import pandas as pd
 
+from .calendar_index import TradeCalendarIndex
+
 logger = logging.getLogger(__name__)
 
 # 全局交易日历数据缓存
 _TRADE_CAL_CACHE: Dict[Tuple[str, str, str, str], pd.DataFrame] = {}
+# 进程级交易日历索引：(交易所代码, 数据库键) -> TradeCalendarIndex
+_TRADE_CAL_INDEXES: Dict[Tuple[str, str], TradeCalendarIndex] = {}
+# 索引复用超过该秒数后，下次使用前先比对日历表版本（行数 / 最大日期 / 最大 update_time）
+TRADE_CAL_INDEX_REFRESH_SECONDS = 300.0
 _DB_POOL: Optional[asyncpg.Pool] = None
 _CALENDAR_DB_MANAGER: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar(
     "alphahome_calendar_db_manager",
@@ -196,6 +203,195 @@ async def _get_db_pool() -> Optional[asyncpg.Pool]:
     return _DB_POOL
 
 
+def _to_db_exchange_code(exchange: str) -> str:
+    """交易所参数转换为日历表中的交易所代码（'HK' / 'HKEX' -> 'HKEX'）"""
+    upper_exchange = (exchange or "SSE").upper()
+    return "HKEX" if upper_exchange in ("HK", "HKEX") else upper_exchange
+
+
+def _db_cache_key(db_manager: Optional[Any]) -> str:
+    return f"db:{id(db_manager)}" if db_manager is not None else "legacy"
+
+
+async def _fetch_calendar_records(db_manager: Optional[Any], query: str, *args: Any) -> Optional[list]:
+    """通过注入的数据库管理器或模块级连接池执行查询；连接池不可用时返回 None。"""
+    if db_manager is not None:
+        return await db_manager.fetch(query, *args)
+    pool = await _get_db_pool()
+    if not pool:
+        logger.error("数据库连接池不可用，无法获取交易日历。")
+        return None
+    async with pool.acquire() as conn:
+        return await conn.fetch(query, *args)
+
+
+_CALENDAR_INDEX_SQL = '''
+SELECT cal_date, is_open, update_time
+FROM "tushare"."others_calendar"
+WHERE exchange = $1
+ORDER BY cal_date ASC;
+'''
+
+_CALENDAR_VERSION_SQL = '''
+SELECT COUNT(*) AS row_count, MAX(cal_date) AS max_date, MAX(update_time) AS max_update_time
+FROM "tushare"."others_calendar"
+WHERE exchange = $1;
+'''
+
+
+def _records_version(records: list) -> tuple:
+    """由已加载的日历记录计算版本，与 _CALENDAR_VERSION_SQL 的结果可直接比较"""
+    rows = [dict(r) for r in records]
+    cal_dates = [r["cal_date"] for r in rows if r.get("cal_date") is not None]
+    update_times = [r["update_time"] for r in rows if r.get("update_time") is not None]
+    return (
+        len(rows),
+        max(cal_dates) if cal_dates else None,
+        max(update_times) if update_times else None,
+    )
+
+
+def _index_version_unchanged(index: TradeCalendarIndex, rows: Optional[list]) -> bool:
+    """版本查询结果与已加载索引一致（或无法取得版本）时继续复用索引"""
+    if not rows:
+        return True
+    row = dict(rows[0])
+    return (row["row_count"], row["max_date"], row["max_update_time"]) == index.version
+
+
+def _store_calendar_index(
+    cache_key: Tuple[str, str], db_exchange_code: str, records: Optional[list]
+) -> Optional[TradeCalendarIndex]:
+    """由加载的日历记录构建索引并放入进程级缓存；空结果不缓存"""
+    if not records:
+        # 与 get_trade_cal 一致，不缓存空结果，日历任务写入后即可重新加载
+        logger.info(f"数据库未返回 {db_exchange_code} 交易日历数据。")
+        _TRADE_CAL_INDEXES.pop(cache_key, None)
+        return None
+
+    index = TradeCalendarIndex.from_records(
+        db_exchange_code, records, version=_records_version(records)
+    )
+    _TRADE_CAL_INDEXES[cache_key] = index
+    logger.debug(f"已加载 {index!r}")
+    return index
+
+
+async def get_trade_calendar_index(
+    exchange: str = "SSE",
+    db_manager: Optional[Any] = None,
+    refresh: bool = False,
+) -> Optional[TradeCalendarIndex]:
+    """获取交易所的进程级交易日历索引。
+
+    首次调用时一次性加载该交易所的全部日历；之后直接复用，超过
+    TRADE_CAL_INDEX_REFRESH_SECONDS 时先用一条聚合查询比对日历表版本，有变化才重新加载。
+    日历更新任务执行后会调用 invalidate_trade_calendar 立即失效。
+
+    Args:
+        exchange (str, optional): 交易所代码，默认为 'SSE'，'HK' / 'HKEX' 为港股日历。
+        refresh (bool, optional): 为 True 时强制重新加载。
+
+    Returns:
+        Optional[TradeCalendarIndex]: 日历索引；数据库中没有该交易所的日历时返回 None。
+    """
+    db_exchange_code = _to_db_exchange_code(exchange)
+    active_db_manager = (
+        db_manager if db_manager is not None else _CALENDAR_DB_MANAGER.get()
+    )
+    cache_key = (db_exchange_code, _db_cache_key(active_db_manager))
+    index = _TRADE_CAL_INDEXES.get(cache_key)
+
+    if index is not None and not refresh:
+        now = time.monotonic()
+        if now - index.checked_at < TRADE_CAL_INDEX_REFRESH_SECONDS:
+            return index
+        try:
+            rows = await _fetch_calendar_records(
+                active_db_manager, _CALENDAR_VERSION_SQL, db_exchange_code
+            )
+        except Exception as e:
+            logger.warning(f"检查 {db_exchange_code} 交易日历版本失败，继续使用已加载的索引: {e}")
+            rows = None
+        if _index_version_unchanged(index, rows):
+            index.checked_at = now
+            return index
+        logger.info(f"{db_exchange_code} 交易日历已变更，重新加载索引。")
+
+    try:
+        records = await _fetch_calendar_records(
+            active_db_manager, _CALENDAR_INDEX_SQL, db_exchange_code
+        )
+    except Exception as e:
+        logger.error(f"加载 {db_exchange_code} 交易日历索引失败: {e}")
+        return index
+
+    return _store_calendar_index(cache_key, db_exchange_code, records)
+
+
+def get_trade_calendar_index_sync(
+    db_manager: Any,
+    exchange: str = "SSE",
+    refresh: bool = False,
+) -> Optional[TradeCalendarIndex]:
+    """get_trade_calendar_index 的同步版本，供同步代码（如因子计算脚本）通过 DBManager.fetch_sync 使用。
+
+    与异步版本共用进程级索引缓存和版本检查规则。
+
+    Args:
+        db_manager: 提供 fetch_sync 的数据库管理器（sync 模式使用 psycopg2 占位符）。
+        exchange (str, optional): 交易所代码，默认为 'SSE'，'HK' / 'HKEX' 为港股日历。
+        refresh (bool, optional): 为 True 时强制重新加载。
+
+    Returns:
+        Optional[TradeCalendarIndex]: 日历索引；数据库中没有该交易所的日历时返回 None。
+    """
+    db_exchange_code = _to_db_exchange_code(exchange)
+    cache_key = (db_exchange_code, _db_cache_key(db_manager))
+    index = _TRADE_CAL_INDEXES.get(cache_key)
+
+    def fetch(query: str) -> list:
+        if getattr(db_manager, "mode", "sync") != "async":
+            query = query.replace("$1", "%s")
+        return db_manager.fetch_sync(query, (db_exchange_code,))
+
+    if index is not None and not refresh:
+        now = time.monotonic()
+        if now - index.checked_at < TRADE_CAL_INDEX_REFRESH_SECONDS:
+            return index
+        try:
+            rows = fetch(_CALENDAR_VERSION_SQL)
+        except Exception as e:
+            logger.warning(f"检查 {db_exchange_code} 交易日历版本失败，继续使用已加载的索引: {e}")
+            rows = None
+        if _index_version_unchanged(index, rows):
+            index.checked_at = now
+            return index
+        logger.info(f"{db_exchange_code} 交易日历已变更，重新加载索引。")
+
+    try:
+        records = fetch(_CALENDAR_INDEX_SQL)
+    except Exception as e:
+        logger.error(f"加载 {db_exchange_code} 交易日历索引失败: {e}")
+        return index
+
+    return _store_calendar_index(cache_key, db_exchange_code, records)
+
+
+def invalidate_trade_calendar(exchange: Optional[str] = None) -> None:
+    """清除进程内的交易日历索引和 get_trade_cal 缓存；exchange 为空时清除全部交易所。"""
+    if exchange is None:
+        _TRADE_CAL_INDEXES.clear()
+        _TRADE_CAL_CACHE.clear()
+        return
+
+    db_exchange_code = _to_db_exchange_code(exchange)
+    for key in [k for k in _TRADE_CAL_INDEXES if k[0] == db_exchange_code]:
+        _TRADE_CAL_INDEXES.pop(key, None)
+    for key in [k for k in _TRADE_CAL_CACHE if _to_db_exchange_code(k[2]) == db_exchange_code]:
+        _TRADE_CAL_CACHE.pop(key, None)
+
+
 async def get_trade_cal(
     start_date: str = None,
     end_date: str = None,
@@ -234,7 +430,7 @@ async def get_trade_cal(
         end_date = end_date_dt.strftime("%Y%m%d")
 
     upper_exchange = exchange.upper()
-    db_exchange_code = "HKEX" if upper_exchange in ("HK", "HKEX") else upper_exchange
+    db_exchange_code = _to_db_exchange_code(exchange)
     logger.info(
         f"_get_trade_cal: Calculated exchange codes: input_exchange='{exchange}', upper_exchange='{upper_exchange}', db_exchange_code='{db_exchange_code}'"
     )
@@ -242,8 +438,7 @@ async def get_trade_cal(
     active_db_manager = (
         db_manager if db_manager is not None else _CALENDAR_DB_MANAGER.get()
     )
-    cache_db_key = f"db:{id(active_db_manager)}" if active_db_manager is not None else "legacy"
-    cache_key = (start_date, end_date, upper_exchange, cache_db_key)
+    cache_key = (start_date, end_date, upper_exchange, _db_cache_key(active_db_manager))
     if cache_key in _TRADE_CAL_CACHE:
         logger.debug(f"交易日历缓存命中: {cache_key}")
         return _TRADE_CAL_CACHE[cache_key].copy()
@@ -262,19 +457,11 @@ async def get_trade_cal(
     final_df = pd.DataFrame()
 
     try:
-        if active_db_manager is not None:
-            records = await active_db_manager.fetch(
-                sql_query, db_exchange_code, start_date, end_date
-            )
-        else:
-            pool = await _get_db_pool()
-            if not pool:
-                logger.error("数据库连接池不可用，无法获取交易日历。")
-                return pd.DataFrame()
-            async with pool.acquire() as conn:
-                records = await conn.fetch(
-                    sql_query, db_exchange_code, start_date, end_date
-                )
+        records = await _fetch_calendar_records(
+            active_db_manager, sql_query, db_exchange_code, start_date, end_date
+        )
+        if records is None:
+            return pd.DataFrame()
 
         logger.debug(
             f"_get_trade_cal: Database raw records count for {db_exchange_code} ({start_date}-{end_date}): {len(records) if records else 'None'}"
@@ -355,20 +542,11 @@ async def is_trade_day(
         logger.error(f"is_trade_day 收到无效日期格式: {date}")
         return False
 
-    # 优化：直接使用 get_trade_cal 并检查结果
-    # 这样可以利用缓存，并且只查询一次数据库
-    df = await get_trade_cal(
-        start_date=date_str,
-        end_date=date_str,
-        exchange=exchange,
-        db_manager=db_manager,
-    )
-
-    if not df.empty:
-        # 确保查询结果包含当天
-        day_info = df[df["cal_date"] == date_str]
-        if not day_info.empty:
-            return day_info.iloc[0]["is_open"] == 1
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is not None:
+        is_open = index.is_trade_day(date_str)
+        if is_open is not None:
+            return is_open
 
     logger.warning(f"无法获取日期 {date_str} 的交易日历信息。")
     return False
@@ -400,38 +578,17 @@ async def get_last_trade_day(
         logger.error(f"get_last_trade_day 收到无效日期格式: {date}")
         return None
 
-    # 为了安全起见，向前查询一段较长的时间范围
-    # 估算查询范围：n个交易日大约需要 n * 1.5 个日历日
-    start_date_dt = datetime.datetime.strptime(
-        base_date_str, "%Y%m%d"
-    ) - timedelta(days=int(n * 1.5) + 15)
-    start_date_str_query = start_date_dt.strftime("%Y%m%d")
-
-    df = await get_trade_cal(
-        start_date=start_date_str_query,
-        end_date=base_date_str,
-        exchange=exchange,
-        db_manager=db_manager,
-    )
-
-    if df.empty:
-        logger.warning(
-            f"在 {start_date_str_query} 和 {base_date_str} 之间未找到交易日历数据。"
-        )
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is None:
+        logger.warning(f"未找到 {exchange} 交易日历数据。")
         return None
 
-    # 筛选出实际的交易日
-    trade_days = df[(df["is_open"] == 1) & (df["cal_date"] < base_date_str)][
-        "cal_date"
-    ].sort_values(ascending=False)
-
-    if len(trade_days) >= n:
-        return trade_days.iloc[n - 1]
-    else:
+    trade_day = index.prev_trade_day(base_date_str, n)
+    if trade_day is None:
         logger.warning(
-            f"在日期 {base_date_str} 之前没有足够的 {n} 个交易日 (只找到 {len(trade_days)} 个)。"
+            f"在日期 {base_date_str} 之前没有足够的 {n} 个交易日 (日历范围 {index.start}-{index.end})。"
         )
-        return None
+    return trade_day
 
 
 async def get_next_trade_day(
@@ -460,37 +617,17 @@ async def get_next_trade_day(
         logger.error(f"get_next_trade_day 收到无效日期格式: {date}")
         return None
 
-    # 为了安全起见，向后查询一段较长的时间范围
-    end_date_dt = datetime.datetime.strptime(base_date_str, "%Y%m%d") + timedelta(
-        days=int(n * 1.5) + 15
-    )
-    end_date_str_query = end_date_dt.strftime("%Y%m%d")
-
-    df = await get_trade_cal(
-        start_date=base_date_str,
-        end_date=end_date_str_query,
-        exchange=exchange,
-        db_manager=db_manager,
-    )
-
-    if df.empty:
-        logger.warning(
-            f"在 {base_date_str} 和 {end_date_str_query} 之间未找到交易日历数据。"
-        )
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is None:
+        logger.warning(f"未找到 {exchange} 交易日历数据。")
         return None
 
-    # 筛选出实际的交易日
-    trade_days = df[(df["is_open"] == 1) & (df["cal_date"] > base_date_str)][
-        "cal_date"
-    ].sort_values(ascending=True)
-
-    if len(trade_days) >= n:
-        return trade_days.iloc[n - 1]
-    else:
+    trade_day = index.next_trade_day(base_date_str, n)
+    if trade_day is None:
         logger.warning(
-            f"在日期 {base_date_str} 之后没有足够的 {n} 个交易日 (只找到 {len(trade_days)} 个)。"
+            f"在日期 {base_date_str} 之后没有足够的 {n} 个交易日 (日历范围 {index.start}-{index.end})。"
         )
-        return None
+    return trade_day
 
 
 async def get_trade_days_between(
@@ -518,18 +655,101 @@ async def get_trade_days_between(
         )
         return []
 
-    df = await get_trade_cal(
-        start_date=start_date_str,
-        end_date=end_date_str,
-        exchange=exchange,
-        db_manager=db_manager,
-    )
-    if not df.empty and "is_open" in df.columns:
-        # 筛选出 is_open 为 1 的交易日
-        trade_days_df = df[df["is_open"] == 1]
-        # 返回 cal_date 列表
-        return trade_days_df["cal_date"].tolist()
-    return []
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is None:
+        return []
+    return index.trade_days_between(start_date_str, end_date_str)
+
+
+async def shift_trade_day(
+    date: Union[str, datetime.datetime, datetime.date],
+    n: int,
+    exchange: str = "SSE",
+    db_manager: Optional[Any] = None,
+) -> Optional[str]:
+    """按交易日平移日期。
+
+    Args:
+        date (Union[str, datetime.datetime, datetime.date]): 基准日期 (格式 YYYYMMDD 或兼容格式)。
+        n (int): 平移的交易日数，正数向后、负数向前（均不含基准日当天）；
+                 为 0 时基准日是交易日则返回其本身，否则返回 None。
+        exchange (str, optional): 交易所代码，默认为 'SSE'。
+
+    Returns:
+        Optional[str]: YYYYMMDD 格式的交易日字符串，超出日历范围时返回 None。
+    """
+    date_str = _normalize_date_to_yyyymmdd(date)
+    if not date_str:
+        logger.error(f"shift_trade_day 收到无效日期格式: {date}")
+        return None
+
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is None:
+        logger.warning(f"未找到 {exchange} 交易日历数据。")
+        return None
+    return index.shift(date_str, n)
+
+
+async def count_trade_days(
+    start_date: Union[str, datetime.datetime, datetime.date],
+    end_date: Union[str, datetime.datetime, datetime.date],
+    exchange: str = "SSE",
+    db_manager: Optional[Any] = None,
+) -> int:
+    """统计两个日期之间（含两端）的交易日数。
+
+    Args:
+        start_date (Union[str, datetime.datetime, datetime.date]): 开始日期 (含)。
+        end_date (Union[str, datetime.datetime, datetime.date]): 结束日期 (含)。
+        exchange (str, optional): 交易所代码，默认为 'SSE'。
+
+    Returns:
+        int: 交易日数；日期无效或没有日历数据时返回 0。
+    """
+    start_date_str = _normalize_date_to_yyyymmdd(start_date)
+    end_date_str = _normalize_date_to_yyyymmdd(end_date)
+    if not start_date_str or not end_date_str:
+        logger.error(
+            f"count_trade_days 的日期格式无效或无法转换: {start_date} 或 {end_date}."
+        )
+        return 0
+
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is None:
+        return 0
+    return index.count_trade_days(start_date_str, end_date_str)
+
+
+async def get_period_end_trade_days(
+    start_date: Union[str, datetime.datetime, datetime.date],
+    end_date: Union[str, datetime.datetime, datetime.date],
+    freq: str = "M",
+    exchange: str = "SSE",
+    db_manager: Optional[Any] = None,
+) -> List[str]:
+    """获取两个日期之间各周期的最后一个交易日。
+
+    Args:
+        start_date (Union[str, datetime.datetime, datetime.date]): 开始日期 (含)。
+        end_date (Union[str, datetime.datetime, datetime.date]): 结束日期 (含)。
+        freq (str, optional): 周期，'W' 周、'M' 月、'Q' 季、'Y' 年，默认为 'M'。
+        exchange (str, optional): 交易所代码，默认为 'SSE'。
+
+    Returns:
+        List[str]: 周期末交易日列表 (格式 YYYYMMDD)；周期末交易日晚于 end_date 的周期不包含在内。
+    """
+    start_date_str = _normalize_date_to_yyyymmdd(start_date)
+    end_date_str = _normalize_date_to_yyyymmdd(end_date)
+    if not start_date_str or not end_date_str:
+        logger.error(
+            f"get_period_end_trade_days 的日期格式无效或无法转换: {start_date} 或 {end_date}."
+        )
+        return []
+
+    index = await get_trade_calendar_index(exchange, db_manager=db_manager)
+    if index is None:
+        return []
+    return index.period_end_trade_days(start_date_str, end_date_str, freq=freq)
 
 
 def generate_date_range(start_date: str, end_date: str) -> List[str]:
@@ -565,10 +785,25 @@ async def get_month_ends(start_date, end_date, re_trade_day=True) -> list:
     Args:
         start_date: 开始日期
         end_date: 结束日期
-        re_trade_day: 是否返回交易日
+        re_trade_day: 是否返回交易日（SSE 日历中每月最后一个交易日）
 
     Returns:
-        list: 月末日期列表
+        list: 月末日期列表 (格式 YYYYMMDD)
     """
-    # 实现获取月末日期的逻辑
-    pass
+    if re_trade_day:
+        return await get_period_end_trade_days(start_date, end_date, freq="M")
+
+    start_date_str = _normalize_date_to_yyyymmdd(start_date)
+    end_date_str = _normalize_date_to_yyyymmdd(end_date)
+    if not start_date_str or not end_date_str:
+        return []
+
+    month_ends: List[str] = []
+    year, month = int(start_date_str[:4]), int(start_date_str[4:6])
+    while f"{year:04d}{month:02d}01" <= end_date_str:
+        last_day = std_calendar.monthrange(year, month)[1]
+        month_end = f"{year:04d}{month:02d}{last_day:02d}"
+        if start_date_str <= month_end <= end_date_str:
+            month_ends.append(month_end)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return month_ends
@@ -0,0 +1,212 @@
+"""
+交易日历索引
+
+将单个交易所的交易日历装入已排序的 NumPy 日期数组，交易日推算（前后第 N 个交易日、
+区间计数、区间交易日、周期末交易日）均为一次 searchsorted 二分查找，不再访问数据库。
+索引本身不含数据库逻辑，加载、进程级缓存和刷新见 calendar.get_trade_calendar_index。
+
+日期参数接受 'YYYYMMDD' / 'YYYY-MM-DD' 字符串、date / datetime 或 numpy.datetime64，
+返回的日期统一为 'YYYYMMDD' 字符串（与 calendar 模块其他函数一致）。
+"""
+
+import datetime
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+_DAY = np.timedelta64(1, "D")
+
+# period_end_trade_days 支持的周期
+_PERIOD_FREQS = ("W", "M", "Q", "Y")
+
+
+def _to_day(value: Any) -> np.datetime64:
+    """将日期输入转换为 datetime64[D]"""
+    if isinstance(value, np.datetime64):
+        return value.astype("datetime64[D]")
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return np.datetime64(value, "D")
+    text = str(value).strip()
+    if len(text) == 8 and text.isdigit():
+        text = f"{text[:4]}-{text[4:6]}-{text[6:]}"
+    return np.datetime64(text.replace("/", "-"), "D")
+
+
+def _to_str(day: np.datetime64) -> str:
+    return str(day.astype("datetime64[D]")).replace("-", "")
+
+
+def _to_str_list(days: np.ndarray) -> List[str]:
+    if days.size == 0:
+        return []
+    return np.char.replace(np.datetime_as_string(days, unit="D"), "-", "").tolist()
+
+
+def _period_keys(days: np.ndarray, freq: str) -> np.ndarray:
+    """计算日期所属周期的整数键（周以周一为起点）"""
+    if freq == "W":
+        # 1970-01-01 为周四，+3 后按 7 整除即以周一划分
+        return (days.astype("datetime64[D]").astype(np.int64) + 3) // 7
+    if freq == "M":
+        return days.astype("datetime64[M]").astype(np.int64)
+    if freq == "Q":
+        return days.astype("datetime64[M]").astype(np.int64) // 3
+    if freq == "Y":
+        return days.astype("datetime64[Y]").astype(np.int64)
+    raise ValueError(f"不支持的周期: {freq}，可选 {_PERIOD_FREQS}")
+
+
+class TradeCalendarIndex:
+    """单个交易所的交易日历索引
+
+    - ``cal_days``: 日历覆盖的全部日期（含非交易日），用于判断覆盖范围
+    - ``trade_days``: 交易日（is_open == 1），已排序
+
+    覆盖范围之外的日期无法判断是否为交易日：is_trade_day 返回 None，
+    前后推算在跨越覆盖边界时返回 None，而不是给出可能错误的结果。
+    """
+
+    def __init__(
+        self,
+        exchange: str,
+        cal_dates: Iterable[Any],
+        is_open: Iterable[Any],
+        version: Optional[tuple] = None,
+    ):
+        cal_days = np.array([_to_day(d) for d in cal_dates], dtype="datetime64[D]")
+        open_flags = np.array([flag == 1 for flag in is_open], dtype=bool)
+        if cal_days.shape != open_flags.shape:
+            raise ValueError("cal_dates 与 is_open 长度不一致")
+
+        order = np.argsort(cal_days, kind="stable")
+        self.exchange = exchange
+        self.version = version
+        self.cal_days = cal_days[order]
+        self.trade_days = self.cal_days[open_flags[order]]
+        self.loaded_at = time.monotonic()
+        self.checked_at = self.loaded_at
+        self._period_end_masks: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_records(
+        cls,
+        exchange: str,
+        records: Iterable[Mapping[str, Any]],
+        version: Optional[tuple] = None,
+    ) -> "TradeCalendarIndex":
+        """从包含 cal_date / is_open 的记录（asyncpg Record 或字典）构建索引"""
+        cal_dates: List[Any] = []
+        is_open: List[Any] = []
+        for record in records:
+            if record["cal_date"] is None:
+                continue
+            cal_dates.append(record["cal_date"])
+            is_open.append(record["is_open"])
+        return cls(exchange, cal_dates, is_open, version=version)
+
+    def __len__(self) -> int:
+        return int(self.trade_days.size)
+
+    def __repr__(self) -> str:
+        return (
+            f"TradeCalendarIndex(exchange={self.exchange!r}, start={self.start!r}, "
+            f"end={self.end!r}, trade_days={len(self)})"
+        )
+
+    @property
+    def start(self) -> Optional[str]:
+        """日历覆盖的第一天"""
+        return _to_str(self.cal_days[0]) if self.cal_days.size else None
+
+    @property
+    def end(self) -> Optional[str]:
+        """日历覆盖的最后一天"""
+        return _to_str(self.cal_days[-1]) if self.cal_days.size else None
+
+    def covers(self, date: Any) -> bool:
+        """日期是否在日历覆盖范围内"""
+        if not self.cal_days.size:
+            return False
+        day = _to_day(date)
+        return bool(self.cal_days[0] <= day <= self.cal_days[-1])
+
+    def is_trade_day(self, date: Any) -> Optional[bool]:
+        """是否为交易日；超出覆盖范围返回 None"""
+        if not self.covers(date):
+            return None
+        day = _to_day(date)
+        pos = np.searchsorted(self.trade_days, day)
+        return bool(pos < self.trade_days.size and self.trade_days[pos] == day)
+
+    def next_trade_day(self, date: Any, n: int = 1) -> Optional[str]:
+        """date 之后（不含当日）的第 n 个交易日"""
+        if n <= 0 or not self.cal_days.size:
+            return None
+        day = _to_day(date)
+        if day + _DAY < self.cal_days[0]:
+            return None
+        pos = int(np.searchsorted(self.trade_days, day, side="right")) + n - 1
+        return _to_str(self.trade_days[pos]) if pos < self.trade_days.size else None
+
+    def prev_trade_day(self, date: Any, n: int = 1) -> Optional[str]:
+        """date 之前（不含当日）的第 n 个交易日"""
+        if n <= 0 or not self.cal_days.size:
+            return None
+        day = _to_day(date)
+        if day - _DAY > self.cal_days[-1]:
+            return None
+        pos = int(np.searchsorted(self.trade_days, day, side="left")) - n
+        return _to_str(self.trade_days[pos]) if pos >= 0 else None
+
+    def shift(self, date: Any, n: int) -> Optional[str]:
+        """按交易日平移：n > 0 向后、n < 0 向前（均不含当日）；n == 0 时 date 为交易日则返回自身"""
+        if n > 0:
+            return self.next_trade_day(date, n)
+        if n < 0:
+            return self.prev_trade_day(date, -n)
+        return _to_str(_to_day(date)) if self.is_trade_day(date) else None
+
+    def _range_slice(self, start_date: Any, end_date: Any) -> slice:
+        lo = int(np.searchsorted(self.trade_days, _to_day(start_date), side="left"))
+        hi = int(np.searchsorted(self.trade_days, _to_day(end_date), side="right"))
+        return slice(lo, max(lo, hi))
+
+    def count_trade_days(self, start_date: Any, end_date: Any) -> int:
+        """[start_date, end_date] 内（含两端）的交易日数"""
+        window = self._range_slice(start_date, end_date)
+        return window.stop - window.start
+
+    def trade_days_between(self, start_date: Any, end_date: Any) -> List[str]:
+        """[start_date, end_date] 内（含两端）的交易日列表"""
+        return _to_str_list(self.trade_days[self._range_slice(start_date, end_date)])
+
+    def _period_end_mask(self, freq: str) -> np.ndarray:
+        freq = freq.upper()
+        mask = self._period_end_masks.get(freq)
+        if mask is not None:
+            return mask
+
+        keys = _period_keys(self.trade_days, freq)
+        mask = np.zeros(self.trade_days.size, dtype=bool)
+        if keys.size:
+            mask[:-1] = keys[:-1] != keys[1:]
+            # 最后一个交易日仅在日历已覆盖到该周期结束时才算周期末
+            after_end = _period_keys(np.array([self.cal_days[-1] + _DAY]), freq)[0]
+            mask[-1] = after_end != keys[-1]
+        self._period_end_masks[freq] = mask
+        return mask
+
+    def period_end_trade_days(self, start_date: Any, end_date: Any, freq: str = "M") -> List[str]:
+        """
+        [start_date, end_date] 内各周期的最后一个交易日。
+
+        freq: 'W' 周（周一至周日）、'M' 月、'Q' 季、'Y' 年。
+        周期末交易日晚于 end_date 的周期（区间末尾未结束的周期）不包含在内。
+        """
+        mask = self._period_end_mask(freq)
+        window = self._range_slice(start_date, end_date)
+        days = self.trade_days[window]
+        return _to_str_list(days[mask[window]])
@@ -90,9 +90,8 @@ async def initialize_controller(response_callback):
     global _response_callback, db_manager
     _response_callback = response_callback
 
-    # 导入fetchers模块以触发任务注册（修复Phase 1-3中GUI不显示任务的问题）
-    logger.info("正在导入数据采集任务模块...")
-    import alphahome.fetchers  # 触发任务注册
+    # 任务列表由 UnifiedTaskFactory 从任务清单读取，任务模块在创建实例时按需导入
+    import alphahome.fetchers  # noqa: F401
 
     logger.info("正在初始化所有后端控制器逻辑模块...")
     
@@ -16,6 +16,7 @@ from typing import Any, Callable, Dict, List, Optional
 from ...common.logging_utils import get_logger
 from ...common.task_system import UnifiedTaskFactory
 from ...features import FeatureRegistry
+from ...features.storage.refresh_orchestrator import FeatureRefreshOrchestrator
 
 logger = get_logger(__name__)
 
@@ -124,39 +125,36 @@ async def handle_refresh_features(feature_names: List[str], strategy: str = "def
             _send_response_callback("ERROR", "数据库未连接，无法刷新特征视图。")
         return
     
+    recipe_classes = []
     for name in feature_names:
+        # 从缓存获取 recipe_class
+        feature = next((f for f in _feature_cache if f["name"] == name), None)
+        if not feature or "recipe_class" not in feature:
+            logger.warning(f"未找到特征 '{name}' 的配方类。")
+            fail_count += 1
+            continue
+        recipe_classes.append(feature["recipe_class"])
+
+    if recipe_classes:
+        # 按 source_tables 依赖顺序并发刷新
+        orchestrator = FeatureRefreshOrchestrator(db_manager=db_manager)
         try:
-            # 从缓存获取 recipe_class
-            feature = next((f for f in _feature_cache if f["name"] == name), None)
-            if not feature or "recipe_class" not in feature:
-                logger.warning(f"未找到特征 '{name}' 的配方类。")
-                fail_count += 1
-                continue
-            
-            recipe_cls = feature["recipe_class"]
-            actual_strategy = (
-                getattr(recipe_cls, "refresh_strategy", "full")
-                if strategy == "default"
-                else strategy
-            )
-            
-            # 创建实例并刷新
-            instance = recipe_cls(db_manager=db_manager)
-            logger.info(f"正在刷新物化视图: {instance.full_name} (策略: {actual_strategy})")
-            
-            result = await instance.refresh(strategy=actual_strategy)
-            
-            if result.get("status") == "success":
-                success_count += 1
-                logger.info(f"物化视图 {name} 刷新成功")
-            else:
-                fail_count += 1
-                logger.error(f"物化视图 {name} 刷新失败: {result.get('error_message')}")
-                
+            summary = await orchestrator.refresh(recipe_classes, strategy=strategy)
+            for result in summary["results"]:
+                name = result.get("name")
+                if result.get("status") == "success":
+                    success_count += 1
+                    logger.info(f"物化视图 {name} 刷新成功")
+                else:
+                    fail_count += 1
+                    logger.error(
+                        f"物化视图 {name} 刷新失败: "
+                        f"{result.get('error_message') or result.get('error')}"
+                    )
         except Exception as e:
-            fail_count += 1
-            logger.error(f"刷新特征 '{name}' 时发生错误: {e}")
-    
+            fail_count += len(recipe_classes)
+            logger.error(f"批量刷新特征时发生错误: {e}")
+
     if _send_response_callback:
         _send_response_callback("FEATURE_OPERATION_COMPLETE", {
             "operation": "刷新",
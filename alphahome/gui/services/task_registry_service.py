@@ -15,7 +15,7 @@ from typing import Any, Callable, Dict, List, Optional
 import inspect
 
 from ...common.logging_utils import get_logger
-from ...common.task_system import UnifiedTaskFactory, get_tasks_by_type
+from ...common.task_system import UnifiedTaskFactory, get_task_names_by_type
 from ...gui.utils.common import format_datetime_for_display
 
 logger = get_logger(__name__)
@@ -72,7 +72,7 @@ async def handle_get_collection_tasks():
     success = False
     try:
         # 获取'fetch'类型的任务
-        fetch_tasks = get_tasks_by_type("fetch")
+        fetch_tasks = get_task_names_by_type("fetch")
         logger.info(f"发现 {len(fetch_tasks)} 个数据采集任务。")
 
         new_cache = []
@@ -84,15 +84,16 @@ async def handle_get_collection_tasks():
             if _GUI_EXCLUDE_TINYSOFT_MINUTE_FETCH.match(name):
                 continue
             try:
-                task_instance = await UnifiedTaskFactory.get_task(name)
+                # 只读取任务清单/类属性中的元信息，不实例化任务（实例在运行任务时才创建）
+                info = UnifiedTaskFactory.get_task_info(name)
                 # 推断任务子类型
-                task_type = getattr(task_instance, 'task_type', 'fetch')
+                task_type = info.get("type") or 'fetch'
                 if task_type == 'fetch':
-                    # 使用业务域获取方法，优先使用domain属性
-                    task_type = task_instance.get_business_domain()
+                    # 使用业务域，优先使用domain属性
+                    task_type = _get_business_domain(info)
 
                 # 推断数据源
-                data_source = getattr(task_instance, 'data_source', None)
+                data_source = info.get("data_source")
                 if data_source is None:
                     # 如果任务类未定义data_source，则从名称推断
                     parts = name.split('_')
@@ -107,9 +108,10 @@ async def handle_get_collection_tasks():
                     "name": name,
                     "type": task_type,
                     "data_source": data_source,
-                    "description": getattr(task_instance, "description", ""),
+                    "description": info.get("description") or "",
                     "selected": existing_selection.get(name, False),
-                    "table_name": getattr(task_instance, "table_name", None),
+                    "table_name": info.get("table_name"),
+                    "date_column": info.get("date_column"),
                 })
             except Exception as e:
                 logger.error(f"获取采集任务 '{name}' 详情失败: {e}")
@@ -169,7 +171,7 @@ async def get_task_details_by_type(task_type: str) -> List[Dict[str, Any]]:
     按类型获取任务的详细信息列表，用于GUI显示。
 
     此方法是获取任务信息供GUI使用的唯一、标准化的方式。
-    它封装了获取任务类、创建实例和提取所需属性的逻辑。
+    它封装了获取任务类和提取所需属性的逻辑，不创建任务实例。
 
     Args:
         task_type (str): 要获取的任务类型 ('fetch', 'processor', etc.)
@@ -179,16 +181,16 @@ async def get_task_details_by_type(task_type: str) -> List[Dict[str, Any]]:
     """
     details_list = []
     try:
-        # 1. 从工厂获取指定类型的所有任务类
-        task_classes = UnifiedTaskFactory.get_tasks_by_type(task_type)
-        if not task_classes:
+        # 1. 从工厂获取指定类型的所有任务名称（读取任务清单，不导入任务模块）
+        task_names = UnifiedTaskFactory.get_task_names_by_type(task_type)
+        if not task_names:
             logger.warning(f"未找到类型为 '{task_type}' 的任务。")
             return []
         
         # 2. 异步地获取所有任务实例的详情
         tasks_to_gather = [
             _get_single_task_details(name)
-            for name in task_classes.keys()
+            for name in task_names
         ]
         results = await asyncio.gather(*tasks_to_gather, return_exceptions=True)
 
@@ -211,9 +213,10 @@ async def _get_single_task_details(task_name: str) -> Optional[Dict[str, Any]]:
     获取单个任务的详细信息，能安全地处理抽象类。
     """
     try:
-        # 正确地从工厂的注册表中获取任务类
-        task_class = UnifiedTaskFactory._task_registry.get(task_name)
-        if not task_class:
+        # 从工厂获取任务类（未导入时按任务清单导入对应模块）
+        try:
+            task_class = UnifiedTaskFactory.get_task_class(task_name)
+        except ValueError:
             logger.warning(f"无法在工厂注册表中找到名为 '{task_name}' 的任务类。")
             return None
 
@@ -235,21 +238,14 @@ async def _get_single_task_details(task_name: str) -> Optional[Dict[str, Any]]:
             logger.info(f"任务 '{task_name}' 是抽象类，仅加载基础信息。")
             return details
 
-        # --- 如果是具体类，则实例化以获取更多信息 ---
-        task_instance = await UnifiedTaskFactory.get_task(task_name)
-        if not task_instance:
-            details["error"] = "任务实例创建失败"
-            return details
-            
-        # 使用实例更新/覆盖信息
-        details["primary_keys"] = getattr(task_instance, "primary_keys", [])
-        details["date_column"] = getattr(task_instance, "date_column", None)
-        
+        # --- 具体类：补充类属性中的主键和日期列（不实例化任务） ---
+        details["primary_keys"] = list(getattr(task_class, "primary_keys", None) or [])
+        details["date_column"] = getattr(task_class, "date_column", None)
+
         # 为 'fetch' 任务推断更具体的子类型
         if details["task_type"] == 'fetch':
-            # 使用业务域获取方法，优先使用domain属性
-            business_domain = task_instance.get_business_domain()
-            details["task_type"] = business_domain
+            # 使用业务域，优先使用domain属性
+            details["task_type"] = _get_business_domain(UnifiedTaskFactory.get_task_info(task_name))
 
         return details
 
@@ -262,6 +258,18 @@ async def _get_single_task_details(task_name: str) -> Optional[Dict[str, Any]]:
         }
 
 
+def _get_business_domain(info: Dict[str, Any]) -> str:
+    """按任务元信息推断业务域，规则与 BaseTask.get_business_domain 一致"""
+    if info.get("domain"):
+        return info["domain"]
+    parts = (info.get("name") or "").split('_')
+    if len(parts) > 1:
+        return parts[1]
+    if parts[0]:
+        return parts[0]
+    return info.get("data_source") or "unknown"
+
+
 async def _update_tasks_with_latest_timestamp(task_cache: List[Dict[str, Any]]):
     """使用每个任务的最新数据时间戳更新任务缓存列表。"""
     import time
@@ -274,6 +282,15 @@ async def _update_tasks_with_latest_timestamp(task_cache: List[Dict[str, Any]]):
             task_detail["latest_update_time"] = "N/A (DB Error)"
         return
 
+    # 一次查询读取水位目录中所有表的可信记录，只有缺失或过期的表才逐表查询
+    watermarks = {}
+    try:
+        watermarks = await db_manager.get_table_watermarks(
+            [task for task in task_cache if task.get("table_name")]
+        )
+    except Exception as e:
+        logger.warning(f"读取水位目录失败，回退到逐表查询: {e}")
+
     async def update_single_task(task_detail: Dict[str, Any]):
         task_start_time = time.time()
         table_name = task_detail.get("table_name")
@@ -283,9 +300,14 @@ async def _update_tasks_with_latest_timestamp(task_cache: List[Dict[str, Any]]):
             try:
                 # 修复: 传递整个task_detail字典，而不是只有name
                 # TableNameResolver可以从字典中正确解析出data_source和table_name
-                latest_time = await db_manager.get_latest_update_time(
-                    task_detail
-                )
+                # 目录中缺失或过期的表直接查询原表；播种只在任务写入时进行，避免 SHARE 锁阻塞写入
+                watermark = watermarks.get(db_manager.resolver.get_schema_and_table(task_detail))
+                if watermark is not None and (
+                    watermark["max_update_time"] is not None or watermark["row_count"] == 0
+                ):
+                    latest_time = watermark["max_update_time"]
+                else:
+                    latest_time = await db_manager.get_latest_update_time(task_detail)
                 if latest_time:
                     task_detail["latest_update_time"] = format_datetime_for_display(latest_time)
                 else:
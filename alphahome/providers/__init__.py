@@ -10,10 +10,12 @@ from .data_access import (
     ValidationError,
     CacheError
 )
+from .query_cache import QueryCache
 
 __all__ = [
     'AlphaDataTool',
     'DataAccessError',
     'ValidationError',
-    'CacheError'
+    'CacheError',
+    'QueryCache'
 ]
@@ -72,14 +72,16 @@ class AlphaDataTool:
         
         Args:
             db_manager: DBManager 实例
-            cache_manager: 可选的缓存管理器（暂未使用，保持兼容性）
+            cache_manager: 可选的缓存管理器（QueryCache）。提供时 get_stock_data、
+                get_index_weights、get_adj_factor_data、get_trade_dates 走读穿透缓存
         """
         self.db_manager = db_manager
-        self.cache_manager = cache_manager  # 保持兼容性，暂不使用
+        self.cache_manager = cache_manager
         self.logger = logger.getChild(self.__class__.__name__)
         
         # 表名缓存，避免重复检测
         self._table_cache = {}
+        self._watermark_catalog_available = False
     
     # ========================================================================
     # 核心方法 1: 股票行情数据
@@ -134,21 +136,22 @@ class AlphaDataTool:
         
         # 执行查询
         params = tuple(symbols + [str(start_date), str(end_date)])
+
+        def load() -> pd.DataFrame:
+            # 列式解码：NUMERIC → float64，DATE → datetime64，无需逐列转换
+            return self.db_manager.fetch_dataframe_sync(query, params)
+
         try:
-            result = self.db_manager.fetch_sync(query, params)
-            df = pd.DataFrame(result)
+            df = self._cached(
+                table_name, 'stock_daily', load,
+                symbols=symbols, start=start_date, end=end_date,
+                date_column='trade_date', symbol_column='ts_code',
+            )
             
             if df.empty:
                 self.logger.warning(f"未查询到股票数据: {symbols}")
                 return df
             
-            # 数据类型转换
-            df['trade_date'] = pd.to_datetime(df['trade_date'])
-            numeric_cols = ['open', 'high', 'low', 'close', 'pre_close', 'change', 'pct_chg', 'vol', 'amount']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-            
             self.logger.info(f"获取股票数据成功: {len(df)} 条记录")
             return df
             
@@ -205,14 +208,16 @@ class AlphaDataTool:
             ORDER BY trade_date, con_code
             """
         
+        params = (index_code, str(start_date), str(end_date))
+
+        def load() -> pd.DataFrame:
+            return self.db_manager.fetch_dataframe_sync(query, params)
+
         try:
-            params = (index_code, str(start_date), str(end_date))
-            result = self.db_manager.fetch_sync(query, params)
-            df = pd.DataFrame(result)
-            
-            if not df.empty:
-                df['trade_date'] = pd.to_datetime(df['trade_date'])
-                df['weight'] = pd.to_numeric(df['weight'], errors='coerce')
+            df = self._cached(
+                table_name, f'index_weights:{index_code}:monthly={monthly}', load,
+                start=start_date, end=end_date, date_column='trade_date',
+            )
             
             self.logger.info(f"获取指数权重成功: {len(df)} 条记录")
             return df
@@ -269,13 +274,15 @@ class AlphaDataTool:
         
         query += " ORDER BY ts_code, trade_date"
         
+        def load() -> pd.DataFrame:
+            return self.db_manager.fetch_dataframe_sync(query, tuple(params))
+
         try:
-            result = self.db_manager.fetch_sync(query, params)
-            df = pd.DataFrame(result)
-            
-            if not df.empty:
-                df['trade_date'] = pd.to_datetime(df['trade_date'])
-                df['adj_factor'] = pd.to_numeric(df['adj_factor'], errors='coerce')
+            df = self._cached(
+                'tushare.stock_adjfactor', 'stock_adjfactor', load,
+                symbols=symbols or None, start=start_date, end=end_date,
+                date_column='trade_date', symbol_column='ts_code',
+            )
             
             self.logger.info(f"获取复权因子成功: {len(df)} 条记录")
             return df
@@ -372,16 +379,21 @@ class AlphaDataTool:
         ORDER BY cal_date
         """
 
-        try:
-            params = (market, str(start_date), str(end_date))
-            result = self.db_manager.fetch_sync(query, params)
-            df = pd.DataFrame(result)
+        params = (market, str(start_date), str(end_date))
 
+        def load() -> pd.DataFrame:
+            df = self.db_manager.fetch_dataframe_sync(query, params)
             if not df.empty:
-                df['cal_date'] = pd.to_datetime(df['cal_date'])
                 if 'pretrade_date' in df.columns:
                     df['pretrade_date'] = pd.to_datetime(df['pretrade_date'], errors='coerce')
                 df['is_open'] = df['is_open'].astype(int)
+            return df
+
+        try:
+            df = self._cached(
+                'tushare.trade_cal', f'trade_cal:{market}', load,
+                start=start_date, end=end_date, date_column='cal_date',
+            )
 
             self.logger.info(f"获取交易日历成功: {len(df)} 条记录")
             return df
@@ -492,6 +504,44 @@ class AlphaDataTool:
     # 私有辅助方法
     # ========================================================================
 
+    def _cached(self, table: str, kind: str, loader, **key) -> pd.DataFrame:
+        """经 cache_manager 读穿透；未配置缓存时直接查询"""
+        if self.cache_manager is None:
+            return loader()
+        return self.cache_manager.get_or_load(
+            table, kind, loader, self._get_table_version, **key
+        )
+
+    def _get_table_version(self, table: str):
+        """源表版本（最新 update_time），用于缓存失效
+
+        优先读取水位目录 meta.table_watermarks；目录中没有该表（或目录尚未创建）时扫描源表。
+        读取目录出错时直接抛出，由 QueryCache 沿用上一次的版本。
+        """
+        schema, name = table.split('.', 1) if '.' in table else ('public', table)
+        if self._has_watermark_catalog():
+            try:
+                rows = self.db_manager.fetch_sync(
+                    "SELECT max_update_time FROM meta.table_watermarks WHERE schema_name = %s AND table_name = %s",
+                    (schema, name),
+                )
+            except Exception as e:
+                self.logger.debug(f"读取 {table} 的水位目录失败: {e}")
+                raise
+            if rows:
+                return rows[0]['max_update_time']
+        rows = self.db_manager.fetch_sync(f"SELECT MAX(update_time) AS version FROM {table}")
+        return rows[0]['version'] if rows else None
+
+    def _has_watermark_catalog(self) -> bool:
+        """水位目录表是否存在（存在后缓存结果，不再重复检查）"""
+        if not self._watermark_catalog_available:
+            rows = self.db_manager.fetch_sync(
+                "SELECT to_regclass('meta.table_watermarks') IS NOT NULL AS available"
+            )
+            self._watermark_catalog_available = bool(rows and rows[0]['available'])
+        return self._watermark_catalog_available
+
     def _get_stock_table(self) -> str:
         """获取股票数据表名（智能检测）"""
         if 'stock_daily' in self._table_cache:
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+AlphaDataTool 读穿透查询缓存
+
+两级缓存：
+- 内存层：按 DataFrame 实际内存占用（字节）限额的 LRU
+- 磁盘层：Parquet 文件 + index.json 索引，进程/Notebook 重启后仍可命中
+
+缓存条目按 (表, 查询类型, 代码集合, 日期区间) 记录。请求的代码集合是已缓存条目的子集、
+日期区间落在已缓存区间内时，直接从缓存数据中筛选返回，不再访问数据库。
+
+失效：每张源表记录写入缓存时的版本（最新 update_time）。读取前比对当前版本
+（版本查询结果在 version_ttl 秒内复用），版本变化时丢弃该表的全部条目。
+
+磁盘层依赖 pyarrow；未安装时自动退化为仅内存缓存。
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Union
+
+import appdirs
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_LIMIT_BYTES = 512 * 1024 * 1024
+DEFAULT_DISK_LIMIT_BYTES = 8 * 1024 * 1024 * 1024
+INDEX_FILE = "index.json"
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目元数据（磁盘层索引中的一行）"""
+
+    key: str
+    table: str
+    kind: str
+    symbols: Optional[List[str]]  # None 表示全部代码
+    start: Optional[str]  # None 表示不限
+    end: Optional[str]
+    version: Optional[str]
+    nbytes: int
+    last_access: float
+
+    def covers(
+        self,
+        symbols: Optional[FrozenSet[str]],
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+    ) -> bool:
+        """判断本条目是否包含请求的代码集合与日期区间"""
+        if self.symbols is not None and (symbols is None or not symbols <= set(self.symbols)):
+            return False
+        if self.start is not None and (start is None or start < pd.Timestamp(self.start)):
+            return False
+        if self.end is not None and (end is None or end > pd.Timestamp(self.end)):
+            return False
+        return True
+
+
+class QueryCache:
+    """AlphaDataTool 的缓存管理器（传入 AlphaDataTool(db_manager, cache_manager=QueryCache())）"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        memory_limit_bytes: int = DEFAULT_MEMORY_LIMIT_BYTES,
+        disk_limit_bytes: int = DEFAULT_DISK_LIMIT_BYTES,
+        version_ttl: float = 60.0,
+        use_disk: bool = True,
+    ):
+        """
+        Args:
+            cache_dir: 磁盘层目录，默认为用户缓存目录下的 query_cache
+            memory_limit_bytes: 内存层字节上限
+            disk_limit_bytes: 磁盘层字节上限（超出时按最近访问时间淘汰）
+            version_ttl: 源表版本查询结果的复用时长（秒）；0 表示每次读取都检查
+            use_disk: 是否启用磁盘层
+        """
+        self.memory_limit_bytes = memory_limit_bytes
+        self.disk_limit_bytes = disk_limit_bytes
+        self.version_ttl = version_ttl
+        self.logger = logger.getChild(self.__class__.__name__)
+
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._memory_bytes = 0
+        self._entries: Dict[str, CacheEntry] = {}
+        self._table_versions: Dict[str, tuple] = {}  # table -> (version, checked_at)
+        self.hits = 0
+        self.misses = 0
+
+        self.cache_dir: Optional[Path] = None
+        if use_disk:
+            if importlib.util.find_spec("pyarrow") is None:
+                self.logger.warning("未安装 pyarrow，查询缓存仅使用内存层")
+            else:
+                self.cache_dir = Path(cache_dir or Path(appdirs.user_cache_dir("alphahome", "trademaster")) / "query_cache")
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._load_index()
+
+    # ------------------------------------------------------------------
+    # 读穿透入口
+    # ------------------------------------------------------------------
+
+    def get_or_load(
+        self,
+        table: str,
+        kind: str,
+        loader: Callable[[], pd.DataFrame],
+        version_loader: Callable[[str], Any],
+        symbols: Optional[List[str]] = None,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        date_column: Optional[str] = None,
+        symbol_column: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        从缓存读取；未命中时调用 loader 查询数据库并写入缓存。
+
+        Args:
+            table: 源表名（schema.table），用于版本失效
+            kind: 查询类型，包含除代码/日期外影响结果的参数（如指数代码、市场）
+            loader: 未命中时执行的查询，返回完整结果
+            version_loader: 查询源表当前版本（最新 update_time）
+            symbols: 代码列表，None 表示全部代码
+            start / end: 日期区间，None 表示不限
+            date_column / symbol_column: 子区间/子集筛选使用的列
+        """
+        symbol_set = frozenset(symbols) if symbols is not None else None
+        start_ts = pd.Timestamp(start) if start is not None else None
+        end_ts = pd.Timestamp(end) if end is not None else None
+
+        with self._lock:
+            version = self._check_version(table, version_loader)
+            for entry in sorted(self._entries.values(), key=lambda e: e.nbytes):
+                if entry.table != table or entry.kind != kind or not entry.covers(symbol_set, start_ts, end_ts):
+                    continue
+                df = self._read(entry)
+                if df is None:
+                    continue
+                self.hits += 1
+                entry.last_access = time.time()
+                self.logger.debug(f"查询缓存命中: {table} [{kind}] {len(df)} 行")
+                return self._select(df, entry, symbol_set, start_ts, end_ts, date_column, symbol_column)
+
+        self.misses += 1
+        df = loader()
+
+        with self._lock:
+            entry = CacheEntry(
+                key=self._make_key(table, kind, symbol_set, start_ts, end_ts, version),
+                table=table,
+                kind=kind,
+                symbols=sorted(symbol_set) if symbol_set is not None else None,
+                start=start_ts.isoformat() if start_ts is not None else None,
+                end=end_ts.isoformat() if end_ts is not None else None,
+                version=version,
+                nbytes=int(df.memory_usage(deep=True).sum()),
+                last_access=time.time(),
+            )
+            self._store(entry, df)
+        return df.copy()
+
+    # ------------------------------------------------------------------
+    # 管理接口
+    # ------------------------------------------------------------------
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """丢弃指定表（默认全部）的缓存条目"""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if table is None or e.table == table]:
+                self._drop(key)
+            if table is None:
+                self._table_versions.clear()
+            else:
+                self._table_versions.pop(table, None)
+            self._save_index()
+
+    def clear(self) -> None:
+        """清空全部缓存"""
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": sum(e.nbytes for e in self._entries.values()) if self.cache_dir else 0,
+                "disk_enabled": self.cache_dir is not None,
+            }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _make_key(table, kind, symbols, start, end, version) -> str:
+        raw = json.dumps(
+            [table, kind, sorted(symbols) if symbols is not None else None, str(start), str(end), version]
+        )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _check_version(self, table: str, version_loader: Callable[[str], Any]) -> Optional[str]:
+        """获取源表当前版本；与已缓存条目的版本不一致时丢弃该表的条目"""
+        cached = self._table_versions.get(table)
+        if cached is not None and time.time() - cached[1] < self.version_ttl:
+            return cached[0]
+
+        try:
+            raw = version_loader(table)
+            version = str(raw) if raw is not None else None
+        except Exception as e:
+            self.logger.warning(f"获取 {table} 版本失败，跳过缓存失效检查: {e}")
+            version = cached[0] if cached else None
+        self._table_versions[table] = (version, time.time())
+
+        stale = [k for k, e in self._entries.items() if e.table == table and e.version != version]
+        if stale:
+            self.logger.info(f"{table} 已更新 (update_time={version})，丢弃 {len(stale)} 条缓存")
+            for key in stale:
+                self._drop(key)
+            self._save_index()
+        return version
+
+    def _select(self, df, entry, symbols, start, end, date_column, symbol_column) -> pd.DataFrame:
+        """从缓存数据中筛选出请求的子集（保持原有行顺序）"""
+        if df.empty:
+            return df.copy()
+        mask = pd.Series(True, index=df.index)
+        if symbol_column and symbols is not None and entry.symbols != sorted(symbols):
+            mask &= df[symbol_column].isin(symbols)
+        if date_column and start is not None and (entry.start is None or start > pd.Timestamp(entry.start)):
+            mask &= df[date_column] >= start
+        if date_column and end is not None and (entry.end is None or end < pd.Timestamp(entry.end)):
+            mask &= df[date_column] <= end
+        if mask.all():
+            return df.copy()
+        return df[mask].reset_index(drop=True)
+
+    def _store(self, entry: CacheEntry, df: pd.DataFrame) -> None:
+        self._entries[entry.key] = entry
+        self._remember(entry.key, df)
+        if self.cache_dir is not None:
+            try:
+                df.to_parquet(self._path(entry.key), index=False)
+            except Exception as e:
+                # 无法序列化的列（如混合类型 object 列）只保留在内存层
+                self.logger.warning(f"写入磁盘缓存失败 ({entry.table} [{entry.kind}]): {e}")
+                entry.nbytes = 0
+            self._evict_disk()
+            self._save_index()
+
+    def _read(self, entry: CacheEntry) -> Optional[pd.DataFrame]:
+        df = self._memory.get(entry.key)
+        if df is not None:
+            self._memory.move_to_end(entry.key)
+            return df
+        if self.cache_dir is None or not self._path(entry.key).exists():
+            self._drop(entry.key)
+            return None
+        try:
+            df = pd.read_parquet(self._path(entry.key))
+        except Exception as e:
+            self.logger.warning(f"读取磁盘缓存失败，丢弃该条目: {e}")
+            self._drop(entry.key)
+            return None
+        self._remember(entry.key, df)
+        return df
+
+    def _remember(self, key: str, df: pd.DataFrame) -> None:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.memory_limit_bytes:
+            return
+        self._memory[key] = df
+        self._memory_bytes += nbytes
+        while self._memory_bytes > self.memory_limit_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= int(evicted.memory_usage(deep=True).sum())
+            if self.cache_dir is None:
+                self._entries.pop(evicted_key, None)
+
+    def _drop(self, key: str) -> None:
+        df = self._memory.pop(key, None)
+        if df is not None:
+            self._memory_bytes -= int(df.memory_usage(deep=True).sum())
+        self._entries.pop(key, None)
+        if self.cache_dir is not None:
+            self._path(key).unlink(missing_ok=True)
+
+    def _evict_disk(self) -> None:
+        total = sum(e.nbytes for e in self._entries.values())
+        for entry in sorted(self._entries.values(), key=lambda e: e.last_access):
+            if total <= self.disk_limit_bytes:
+                break
+            total -= entry.nbytes
+            self._drop(entry.key)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.parquet"  # type: ignore[operator]
+
+    def _load_index(self) -> None:
+        path = self.cache_dir / INDEX_FILE  # type: ignore[operator]
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self._entries = {e["key"]: CacheEntry(**e) for e in data.get("entries", [])}
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.warning(f"磁盘缓存索引损坏，已重建: {e}")
+            self._entries = {}
+
+    def _save_index(self) -> None:
+        if self.cache_dir is None:
+            return
+        # 只索引已落盘的条目
+        entries = [asdict(e) for e in self._entries.values() if self._path(e.key).exists()]
+        tmp = self.cache_dir / f"{INDEX_FILE}.tmp"
+        tmp.write_text(json.dumps({"entries": entries}, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.cache_dir / INDEX_FILE)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+G因子面板计算引擎
+=================
+
+逐日计算时，每个计算日都要重新查询两年 P 因子历史，并逐股票在 Python 中
+查找同比记录、构建 52 周 ΔP_score 序列。本模块改为：
+
+1. 一次性加载整个日期区间所需的 P 因子历史（按 ts_code, calc_date 排序）
+2. 以 (计算日, 股票) 为分组，用复合键 searchsorted 在数组上完成：
+   - 最新记录定位（calc_date <= 计算日）
+   - 同比记录匹配（1 年前 ±30 天、52 周前 ±容忍天数，取最接近者，距离相同取较早者）
+   - ΔP_score 序列的样本数与标准差（分组 bincount）
+3. 按计算日做横截面百分位排名并合成 g_score
+
+口径与 ProductionGFactorCalculator 逐日路径一致：每个计算日只使用
+[计算日 - 730 天, 计算日] 内的 P 因子记录（同比基期同样受此窗口约束）。
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+HISTORY_COLUMNS = [
+    'ts_code', 'calc_date', 'p_score', 'data_source', 'ann_date',
+    'gpa', 'roe_excl', 'roa_excl', 'revenue_yoy_growth', 'n_income_yoy_growth',
+]
+
+HISTORY_QUERY = """
+SELECT ts_code, calc_date, p_score, data_source, ann_date,
+       gpa, roe_excl, roa_excl, revenue_yoy_growth, n_income_yoy_growth
+FROM pgs_factors.p_factor
+WHERE ts_code = ANY(%s)
+  AND calc_date BETWEEN %s AND %s
+  AND p_score IS NOT NULL
+ORDER BY ts_code, calc_date
+"""
+
+RESULT_COLUMNS = [
+    'calc_date', 'ts_code', 'data_source', 'data_timeliness_weight',
+    'g_efficiency_surprise', 'g_efficiency_momentum', 'g_revenue_momentum', 'g_profit_momentum',
+    'ann_date', 'calculation_status', 'rank_es', 'rank_em', 'rank_rm', 'rank_pm', 'g_score',
+]
+
+HISTORY_WINDOW_DAYS = 730
+YOY_TOLERANCE_DAYS = 30
+DEFAULT_SUBFACTOR_WEIGHTS = {
+    'efficiency_surprise': 0.25,
+    'efficiency_momentum': 0.25,
+    'revenue_momentum': 0.25,
+    'profit_momentum': 0.25,
+}
+DEFAULT_ES_PARAMS = {
+    'yoy_interval_weeks': 52,
+    'yoy_match_tolerance_days': 45,
+    'min_yoy_pairs_for_std': 8,
+    'min_yoy_pairs_soft': 3,
+}
+
+_KEY_SPAN = np.int64(1 << 20)
+
+
+def load_p_factor_history(context, stock_codes: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+    """一次性加载 [start_date - 730 天, end_date] 的 P 因子历史"""
+    history_start = (
+        datetime.strptime(start_date, '%Y-%m-%d') - timedelta(days=HISTORY_WINDOW_DAYS)
+    ).strftime('%Y-%m-%d')
+    result = context.query_dataframe(HISTORY_QUERY, (list(stock_codes), history_start, end_date))
+    if result is None or result.empty:
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    return result
+
+
+def _to_days(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values)).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def _to_float(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _nearest(keys: np.ndarray, days: np.ndarray, stock_key: np.ndarray,
+             target: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """在 [low, high] 内查找最接近 target 的记录行号（距离相同取较早者，无候选为 -1）"""
+    begin = np.searchsorted(keys, stock_key + low, side='left')
+    end = np.searchsorted(keys, stock_key + high, side='right')
+    pivot = np.clip(np.searchsorted(keys, stock_key + target, side='left'), begin, end)
+
+    left = pivot - 1
+    has_left = left >= begin
+    has_right = pivot < end
+    left_diff = np.where(has_left, target - days[np.maximum(left, 0)], np.iinfo(np.int64).max)
+    right_diff = np.where(has_right, days[np.minimum(pivot, len(days) - 1)] - target, np.iinfo(np.int64).max)
+    choose_left = has_left & (left_diff <= right_diff)
+    return np.where(choose_left, left, np.where(has_right, pivot, -1))
+
+
+def _efficiency_surprise(delta: np.ndarray, n_samples: np.ndarray, std: np.ndarray,
+                         es_params: Dict[str, Any]) -> np.ndarray:
+    hard_n = max(1, int(es_params.get('min_yoy_pairs_for_std', 8)))
+    soft_n = max(1, int(es_params.get('min_yoy_pairs_soft', 3)))
+    positive_std = std > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        normalized = np.where(positive_std, delta / std, delta)
+        damped = np.where(positive_std, delta / std * np.sqrt(n_samples / float(hard_n)), delta)
+    return np.select([n_samples >= hard_n, n_samples >= soft_n], [normalized, damped], default=delta)
+
+
+def compute_g_factor_panel(
+    history: pd.DataFrame,
+    universe: pd.DataFrame,
+    es_params: Optional[Dict[str, Any]] = None,
+    subfactor_weights: Optional[Dict[str, float]] = None,
+    max_pairs: int = 5_000_000,
+) -> pd.DataFrame:
+    """
+    计算全部 (calc_date, ts_code) 的 G 因子、横截面排名与 g_score。
+
+    Args:
+        history: P 因子历史（HISTORY_COLUMNS）
+        universe: 各计算日需要计算的股票 (calc_date, ts_code)
+        es_params: 效率惊喜参数（同 ProductionGFactorCalculator.es_params）
+        subfactor_weights: 子因子权重
+        max_pairs: 单批展开的 (分组, 历史记录) 对数上限，控制内存
+
+    Returns:
+        RESULT_COLUMNS 列，按 (calc_date, ts_code) 排序；窗口内无 P 因子记录的组合不出现
+    """
+    es_params = {**DEFAULT_ES_PARAMS, **(es_params or {})}
+    weights = subfactor_weights or DEFAULT_SUBFACTOR_WEIGHTS
+    if history is None or history.empty or universe is None or universe.empty:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    hist = history.dropna(subset=['p_score']).copy()
+    hist['_day'] = _to_days(hist['calc_date'])
+    hist = hist.sort_values(['ts_code', '_day'], kind='mergesort').reset_index(drop=True)
+    codes, code_index = np.unique(hist['ts_code'].to_numpy().astype(str), return_inverse=True)
+    days = hist['_day'].to_numpy()
+    keys = code_index.astype(np.int64) * _KEY_SPAN + days
+    p_score = _to_float(hist['p_score'])
+
+    # 分组：(计算日, 股票)，窗口为 [计算日 - 730 天, 计算日]
+    universe = universe.drop_duplicates(['calc_date', 'ts_code'])
+    pair_codes = universe['ts_code'].to_numpy().astype(str)
+    code_pos = np.minimum(np.searchsorted(codes, pair_codes), len(codes) - 1)
+    known = codes[code_pos] == pair_codes
+    universe = universe[known]
+    code_pos = code_pos[known]
+    group_day = _to_days(universe['calc_date'])
+    window_start = group_day - HISTORY_WINDOW_DAYS
+    group_key = code_pos.astype(np.int64) * _KEY_SPAN
+    row_start = np.searchsorted(keys, group_key + window_start, side='left')
+    row_end = np.searchsorted(keys, group_key + group_day, side='right')
+    has_rows = row_end > row_start
+
+    universe = universe[has_rows]
+    group_day, window_start, group_key = group_day[has_rows], window_start[has_rows], group_key[has_rows]
+    row_start, row_end = row_start[has_rows], row_end[has_rows]
+    group_count = len(row_start)
+    if group_count == 0:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    # 1) 最新记录及其 1 年前（±30 天）同比记录
+    latest = row_end - 1
+    latest_days = days[latest]
+    yoy_target = (
+        pd.to_datetime(latest_days, unit='D') - pd.DateOffset(years=1)
+    ).to_numpy().astype('datetime64[D]').astype(np.int64)
+    yoy_row = _nearest(
+        keys, days, group_key, yoy_target,
+        np.maximum(yoy_target - YOY_TOLERANCE_DAYS, window_start), yoy_target + YOY_TOLERANCE_DAYS,
+    )
+    delta_latest = np.where(yoy_row >= 0, p_score[latest] - p_score[np.maximum(yoy_row, 0)], np.nan)
+
+    # 2) 窗口内每条记录的 52 周 ΔP_score 序列：样本数与总体标准差
+    interval_days = 7 * max(1, int(es_params.get('yoy_interval_weeks', 52)))
+    tolerance = max(0, int(es_params.get('yoy_match_tolerance_days', 45)))
+    # 不受窗口约束的同比基期每条记录只需查找一次；若其早于窗口起点，窗口内最接近者
+    # 必为窗口首条记录（仍需落在容忍范围内）
+    row_target = days - interval_days
+    row_base = _nearest(
+        keys, days, code_index.astype(np.int64) * _KEY_SPAN, row_target,
+        row_target - tolerance, row_target + tolerance,
+    )
+    lengths = row_end - row_start
+    n_samples = np.zeros(group_count)
+    std = np.zeros(group_count)
+
+    batch_start = 0
+    while batch_start < group_count:
+        cumulative = np.cumsum(lengths[batch_start:])
+        batch_end = batch_start + max(1, int(np.searchsorted(cumulative, max_pairs, side='right')))
+        groups = np.arange(batch_start, batch_end)
+        group_lengths = lengths[groups]
+        pair_group = np.repeat(groups, group_lengths)
+        offsets = np.arange(len(pair_group)) - np.repeat(np.cumsum(group_lengths) - group_lengths, group_lengths)
+        rows = row_start[pair_group] + offsets
+
+        base = row_base[rows]
+        first = row_start[pair_group]
+        in_window = (base >= 0) & (days[np.maximum(base, 0)] >= window_start[pair_group])
+        clipped = (base >= 0) & ~in_window & (days[first] <= row_target[rows] + tolerance)
+        base = np.where(in_window, base, np.where(clipped, first, -1))
+        delta = p_score[rows] - p_score[np.maximum(base, 0)]
+        valid = (base >= 0) & ~np.isnan(delta)
+
+        local = pair_group - batch_start
+        size = batch_end - batch_start
+        count = np.bincount(local, weights=valid, minlength=size)
+        total = np.bincount(local, weights=np.where(valid, delta, 0.0), minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            squares = np.where(valid, (delta - mean[local]) ** 2, 0.0)
+            variance = np.bincount(local, weights=squares, minlength=size) / count
+        n_samples[batch_start:batch_end] = count
+        std[batch_start:batch_end] = np.sqrt(np.nan_to_num(variance))
+        batch_start = batch_end
+
+    # 3) 子因子
+    result = pd.DataFrame({
+        'calc_date': universe['calc_date'].to_numpy(),
+        'ts_code': universe['ts_code'].to_numpy(),
+        'data_source': hist['data_source'].to_numpy()[latest],
+        'data_timeliness_weight': 1.0,
+        'g_efficiency_surprise': np.where(
+            np.isnan(delta_latest), np.nan, _efficiency_surprise(delta_latest, n_samples, std, es_params)
+        ),
+        'g_efficiency_momentum': delta_latest,
+        'g_revenue_momentum': _to_float(hist['revenue_yoy_growth'])[latest],
+        'g_profit_momentum': _to_float(hist['n_income_yoy_growth'])[latest],
+        'ann_date': hist['ann_date'].to_numpy()[latest],
+        'calculation_status': 'success',
+    })
+    result = result.sort_values(['calc_date', 'ts_code'], kind='mergesort').reset_index(drop=True)
+
+    # 4) 按计算日横截面百分位排名与最终评分
+    by_date = result.groupby('calc_date', sort=False)
+    factor_ranks = [
+        ('g_efficiency_surprise', 'rank_es', 'efficiency_surprise'),
+        ('g_efficiency_momentum', 'rank_em', 'efficiency_momentum'),
+        ('g_revenue_momentum', 'rank_rm', 'revenue_momentum'),
+        ('g_profit_momentum', 'rank_pm', 'profit_momentum'),
+    ]
+    weighted_sum = np.zeros(len(result))
+    total_weight = np.zeros(len(result))
+    for factor, rank_column, weight_key in factor_ranks:
+        result[rank_column] = by_date[factor].rank(pct=True, na_option='keep') * 100
+        has_value = result[factor].notna().to_numpy()
+        rank = result[rank_column].to_numpy(dtype=np.float64)
+        weight = weights[weight_key]
+        weighted_sum += np.where(has_value & ~np.isnan(rank), rank * weight, 0.0)
+        total_weight += weight * has_value
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['g_score'] = np.where(total_weight == 0, 0.0, weighted_sum / total_weight)
+
+    return result[RESULT_COLUMNS]
+
+
+def universe_frame(universes: Dict[str, Iterable[str]]) -> pd.DataFrame:
+    """{calc_date: 股票代码列表} 展开为 (calc_date, ts_code)"""
+    frames = [
+        pd.DataFrame({'calc_date': calc_date, 'ts_code': list(codes)})
+        for calc_date, codes in universes.items()
+    ]
+    if not frames:
+        return pd.DataFrame(columns=['calc_date', 'ts_code'])
+    return pd.concat(frames, ignore_index=True)
@@ -43,7 +43,9 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 import time
 
+from alphahome.fetchers.tools.calendar import get_trade_calendar_index_sync
 from research.tools.context import ResearchContext
+from research.pgs_factor.processors import g_factor_panel_engine as panel_engine
 
 
 class ProductionGFactorCalculator:
@@ -752,7 +754,8 @@ class ProductionGFactorCalculator:
         self,
         start_date: str,
         end_date: str,
-        mode: Optional[str] = None
+        mode: Optional[str] = None,
+        engine: str = 'panel'
     ) -> Dict[str, Any]:
         """基于日期范围的批量G因子计算 (为runner脚本提供的接口)
 
@@ -760,6 +763,8 @@ class ProductionGFactorCalculator:
             start_date: 开始日期
             end_date: 结束日期
             mode: 执行模式 ('incremental', 'backfill', None为自动检测)
+            engine: 'panel' 一次加载P因子历史、全部日期面板计算（默认）；
+                    'per_date' 逐日查询与逐股票计算
 
         Returns:
             执行结果统计
@@ -789,36 +794,14 @@ class ProductionGFactorCalculator:
 
         # 3. 执行批量计算
         total_start = time.time()
-        total_success = 0
-        total_failed = 0
-        per_date_stats: Dict[str, Dict[str, int]] = {}
-
-        for i, calc_date in enumerate(calc_dates, 1):
-            self.logger.info(f"\n进度: [{i}/{len(calc_dates)}] 处理日期: {calc_date}")
-
-            try:
-                # 获取在交易股票列表
-                stock_codes = self._get_trading_stock_codes(calc_date)
-
-                if not stock_codes:
-                    self.logger.warning(f"{calc_date} 未找到在交易股票")
-                    continue
-
-                # 执行G因子计算
-                result = self.calculate_g_factors_pit(calc_date, stock_codes)
-                total_success += result['success_count']
-                total_failed += result['failed_count']
-                per_date_stats[calc_date] = {
-                    'success': result['success_count'],
-                    'failed': result['failed_count'],
-                    'total': result['success_count'] + result['failed_count']
-                }
-
-                self.logger.info(f"{calc_date} 计算完成: 成功 {result['success_count']}, 失败 {result['failed_count']}")
-
-            except Exception as e:
-                self.logger.error(f"{calc_date} 计算失败: {e}")
-                total_failed += len(stock_codes) if 'stock_codes' in locals() else 0
+        if engine == 'panel':
+            per_date_stats = self._calculate_batch_panel(calc_dates)
+        elif engine == 'per_date':
+            per_date_stats = self._calculate_batch_per_date(calc_dates)
+        else:
+            raise ValueError(f"未知的计算引擎: {engine}（可选 'panel' / 'per_date'）")
+        total_success = sum(s['success'] for s in per_date_stats.values())
+        total_failed = sum(s['failed'] for s in per_date_stats.values())
 
         total_time = time.time() - total_start
 
@@ -861,6 +844,94 @@ class ProductionGFactorCalculator:
             'total_records_saved': total_success
         }
 
+    def _calculate_batch_per_date(self, calc_dates: List[str]) -> Dict[str, Dict[str, int]]:
+        """逐日查询在交易股票并逐日计算G因子（per_date 引擎）
+
+        Returns:
+            {calc_date: {'success', 'failed', 'total'}}
+        """
+        per_date_stats: Dict[str, Dict[str, int]] = {}
+        for i, calc_date in enumerate(calc_dates, 1):
+            self.logger.info(f"\n进度: [{i}/{len(calc_dates)}] 处理日期: {calc_date}")
+
+            stock_codes: List[str] = []
+            try:
+                # 获取在交易股票列表
+                stock_codes = self._get_trading_stock_codes(calc_date)
+
+                if not stock_codes:
+                    self.logger.warning(f"{calc_date} 未找到在交易股票")
+                    continue
+
+                # 执行G因子计算
+                result = self.calculate_g_factors_pit(calc_date, stock_codes)
+                per_date_stats[calc_date] = {
+                    'success': result['success_count'],
+                    'failed': result['failed_count'],
+                    'total': result['success_count'] + result['failed_count']
+                }
+
+                self.logger.info(f"{calc_date} 计算完成: 成功 {result['success_count']}, 失败 {result['failed_count']}")
+
+            except Exception as e:
+                self.logger.error(f"{calc_date} 计算失败: {e}")
+                if stock_codes:
+                    per_date_stats[calc_date] = {'success': 0, 'failed': len(stock_codes), 'total': len(stock_codes)}
+
+        return per_date_stats
+
+    def _calculate_batch_panel(self, calc_dates: List[str]) -> Dict[str, Dict[str, int]]:
+        """面板模式：整个日期区间只加载一次P因子历史，一次计算全部日期后逐日保存
+
+        Returns:
+            {calc_date: {'success', 'failed', 'total'}}
+        """
+        universes: Dict[str, List[str]] = {}
+        for calc_date in calc_dates:
+            stock_codes = self._get_trading_stock_codes(calc_date)
+            if stock_codes:
+                universes[calc_date] = stock_codes
+            else:
+                self.logger.warning(f"{calc_date} 未找到在交易股票")
+        if not universes:
+            return {}
+
+        all_codes = sorted({code for codes in universes.values() for code in codes})
+        query_start = time.time()
+        history = panel_engine.load_p_factor_history(
+            self.context, all_codes, min(universes), max(universes)
+        )
+        self.stats['query_time'] = time.time() - query_start
+        self.logger.info(f"面板模式: {len(universes)} 个日期, {len(all_codes)} 只股票, {len(history)} 条P因子历史")
+
+        calc_start = time.time()
+        panel = panel_engine.compute_g_factor_panel(
+            history,
+            panel_engine.universe_frame(universes),
+            es_params=self.es_params,
+            subfactor_weights=self.subfactor_weights,
+        )
+        self.stats['calculation_time'] = time.time() - calc_start
+
+        per_date_stats: Dict[str, Dict[str, int]] = {}
+        frames = {d: f for d, f in panel.groupby('calc_date', sort=False)} if not panel.empty else {}
+        save_start = time.time()
+        for calc_date, stock_codes in universes.items():
+            frame = frames.get(calc_date)
+            if frame is None or frame.empty:
+                self.logger.warning(f"在时点 {calc_date} 未找到P因子历史数据")
+                success = 0
+            else:
+                success = self._save_g_factor_results_pit(frame.reset_index(drop=True), calc_date)
+            per_date_stats[calc_date] = {
+                'success': success,
+                'failed': len(stock_codes) - success,
+                'total': len(stock_codes),
+            }
+            self.logger.info(f"{calc_date} 计算完成: 成功 {success}, 失败 {len(stock_codes) - success}")
+        self.stats['save_time'] = time.time() - save_start
+        return per_date_stats
+
     def detect_execution_mode(self, start_date: str, end_date: str) -> str:
         """智能检测执行模式
 
@@ -903,49 +974,38 @@ class ProductionGFactorCalculator:
         Returns:
             计算日期列表
         """
-        # 生成所有周五日期
-        all_fridays = self._generate_friday_dates(start_date, end_date)
+        # 生成每周最后一个交易日
+        week_end_dates = self._generate_week_end_dates(start_date, end_date)
 
         if mode == 'backfill':
             # 回填模式：计算所有日期
-            return all_fridays
+            return week_end_dates
         elif mode == 'incremental':
             # 增量模式：只计算缺失的日期
-            return self._filter_missing_dates(all_fridays)
+            return self._filter_missing_dates(week_end_dates)
         else:
             self.logger.warning(f"未知执行模式: {mode}，使用增量模式")
-            return self._filter_missing_dates(all_fridays)
+            return self._filter_missing_dates(week_end_dates)
 
-    def _generate_friday_dates(self, start_date: str, end_date: str) -> List[str]:
-        """生成指定范围内的所有周五日期
+    def _generate_week_end_dates(self, start_date: str, end_date: str) -> List[str]:
+        """生成指定范围内每周的最后一个交易日
+
+        基于进程级交易日历索引：通常为周五，周五休市时为该周最后一个交易日；
+        周末交易日晚于 end_date 的周（尚未结束）不包含在内。
 
         Args:
             start_date: 开始日期
             end_date: 结束日期
 
         Returns:
-            周五日期列表
+            每周最后一个交易日列表 (YYYY-MM-DD)
         """
-        from datetime import datetime, timedelta
-
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-
-        fridays = []
-        current = start
-
-        # 找到第一个周五
-        while current.weekday() != 4:  # 4 = 周五
-            current += timedelta(days=1)
-            if current > end:
-                break
-
-        # 收集所有周五
-        while current <= end:
-            fridays.append(current.strftime('%Y-%m-%d'))
-            current += timedelta(days=7)
+        index = get_trade_calendar_index_sync(self.db_manager)
+        if index is None:
+            raise RuntimeError("无法加载交易日历，无法生成计算日期")
 
-        return fridays
+        week_ends = index.period_end_trade_days(start_date, end_date, freq='W')
+        return [f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in week_ends]
 
     def _filter_missing_dates(self, dates: List[str]) -> List[str]:
         """过滤出缺失G因子数据的日期
@@ -52,6 +52,7 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 import time
 
+from alphahome.fetchers.tools.calendar import get_trade_calendar_index_sync
 from research.tools.context import ResearchContext
 
 
@@ -335,49 +336,38 @@ class ProductionPFactorCalculator:
         Returns:
             计算日期列表
         """
-        # 生成所有周五日期
-        all_fridays = self._generate_friday_dates(start_date, end_date)
+        # 生成每周最后一个交易日
+        week_end_dates = self._generate_week_end_dates(start_date, end_date)
 
         if mode == 'backfill':
             # 回填模式：计算所有日期
-            return all_fridays
+            return week_end_dates
         elif mode == 'incremental':
             # 增量模式：只计算缺失的日期
-            return self._filter_missing_dates(all_fridays)
+            return self._filter_missing_dates(week_end_dates)
         else:
             self.logger.warning(f"未知执行模式: {mode}，使用增量模式")
-            return self._filter_missing_dates(all_fridays)
+            return self._filter_missing_dates(week_end_dates)
 
-    def _generate_friday_dates(self, start_date: str, end_date: str) -> List[str]:
-        """生成指定范围内的所有周五日期
+    def _generate_week_end_dates(self, start_date: str, end_date: str) -> List[str]:
+        """生成指定范围内每周的最后一个交易日
+
+        基于进程级交易日历索引：通常为周五，周五休市时为该周最后一个交易日；
+        周末交易日晚于 end_date 的周（尚未结束）不包含在内。
 
         Args:
             start_date: 开始日期
             end_date: 结束日期
 
         Returns:
-            周五日期列表
+            每周最后一个交易日列表 (YYYY-MM-DD)
         """
-        from datetime import datetime, timedelta
-
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-
-        fridays = []
-        current = start
-
-        # 找到第一个周五
-        while current.weekday() != 4:  # 4 = 周五
-            current += timedelta(days=1)
-            if current > end:
-                break
-
-        # 收集所有周五
-        while current <= end:
-            fridays.append(current.strftime('%Y-%m-%d'))
-            current += timedelta(days=7)
+        index = get_trade_calendar_index_sync(self.db_manager)
+        if index is None:
+            raise RuntimeError("无法加载交易日历，无法生成计算日期")
 
-        return fridays
+        week_ends = index.period_end_trade_days(start_date, end_date, freq='W')
+        return [f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in week_ends]
 
     def _filter_missing_dates(self, dates: List[str]) -> List[str]:
         """过滤出缺失P因子数据的日期
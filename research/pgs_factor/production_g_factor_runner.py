@@ -371,7 +371,7 @@ def main():
         if args.validate_only:
             # 仅验证模式
             print("🔍 数据质量验证模式")
-            calc_dates = runner.calculator._generate_friday_dates(args.start_date, args.end_date)
+            calc_dates = runner.calculator._generate_week_end_dates(args.start_date, args.end_date)
             runner.calculator._validate_calculation_results(calc_dates)
             return
 
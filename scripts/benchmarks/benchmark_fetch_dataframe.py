@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+查询结果解码基准测试
+
+在真实数据库上对比两种读取 tushare.stock_daily 的方式：
+- records:   fetch 返回 Record 列表 → pd.DataFrame → 逐列 pd.to_numeric / pd.to_datetime（历史写法）
+- columnar:  fetch_dataframe（COPY CSV 输出按列解码为 float64 / datetime64）
+
+两种结果会先校验数值一致，再统计耗时与峰值内存。
+
+使用方法:
+    python scripts/benchmarks/benchmark_fetch_dataframe.py
+    python scripts/benchmarks/benchmark_fetch_dataframe.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到 sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from alphahome.common.config_manager import get_database_url
+from alphahome.common.db_manager import DBManager
+
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount"]
+
+QUERY = """
+SELECT ts_code, trade_date, open, high, low, close, pre_close, change, pct_chg,
+       volume AS vol, amount
+FROM tushare.stock_daily
+ORDER BY trade_date DESC, ts_code
+LIMIT {rows}
+"""
+
+
+async def load_records(db: DBManager, query: str) -> pd.DataFrame:
+    rows = await db.fetch(query)
+    df = pd.DataFrame([dict(r) for r in rows])
+    df["trade_date"] = pd.to_datetime(df["trade_date"])
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+async def load_columnar(db: DBManager, query: str) -> pd.DataFrame:
+    return await db.fetch_dataframe(query)
+
+
+async def measure(loader, db: DBManager, query: str, repeat: int):
+    timings, peaks, df = [], [], None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        df = await loader(db, query)
+        timings.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return df, statistics.median(timings), max(peaks)
+
+
+async def run(rows: int, repeat: int) -> int:
+    db = DBManager(os.environ.get("DATABASE_URL") or get_database_url())
+    await db.connect()
+    try:
+        query = QUERY.format(rows=rows)
+        expected, records_time, records_peak = await measure(load_records, db, query, repeat)
+        actual, columnar_time, columnar_peak = await measure(load_columnar, db, query, repeat)
+    finally:
+        await db.close()
+
+    # 校验：行数、日期与数值列一致
+    assert len(expected) == len(actual), f"行数不一致: {len(expected)} != {len(actual)}"
+    assert (expected["trade_date"].to_numpy() == actual["trade_date"].to_numpy()).all()
+    for col in NUMERIC_COLUMNS:
+        assert actual[col].dtype == np.float64, f"{col} 未解码为 float64: {actual[col].dtype}"
+        np.testing.assert_allclose(expected[col].to_numpy(), actual[col].to_numpy(), equal_nan=True)
+
+    print(f"行数: {len(actual):,}")
+    print(f"records  耗时 {records_time:.3f}s  峰值内存 {records_peak / 2**20:,.0f} MiB")
+    print(f"columnar 耗时 {columnar_time:.3f}s  峰值内存 {columnar_peak / 2**20:,.0f} MiB")
+    print(f"加速: {records_time / max(columnar_time, 1e-9):.1f}x")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="fetch_dataframe 列式解码基准测试")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="读取行数")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式运行次数（取中位数）")
+    args = parser.parse_args()
+    return asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
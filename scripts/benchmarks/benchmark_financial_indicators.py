@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+财务指标计算基准测试
+
+对比 FinancialIndicatorsCalculator 的逐股路径（engine='per_stock' 使用的
+_calculate_batch_indicators）与列式引擎（engine='vectorized'），
+使用仿 _fetch_pit_data_batch 输出结构的合成全市场数据（不访问数据库），
+校验入库前（_clean_indicators_data 之后）的记录一致并统计耗时。
+
+使用方法:
+    python scripts/benchmarks/benchmark_financial_indicators.py
+    python scripts/benchmarks/benchmark_financial_indicators.py --stocks 5000 --repeat 3
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 添加项目根目录到 sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.production.data_updaters.pit.calculators.financial_indicators_calculator import (
+    FinancialIndicatorsCalculator,
+)
+
+SAVE_COLUMNS = [
+    'ts_code', 'end_date', 'ann_date', 'data_source',
+    'gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm',
+    'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
+    'asset_turnover_ttm', 'equity_multiplier',
+    'debt_to_asset_ratio', 'equity_ratio',
+    'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
+    'data_quality', 'calculation_status',
+    'data_completeness', 'balance_sheet_lag',
+]
+SOURCES = ['report', 'express', 'forecast', 'forecast_direct']
+
+
+def build_pit_frame(stocks: int, as_of: date, seed: int = 7) -> pd.DataFrame:
+    """构造与 _fetch_pit_data_batch 输出结构相近的合成数据（Decimal 数值、date 日期）"""
+    rng = np.random.default_rng(seed)
+    quarter_ends = [d.date() for d in pd.date_range(as_of - timedelta(days=760), as_of, freq='QE')][::-1]
+    rows = []
+    for i in range(stocks):
+        code = f"{i:06d}.SZ"
+        assets = None if rng.random() < 0.05 else Decimal(str(round(rng.uniform(1e8, 1e11), 2)))
+        equity = None if assets is None else Decimal(str(round(float(assets) * rng.uniform(-0.2, 0.9), 2)))
+        scale = rng.uniform(1e6, 1e10)
+        kept = [d for d in quarter_ends if rng.random() > 0.15]
+        announce_today = rng.random() < 0.6
+        for j, end in enumerate(kept):
+            source = SOURCES[int(rng.choice(4, p=[0.7, 0.1, 0.1, 0.1]))]
+            ann = as_of if (announce_today and j < 2) else min(as_of, end + timedelta(days=int(rng.integers(20, 120))))
+
+            def _value(low, high):
+                if rng.random() < 0.05:
+                    return None
+                return Decimal(str(round(scale * rng.uniform(low, high), 2)))
+
+            rows.append({
+                'ts_code': code,
+                'end_date': end,
+                'ann_date': ann,
+                'data_source': source,
+                'revenue': _value(-0.05, 1.0),
+                'n_income_attr_p': _value(-0.3, 0.3),
+                'oper_cost': _value(0.0, 0.9),
+                'operate_profit': _value(-0.3, 0.4),
+                'conversion_status': 'RPT_ORIG' if rng.random() < 0.05 else 'SINGLE',
+                'tot_assets': assets,
+                'tot_equity': equity,
+                'balance_end_date': quarter_ends[0],
+                'data_completeness': 'complete' if end == quarter_ends[0] else 'estimated',
+                'balance_sheet_lag': (quarter_ends[0] - end).days,
+            })
+    return pd.DataFrame(rows)
+
+
+class _BenchmarkContext:
+    """替代 ResearchContext：forecast 营收增长回填查询返回固定结果"""
+
+    def __init__(self, fill_values):
+        self.db_manager = None
+        self.fill_values = fill_values
+
+    def query_dataframe(self, query, params=None):
+        codes = params[0] if isinstance(params[0], list) else [params[0]]
+        rows = [
+            {'ts_code': c, 'data_source': 'report', 'revenue_yoy_growth': self.fill_values[c]}
+            for c in codes if c in self.fill_values
+        ]
+        return pd.DataFrame(rows, columns=['ts_code', 'data_source', 'revenue_yoy_growth'])
+
+
+def build_calculator(pit_data: pd.DataFrame, saved: list) -> FinancialIndicatorsCalculator:
+    """构造不访问数据库的计算器：取数返回 pit_data，保存时记录清洗后的 DataFrame"""
+    codes = pit_data['ts_code'].unique()
+    context = _BenchmarkContext({c: float(k % 7) * 10 for k, c in enumerate(codes) if k % 2 == 0})
+    calculator = FinancialIndicatorsCalculator(context)
+    calculator.logger.setLevel(logging.CRITICAL)
+    calculator.enable_cache = False
+    calculator._get_pit_data_for_calculation = (
+        lambda as_of_date, stock_codes: pit_data[pit_data['ts_code'].isin(stock_codes)].reset_index(drop=True)
+    )
+
+    def _save(indicators_list):
+        df = pd.DataFrame(indicators_list)
+        for col in SAVE_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        saved.append(calculator._clean_indicators_data(df, SAVE_COLUMNS)[SAVE_COLUMNS])
+
+    calculator._save_indicators_batch = _save
+    return calculator
+
+
+def run_engine(pit_data: pd.DataFrame, as_of: str, engine: str) -> pd.DataFrame:
+    saved = []
+    calculator = build_calculator(pit_data, saved)
+    codes = sorted(pit_data['ts_code'].unique().tolist())
+    calculator.calculate_indicators_for_date(
+        as_of, stock_codes=codes, batch_size=1000, engine=engine, use_parallel=False
+    )
+    if not saved:
+        return pd.DataFrame(columns=SAVE_COLUMNS)
+    result = pd.concat(saved, ignore_index=True)
+    result['ann_date'] = result['ann_date'].astype(str)
+    result['end_date'] = result['end_date'].astype(str)
+    return result.sort_values(['ts_code', 'end_date', 'data_source']).reset_index(drop=True)
+
+
+def _time_it(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="财务指标计算基准测试")
+    parser.add_argument("--stocks", type=int, default=2000, help="合成股票数量")
+    parser.add_argument("--as-of", default="2024-04-30", help="计算日期")
+    parser.add_argument("--repeat", type=int, default=1, help="重复次数（取最优）")
+    args = parser.parse_args()
+
+    as_of = pd.to_datetime(args.as_of).date()
+    pit_data = build_pit_frame(args.stocks, as_of)
+    print(f"数据规模: {args.stocks:,} 只股票, {len(pit_data):,} 行")
+
+    legacy = run_engine(pit_data, args.as_of, 'per_stock')
+    vectorized = run_engine(pit_data, args.as_of, 'vectorized')
+    try:
+        pd.testing.assert_frame_equal(legacy, vectorized, check_dtype=False, rtol=1e-9)
+    except AssertionError as e:
+        print(f"❌ 输出不一致：列式引擎结果与逐股路径不同\n{e}")
+        return 1
+    print(f"✅ 输出一致性校验通过 ({len(legacy):,} 条当日记录)")
+
+    t_legacy = _time_it(lambda: run_engine(pit_data, args.as_of, 'per_stock'), args.repeat)
+    t_vectorized = _time_it(lambda: run_engine(pit_data, args.as_of, 'vectorized'), args.repeat)
+
+    print(f"逐股路径: {t_legacy:.3f}s ({args.stocks / t_legacy:,.0f} 股/秒)")
+    print(f"列式引擎: {t_vectorized:.3f}s ({args.stocks / t_vectorized:,.0f} 股/秒)")
+    print(f"加速比: {t_legacy / t_vectorized:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+任务注册表启动耗时基准测试
+
+在全新解释器中分别测量：
+- manifest: import alphahome.fetchers 后经 UnifiedTaskFactory 读取任务清单列出全部任务
+  （`ah prod list` / GUI 任务列表的路径，不导入任务模块）
+- eager:    导入清单中的全部任务模块完成注册后再列出任务（此前 import alphahome.fetchers 的行为）
+
+输出每种方式的耗时中位数、列出的任务数以及 sys.modules 中的模块数。
+
+使用方法:
+    python scripts/benchmarks/benchmark_task_registry_startup.py
+    python scripts/benchmarks/benchmark_task_registry_startup.py --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# 项目根目录（子进程中加入 sys.path）
+project_root = Path(__file__).resolve().parent.parent.parent
+
+SCENARIOS = {
+    "manifest": """
+from alphahome.common.task_system import UnifiedTaskFactory
+import alphahome.fetchers
+names = list(UnifiedTaskFactory._get_task_meta())
+""",
+    "eager": """
+import importlib
+from alphahome.common.task_system import UnifiedTaskFactory
+import alphahome.fetchers
+for entry in UnifiedTaskFactory._get_manifest().values():
+    importlib.import_module(entry["module"])
+names = list(UnifiedTaskFactory._task_registry)
+""",
+}
+
+RUNNER = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+_start = time.perf_counter()
+{body}
+print(json.dumps({{"seconds": time.perf_counter() - _start, "tasks": len(names), "modules": len(sys.modules)}}))
+"""
+
+
+def run_once(name: str) -> dict:
+    code = RUNNER.format(root=str(project_root), body=SCENARIOS[name])
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="任务注册表启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式运行次数（取中位数）")
+    args = parser.parse_args()
+
+    results = {}
+    for name in SCENARIOS:
+        runs = [run_once(name) for _ in range(args.repeat)]
+        results[name] = {
+            "seconds": statistics.median(r["seconds"] for r in runs),
+            "tasks": runs[-1]["tasks"],
+            "modules": runs[-1]["modules"],
+        }
+        print(
+            f"{name:<9} 耗时 {results[name]['seconds']:.3f}s  "
+            f"任务数 {results[name]['tasks']:>4}  已加载模块 {results[name]['modules']:>5}"
+        )
+
+    if results["manifest"]["tasks"] != results["eager"]["tasks"]:
+        print("⚠️ 清单任务数与导入注册的任务数不一致，请重新生成 task_manifest.json")
+        return 1
+    speedup = results["eager"]["seconds"] / max(results["manifest"]["seconds"], 1e-9)
+    print(f"启动加速: {speedup:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ Features 模块初始化脚本
     python scripts/features_init.py                    # 仅初始化 schema 和元数据表
     python scripts/features_init.py --create-views     # 同时创建物化视图
     python scripts/features_init.py --check            # 仅检查初始化状态
+    python scripts/features_init.py --refresh          # 按依赖顺序并发刷新全部特征
 """
 
 import argparse
@@ -24,6 +25,7 @@ from alphahome.common.db_manager import DBManager
 from alphahome.common.config_manager import get_database_url
 from alphahome.features.storage.database_init import FeaturesDatabaseInit
 from alphahome.features.storage.base_view import BaseFeatureView
+from alphahome.features.storage.refresh_orchestrator import FeatureRefreshOrchestrator
 
 # 配置日志
 logging.basicConfig(
@@ -246,6 +248,33 @@ async def main(args: argparse.Namespace) -> int:
             if results["failed"]:
                 return 1
 
+        # 刷新全部特征
+        if args.refresh:
+            logger.info("开始刷新全部特征...")
+            orchestrator = FeatureRefreshOrchestrator(
+                db_manager=db_manager, max_concurrency=args.max_concurrency
+            )
+            summary = await orchestrator.refresh(
+                get_all_view_classes(), strategy=args.strategy
+            )
+            print("\n" + "=" * 60)
+            print("特征刷新结果")
+            print("=" * 60)
+            print(f"成功: {summary['success_count']} 个, 失败: {summary['fail_count']} 个")
+            for result in summary["results"]:
+                if result.get("status") != "success":
+                    error = result.get("error_message") or result.get("error")
+                    print(f"  FAIL {result.get('name')}: {error}")
+            print(
+                f"耗时: {summary['wall_seconds']:.1f}s "
+                f"(串行 {summary['serial_seconds']:.1f}s, "
+                f"节省 {summary['time_saved_seconds']:.1f}s)"
+            )
+            print("=" * 60 + "\n")
+
+            if summary["fail_count"]:
+                return 1
+
         logger.info("初始化完成")
         return 0
 
@@ -268,6 +297,7 @@ def parse_args() -> argparse.Namespace:
     python scripts/features_init.py                    # 仅初始化 schema 和元数据表
     python scripts/features_init.py --create-views     # 同时创建物化视图
     python scripts/features_init.py --check            # 仅检查初始化状态
+    python scripts/features_init.py --refresh --max-concurrency 6
         """
     )
 
@@ -283,6 +313,26 @@ def parse_args() -> argparse.Namespace:
         help="仅检查初始化状态"
     )
 
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="按依赖顺序并发刷新全部特征"
+    )
+
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="同时刷新的特征数上限（默认 4）"
+    )
+
+    parser.add_argument(
+        "--strategy",
+        choices=["default", "full", "incremental"],
+        default="default",
+        help="刷新策略（默认使用各配方自身策略）"
+    )
+
     return parser.parse_args()
 
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+审计数据水位目录 (meta.table_watermarks)
+
+逐表扫描任务清单中各任务对应的数据表，与水位目录中的记录（最新日期、最新 update_time、行数）比对，
+列出缺失或不一致的记录；指定 --repair 时用扫描结果重建记录。
+
+写入路径在同一事务内推进水位；其他途径的写入由原表上的触发器标记为过期（stale），
+读取方会回退到扫描原表，下次任务写入前自动重新播种。以下情况可运行本脚本：
+- 首次启用水位目录或升级目录结构后，批量回填（--repair）各表记录，避免读取时扫描原表
+- 在任务系统之外删除/改写了表数据（DELETE、TRUNCATE、手工 SQL 修复等）后立即修复
+- 表被删除后以非 create_table_from_schema 的方式重建
+
+使用方法:
+    python scripts/maintenance/audit_table_watermarks.py
+    python scripts/maintenance/audit_table_watermarks.py --tasks tushare_stock_daily tushare_fund_nav
+    python scripts/maintenance/audit_table_watermarks.py --repair
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from alphahome.common.config_manager import get_database_url
+from alphahome.common.db_manager import DBManager
+from alphahome.common.task_system.task_manifest import load_manifest
+
+
+def setup_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
+async def audit(task_names: list[str] | None, repair: bool) -> int:
+    logger = logging.getLogger(__name__)
+
+    manifest = load_manifest()
+    if task_names:
+        unknown = sorted(set(task_names) - set(manifest))
+        if unknown:
+            logger.error(f"任务清单中不存在: {unknown}")
+            return 2
+        manifest = {name: manifest[name] for name in task_names}
+
+    # 清单条目本身即可作为 TableNameResolver 的目标（含 data_source / table_name）
+    targets = [
+        (entry, entry["date_column"])
+        for entry in manifest.values()
+        if entry.get("table_name") and entry.get("date_column")
+    ]
+
+    db_url = os.environ.get("DATABASE_URL") or get_database_url()
+    db_manager = DBManager(db_url)
+    try:
+        await db_manager.connect()
+        if not await db_manager.ensure_watermark_catalog():
+            logger.error("水位目录不可用，无法审计")
+            return 2
+
+        logger.info(f"开始审计 {len(targets)} 张表的水位记录{'（修复模式）' if repair else ''}...")
+        issues = await db_manager.audit_table_watermarks(targets, repair=repair)
+    finally:
+        await db_manager.close()
+
+    for issue in issues:
+        catalog = issue["catalog"] or {}
+        actual = issue["actual"] or {}
+        print(
+            f"[{issue['status']:<13}] {issue['schema']}.{issue['table']}: "
+            f"目录 max_date={catalog.get('max_date')} rows={catalog.get('row_count')} | "
+            f"实际 max_date={actual.get('max_date')} rows={actual.get('row_count')}"
+        )
+
+    drift = [i for i in issues if i["status"] != "unsupported"]
+    print(f"\n共审计 {len(targets)} 张表，发现 {len(drift)} 条偏差，{len(issues) - len(drift)} 张表日期列类型不受支持")
+    if drift and repair:
+        print("已按实际扫描结果修复上述记录")
+    return 1 if drift and not repair else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="审计数据水位目录 meta.table_watermarks")
+    parser.add_argument("--tasks", nargs="+", help="仅审计指定任务（默认全部任务）")
+    parser.add_argument("--repair", action="store_true", help="用扫描结果修复缺失/不一致的记录")
+    args = parser.parse_args()
+
+    setup_logging()
+    return asyncio.run(audit(args.tasks, args.repair))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
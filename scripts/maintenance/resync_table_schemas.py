@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+清除表结构注册表 (meta.table_schema_registry)，强制任务在下次保存时重新同步表结构
+
+BaseTask 保存数据前会比对任务的结构指纹（schema_def / 主键 / 索引等）与注册表记录，
+一致时跳过建表检查、结构兼容处理和 rawdata 视图 DDL。以下情况需要运行本脚本：
+- 在任务系统之外修改了表结构或 rawdata 视图（手工迁移、恢复备份等）
+- 新增了 tushare 同名表，需要让其他数据源的 rawdata 视图重新判断优先级
+
+注意：已在运行的进程保留进程内缓存，重启后生效。
+
+使用方法:
+    python scripts/maintenance/resync_table_schemas.py
+    python scripts/maintenance/resync_table_schemas.py --tasks tushare_stock_daily tushare_fund_nav
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from alphahome.common.config_manager import get_database_url
+from alphahome.common.db_manager import DBManager
+from alphahome.common.task_system.task_manifest import load_manifest
+
+
+def setup_logging() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
+async def resync(task_names: list[str] | None) -> int:
+    logger = logging.getLogger(__name__)
+
+    targets = None
+    if task_names:
+        manifest = load_manifest()
+        unknown = sorted(set(task_names) - set(manifest))
+        if unknown:
+            logger.error(f"任务清单中不存在: {unknown}")
+            return 2
+        # 清单条目本身即可作为 TableNameResolver 的目标（含 data_source / table_name）
+        targets = [manifest[name] for name in task_names if manifest[name].get("table_name")]
+
+    db_url = os.environ.get("DATABASE_URL") or get_database_url()
+    db_manager = DBManager(db_url)
+    try:
+        await db_manager.connect()
+        if not await db_manager.ensure_schema_registry():
+            logger.error("表结构注册表不可用")
+            return 2
+
+        if targets is None:
+            await db_manager.invalidate_schema_registry()
+        else:
+            for target in targets:
+                await db_manager.invalidate_schema_registry(target)
+                schema, table = db_manager.resolver.get_schema_and_table(target)
+                logger.info(f"已清除 {schema}.{table} 的结构指纹")
+    finally:
+        await db_manager.close()
+
+    print("下次保存时将重新同步上述表的结构")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="清除表结构注册表 meta.table_schema_registry")
+    parser.add_argument("--tasks", nargs="+", help="仅清除指定任务的记录（默认全部）")
+    args = parser.parse_args()
+
+    setup_logging()
+    return asyncio.run(resync(args.tasks))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
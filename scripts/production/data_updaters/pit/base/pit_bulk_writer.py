@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PIT / 因子表批量写入
+====================
+
+DataFrame 以 CSV 流经 COPY 写入临时 staging 表，再用一条 INSERT ... SELECT ... ON CONFLICT
+合并到目标表，整个过程在同一事务内完成。新增/更新条数由 RETURNING (xmax = 0) 区分
+（新插入行的 xmax 为 0，冲突更新的行不为 0）。
+
+使用 DBManager 同步模式的线程本地 psycopg2 连接，可在线程池中并发调用。
+"""
+
+import io
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+INTEGER_TYPES = ('smallint', 'integer', 'bigint')
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def encode_csv(data: pd.DataFrame, fields: List[str], integer_columns: Iterable[str] = ()) -> io.StringIO:
+    """
+    按列编码为 COPY CSV 流：缺失值与空串写为 NULL；目标为整数列的浮点列（NaN 导致的 2024.0）转回整数。
+    """
+    frame = data[fields].copy()
+    for c in set(integer_columns) & set(fields):
+        if not pd.api.types.is_integer_dtype(frame[c]):
+            frame[c] = pd.to_numeric(frame[c], errors='coerce').round().astype('Int64')
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep='')
+    buffer.seek(0)
+    return buffer
+
+
+def build_merge_sql(target: str, staging: str, fields: List[str],
+                    conflict_fields: Optional[List[str]] = None,
+                    update_fields: Optional[List[str]] = None,
+                    touch_updated_at: bool = True) -> str:
+    """staging -> target 的合并语句，返回 (inserted, updated) 一行"""
+    col_list = ', '.join(_quote(c) for c in fields)
+    conflict_clause = ''
+    returning = 'TRUE'
+    if conflict_fields:
+        if update_fields is None:
+            update_fields = [c for c in fields if c not in conflict_fields]
+        assignments = [f'{_quote(c)} = EXCLUDED.{_quote(c)}' for c in update_fields]
+        if touch_updated_at:
+            assignments.append('updated_at = CURRENT_TIMESTAMP')
+        keys = ', '.join(_quote(c) for c in conflict_fields)
+        if assignments:
+            conflict_clause = f"ON CONFLICT ({keys}) DO UPDATE SET {', '.join(assignments)}"
+        else:
+            conflict_clause = f"ON CONFLICT ({keys}) DO NOTHING"
+        returning = '(xmax = 0)'
+    return f"""
+    WITH merged AS (
+        INSERT INTO {target} ({col_list})
+        SELECT {col_list} FROM {staging}
+        {conflict_clause}
+        RETURNING {returning} AS inserted
+    )
+    SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM merged
+    """
+
+
+def bulk_upsert(db_manager, data: pd.DataFrame, schema: str, table: str, fields: List[str],
+                conflict_fields: Optional[List[str]] = None,
+                update_fields: Optional[List[str]] = None,
+                touch_updated_at: bool = True) -> Dict[str, int]:
+    """
+    COPY + 单条集合式 UPSERT 写入 schema.table。
+
+    Args:
+        db_manager: 同步模式的 DBManager
+        data: 待写入数据，需包含 fields 全部列
+        fields: 写入列
+        conflict_fields: 冲突键；为空时直接插入（不做 UPSERT）
+        update_fields: 冲突时更新的列，默认 fields 中除冲突键外的全部列
+        touch_updated_at: 冲突更新时是否同时刷新 updated_at
+
+    同一冲突键在 data 中出现多次时只保留最后一条（与逐行 UPSERT 的最终结果一致）。
+    失败时回滚并抛出异常。
+
+    Returns:
+        {'inserted': 新增条数, 'updated': 更新条数}
+    """
+    if data is None or data.empty:
+        return {'inserted': 0, 'updated': 0}
+    if conflict_fields:
+        data = data.drop_duplicates(subset=conflict_fields, keep='last')
+
+    target = f'{_quote(schema)}.{_quote(table)}'
+    staging = _quote(f'_stg_{table}')
+    col_list = ', '.join(_quote(c) for c in fields)
+
+    connection = db_manager._get_sync_connection()  # 使用受控的内部方法获取psycopg2连接
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = %s AND table_name = %s AND data_type IN %s",
+                (schema, table, INTEGER_TYPES),
+            )
+            integer_columns: Set[str] = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS "
+                f"SELECT {col_list} FROM {target} LIMIT 0"
+            )
+            cursor.copy_expert(
+                f"COPY {staging} ({col_list}) FROM STDIN WITH (FORMAT csv)",
+                encode_csv(data, fields, integer_columns),
+            )
+            cursor.execute(build_merge_sql(target, staging, fields, conflict_fields, update_fields, touch_updated_at))
+            inserted, updated = cursor.fetchone()
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return {'inserted': int(inserted), 'updated': int(updated)}
@@ -26,8 +26,10 @@ from research.tools.context import ResearchContext
 
 try:
     from .pit_config import PITConfig
+    from .pit_bulk_writer import bulk_upsert
 except ImportError:
     from pit_config import PITConfig
+    from pit_bulk_writer import bulk_upsert
 
 class PITTableManager(ABC):
     """PIT数据表管理基类"""
@@ -145,6 +147,19 @@ class PITTableManager(ABC):
         except Exception as e:
             self.logger.error(f"部署 PIT updated_at 触发器失败: {e}")
 
+    # PIT 表统一冲突键（与 _generate_create_table_sql 的唯一键一致）
+    PIT_CONFLICT_FIELDS = ['ts_code', 'end_date', 'ann_date', 'data_source']
+
+    def _bulk_upsert(self, data: pd.DataFrame, fields: List[str],
+                     conflict_fields: Optional[List[str]] = None) -> Dict[str, int]:
+        """COPY 到临时表后单条 INSERT ... ON CONFLICT 合并到当前 PIT 表，返回 inserted/updated 计数。
+        失败时整批回滚并抛出异常，由调用方决定是否回退逐行写入。
+        """
+        return bulk_upsert(
+            self.context.db_manager, data, PITConfig.PIT_SCHEMA, self.table_name, fields,
+            conflict_fields=conflict_fields or self.PIT_CONFLICT_FIELDS,
+        )
+
     def _table_exists(self, schema: str, table: str) -> bool:
         """检查表是否存在（information_schema.tables）。"""
         try:
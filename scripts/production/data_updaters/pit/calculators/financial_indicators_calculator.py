@@ -11,13 +11,22 @@ from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from typing import List, Optional, Dict, Any, Tuple
 import time
-import random
 from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
 
 from research.tools.context import ResearchContext
 
+try:
+    from . import financial_indicators_engine as indicators_engine
+except ImportError:
+    import financial_indicators_engine as indicators_engine
+
+try:
+    from ..base.pit_bulk_writer import bulk_upsert
+except ImportError:
+    from base.pit_bulk_writer import bulk_upsert
+
 
 class FinancialIndicatorsCalculator:
     """标准财务指标计算器（pit_data 版）"""
@@ -196,8 +205,16 @@ class FinancialIndicatorsCalculator:
         stock_codes: Optional[List[str]] = None,
         batch_size: int = 1000,  # 增大批次大小
         target_data_sources: Optional[List[str]] = None,
-        use_parallel: bool = True  # 是否使用并行处理
+        use_parallel: bool = True,  # 是否使用并行处理（仅 engine='per_stock'）
+        engine: str = 'vectorized'
     ) -> Dict[str, Any]:
+        """
+        计算 as_of_date 当日公告记录的财务指标。
+
+        engine:
+            'vectorized' - 全市场一次取数、列式计算（默认）
+            'per_stock'  - 原逐股票/逐记录计算（串行或线程池）
+        """
         self.stats['start_time'] = time.time()
 
         if stock_codes is None:
@@ -210,7 +227,9 @@ class FinancialIndicatorsCalculator:
                 self.logger.info(f"数据源筛选: {target_data_sources}")
 
         # 优化策略：根据数据量选择处理方式
-        if len(stock_codes) < 100 or not use_parallel:
+        if engine == 'vectorized':
+            result = self._calculate_vectorized(as_of_date, stock_codes, batch_size, target_data_sources)
+        elif len(stock_codes) < 100 or not use_parallel:
             # 小批量使用串行处理
             result = self._calculate_serial(as_of_date, stock_codes, batch_size, target_data_sources)
         else:
@@ -278,6 +297,68 @@ class FinancialIndicatorsCalculator:
 
         return self._finalize_calculation(total_success, total_failed)
 
+    def _calculate_vectorized(self, as_of_date: str, stock_codes: List[str], batch_size: int,
+                              target_data_sources: Optional[List[str]] = None) -> Dict[str, Any]:
+        """列式计算模式：全市场数据一次取出，整体计算后分批入库"""
+        if not stock_codes:
+            return self._finalize_calculation(0, 0)
+        try:
+            pit_data = self._get_pit_data_for_calculation(as_of_date, stock_codes)
+            frame = indicators_engine.compute_indicator_frame(pit_data, as_of_date, target_data_sources)
+        except Exception as e:
+            self.logger.error(f"列式计算失败: {e}")
+            return self._finalize_calculation(0, len(stock_codes))
+
+        if frame.empty:
+            return self._finalize_calculation(0, 0)
+
+        frame = self._fill_forecast_revenue_growth_frame(frame, as_of_date)
+        frame = indicators_engine.assess_data_quality_frame(frame)
+        records = indicators_engine.frame_to_records(frame)
+
+        total_success = 0
+        total_failed = 0
+        for i in range(0, len(records), batch_size):
+            batch = records[i:i + batch_size]
+            try:
+                self._save_indicators_batch(batch)
+                total_success += len(batch)
+            except Exception as e:
+                self.logger.error(f"批次保存失败: {e}")
+                total_failed += len(batch)
+
+        return self._finalize_calculation(total_success, total_failed)
+
+    def _fill_forecast_revenue_growth_frame(self, frame: pd.DataFrame, as_of_date: str) -> pd.DataFrame:
+        """批量版 _fill_forecast_revenue_growth：一次查询回填所有 forecast 记录缺失的营收增长"""
+        missing = (frame['data_source'] == 'forecast') & frame['revenue_yoy_growth'].isna()
+        if not missing.any():
+            return frame
+        codes = sorted(frame.loc[missing, 'ts_code'].unique().tolist())
+        try:
+            fill_query = """
+            SELECT DISTINCT ON (ts_code) ts_code, revenue_yoy_growth
+            FROM pgs_factors.pit_financial_indicators
+            WHERE ts_code = ANY(%s) AND ann_date <= %s
+              AND data_source IN ('express','report')
+              AND revenue_yoy_growth IS NOT NULL
+            ORDER BY ts_code, ann_date DESC,
+                     CASE data_source WHEN 'express' THEN 1 WHEN 'report' THEN 2 ELSE 3 END
+            """
+            fill_result = self.context.query_dataframe(fill_query, (codes, as_of_date))
+        except Exception as e:
+            self.logger.warning(f"批量填充forecast营收增长失败: {e}")
+            return frame
+        if fill_result is None or fill_result.empty:
+            return frame
+        fill_values = pd.Series(
+            fill_result['revenue_yoy_growth'].astype(float).to_numpy(),
+            index=fill_result['ts_code'],
+        )
+        frame = frame.copy()
+        frame.loc[missing, 'revenue_yoy_growth'] = frame.loc[missing, 'ts_code'].map(fill_values)
+        return frame
+
     def _preload_data_cache(self, as_of_date: str, stock_codes: List[str]):
         """预加载数据到缓存"""
         if not self.enable_cache:
@@ -1110,141 +1191,28 @@ class FinancialIndicatorsCalculator:
 
     def _save_indicators_optimized(self, df: pd.DataFrame) -> None:
         """
-        优化的批量插入 - 使用临时表和批量操作
+        优化的批量写入 - COPY 到临时表后单条 INSERT ... ON CONFLICT 合并
         """
+        fields = [
+            'ts_code', 'end_date', 'ann_date', 'data_source',
+            'gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm',
+            'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
+            'asset_turnover_ttm', 'equity_multiplier',
+            'debt_to_asset_ratio', 'equity_ratio',
+            'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
+            'data_quality', 'calculation_status',
+            'data_completeness', 'balance_sheet_lag'
+        ]
         try:
-            # 创建临时表并批量插入 - 使用微秒级时间戳确保唯一性
-            temp_table_name = f"temp_financial_indicators_{int(time.time() * 1000000)}_{random.randint(1000, 9999)}"
-
-            # 0. 清理可能存在的同名临时表（以防万一）
-            try:
-                cleanup_sql = f"DROP TABLE IF EXISTS {temp_table_name}"
-                self.context.db_manager.execute_sync(cleanup_sql)
-            except Exception as cleanup_error:
-                self.logger.debug(f"清理临时表 {temp_table_name} 时出现问题（可忽略）: {cleanup_error}")
-
-            # 1. 创建临时表
-            create_temp_sql = f"""
-            CREATE TEMPORARY TABLE {temp_table_name} (
-                ts_code VARCHAR(20),
-                end_date DATE,
-                ann_date DATE,
-                data_source VARCHAR(20),
-                gpa_ttm DECIMAL(10,4),
-                roe_excl_ttm DECIMAL(10,4),
-                roa_excl_ttm DECIMAL(10,4),
-                net_margin_ttm DECIMAL(10,4),
-                operating_margin_ttm DECIMAL(10,4),
-                roi_ttm DECIMAL(10,4),
-                asset_turnover_ttm DECIMAL(10,4),
-                equity_multiplier DECIMAL(10,4),
-                debt_to_asset_ratio DECIMAL(10,4),
-                equity_ratio DECIMAL(10,4),
-                revenue_yoy_growth DECIMAL(10,4),           -- 营收同比增长率(%)
-                n_income_yoy_growth DECIMAL(10,4),           -- 归属母公司股东的净利润同比增长率(%)
-                operate_profit_yoy_growth DECIMAL(10,4),     -- 经营利润同比增长率(%)
-                data_quality VARCHAR(20),
-                calculation_status VARCHAR(20),
-                data_completeness VARCHAR(20),
-                balance_sheet_lag INTEGER
+            result = bulk_upsert(
+                self.context.db_manager, df, 'pgs_factors', 'pit_financial_indicators', fields,
+                conflict_fields=['ts_code', 'ann_date', 'end_date', 'data_source'],
             )
-            """
-            self.context.db_manager.execute_sync(create_temp_sql)
-
-            # 2. 批量插入临时表
-            # 使用字典格式参数，避免 NaN 值问题
-            fields = [
-                'ts_code', 'end_date', 'ann_date', 'data_source',
-                'gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm',
-                'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
-                'asset_turnover_ttm', 'equity_multiplier',
-                'debt_to_asset_ratio', 'equity_ratio',
-                'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
-                'data_quality', 'calculation_status',
-                'data_completeness', 'balance_sheet_lag'
-            ]
-
-            # 使用批量命名参数插入
-            batch_size = 100
-            for i in range(0, len(df), batch_size):
-                batch_df = df.iloc[i:i + batch_size]
-
-                # 构建批量插入的 VALUES 子句
-                values_placeholders = []
-                all_params = {}
-
-                for j, (_, row) in enumerate(batch_df.iterrows()):
-                    row_params = {f"{field}_{j}": row[field] for field in fields}
-                    row_params = self._sanitize_params(row_params)
-                    all_params.update(row_params)
-
-                    row_placeholders = ', '.join([f'%({field}_{j})s' for field in fields])
-                    values_placeholders.append(f"({row_placeholders})")
-
-                insert_temp_sql = f"""
-                INSERT INTO {temp_table_name} ({', '.join(fields)})
-                VALUES {', '.join(values_placeholders)}
-                """
-
-                self.context.db_manager.execute_sync(insert_temp_sql, all_params)
-
-            # 3. 使用UPSERT将临时表数据合并到目标表
-            upsert_sql = f"""
-            INSERT INTO pgs_factors.pit_financial_indicators (
-                ts_code, end_date, ann_date, data_source,
-                gpa_ttm, roe_excl_ttm, roa_excl_ttm,
-                net_margin_ttm, operating_margin_ttm, roi_ttm,
-                asset_turnover_ttm, equity_multiplier,
-                debt_to_asset_ratio, equity_ratio,
-                revenue_yoy_growth, n_income_yoy_growth, operate_profit_yoy_growth,
-                data_quality, calculation_status,
-                data_completeness, balance_sheet_lag
+            self.logger.info(
+                f"批量保存 {len(df)} 条财务指标记录（COPY）：新增 {result['inserted']}，更新 {result['updated']}"
             )
-            SELECT * FROM {temp_table_name}
-            ON CONFLICT (ts_code, ann_date, end_date, data_source)
-            DO UPDATE SET
-                data_source = EXCLUDED.data_source,
-                updated_at = CURRENT_TIMESTAMP,
-                gpa_ttm = EXCLUDED.gpa_ttm,
-                roe_excl_ttm = EXCLUDED.roe_excl_ttm,
-                roa_excl_ttm = EXCLUDED.roa_excl_ttm,
-                net_margin_ttm = EXCLUDED.net_margin_ttm,
-                operating_margin_ttm = EXCLUDED.operating_margin_ttm,
-                roi_ttm = EXCLUDED.roi_ttm,
-                asset_turnover_ttm = EXCLUDED.asset_turnover_ttm,
-                equity_multiplier = EXCLUDED.equity_multiplier,
-                debt_to_asset_ratio = EXCLUDED.debt_to_asset_ratio,
-                equity_ratio = EXCLUDED.equity_ratio,
-                revenue_yoy_growth = EXCLUDED.revenue_yoy_growth,
-                n_income_yoy_growth = EXCLUDED.n_income_yoy_growth,
-                operate_profit_yoy_growth = EXCLUDED.operate_profit_yoy_growth,
-                data_quality = EXCLUDED.data_quality,
-                calculation_status = EXCLUDED.calculation_status,
-                data_completeness = EXCLUDED.data_completeness,
-                balance_sheet_lag = EXCLUDED.balance_sheet_lag
-            """
-
-            self.context.db_manager.execute_sync(upsert_sql)
-            self.logger.info(f"批量保存 {len(df)} 条财务指标记录（使用临时表优化）")
-
-            # 4. 清理临时表
-            try:
-                cleanup_sql = f"DROP TABLE IF EXISTS {temp_table_name}"
-                self.context.db_manager.execute_sync(cleanup_sql)
-                self.logger.debug(f"临时表 {temp_table_name} 已清理")
-            except Exception as cleanup_error:
-                self.logger.debug(f"清理临时表 {temp_table_name} 时出现问题（可忽略）: {cleanup_error}")
-
         except Exception as e:
             self.logger.warning(f"批量保存失败，回退到单条插入: {e}")
-            # 确保在异常情况下也清理临时表
-            try:
-                if 'temp_table_name' in locals():
-                    cleanup_sql = f"DROP TABLE IF EXISTS {temp_table_name}"
-                    self.context.db_manager.execute_sync(cleanup_sql)
-            except Exception as cleanup_error:
-                self.logger.debug(f"异常情况下清理临时表失败（可忽略）: {cleanup_error}")
-            # 回退到单条插入
             self._save_indicators_single(df)
 
     def _log_performance_stats(self, detailed: bool = True) -> None:
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+财务指标列式计算引擎（全市场、单个 as_of_date）
+
+与 FinancialIndicatorsCalculator 逐股路径（_calculate_single_stock_indicators）口径一致，
+但将全部股票的数据按 (ts_code, end_date DESC) 排成连续数组，用分组数组运算一次性得到：
+- TTM：当前记录及其后（更早）3 条记录之和（缺失按 0 计）
+- 盈利能力 / 效率 / 结构指标
+- 同比增长：基于股票最新报告期记录，先按 ±90 天最近日期查找基期，找不到时回退到
+  “不晚于目标日期的最近正式报告”（快报/预告无正式报告时取任意数据源）
+- 数据质量：极端值截断与 data_quality 等级
+
+不访问数据库；forecast 营收增长的回填由调用方在质量评估前完成。
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CORE_INDICATORS = ['gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm']
+
+INDICATOR_COLUMNS = [
+    'gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm',
+    'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
+    'asset_turnover_ttm', 'equity_multiplier',
+    'debt_to_asset_ratio', 'equity_ratio',
+    'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
+]
+
+OUTPUT_COLUMNS = [
+    'ts_code', 'end_date', 'ann_date', 'data_source',
+    'data_completeness', 'balance_sheet_lag',
+] + INDICATOR_COLUMNS
+
+# (moderate, extreme) 阈值，与 _assess_data_quality 一致
+QUALITY_THRESHOLDS = {
+    'roe_excl_ttm': (100, 200),
+    'roa_excl_ttm': (50, 100),
+    'net_margin_ttm': (100, 200),
+    'operating_margin_ttm': (100, 200),
+    'roi_ttm': (100, 200),
+    'asset_turnover_ttm': (10, 20),
+    'equity_multiplier': (20, 50),
+    'debt_to_asset_ratio': (95, 200),
+    'equity_ratio': (100, 200),
+    'revenue_yoy_growth': (500, 1000),
+    'n_income_yoy_growth': (500, 1000),
+    'operate_profit_yoy_growth': (500, 1000),
+}
+
+OPERATING_GROWTH_SOURCES = ('report', 'express', 'forecast')
+TTM_PERIODS = 4
+YOY_TOLERANCE_DAYS = 90
+
+
+def _numeric(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _first_in_group(condition: np.ndarray, group_start: np.ndarray, size: int) -> np.ndarray:
+    """每组中首个满足条件的行号（不存在时为 -1）"""
+    candidates = np.where(condition, np.arange(size), size)
+    first = np.minimum.reduceat(candidates, group_start)
+    return np.where(first < size, first, -1)
+
+
+def _take(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    return np.where(index >= 0, values[np.maximum(index, 0)], np.nan)
+
+
+def _growth(current: np.ndarray, base: np.ndarray, positive_base: bool = False) -> np.ndarray:
+    valid = ~np.isnan(current) & ~np.isnan(base)
+    valid &= (base > 0) if positive_base else (base != 0)
+    denominator = base if positive_base else np.abs(base)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid, (current - base) / denominator * 100, np.nan)
+
+
+def compute_indicator_frame(
+    pit_data: pd.DataFrame,
+    as_of_date: str,
+    target_data_sources: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    计算 as_of_date 当日公告记录的财务指标（未做质量评估）。
+
+    Args:
+        pit_data: _get_pit_data_for_calculation 返回的全市场数据
+        as_of_date: PIT 观察时点
+        target_data_sources: 仅使用指定数据源（与逐股路径一致，同时作用于 TTM/同比上下文）
+
+    Returns:
+        OUTPUT_COLUMNS 列的 DataFrame，缺失指标为 NaN
+    """
+    if pit_data is None or pit_data.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    df = pit_data
+    if target_data_sources:
+        df = df[df['data_source'].isin(target_data_sources)]
+        if df.empty:
+            return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    df = df.copy()
+    df['ann_date'] = pd.to_datetime(df['ann_date']).dt.date
+    df['_end'] = pd.to_datetime(df['end_date'])
+    df = df.sort_values(['ts_code', '_end'], ascending=[True, False], kind='mergesort').reset_index(drop=True)
+
+    size = len(df)
+    codes = df['ts_code'].to_numpy()
+    new_group = np.ones(size, dtype=bool)
+    new_group[1:] = codes[1:] != codes[:-1]
+    group_id = np.cumsum(new_group) - 1
+    group_start = np.flatnonzero(new_group)
+    group_end = np.append(group_start[1:], size)
+    row_end = group_end[group_id]
+    rows = np.arange(size)
+
+    # --- TTM：当前行及同组后续 3 行（更早的报告期）之和，缺失按 0 计 ---
+    def _ttm(column: str) -> np.ndarray:
+        values = np.nan_to_num(_numeric(df[column]), nan=0.0)
+        total = np.zeros(size)
+        for offset in range(TTM_PERIODS):
+            idx = rows + offset
+            in_group = idx < row_end
+            total += np.where(in_group, values[np.minimum(idx, size - 1)], 0.0)
+        return total
+
+    ttm_revenue = _ttm('revenue')
+    ttm_oper_cost = _ttm('oper_cost')
+    ttm_n_income = _ttm('n_income_attr_p')
+    ttm_operate_profit = _ttm('operate_profit')
+    tot_assets = _numeric(df['tot_assets']) if 'tot_assets' in df else np.full(size, np.nan)
+    tot_equity = _numeric(df['tot_equity']) if 'tot_equity' in df else np.full(size, np.nan)
+
+    has_revenue = ttm_revenue > 0
+    has_assets = tot_assets > 0
+    has_equity = tot_equity > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result: Dict[str, np.ndarray] = {
+            'gpa_ttm': np.where(has_revenue, (ttm_revenue - ttm_oper_cost) / ttm_revenue * 100, np.nan),
+            'roe_excl_ttm': np.where(has_equity, ttm_n_income / tot_equity * 100, np.nan),
+            'roa_excl_ttm': np.where(has_assets, ttm_n_income / tot_assets * 100, np.nan),
+            'net_margin_ttm': np.where(has_revenue, ttm_n_income / ttm_revenue * 100, np.nan),
+            'operating_margin_ttm': np.where(has_revenue, ttm_operate_profit / ttm_revenue * 100, np.nan),
+            'roi_ttm': np.where(has_assets, ttm_operate_profit / tot_assets * 100, np.nan),
+            'asset_turnover_ttm': np.where(has_assets, ttm_revenue / tot_assets, np.nan),
+            'equity_multiplier': np.where(has_equity & ~np.isnan(tot_assets), tot_assets / tot_equity, np.nan),
+            'debt_to_asset_ratio': np.where(
+                has_assets & ~np.isnan(tot_equity), (tot_assets - tot_equity) / tot_assets * 100, np.nan
+            ),
+            'equity_ratio': np.where(has_assets & ~np.isnan(tot_equity), tot_equity / tot_assets * 100, np.nan),
+        }
+
+    # --- 同比增长：每只股票只算一次（基于其最新报告期记录），再广播到当日记录 ---
+    sources = df['data_source'].to_numpy().astype(str)
+    end_days = df['_end'].to_numpy().astype('datetime64[D]')
+    group_size = group_end - group_start
+    target = (
+        pd.Series(df['_end'].to_numpy()[group_start]) - pd.DateOffset(months=12)
+    ).to_numpy().astype('datetime64[D]')
+    row_target = target[group_id]
+
+    # 1) ±90 天最近日期（排除最新记录本身，距离相同取更新的报告期）
+    diff = np.abs((end_days - row_target).astype(np.int64)).astype(np.float64)
+    diff[rows == group_start[group_id]] = np.inf
+    nearest = (
+        pd.Series(diff).groupby(group_id).idxmin().to_numpy()
+        if size else np.array([], dtype=np.int64)
+    )
+    nearest_diff = diff[nearest] if size else np.array([])
+    use_nearest = (group_size >= 2) & (nearest_diff <= YOY_TOLERANCE_DAYS)
+
+    # 2) 回退：不晚于目标日期的最近记录（行按 end_date 降序，组内首个满足条件者即最近）
+    current_source = sources[group_start]
+    before_target = end_days <= row_target
+    is_report = sources == 'report'
+    report_base = _first_in_group(before_target & is_report, group_start, size)
+    any_base = _first_in_group(before_target, group_start, size)
+    prefers_any = np.isin(current_source, ('express', 'forecast'))
+    fallback_base = np.where(prefers_any & (report_base < 0), any_base, report_base)
+
+    base = np.where(use_nearest, nearest, fallback_base)
+
+    revenue = _numeric(df['revenue'])
+    n_income = _numeric(df['n_income_attr_p'])
+    operate_profit = _numeric(df['operate_profit'])
+    cur_revenue = revenue[group_start]
+    cur_n_income = n_income[group_start]
+    cur_operate_profit = operate_profit[group_start]
+
+    revenue_growth = _growth(cur_revenue, _take(revenue, base), positive_base=True)
+    n_income_growth = _growth(cur_n_income, _take(n_income, base))
+    operate_growth = _growth(cur_operate_profit, _take(operate_profit, base))
+    operate_allowed = np.isin(current_source, OPERATING_GROWTH_SOURCES)
+    # 回退路径：快报经营利润缺失或为 0 时不计算
+    express_without_profit = (current_source == 'express') & (
+        np.isnan(cur_operate_profit) | (cur_operate_profit == 0)
+    )
+    operate_allowed &= use_nearest | ~express_without_profit
+    operate_growth = np.where(operate_allowed, operate_growth, np.nan)
+
+    result['revenue_yoy_growth'] = revenue_growth[group_id]
+    result['n_income_yoy_growth'] = n_income_growth[group_id]
+    result['operate_profit_yoy_growth'] = operate_growth[group_id]
+
+    # --- 仅输出当日公告且非 RPT_ORIG 的记录 ---
+    try:
+        as_of = pd.to_datetime(as_of_date).date()
+    except Exception:
+        as_of = as_of_date
+    current = (df['ann_date'] == as_of).to_numpy()
+    if 'conversion_status' in df:
+        current &= (df['conversion_status'] != 'RPT_ORIG').to_numpy()
+
+    out = pd.DataFrame({
+        'ts_code': df['ts_code'],
+        'end_date': df['end_date'],
+        'ann_date': df['ann_date'],
+        'data_source': df['data_source'].replace(
+            {'forecast_direct': 'forecast', 'forecast_calculated': 'forecast'}
+        ),
+        'data_completeness': df['data_completeness'] if 'data_completeness' in df else 'complete',
+        'balance_sheet_lag': (
+            np.nan_to_num(_numeric(df['balance_sheet_lag']), nan=0.0)
+            if 'balance_sheet_lag' in df else 0.0
+        ),
+    })
+    for column in INDICATOR_COLUMNS:
+        out[column] = result[column]
+    return out[current].reset_index(drop=True)
+
+
+def assess_data_quality_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """极端值截断并给出 data_quality / calculation_status（与 _assess_data_quality 一致）"""
+    frame = frame.copy()
+    size = len(frame)
+    valid_count = frame[CORE_INDICATORS].notna().sum(axis=1).to_numpy()
+    has_extreme = np.zeros(size, dtype=bool)
+    has_moderate = np.zeros(size, dtype=bool)
+
+    for column, (moderate, extreme) in QUALITY_THRESHOLDS.items():
+        values = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        magnitude = np.abs(values)
+        is_extreme = magnitude > extreme
+        has_extreme |= is_extreme
+        has_moderate |= ~is_extreme & (magnitude > moderate)
+        sign = np.where(values >= 0, 1.0, -1.0)
+        frame[column] = np.where(is_extreme, sign * extreme, values)
+
+    positive_core = (frame[CORE_INDICATORS].to_numpy(dtype=np.float64, na_value=np.nan) > 0).any(axis=1)
+    quality = np.select(
+        [
+            has_extreme & positive_core,
+            has_extreme,
+            has_moderate,
+            valid_count >= 3,
+            valid_count >= 2,
+            valid_count >= 1,
+        ],
+        ['outlier_high', 'outlier_low', 'normal', 'high', 'normal', 'low'],
+        default='invalid',
+    )
+    frame['data_quality'] = quality
+    frame['calculation_status'] = 'success'
+    return frame
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """转换为 _save_indicators_batch 接受的记录列表（NaN -> None）"""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
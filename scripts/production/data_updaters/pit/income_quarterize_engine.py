@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+利润表“累计转单季”列式引擎
+
+与 PITIncomeQuarterlyManager._quarterize_to_single_iterative 口径一致，但以排序去重 + 键连接
+代替逐行 iterrows / 字典查找：
+- report：同 (ts_code, year) 仅有 Q4 的记录标注 ANNUAL_ONLY；Q1 等于累计；Q2-Q4 减去
+  上一季度 report 累计（同 (ts_code, end_date) 多条时取表内最后一条）
+- express / forecast：Q1 等于累计；Q2-Q4 减去上一季度 report 原始累计
+  （按 (ts_code, end_date, ann_date) 排序后取最新 ann_date）
+- 某字段整批都无法差分时，该字段整批置空；forecast 的 n_income_attr_p 保留中值并标注 FC_MID_KEEP
+
+另提供 _fill_missing_from_report 使用的两种候选回填（按报告期取首个非空值、按公告日精确匹配）。
+
+不访问数据库，不写日志；缺失统计通过返回的 stats 交给调用方输出。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+QUARTERIZE_FIELDS = ['revenue', 'oper_cost', 'operate_profit', 'total_profit', 'n_income', 'n_income_attr_p']
+
+DIFF_STATUS = {
+    'report': 'QTR_DIFF_RPT',
+    'express': 'QTR_DIFF_EXP',
+    'forecast': 'QTR_DIFF_FC',
+}
+
+# forecast 无法差分时保留中值的字段
+FORECAST_KEEP_FIELD = 'n_income_attr_p'
+
+MONTH_TO_QUARTER = {1: 1, 2: 1, 3: 1, 4: 2, 5: 2, 6: 2, 7: 3, 8: 3, 9: 3, 10: 4, 11: 4, 12: 4}
+
+
+def prev_quarter_end(end_date: pd.Series, k: int = 1) -> pd.Series:
+    """向量化的 _prev_quarter_end：返回往前第 k 个季度的季末日期（datetime.date，缺失为 NaT）"""
+    periods = pd.to_datetime(end_date).dt.to_period('Q') - k
+    return periods.dt.end_time.dt.normalize().dt.date
+
+
+def empty_quarterly_stats(q_fields: List[str]) -> Dict[str, Dict[str, Any]]:
+    stats = {
+        source: {
+            'total_records': 0,
+            'q2q4_records': 0,
+            'missing_prev_cumulative': 0,
+            'affected_single_calculation': 0,
+            'missing_examples': [],
+        }
+        for source in DIFF_STATUS
+    }
+    stats['report']['field_affected_breakdown'] = {field: 0 for field in q_fields}
+    stats['report']['annual_only_records'] = 0
+    return stats
+
+
+def _annual_only_mask(report: pd.DataFrame) -> pd.Series:
+    """同 (ts_code, year) 的 report 只有 Q4（上市前仅年报）"""
+    quarter = report['quarter']
+    flags = pd.DataFrame({
+        'ts_code': report['ts_code'],
+        'year': report['year'],
+        'has_q4': quarter.eq(4),
+        'has_other': quarter.notna() & quarter.ne(4),
+    })
+    # 与 groupby 默认行为一致：键缺失的行不参与判定
+    flags = flags[flags['ts_code'].notna() & flags['year'].notna()]
+    grouped = flags.groupby(['ts_code', 'year'])
+    only_q4 = grouped['has_q4'].transform('any') & ~grouped['has_other'].transform('any')
+    return only_q4.reindex(report.index, fill_value=False).astype(bool)
+
+
+def _latest_by_period(table: pd.DataFrame, q_fields: List[str]) -> pd.DataFrame:
+    table = table.dropna(subset=['ts_code', 'end_date'])
+    return table.drop_duplicates(['ts_code', 'end_date'], keep='last')[['ts_code', 'end_date'] + q_fields]
+
+
+def _lookup_previous(keys: pd.DataFrame, table: pd.DataFrame, q_fields: List[str]) -> pd.DataFrame:
+    """按 (ts_code, prev_end_date) 连接上一季累计值；返回与 keys 同索引的字段列与 _found 标记"""
+    left = pd.DataFrame({
+        'ts_code': keys['ts_code'].to_numpy(),
+        'end_date': keys['prev_end_date'].to_numpy(),
+    })
+    merged = left.merge(table.assign(_found=True), on=['ts_code', 'end_date'], how='left')
+    merged.index = keys.index
+    merged['_found'] = merged['_found'].fillna(False).astype(bool)
+    return merged
+
+
+def _apply_differences(work: pd.DataFrame, base: pd.DataFrame, mask: pd.Series, prev: pd.DataFrame,
+                       q_fields: List[str], source: str, stats: Dict[str, Any]) -> int:
+    """单季 = 当前累计 - 上一季累计；整批无法差分的字段整批置空（forecast 中值除外）"""
+    status = DIFF_STATUS[source]
+    affected = 0
+    for c in q_fields:
+        cur_vals = pd.to_numeric(base.loc[mask, c], errors='coerce')
+        single_vals = cur_vals - pd.to_numeric(prev[c], errors='coerce')
+        valid = single_vals.notna()
+        if valid.any():
+            rows = valid.index[valid.to_numpy()]
+            work.loc[rows, c] = single_vals[valid]
+            work.loc[rows, 'conversion_status'] = status
+        elif source == 'forecast' and c == FORECAST_KEEP_FIELD:
+            work.loc[mask, c] = cur_vals
+            work.loc[mask, 'conversion_status'] = 'FC_MID_KEEP'
+        else:
+            work.loc[mask, c] = None
+            affected += int(mask.sum())
+            if source == 'report':
+                stats['field_affected_breakdown'][c] = int(mask.sum())
+    return affected
+
+
+def _copy_cumulative(work: pd.DataFrame, base: pd.DataFrame, mask: pd.Series, q_fields: List[str], status: str) -> None:
+    if mask.any():
+        for c in q_fields:
+            work.loc[mask, c] = pd.to_numeric(base.loc[mask, c], errors='coerce')
+        work.loc[mask, 'conversion_status'] = status
+
+
+def quarterize_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[Dict[str, Dict[str, Any]]]]:
+    """
+    将累计值转换为单季度值。
+
+    返回 (结果, 统计)；没有可季度化字段时统计为 None。
+    输入的 end_date/ann_date 应已是同一日期类型（_preprocess_data 中统一为 datetime.date）。
+    """
+    if df is None or df.empty:
+        return df, None
+    work = df.copy()
+    for col in ('end_date', 'ann_date'):
+        if col in work.columns:
+            work[col] = pd.to_datetime(work[col]).dt.date
+    # 原始累计值（按索引对齐读取，不受后续覆盖影响）
+    base = df
+    q_fields = [c for c in QUARTERIZE_FIELDS if c in work.columns]
+    if not q_fields:
+        return work, None
+    if 'year' not in work.columns or 'quarter' not in work.columns:
+        end_dt = pd.to_datetime(work['end_date'])
+        work['year'] = end_dt.dt.year
+        work['quarter'] = end_dt.dt.month.map(MONTH_TO_QUARTER)
+
+    stats = empty_quarterly_stats(q_fields)
+    keys = pd.DataFrame({'ts_code': work['ts_code'], 'prev_end_date': prev_quarter_end(work['end_date'])})
+    if 'data_source' in work.columns:
+        source = work['data_source']
+    else:
+        source = pd.Series([None] * len(work), index=work.index)
+    is_q1 = work['quarter'].eq(1)
+
+    # ---------- 1) report ----------
+    mask_r = source.eq('report')
+    if mask_r.any():
+        stats['report']['total_records'] = int(mask_r.sum())
+        annual_only = pd.Series(False, index=work.index)
+        annual_only.loc[mask_r] = _annual_only_mask(work.loc[mask_r])
+        if annual_only.any():
+            stats['report']['annual_only_records'] = int(annual_only.sum())
+            work.loc[annual_only, 'conversion_status'] = 'ANNUAL_ONLY'
+            for c in q_fields:
+                work.loc[annual_only, c] = None
+
+        mask_rv = mask_r & ~annual_only
+        if mask_rv.any():
+            r_prev_table = _latest_by_period(work.loc[mask_rv], q_fields)
+            _copy_cumulative(work, base, mask_rv & is_q1, q_fields, DIFF_STATUS['report'])
+
+            mask_r_q2q4 = mask_rv & ~is_q1
+            if mask_r_q2q4.any():
+                stats['report']['q2q4_records'] = int(mask_r_q2q4.sum())
+                prev = _lookup_previous(keys.loc[mask_r_q2q4], r_prev_table, q_fields)
+                stats['report']['missing_prev_cumulative'] = int((~prev['_found']).sum())
+                affected = _apply_differences(work, base, mask_r_q2q4, prev, q_fields, 'report', stats['report'])
+                if affected > 0:
+                    stats['report']['affected_single_calculation'] = affected
+
+    # report 原始累计值（express/forecast 的差分基期），同报告期取最新 ann_date
+    r_cumulative = None
+    if mask_r.any():
+        base_report = base.loc[mask_r, list(q_fields)].copy()
+        base_report['ts_code'] = work.loc[mask_r, 'ts_code']
+        base_report['end_date'] = work.loc[mask_r, 'end_date']
+        base_report['ann_date'] = work.loc[mask_r, 'ann_date']
+        base_report = base_report.sort_values(['ts_code', 'end_date', 'ann_date'])
+        r_cumulative = _latest_by_period(base_report, q_fields)
+
+    # ---------- 2) express / 3) forecast ----------
+    for src in ('express', 'forecast'):
+        mask_s = source.eq(src)
+        if not mask_s.any():
+            continue
+        stats[src]['total_records'] = int(mask_s.sum())
+        _copy_cumulative(work, base, mask_s & is_q1, q_fields, DIFF_STATUS[src])
+
+        mask_s_q2q4 = mask_s & ~is_q1
+        if mask_s_q2q4.any() and r_cumulative is not None:
+            stats[src]['q2q4_records'] = int(mask_s_q2q4.sum())
+            prev = _lookup_previous(keys.loc[mask_s_q2q4], r_cumulative, q_fields)
+            missing = ~prev['_found']
+            stats[src]['missing_prev_cumulative'] = int(missing.sum())
+            stats[src]['missing_examples'] = list(
+                keys.loc[missing[missing].index, ['ts_code', 'prev_end_date']].head(3).itertuples(index=False, name=None)
+            )
+            stats[src]['affected_single_calculation'] = _apply_differences(
+                work, base, mask_s_q2q4, prev, q_fields, src, stats[src]
+            )
+
+    return work, stats
+
+
+def fill_first_by_period(work: pd.DataFrame, target: pd.Series, candidates: pd.DataFrame,
+                         fields: List[str], numeric_fields: Optional[List[str]] = None) -> int:
+    """
+    以候选表中同 (ts_code, end_date) 按表内顺序的首个非空值回填 target 行的空字段（原地修改）。
+    numeric_fields 中的字段回填前转为数值。返回填充的字段值个数。
+    """
+    if candidates is None or candidates.empty or not target.any():
+        return 0
+    first = candidates.groupby(['ts_code', 'end_date'], sort=False)[fields].first()
+    return _fill_from_keyed(work, target, first, ['ts_code', 'end_date'], fields, numeric_fields)
+
+
+def fill_by_announcement(work: pd.DataFrame, target: pd.Series, candidates: pd.DataFrame,
+                         fields: List[str], numeric_fields: Optional[List[str]] = None) -> int:
+    """
+    以候选表中同 (ts_code, ann_date) 的最后一条记录回填 target 行的空字段（原地修改）。
+    返回填充的字段值个数。
+    """
+    if candidates is None or candidates.empty or not target.any():
+        return 0
+    fields = [k for k in fields if k in candidates.columns]
+    keyed = candidates.dropna(subset=['ts_code', 'ann_date'])
+    keyed = keyed.drop_duplicates(['ts_code', 'ann_date'], keep='last').set_index(['ts_code', 'ann_date'])[fields]
+    return _fill_from_keyed(work, target, keyed, ['ts_code', 'ann_date'], fields, numeric_fields)
+
+
+def _fill_from_keyed(work: pd.DataFrame, target: pd.Series, keyed: pd.DataFrame, key_cols: List[str],
+                     fields: List[str], numeric_fields: Optional[List[str]]) -> int:
+    if keyed.empty or not fields:
+        return 0
+    left = work.loc[target, key_cols]
+    matched = left.merge(keyed.reset_index(), on=key_cols, how='left')
+    matched.index = left.index
+    filled = 0
+    for k in fields:
+        fill_mask = work.loc[target, k].isna() & matched[k].notna()
+        if not fill_mask.any():
+            continue
+        rows = fill_mask.index[fill_mask.to_numpy()]
+        values = matched.loc[rows, k]
+        if numeric_fields is None or k in numeric_fields:
+            values = pd.to_numeric(values, errors='coerce')
+        work.loc[rows, k] = values
+        filled += len(rows)
+    return filled
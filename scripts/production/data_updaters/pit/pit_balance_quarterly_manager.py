@@ -992,7 +992,17 @@ class PITBalanceQuarterlyManager(PITTableManager):
             self.logger.error(f"创建索引失败: {e}")
 
     def _upsert_batch(self, upsert_sql: str, batch_data: pd.DataFrame, all_fields: List[str]) -> Dict[str, int]:
-        """处理单个批次的UPSERT"""
+        """处理单个批次的UPSERT：优先 COPY + 集合式合并，失败时回退逐行写入"""
+        if batch_data.empty:
+            return {'inserted': 0, 'updated': 0}
+        try:
+            return self._bulk_upsert(batch_data, all_fields)
+        except Exception as e:
+            self.logger.warning(f"批量UPSERT失败（{len(batch_data)}条），回退逐行写入: {e}")
+        return self._upsert_rows(upsert_sql, batch_data, all_fields)
+
+    def _upsert_rows(self, upsert_sql: str, batch_data: pd.DataFrame, all_fields: List[str]) -> Dict[str, int]:
+        """逐行UPSERT（批量写入失败时的回退路径）"""
 
         inserted_count = 0
         updated_count = 0
@@ -35,6 +35,11 @@ except ImportError:
     from base.pit_table_manager import PITTableManager
     from base.pit_config import PITConfig
 
+try:
+    from . import income_quarterize_engine as quarterize_engine
+except ImportError:
+    import income_quarterize_engine as quarterize_engine
+
 from typing import Dict, Any
 
 class PITIncomeQuarterlyManager(PITTableManager):
@@ -1104,7 +1109,33 @@ class PITIncomeQuarterlyManager(PITTableManager):
 
         return work
 
-    def _quarterize_to_single(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _quarterize_to_single(self, df: pd.DataFrame, engine: str = 'vectorized') -> pd.DataFrame:
+        """
+        将年度累计值转换为单季度值（季度化）。
+
+        engine:
+            'vectorized' - 排序去重 + 键连接的列式实现（默认，income_quarterize_engine）
+            'iterative'  - 原逐行查找实现
+        """
+        if engine == 'iterative':
+            return self._quarterize_to_single_iterative(df)
+        if engine != 'vectorized':
+            raise ValueError(f"未知的季度化引擎: {engine}（可选 'vectorized' / 'iterative'）")
+        work, quarterly_stats = quarterize_engine.quarterize_frame(df)
+        if quarterly_stats is None:
+            return work
+        for source, label in (('express', 'Express'), ('forecast', 'Forecast')):
+            missing = quarterly_stats[source]['missing_prev_cumulative']
+            if missing:
+                self.logger.warning(f"{label}累计数据缺失: {missing} 条记录受影响")
+                for ts, prev_end in quarterly_stats[source]['missing_examples']:
+                    self.logger.warning(f"  示例: {ts} {prev_end}")
+                if missing > 3:
+                    self.logger.warning(f"  ... 还有 {missing - 3} 条类似记录")
+        self._print_quarterly_stats_summary(quarterly_stats)
+        return work
+
+    def _quarterize_to_single_iterative(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         将年度累计值转换为单季度值（季度化）。
         规则：单季(Qn) = 累计(Qn) - 累计(Qn-1)，其中 Q1 直接等于 累计(Q1)。
@@ -1624,9 +1655,7 @@ class PITIncomeQuarterlyManager(PITTableManager):
                     r = r.drop_duplicates(['ts_code','end_date'], keep='last')
                     # 使用前一季度的数据进行填充，避免同报告期数据导致的PIT筛选为空
                     target_for_merge = work.loc[mask_target, ['ts_code','end_date','ann_date']].copy()
-                    target_for_merge['end_date_prev'] = target_for_merge['end_date'].apply(
-                        lambda d: self._prev_quarter_end(d, 1)
-                    )
+                    target_for_merge['end_date_prev'] = quarterize_engine.prev_quarter_end(target_for_merge['end_date'], 1)
                     merged = target_for_merge.merge(
                         r, left_on=['ts_code','end_date_prev'], right_on=['ts_code','end_date'],
                         how='left', suffixes=('','_r')
@@ -1641,48 +1670,13 @@ class PITIncomeQuarterlyManager(PITTableManager):
 
                     # 批量更新结果
                     if not merged.empty:
-                        # 【关键修复】使用向量化的方式更新，避免索引错位问题
-                        # 方法：直接在merged结果上进行更新，确保数据完整性
-
-                        batch_fill_count = 0
-
-                        # 为merged添加原始work的索引信息
-                        # merged的行顺序与mask_target不一定一致，需要重新建立对应关系
-                        work_target_data = work.loc[mask_target, ['ts_code','end_date','ann_date']].copy()
-                        work_target_data['work_idx'] = work_target_data.index
-
-                        # 合并work索引信息与匹配结果
-                        final_merge = work_target_data.merge(
-                            merged[['ts_code','end_date','ann_date'] + available_keys],
-                            left_on=['ts_code','end_date'],
-                            right_on=['ts_code','end_date'],
-                            how='left',
-                            suffixes=('', '_matched')
+                        # 同报告期的全部匹配记录按 merged 顺序作为候选，每个字段取首个非空值
+                        # （不要求与目标行的 ann_date 一致，保持原批次内回填口径）
+                        batch_fill_count = quarterize_engine.fill_first_by_period(
+                            work, mask_target, merged, available_keys,
+                            numeric_fields=[k for k in self.data_fields if k != 'conversion_status'],
                         )
 
-                        # 向量化更新：直接使用loc进行批量赋值
-                        valid_matches = final_merge['ann_date_matched'].notna()
-                        if valid_matches.any():
-                            matched_rows = final_merge[valid_matches]
-
-                            for _, row in matched_rows.iterrows():
-                                work_idx = row['work_idx']
-                                for k in available_keys:
-                                    if pd.isna(work.at[work_idx, k]) and pd.notna(row.get(k)):
-                                        # 【修复】数据类型转换
-                                        value = row[k]
-                                        try:
-                                            # 对于数值字段，进行类型转换
-                                            if k in self.data_fields and k != 'conversion_status':
-                                                work.at[work_idx, k] = pd.to_numeric(value, errors='coerce')
-                                            else:
-                                                # 对于其他字段，直接赋值
-                                                work.at[work_idx, k] = value
-                                            batch_fill_count += 1
-                                        except Exception as e:
-                                            self.logger.warning(f"数据类型转换失败 idx={work_idx}, field={k}, value={value}: {e}")
-                                            continue
-
                         total_fill_count += batch_fill_count
                         if batch_fill_count:
                             self.logger.info(f"批次内report回填完成：填充 {batch_fill_count} 个字段值")
@@ -1696,8 +1690,8 @@ class PITIncomeQuarterlyManager(PITTableManager):
             if not target.empty:
                 # 构造回填优先级：当前季度→前一季度→前二季度（end_date 维度）
                 target = target.copy()
-                target['end_prev1'] = target['end_date'].apply(lambda d: self._prev_quarter_end(d, 1))
-                target['end_prev2'] = target['end_date'].apply(lambda d: self._prev_quarter_end(d, 2))
+                target['end_prev1'] = quarterize_engine.prev_quarter_end(target['end_date'], 1)
+                target['end_prev2'] = quarterize_engine.prev_quarter_end(target['end_date'], 2)
                 ts_list = sorted(target['ts_code'].unique().tolist())
 
                 # 【关键修复】扩展查询范围：考虑所有可能需要的report数据
@@ -1744,33 +1738,8 @@ class PITIncomeQuarterlyManager(PITTableManager):
                         merged = merged.sort_values(['ts_code','ann_date', level_end_col, 'ann_date_r'])
                         merged = merged.drop_duplicates(['ts_code','ann_date', level_end_col], keep='last')
 
-                        # 构建索引映射
-                        idx_map = {(row.ts_code, row.ann_date): j for j, row in merged.iterrows()}
-
-                        filled = 0
-                        # 向量化更新
-                        for idx, row in work.loc[remain].iterrows():
-                            key = (row['ts_code'], row['ann_date'])
-                            j = idx_map.get(key)
-                            if j is None:
-                                continue
-                            for k in key_fields:
-                                if pd.isna(work.at[idx, k]) and k in merged.columns and pd.notna(merged.at[j, k]):
-                                    # 【修复】数据类型转换，确保兼容性
-                                    value = merged.at[j, k]
-                                    try:
-                                        # 统一对所有字段进行智能类型转换
-                                        if k == 'conversion_status':
-                                            # 转换状态字段保持原样
-                                            work.at[idx, k] = value
-                                        else:
-                                            # 数值字段统一转换为numeric
-                                            work.at[idx, k] = pd.to_numeric(value, errors='coerce')
-                                        filled += 1
-                                    except Exception as e:
-                                        self.logger.warning(f"数据类型转换失败 idx={idx}, field={k}, value={value}: {e}")
-                                        continue
-                        return filled
+                        # 同 (ts_code, ann_date) 多条时取排序后的最后一条
+                        return quarterize_engine.fill_by_announcement(work, remain, merged, key_fields)
 
                     # 先当前季度 end_date 匹配，再前一季度 end_prev1，再前二季度 end_prev2
                     fill_current = _apply_fill_batch('end_date')
@@ -2068,7 +2037,26 @@ class PITIncomeQuarterlyManager(PITTableManager):
         }
 
     def _upsert_batch(self, upsert_sql: str, batch_data: pd.DataFrame, all_fields: List[str]) -> Dict[str, int]:
-        """处理单个批次的UPSERT"""
+        """处理单个批次的UPSERT：优先 COPY + 集合式合并，失败时回退逐行写入"""
+        if batch_data.empty:
+            return {'inserted': 0, 'updated': 0}
+        try:
+            prepared = batch_data
+            if 'conversion_status' in all_fields:
+                # 与 _sanitize_params 一致：conversion_status 最长 20 字符
+                prepared = batch_data.copy()
+                status = prepared['conversion_status']
+                too_long = status.notna() & status.astype(str).str.len().gt(20)
+                if too_long.any():
+                    self.logger.warning("conversion_status 超长，已截断 %d 条", int(too_long.sum()))
+                    prepared['conversion_status'] = status.where(~too_long, status.astype(str).str[:20])
+            return self._bulk_upsert(prepared, all_fields)
+        except Exception as e:
+            self.logger.warning(f"批量UPSERT失败（{len(batch_data)}条），回退逐行写入: {e}")
+        return self._upsert_rows(upsert_sql, batch_data, all_fields)
+
+    def _upsert_rows(self, upsert_sql: str, batch_data: pd.DataFrame, all_fields: List[str]) -> Dict[str, int]:
+        """逐行UPSERT（批量写入失败时的回退路径）"""
 
         inserted_count = 0
         updated_count = 0
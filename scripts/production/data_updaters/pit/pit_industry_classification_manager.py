@@ -395,13 +395,17 @@ class PITIndustryClassificationManager(PITTableManager):
             updated_at = CURRENT_TIMESTAMP
         """
 
-        # 分批插入
-        batch_size = 1000
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
+        # COPY + 集合式合并；失败时回退逐条写入
+        fields = list(records[0].keys())
+        try:
+            self._bulk_upsert(pd.DataFrame(records, columns=fields), fields,
+                              conflict_fields=['ts_code', 'obs_date', 'data_source'])
+            return
+        except Exception as e:
+            self.logger.warning(f"行业快照批量写入失败（{len(records)}条），回退逐条写入: {e}")
 
-            for record in batch:
-                self.context.db_manager.execute_sync(insert_sql, record)
+        for record in records:
+            self.context.db_manager.execute_sync(insert_sql, record)
 
     def _detect_industry_changes(self, since_date: str) -> Dict:
         """检测行业变更"""
@@ -15,6 +15,7 @@ python scripts/production/data_updaters/tushare/data_collection_smart_update_pro
 功能特性：
 - 自动发现所有数据采集 (fetch) 任务
 - 支持多数据源并行执行，提升更新效率
+- 根据任务元数据推导依赖（交易日历、stock_basic 等），按 DAG 调度
 - 智能跳过不支持智能增量的任务
 - 详细的执行日志和状态监控
 - 支持重试机制和错误恢复
@@ -38,7 +39,11 @@ sys.path.insert(0, '.')
 
 from alphahome.common.db_manager import create_async_manager
 from alphahome.common.logging_utils import get_logger
-from alphahome.common.task_system import UnifiedTaskFactory
+from alphahome.common.task_system import (
+    TaskDAGScheduler,
+    UnifiedTaskFactory,
+    derive_task_dependencies,
+)
 from alphahome.common.constants import UpdateTypes
 from alphahome.common.config_manager import get_database_url
 
@@ -152,11 +157,10 @@ class DataCollectionProductionUpdater:
             for task_name in all_tasks:
                 try:
                     task_info = UnifiedTaskFactory.get_task_info(task_name)
-                    task_class = UnifiedTaskFactory._task_registry[task_name]
 
                     # 筛选条件：task_type 为 fetch
                     if task_info.get('type') == 'fetch':
-                        data_source = getattr(task_class, 'data_source', 'unknown')
+                        data_source = task_info.get('data_source') or 'unknown'
                         fetch_tasks.append(task_name)
 
                         # 统计各数据源的任务数量
@@ -283,66 +287,55 @@ class DataCollectionProductionUpdater:
                     'attempts': attempt
                 }
 
+    def get_task_data_source(self, task_name: str) -> str:
+        """获取任务的数据源标识"""
+        try:
+            return UnifiedTaskFactory.get_task_info(task_name).get('data_source') or 'unknown'
+        except ValueError:
+            return 'unknown'
+
+    def build_task_dependencies(self, task_names: List[str]) -> Dict[str, set]:
+        """根据任务元数据推导本次运行集合内的依赖关系"""
+        task_classes = {}
+        for name in task_names:
+            try:
+                task_classes[name] = UnifiedTaskFactory.get_task_class(name)
+            except ValueError:
+                logger.warning(f"[DAG] 未找到任务 {name}，不参与依赖推导")
+        dependencies = derive_task_dependencies(task_classes)
+        edges = sum(len(deps) for deps in dependencies.values())
+        logger.info(f"[DAG] 推导出 {edges} 条任务依赖")
+        for task_name, deps in sorted(dependencies.items()):
+            if deps:
+                logger.debug(f"[DAG] {task_name} 依赖: {', '.join(sorted(deps))}")
+        return dependencies
+
     async def execute_tasks_parallel(self, task_names: List[str]) -> List[Dict[str, Any]]:
-        """并行执行多个任务，支持按数据源动态并发控制"""
+        """按依赖关系并行执行多个任务
+
+        所有数据源同时运行，各数据源受独立的并发上限约束；
+        任务在其依赖（如交易日历、stock_basic）完成后立即启动。
+        """
         logger.info(f"[EXEC] 开始并行执行 {len(task_names)} 个任务 (最大并发: {self.max_workers})")
 
-        # 按数据源分组任务
-        tasks_by_source = {}
+        source_limits = {}
         for task_name in task_names:
-            try:
-                task_info = UnifiedTaskFactory.get_task_info(task_name)
-                task_class = UnifiedTaskFactory._task_registry[task_name]
-                data_source = getattr(task_class, 'data_source', 'unknown')
-
-                if data_source not in tasks_by_source:
-                    tasks_by_source[data_source] = []
-                tasks_by_source[data_source].append(task_name)
-            except Exception as e:
-                logger.warning(f"无法获取任务 {task_name} 的数据源信息: {e}")
-                # 归类为未知数据源
-                if 'unknown' not in tasks_by_source:
-                    tasks_by_source['unknown'] = []
-                tasks_by_source['unknown'].append(task_name)
-
-        # 为每个数据源创建执行器
-        all_results = []
-
-        for data_source, source_tasks in tasks_by_source.items():
-            optimal_workers = self.get_optimal_workers_for_data_source(data_source, self.max_workers)
-            logger.info(f"[DS_EXEC] 数据源 {data_source}: {len(source_tasks)} 个任务，使用 {optimal_workers} 并发")
-
-            # 为该数据源创建信号量
-            semaphore = asyncio.Semaphore(optimal_workers)
-
-            async def execute_with_semaphore(task_name: str):
-                async with semaphore:
-                    return await self.execute_task_with_retry(task_name)
-
-            # 执行该数据源的所有任务
-            tasks = []
-            for task_name in source_tasks:
-                task = asyncio.create_task(execute_with_semaphore(task_name))
-                tasks.append(task)
-
-            # 等待该数据源的任务完成
-            source_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # 处理结果
-            for i, result in enumerate(source_results):
-                if isinstance(result, Exception):
-                    task_name = source_tasks[i]
-                    logger.error(f"[{task_name}] 任务执行异常: {result}")
-                    all_results.append({
-                        'task_name': task_name,
-                        'status': 'error',
-                        'error': str(result),
-                        'attempts': 1
-                    })
-                else:
-                    all_results.append(result)
-
-        return all_results
+            data_source = self.get_task_data_source(task_name)
+            if data_source not in source_limits:
+                source_limits[data_source] = self.get_optimal_workers_for_data_source(
+                    data_source, self.max_workers
+                )
+        for data_source, workers in sorted(source_limits.items()):
+            logger.info(f"[DS_EXEC] 数据源 {data_source}: 使用 {workers} 并发")
+
+        scheduler = TaskDAGScheduler(
+            run_task=self.execute_task_with_retry,
+            dependencies=self.build_task_dependencies(task_names),
+            source_of=self.get_task_data_source,
+            source_limits=source_limits,
+            log=logger,
+        )
+        return await scheduler.run(task_names)
 
     def print_execution_summary(self, results: List[Dict[str, Any]]):
         """打印执行摘要"""
@@ -456,8 +449,7 @@ class DataCollectionProductionUpdater:
                 # 更新数据源级别统计
                 try:
                     task_info = UnifiedTaskFactory.get_task_info(task_name)
-                    task_class = UnifiedTaskFactory._task_registry[task_name]
-                    data_source = getattr(task_class, 'data_source', 'unknown')
+                    data_source = task_info.get('data_source') or 'unknown'
 
                     if data_source not in self.stats['data_source_stats']:
                         self.stats['data_source_stats'][data_source] = {
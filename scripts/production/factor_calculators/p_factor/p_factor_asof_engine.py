@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+P因子批量 as-of 解析引擎
+
+逐日计算时，每个计算日都要在 pgs_factors.pit_financial_indicators 上重跑一次
+ROW_NUMBER() 窗口查询。本模块改为：
+1. 一次性加载整个区间所需的 PIT 指标历史（按 ts_code, ann_date 排序）
+2. 对所有 (calc_date, ts_code) 组合做一次向量化 as-of 查找，
+   得到每个计算日、每只股票在该时点可见的最新有效记录
+
+选取规则与逐日 SQL 完全一致：
+- ann_date <= calc_date（PIT 原则）
+- end_date >= calc_date - 10 个月
+- 排序优先级：ann_date DESC, end_date DESC, data_source（report > express > forecast > 其他）
+- 股票在 calc_date 处于上市状态（list_date <= calc_date 且未退市）
+"""
+
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS: List[str] = [
+    'ts_code', 'end_date', 'ann_date', 'data_source',
+    'gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm',
+    'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
+    'asset_turnover_ttm', 'equity_multiplier',
+    'debt_to_asset_ratio', 'equity_ratio',
+    'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
+    'data_quality', 'calculation_status'
+]
+
+DATA_SOURCE_PRIORITY = {'report': 1, 'express': 2, 'forecast': 3}
+VALID_DATA_QUALITY = ('high', 'normal', 'outlier_high', 'outlier_low')
+END_DATE_LOOKBACK_MONTHS = 10
+
+HISTORY_QUERY = f"""
+SELECT {', '.join('pit.' + c for c in INDICATOR_COLUMNS)}
+FROM pgs_factors.pit_financial_indicators pit
+WHERE pit.ann_date <= %s
+AND pit.end_date >= (%s::date - INTERVAL '{END_DATE_LOOKBACK_MONTHS} months')
+AND pit.calculation_status = 'success'
+AND pit.data_quality IN {VALID_DATA_QUALITY}
+"""
+
+LISTING_QUERY = """
+SELECT ts_code, list_date, delist_date
+FROM tushare.stock_basic
+WHERE list_date <= %s
+AND (delist_date IS NULL OR delist_date > %s)
+"""
+
+
+def load_indicator_history(db_manager, calc_dates: List[str]) -> pd.DataFrame:
+    """一次性加载覆盖全部计算日所需的 PIT 指标历史"""
+    results = db_manager.fetch_sync(HISTORY_QUERY, (max(calc_dates), min(calc_dates)))
+    return pd.DataFrame(results or [], columns=INDICATOR_COLUMNS)
+
+
+def load_listings(db_manager, calc_dates: List[str]) -> pd.DataFrame:
+    """加载在计算区间内任一时点处于上市状态的股票及其上市/退市日期"""
+    results = db_manager.fetch_sync(LISTING_QUERY, (max(calc_dates), min(calc_dates)))
+    return pd.DataFrame(results or [], columns=['ts_code', 'list_date', 'delist_date'])
+
+
+def _to_day_numbers(values) -> np.ndarray:
+    """日期列转为自 1970-01-01 起的天数（缺失为 int64 最大值）"""
+    days = pd.to_datetime(pd.Series(values), errors='coerce').to_numpy().astype('datetime64[D]')
+    result = days.astype(np.int64)
+    result[np.isnat(days)] = np.iinfo(np.int64).max
+    return result
+
+
+def listed_pairs(listings: pd.DataFrame, calc_dates: Iterable[str]) -> pd.DataFrame:
+    """展开每个计算日的上市股票集合，返回 (calc_date, ts_code)"""
+    calc_dates = list(calc_dates)
+    if listings.empty or not calc_dates:
+        return pd.DataFrame(columns=['calc_date', 'ts_code'])
+
+    listings = listings.sort_values('ts_code', kind='mergesort').reset_index(drop=True)
+    list_days = _to_day_numbers(listings['list_date'])
+    delist_days = _to_day_numbers(listings['delist_date'])
+    calc_days = _to_day_numbers(calc_dates)
+
+    # [计算日 x 股票] 的上市状态矩阵
+    listed = (list_days[None, :] <= calc_days[:, None]) & (delist_days[None, :] > calc_days[:, None])
+    date_idx, stock_idx = np.nonzero(listed)
+    return pd.DataFrame({
+        'calc_date': np.asarray(calc_dates, dtype=object)[date_idx],
+        'ts_code': listings['ts_code'].to_numpy()[stock_idx],
+    })
+
+
+def resolve_asof_indicators(
+    history: pd.DataFrame,
+    pairs: pd.DataFrame,
+    lookback_months: int = END_DATE_LOOKBACK_MONTHS,
+) -> pd.DataFrame:
+    """
+    为每个 (calc_date, ts_code) 选取在 calc_date 可见的最新有效指标记录。
+
+    Args:
+        history: PIT 指标历史（INDICATOR_COLUMNS）
+        pairs: 待解析的 (calc_date, ts_code) 组合
+        lookback_months: end_date 回看月数
+
+    Returns:
+        带 calc_date 列的指标记录，按 (calc_date, ts_code) 排序；无可用记录的组合不出现在结果中
+    """
+    columns = ['calc_date'] + INDICATOR_COLUMNS
+    if history.empty or pairs.empty:
+        return pd.DataFrame(columns=columns)
+
+    hist = history.dropna(subset=['ts_code', 'ann_date']).copy()
+    hist['_priority'] = hist['data_source'].map(DATA_SOURCE_PRIORITY).fillna(9)
+    # 组内升序排列后，ann_date <= calc_date 的前缀中最后一条即 ROW_NUMBER() = 1 的记录
+    hist = hist.sort_values(
+        ['ts_code', 'ann_date', 'end_date', '_priority'],
+        ascending=[True, True, True, False],
+        kind='mergesort',
+    ).reset_index(drop=True)
+
+    codes, code_index = np.unique(hist['ts_code'].to_numpy().astype(str), return_inverse=True)
+    ann_days = _to_day_numbers(hist['ann_date'])
+    end_days = _to_day_numbers(hist['end_date'])
+    # end_date 缺失的记录在 SQL 中不满足回看条件，视为永远过旧
+    end_days[end_days == np.iinfo(np.int64).max] = np.iinfo(np.int64).min
+    group_start = np.searchsorted(code_index, np.arange(len(codes)), side='left')
+
+    # 复合键 (股票编号, 公告日) 单调递增，一次 searchsorted 完成全部 as-of 查找
+    span = np.int64(1 << 20)
+    keys = code_index.astype(np.int64) * span + ann_days
+
+    pairs = pairs.sort_values(['calc_date', 'ts_code'], kind='mergesort').reset_index(drop=True)
+    pair_codes = pairs['ts_code'].to_numpy().astype(str)
+    code_pos = np.searchsorted(codes, pair_codes)
+    code_pos = np.minimum(code_pos, len(codes) - 1)
+    known = codes[code_pos] == pair_codes
+
+    unique_dates = pd.Index(pd.unique(pairs['calc_date']))
+    unique_days = _to_day_numbers(unique_dates)
+    cutoff_days = _to_day_numbers(
+        pd.to_datetime(unique_dates) - pd.DateOffset(months=lookback_months)
+    )
+    date_pos = unique_dates.get_indexer(pairs['calc_date'])
+    calc_days = unique_days[date_pos]
+    cutoffs = cutoff_days[date_pos]
+
+    starts = group_start[code_pos]
+    pos = np.searchsorted(keys, code_pos.astype(np.int64) * span + calc_days, side='right') - 1
+    valid = known & (pos >= starts)
+
+    # end_date 过旧（如对老报告期的更正公告）时，沿公告顺序向前回退到满足条件的记录
+    stale = valid & (end_days[np.where(valid, pos, 0)] < cutoffs)
+    while stale.any():
+        pos = np.where(stale, pos - 1, pos)
+        valid &= pos >= starts
+        stale = valid & (end_days[np.where(valid, pos, 0)] < cutoffs)
+
+    matched = hist.iloc[pos[valid]][INDICATOR_COLUMNS].reset_index(drop=True)
+    matched.insert(0, 'calc_date', pairs['calc_date'].to_numpy()[valid])
+    return matched
@@ -61,6 +61,24 @@ sys.path.append(str(project_root))
 
 from alphahome.common.db_manager import DBManager
 from alphahome.common.config_manager import ConfigManager
+from alphahome.fetchers.tools.calendar import get_trade_calendar_index_sync
+
+# 批量 as-of 解析引擎（同目录模块，按文件路径加载）
+import importlib.util
+_engine_spec = importlib.util.spec_from_file_location(
+    "p_factor_asof_engine",
+    Path(__file__).parent / "p_factor_asof_engine.py"
+)
+asof_engine = importlib.util.module_from_spec(_engine_spec)
+_engine_spec.loader.exec_module(asof_engine)
+
+# PIT / 因子表共用的 COPY 批量写入（按文件路径加载，避免引入 PIT 管理器依赖）
+_writer_spec = importlib.util.spec_from_file_location(
+    "pit_bulk_writer",
+    Path(__file__).resolve().parents[2] / "data_updaters" / "pit" / "base" / "pit_bulk_writer.py"
+)
+pit_bulk_writer = importlib.util.module_from_spec(_writer_spec)
+_writer_spec.loader.exec_module(pit_bulk_writer)
 
 
 class ProductionPFactorCalculator:
@@ -150,7 +168,8 @@ class ProductionPFactorCalculator:
         self,
         start_date: str,
         end_date: str,
-        mode: Optional[str] = None
+        mode: Optional[str] = None,
+        engine: str = 'asof'
     ) -> Dict[str, Any]:
         """基于日期范围的批量P因子计算
 
@@ -158,6 +177,7 @@ class ProductionPFactorCalculator:
             start_date: 开始日期
             end_date: 结束日期
             mode: 执行模式 ('incremental', 'backfill', None为自动检测)
+            engine: 'asof' 一次加载指标历史并批量解析全部日期；'per_date' 逐日查询（旧实现）
 
         Returns:
             执行结果统计
@@ -192,10 +212,108 @@ class ProductionPFactorCalculator:
 
         # 3. 执行批量计算
         total_start = time.time()
+
+        if engine == 'asof':
+            total_success, total_failed, successful_dates = self._calculate_batch_asof(calc_dates)
+        elif engine == 'per_date':
+            total_success, total_failed, successful_dates = self._calculate_batch_per_date(calc_dates)
+        else:
+            raise ValueError(f"未知的计算引擎: {engine}（可选 'asof' / 'per_date'）")
+
+        total_time = time.time() - total_start
+
+        self.logger.info("=" * 50)
+        self.logger.info("批量P因子计算完成")
+        self.logger.info("=" * 50)
+        self.logger.info(f"总耗时: {total_time:.2f} 秒")
+        self.logger.info(f"总成功: {total_success}")
+        self.logger.info(f"总失败: {total_failed}")
+
+        if total_time > 0:
+            throughput = total_success / total_time
+            self.logger.info(f"吞吐量: {throughput:.1f} 只/秒")
+
+        return {
+            'success_count': total_success,
+            'failed_count': total_failed,
+            'total_time': total_time,
+            'throughput': total_success / total_time if total_time > 0 else 0,
+            'total_dates': len(calc_dates),
+            'successful_dates': successful_dates,
+            'failed_dates': len(calc_dates) - successful_dates,
+            'total_stocks_processed': total_success + total_failed,
+            'total_records_saved': total_success
+        }
+
+    def _calculate_batch_asof(self, calc_dates: List[str]):
+        """一次加载 PIT 指标历史，批量解析所有计算日的最新可见指标后逐日评分并保存
+
+        Returns:
+            (成功记录数, 失败记录数, 成功日期数)
+        """
+        query_start = time.time()
+        history = asof_engine.load_indicator_history(self.db_manager, calc_dates)
+        listings = asof_engine.load_listings(self.db_manager, calc_dates)
+        pairs = asof_engine.listed_pairs(listings, calc_dates)
+        resolved = asof_engine.resolve_asof_indicators(history, pairs)
+        query_time = time.time() - query_start
+        self.logger.info(
+            f"批量加载指标历史 {len(history)} 条，解析 {len(pairs)} 个(日期,股票)组合，"
+            f"命中 {len(resolved)} 条，耗时 {query_time:.2f} 秒"
+        )
+
+        universe_sizes = pairs.groupby('calc_date').size() if not pairs.empty else pd.Series(dtype=int)
+        groups = {d: g for d, g in resolved.groupby('calc_date', sort=False)} if not resolved.empty else {}
+
         total_success = 0
         total_failed = 0
         successful_dates = 0
+        for i, calc_date in enumerate(calc_dates, 1):
+            universe = int(universe_sizes.get(calc_date, 0))
+            if universe == 0:
+                self.logger.warning(f"{calc_date} 未找到在交易股票")
+                continue
+
+            indicators = groups.get(calc_date)
+            try:
+                success_count = 0
+                if indicators is not None and not indicators.empty:
+                    indicators = indicators.drop(columns=['calc_date']).reset_index(drop=True)
+                    calc_start = time.time()
+                    p_factors = self._calculate_p_factors_from_indicators_pit(indicators, calc_date)
+                    self.stats['calculation_time'] = time.time() - calc_start
+
+                    save_start = time.time()
+                    if not p_factors.empty:
+                        self._save_p_factors(p_factors)
+                        success_count = len(p_factors)
+                    self.stats['save_time'] = time.time() - save_start
+                else:
+                    self.logger.warning(f"在时点 {calc_date} 未找到预计算的财务指标数据")
+
+                total_success += success_count
+                total_failed += universe - success_count
+                if success_count > 0:
+                    successful_dates += 1
+                self.logger.info(
+                    f"[{i}/{len(calc_dates)}] {calc_date} 计算完成: "
+                    f"成功 {success_count}, 失败 {universe - success_count}"
+                )
+            except Exception as e:
+                self.logger.error(f"{calc_date} 计算失败: {e}")
+                total_failed += universe
 
+        return total_success, total_failed, successful_dates
+
+    def _calculate_batch_per_date(self, calc_dates: List[str]):
+        """逐日查询在交易股票和 PIT 指标并计算保存（旧实现）
+
+        Returns:
+            (成功记录数, 失败记录数, 成功日期数)
+        """
+        total_success = 0
+        total_failed = 0
+        successful_dates = 0
         for i, calc_date in enumerate(calc_dates, 1):
             self.logger.info(f"\n进度: [{i}/{len(calc_dates)}] 处理日期: {calc_date}")
 
@@ -222,30 +340,7 @@ class ProductionPFactorCalculator:
                 if 'stock_codes' in locals():
                     total_failed += len(stock_codes)
 
-        total_time = time.time() - total_start
-
-        self.logger.info("=" * 50)
-        self.logger.info("批量P因子计算完成")
-        self.logger.info("=" * 50)
-        self.logger.info(f"总耗时: {total_time:.2f} 秒")
-        self.logger.info(f"总成功: {total_success}")
-        self.logger.info(f"总失败: {total_failed}")
-
-        if total_time > 0:
-            throughput = total_success / total_time
-            self.logger.info(f"吞吐量: {throughput:.1f} 只/秒")
-
-        return {
-            'success_count': total_success,
-            'failed_count': total_failed,
-            'total_time': total_time,
-            'throughput': total_success / total_time if total_time > 0 else 0,
-            'total_dates': len(calc_dates),
-            'successful_dates': successful_dates,
-            'failed_dates': len(calc_dates) - successful_dates,
-            'total_stocks_processed': total_success + total_failed,
-            'total_records_saved': total_success
-        }
+        return total_success, total_failed, successful_dates
 
     def detect_execution_mode(self, start_date: str, end_date: str) -> str:
         """智能检测执行模式
@@ -289,49 +384,38 @@ class ProductionPFactorCalculator:
         Returns:
             计算日期列表
         """
-        # 生成所有周五日期
-        all_fridays = self._generate_friday_dates(start_date, end_date)
+        # 生成每周最后一个交易日
+        week_end_dates = self._generate_week_end_dates(start_date, end_date)
 
         if mode == 'backfill':
             # 回填模式：计算所有日期
-            return all_fridays
+            return week_end_dates
         elif mode == 'incremental':
             # 增量模式：只计算缺失的日期
-            return self._filter_missing_dates(all_fridays)
+            return self._filter_missing_dates(week_end_dates)
         else:
             self.logger.warning(f"未知执行模式: {mode}，使用增量模式")
-            return self._filter_missing_dates(all_fridays)
+            return self._filter_missing_dates(week_end_dates)
+
+    def _generate_week_end_dates(self, start_date: str, end_date: str) -> List[str]:
+        """生成指定范围内每周的最后一个交易日
 
-    def _generate_friday_dates(self, start_date: str, end_date: str) -> List[str]:
-        """生成指定范围内的所有周五日期
+        基于进程级交易日历索引：通常为周五，周五休市时为该周最后一个交易日；
+        周末交易日晚于 end_date 的周（尚未结束）不包含在内。
 
         Args:
             start_date: 开始日期
             end_date: 结束日期
 
         Returns:
-            周五日期列表
+            每周最后一个交易日列表 (YYYY-MM-DD)
         """
-        from datetime import datetime, timedelta
-
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-
-        fridays = []
-        current = start
-
-        # 找到第一个周五
-        while current.weekday() != 4:  # 4 = 周五
-            current += timedelta(days=1)
-            if current > end:
-                break
+        index = get_trade_calendar_index_sync(self.db_manager)
+        if index is None:
+            raise RuntimeError("无法加载交易日历，无法生成计算日期")
 
-        # 收集所有周五
-        while current <= end:
-            fridays.append(current.strftime('%Y-%m-%d'))
-            current += timedelta(days=7)
-
-        return fridays
+        week_ends = index.period_end_trade_days(start_date, end_date, freq='W')
+        return [f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in week_ends]
 
     def _filter_missing_dates(self, dates: List[str]) -> List[str]:
         """过滤出缺失P因子数据的日期
@@ -844,41 +928,27 @@ class ProductionPFactorCalculator:
         # 先删除旧数据
         self.db_manager.execute_sync(delete_sql, (calc_date,))
         
-        # 批量插入新数据
-        insert_query = """
-        INSERT INTO pgs_factors.p_factor (
-            ts_code, calc_date, ann_date, end_date, data_source,
-            p_score, p_rank,
-            gpa, roe_excl, roa_excl,
-            net_margin_ttm, operating_margin_ttm, roi_ttm,
-            asset_turnover_ttm, equity_multiplier,
-            debt_to_asset_ratio, equity_ratio,
-            revenue_yoy_growth, n_income_yoy_growth, operate_profit_yoy_growth,
-            data_quality, calculation_status
-        ) VALUES (
-            %s, %s, %s, %s, %s,
-            %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s,
-            %s, %s,
-            %s, %s, %s,
-            %s, %s
-        )
-        """
-
-        for _, row in p_factors.iterrows():
-            params = (
-                row['ts_code'], row['calc_date'], row['ann_date'], row['end_date'], row['data_source'],
-                row['p_score'], row['p_rank'],
-                row['gpa'], row['roe_excl'], row['roa_excl'],
-                row['net_margin_ttm'], row['operating_margin_ttm'], row['roi_ttm'],
-                row['asset_turnover_ttm'], row['equity_multiplier'],
-                row['debt_to_asset_ratio'], row['equity_ratio'],
-                row['revenue_yoy_growth'], row['n_income_yoy_growth'], row['operate_profit_yoy_growth'],
-                row['data_quality'], row['calculation_status']
-            )
-            self.db_manager.execute_sync(insert_query, params)
+        # 批量写入新数据（COPY + INSERT ... SELECT）
+        fields = [
+            'ts_code', 'calc_date', 'ann_date', 'end_date', 'data_source',
+            'p_score', 'p_rank',
+            'gpa', 'roe_excl', 'roa_excl',
+            'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
+            'asset_turnover_ttm', 'equity_multiplier',
+            'debt_to_asset_ratio', 'equity_ratio',
+            'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
+            'data_quality', 'calculation_status'
+        ]
+        try:
+            pit_bulk_writer.bulk_upsert(self.db_manager, p_factors, 'pgs_factors', 'p_factor', fields)
+        except Exception as e:
+            self.logger.warning(f"P因子批量写入失败，回退逐条插入: {e}")
+            insert_query = f"""
+            INSERT INTO pgs_factors.p_factor ({', '.join(fields)})
+            VALUES ({', '.join(['%s'] * len(fields))})
+            """
+            for row in p_factors[fields].itertuples(index=False, name=None):
+                self.db_manager.execute_sync(insert_query, row)
 
         self.logger.info(f"已保存 {len(p_factors)} 条P因子数据到数据库")
     
@@ -363,7 +363,7 @@ def main():
         if args.validate_only:
             # 仅验证模式
             print("🔍 数据质量验证模式")
-            calc_dates = runner.calculator._generate_friday_dates(args.start_date, args.end_date)
+            calc_dates = runner.calculator._generate_week_end_dates(args.start_date, args.end_date)
             print(f"验证 {len(calc_dates)} 个日期的数据质量")
             return
 
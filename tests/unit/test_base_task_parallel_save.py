@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""BaseTask 并行保存：按主键哈希分片，分片互不相交且在多个连接上并发写入。"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pandas as pd
+import pytest
+
+from alphahome.common.task_system.base_task import BaseTask
+
+
+class _ParallelSaveTask(BaseTask):
+    task_type = "fetch"
+    name = "test_parallel_save_dummy"
+    table_name = "parallel_save_table"
+    primary_keys = ["ts_code", "trade_date"]
+    date_column = "trade_date"
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _fetch_data(self, stop_event=None, **kwargs):
+        return pd.DataFrame()
+
+    async def _save_to_database(self, data, stop_event=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.batches.append(data)
+        return len(data)
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "ts_code": [f"{i % 50:06d}.SZ" for i in range(rows)],
+        "trade_date": [f"2024{(i // 50) % 12 + 1:02d}{(i // 600) % 28 + 1:02d}" for i in range(rows)],
+        "close": [float(i) for i in range(rows)],
+    })
+
+
+def _make_task(**config):
+    db = AsyncMock()
+    db.table_exists = AsyncMock(return_value=True)
+    return _ParallelSaveTask(db, task_config=config)
+
+
+@pytest.mark.asyncio
+async def test_parallel_save_shards_are_disjoint_and_cover_all_rows():
+    task = _make_task(save_batch_size=100, save_parallelism=4)
+    data = _frame(1000)
+
+    result = await task._save_data(data)
+
+    assert result["rows"] == 1000
+    assert task.max_in_flight > 1
+    assert all(len(batch) <= 100 for batch in task.batches)
+
+    saved = pd.concat(task.batches)
+    keys = saved[["ts_code", "trade_date"]].apply(tuple, axis=1)
+    assert keys.is_unique and len(keys) == len(data)
+
+    # 同一主键只能落在一个分片：每个批次只来自一个哈希分片
+    shard_ids = pd.util.hash_pandas_object(data[task.primary_keys], index=False) % 4
+    shard_of = dict(zip(data[task.primary_keys].itertuples(index=False, name=None), shard_ids))
+    for batch in task.batches:
+        assert len({shard_of[key] for key in batch[task.primary_keys].itertuples(index=False, name=None)}) == 1
+
+
+@pytest.mark.asyncio
+async def test_default_parallelism_saves_serially():
+    task = _make_task(save_batch_size=100)
+
+    result = await task._save_data(_frame(500))
+
+    assert result["rows"] == 500
+    assert task.max_in_flight == 1
+    assert len(task.batches) == 5
+
+
+@pytest.mark.asyncio
+async def test_failing_shard_cancels_remaining_shards():
+    task = _make_task(save_batch_size=50, save_parallelism=3)
+    original = task._save_to_database
+
+    async def failing(data, stop_event=None, **kwargs):
+        if len(task.batches) >= 2:
+            raise RuntimeError("boom")
+        return await original(data, stop_event=stop_event)
+
+    task._save_to_database = failing
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await task._save_data(_frame(900))
+    await asyncio.sleep(0.05)
+    assert len(task.batches) < 900 // 50
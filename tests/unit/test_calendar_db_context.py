@@ -30,6 +30,7 @@ class _FakeDbManager:
 @pytest.mark.asyncio
 async def test_trade_calendar_uses_injected_db_manager(monkeypatch):
     calendar._TRADE_CAL_CACHE.clear()
+    calendar._TRADE_CAL_INDEXES.clear()
     db_manager = _FakeDbManager()
 
     async def fail_if_legacy_pool_is_used():
@@ -45,5 +46,6 @@ async def test_trade_calendar_uses_injected_db_manager(monkeypatch):
 
     assert trade_days == ["20240506"]
     assert len(db_manager.calls) == 1
-    assert db_manager.calls[0][1] == ("SSE", "20240506", "20240507")
+    # 交易日历索引一次加载整个交易所的日历
+    assert db_manager.calls[0][1] == ("SSE",)
 
@@ -0,0 +1,92 @@
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alphahome.common.db_components.copy_encoder import (
+    encode_copy_records,
+    iter_copy_records_rowwise,
+    parse_date_string,
+)
+
+
+def _mixed_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ts_code": ["000001.SZ", "600000.SH\t", None, "a\r\nb\x00", ""],
+            "trade_date": ["20240102", "2024-01-03", "2024/01/04", "20241399", None],
+            "ann_date": pd.to_datetime(
+                ["2024-01-02 15:00", None, "2024-01-04 00:00", "2024-01-05 00:00", "2024-01-06 00:00"]
+            ),
+            "close": [10.5, np.nan, 11.0, 12.25, None],
+            "vol": pd.array([1, None, 3, 4, 5], dtype="Int64"),
+            "is_st": [True, False, True, False, True],
+            "end_date": [date(2023, 12, 31), None, date(2024, 3, 31), pd.NaT, date(2024, 6, 30)],
+            "update_time": [
+                datetime(2024, 1, 2, 9, 30),
+                "2024-01-03",
+                None,
+                pd.Timestamp("2024-01-05 10:00"),
+                np.datetime64("2024-01-06T00:00"),
+            ],
+            "amount": [Decimal("1.5"), None, Decimal("2"), Decimal("3.25"), np.nan],
+            "mixed": [1, "x\ty", 2.5, None, pd.Timestamp("2024-01-01")],
+        }
+    )
+
+
+def test_columnar_encoder_matches_rowwise_reference():
+    df = _mixed_frame()
+    date_columns = {"trade_date", "ann_date", "end_date"}
+    timestamp_columns = {"update_time"}
+
+    expected = list(iter_copy_records_rowwise(df, date_columns, timestamp_columns))
+    actual = list(encode_copy_records(df, date_columns, timestamp_columns))
+
+    assert actual == expected
+    for row_actual, row_expected in zip(actual, expected):
+        assert [type(v) for v in row_actual] == [type(v) for v in row_expected]
+
+
+def test_columnar_encoder_cleans_strings_and_parses_dates():
+    df = _mixed_frame()
+    records = list(encode_copy_records(df, {"trade_date", "ann_date"}, set()))
+
+    assert [r[0] for r in records] == ["000001.SZ", "600000.SH ", None, "ab", None]
+    assert [r[1] for r in records] == [
+        date(2024, 1, 2),
+        date(2024, 1, 3),
+        date(2024, 1, 4),
+        None,
+        None,
+    ]
+    assert records[0][2] == date(2024, 1, 2)
+    assert records[1][2] is None
+    assert records[1][3] is None and records[1][4] is None
+
+
+def test_encoder_handles_empty_frame_and_parse_failures(caplog):
+    assert list(encode_copy_records(pd.DataFrame(), set(), set())) == []
+
+    with caplog.at_level(logging.WARNING):
+        assert parse_date_string("20240230") is None
+    assert "无法解析日期字符串" in caplog.text
+
+
+@pytest.mark.parametrize("size", [1, 257])
+def test_columnar_encoder_matches_reference_on_numeric_frame(size):
+    rng = np.random.default_rng(size)
+    df = pd.DataFrame(
+        {
+            "trade_date": pd.date_range("2020-01-01", periods=size).strftime("%Y%m%d"),
+            "open": rng.normal(size=size),
+            "vol": rng.integers(0, 1000, size=size),
+        }
+    )
+    df.loc[df.index[::3], "open"] = np.nan
+
+    expected = list(iter_copy_records_rowwise(df, {"trade_date"}, set()))
+    assert list(encode_copy_records(df, {"trade_date"}, set())) == expected
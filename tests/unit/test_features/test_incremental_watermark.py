@@ -0,0 +1,313 @@
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from alphahome.features.storage.incremental_view import (
+    IncrementalFeatureView,
+    IncrementalTableView,
+    coalesce_date_ranges,
+    month_slices,
+)
+
+
+class _FakeConn:
+    def __init__(
+        self,
+        watermark=date(2024, 3, 1),
+        last_success=datetime(2024, 3, 2, 10, 0, tzinfo=timezone.utc),
+        source_columns=None,
+        changed=None,
+        source_max=None,
+        partitioned=False,
+    ):
+        self.watermark = watermark
+        self.last_success = last_success
+        self.source_columns = source_columns or {}
+        self.changed = changed or {}
+        self.source_max = source_max or {}
+        self.partitioned = partitioned
+        self.statements = []
+        self.fetch_args = []
+        self.column_lookups = 0
+        self.closed = False
+
+    @asynccontextmanager
+    async def _transaction(self):
+        self.statements.append("BEGIN")
+        try:
+            yield
+        except Exception:
+            self.statements.append("ROLLBACK")
+            raise
+        else:
+            self.statements.append("COMMIT")
+
+    def transaction(self):
+        return self._transaction()
+
+    async def execute(self, sql, *args):
+        self.statements.append(" ".join(sql.split()))
+
+    async def fetch(self, sql, *args):
+        sql = " ".join(sql.split())
+        if "information_schema.columns" in sql:
+            schema, table = args
+            if schema == "features":
+                self.column_lookups += 1
+                return [{"column_name": c} for c in ("trade_date", "ts_code", "value")]
+            return [{"column_name": c} for c in self.source_columns.get(f"{schema}.{table}", [])]
+        if sql.startswith("SELECT DISTINCT"):
+            self.fetch_args.append(args)
+            self.fetch_sql = sql
+            table = sql.split(" FROM ")[1].split()[0]
+            return [{"d": d} for d in self.changed.get(table, [])]
+        raise AssertionError(f"unexpected fetch: {sql}")
+
+    async def fetchrow(self, sql, *args):
+        sql = " ".join(sql.split())
+        if "AS watermark" in sql:
+            return {"watermark": self.watermark}
+        if "mv_refresh_log" in sql:
+            return {"last_success": self.last_success}
+        if "relkind" in sql:
+            return {"partitioned": self.partitioned}
+        if "to_regclass" in sql:
+            return {"exists": True}
+        if "COUNT(*)" in sql:
+            return {"cnt": 5}
+        if "MAX(" in sql:
+            table = sql.split(" FROM ")[1].split()[0]
+            return {"d": self.source_max.get(table)}
+        raise AssertionError(f"unexpected fetchrow: {sql}")
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeDBManager:
+    connection_string = "postgresql://fake"
+
+
+class _View(IncrementalTableView):
+    name = "demo_incremental"
+    source_tables = ["tushare.stock_daily", "akshare.macro_daily"]
+
+    def __init__(self):
+        super().__init__(db_manager=_FakeDBManager())
+        self.logged = []
+        self.sql_ranges = []
+
+    def get_create_sql(self) -> str:
+        return "CREATE TABLE features.mv_demo_incremental (trade_date DATE)"
+
+    def get_incremental_sql(self, start_date: str, end_date: str) -> str:
+        self.sql_ranges.append((start_date, end_date))
+        return f"SELECT * FROM src WHERE trade_date BETWEEN '{start_date}' AND '{end_date}'"
+
+    async def _is_materialized_view(self) -> bool:
+        return False
+
+    async def _log_refresh(self, **kwargs):
+        self.logged.append(kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    IncrementalFeatureView._column_cache.clear()
+    IncrementalFeatureView._source_capability_cache.clear()
+    yield
+    IncrementalFeatureView._column_cache.clear()
+    IncrementalFeatureView._source_capability_cache.clear()
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    holder = {}
+
+    def _install(conn):
+        holder["conn"] = conn
+
+        async def _connect(*args, **kwargs):
+            return conn
+
+        import asyncpg
+
+        monkeypatch.setattr(asyncpg, "connect", _connect)
+        return conn
+
+    return _install
+
+
+def test_coalesce_date_ranges_merges_nearby_dates():
+    dates = ["20240105", date(2024, 1, 2), "2024-01-20", date(2024, 1, 9)]
+
+    assert coalesce_date_ranges(dates, max_gap_days=7) == [
+        (date(2024, 1, 2), date(2024, 1, 9)),
+        (date(2024, 1, 20), date(2024, 1, 20)),
+    ]
+    assert coalesce_date_ranges([]) == []
+
+
+def test_month_slices_cover_range():
+    assert month_slices(date(2023, 12, 15), date(2024, 2, 1)) == [
+        (date(2023, 12, 1), date(2024, 1, 1)),
+        (date(2024, 1, 1), date(2024, 2, 1)),
+        (date(2024, 2, 1), date(2024, 3, 1)),
+    ]
+
+
+SOURCES = {
+    "tushare.stock_daily": ["ts_code", "trade_date", "update_time"],
+    "akshare.macro_daily": ["trade_date", "value"],
+}
+
+
+@pytest.mark.asyncio
+async def test_watermark_refresh_recomputes_only_changed_ranges(connect):
+    conn = connect(
+        _FakeConn(
+            source_columns=SOURCES,
+            changed={"tushare.stock_daily": [date(2024, 1, 3), date(2024, 1, 5), date(2024, 2, 20)]},
+            source_max={"akshare.macro_daily": date(2024, 3, 4)},
+        )
+    )
+    view = _View()
+
+    result = await view.refresh("incremental")
+
+    assert result["refreshed_ranges"] == [
+        ("20240103", "20240105"),
+        ("20240220", "20240220"),
+        ("20240302", "20240304"),
+    ]
+    assert view.sql_ranges == result["refreshed_ranges"]
+    # 变更检测基于上次成功刷新时间（减去安全余量）
+    # started_at 为 TIMESTAMPTZ（asyncpg 返回带时区的值），在 SQL 中换算为会话时区再与 update_time 比较
+    assert conn.fetch_args[0][0] == datetime(2024, 3, 2, 9, 50, tzinfo=timezone.utc)
+    assert "update_time > ($1::timestamptz AT TIME ZONE current_setting('TimeZone'))" in conn.fetch_sql
+    # 每个区间独立事务：BEGIN / DELETE / INSERT / COMMIT
+    deletes = [i for i, s in enumerate(conn.statements) if s.startswith("DELETE FROM")]
+    assert len(deletes) == 3
+    for i in deletes:
+        assert conn.statements[i - 1] == "BEGIN"
+        assert conn.statements[i + 1].startswith("INSERT INTO features.mv_demo_incremental")
+        assert conn.statements[i + 2] == "COMMIT"
+    assert result["row_count"] == 15
+    assert view.logged[-1]["date_range"] == "20240103~20240304"
+    assert conn.closed
+
+
+@pytest.mark.asyncio
+async def test_watermark_refresh_skips_when_nothing_changed(connect):
+    conn = connect(_FakeConn(source_columns=SOURCES, source_max={"akshare.macro_daily": date(2024, 3, 1)}))
+    view = _View()
+
+    result = await view.refresh("incremental")
+
+    assert result["status"] == "success"
+    assert result["row_count"] == 0
+    assert result["refreshed_ranges"] == []
+    assert conn.statements == []
+    assert view.logged[-1]["success"] is True
+
+
+@pytest.mark.asyncio
+async def test_changes_propagate_forward_recomputes_until_today(connect):
+    conn = connect(
+        _FakeConn(source_columns=SOURCES, changed={"tushare.stock_daily": [date(2024, 2, 1), date(2024, 2, 28)]})
+    )
+    view = _View()
+    view.changes_propagate_forward = True
+
+    result = await view.refresh("incremental")
+
+    today = datetime.now().date()
+    assert result["refreshed_ranges"] == [("20240201", today.strftime("%Y%m%d"))]
+    assert sum(s.startswith("DELETE FROM") for s in conn.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_window_without_refresh_history(connect):
+    connect(_FakeConn(source_columns=SOURCES, last_success=None))
+    view = _View()
+
+    result = await view.refresh("incremental")
+
+    today = datetime.now().date()
+    assert result["refreshed_ranges"] == [
+        ((today - timedelta(days=30)).strftime("%Y%m%d"), today.strftime("%Y%m%d"))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_window_mode_keeps_fixed_range(connect):
+    conn = connect(_FakeConn(source_columns=SOURCES))
+    view = _View()
+    view.incremental_mode = "window"
+    view.incremental_days = 5
+
+    result = await view.refresh("incremental")
+
+    today = datetime.now().date()
+    assert result["refreshed_ranges"] == [
+        ((today - timedelta(days=5)).strftime("%Y%m%d"), today.strftime("%Y%m%d"))
+    ]
+    assert not conn.fetch_args
+
+
+@pytest.mark.asyncio
+async def test_column_list_is_cached_across_refreshes(connect):
+    conn = connect(_FakeConn(source_columns=SOURCES, last_success=None))
+    view = _View()
+
+    await view.refresh("incremental")
+    await view.refresh("incremental")
+
+    assert conn.column_lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_partitioned_target_swaps_month_partitions(connect):
+    conn = connect(
+        _FakeConn(
+            source_columns=SOURCES,
+            changed={"tushare.stock_daily": [date(2024, 1, 30), date(2024, 2, 2)]},
+            partitioned=True,
+        )
+    )
+    view = _View()
+
+    result = await view.refresh("incremental")
+
+    assert not any(s.startswith("DELETE FROM") for s in conn.statements)
+    assert view.sql_ranges == [("20240101", "20240131"), ("20240201", "20240229")]
+    shadow = "features.mv_demo_incremental_p202401__new"
+    assert conn.statements[:3] == [
+        f"DROP TABLE IF EXISTS {shadow};",
+        f"CREATE TABLE {shadow} (LIKE features.mv_demo_incremental INCLUDING DEFAULTS INCLUDING CONSTRAINTS);",
+        conn.statements[2],
+    ]
+    assert conn.statements[2].startswith(f"INSERT INTO {shadow}")
+    assert conn.statements[3:9] == [
+        "BEGIN",
+        "ALTER TABLE features.mv_demo_incremental DETACH PARTITION features.mv_demo_incremental_p202401;",
+        "DROP TABLE features.mv_demo_incremental_p202401;",
+        f"ALTER TABLE features.mv_demo_incremental ATTACH PARTITION {shadow} "
+        "FOR VALUES FROM ('2024-01-01') TO ('2024-02-01');",
+        f"ALTER TABLE {shadow} RENAME TO mv_demo_incremental_p202401;",
+        "COMMIT",
+    ]
+    assert result["row_count"] == 10
+
+
+@pytest.mark.asyncio
+async def test_source_capability_cache_is_keyed_by_date_column():
+    conn = _FakeConn(source_columns={"tushare.fina_daily": ["ts_code", "trade_date", "ann_date", "update_time"]})
+
+    class _AnnDateView(_View):
+        source_date_columns = {"tushare.fina_daily": "ann_date"}
+
+    assert await _View()._get_source_capability(conn, "tushare.fina_daily") == ("trade_date", True)
+    # 同一张表在另一视图中使用不同的日期列，不应命中前一视图的缓存
+    assert await _AnnDateView()._get_source_capability(conn, "tushare.fina_daily") == ("ann_date", True)
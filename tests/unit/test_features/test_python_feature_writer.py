@@ -0,0 +1,265 @@
+from contextlib import asynccontextmanager
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alphahome.features.storage import python_feature as python_feature_module
+from alphahome.features.storage.python_feature import PythonFeatureTable
+
+
+class _FakeConn:
+    def __init__(self, fail_on=None):
+        self.statements = []
+        self.copies = []
+        self.transaction_depth = 0
+        self.fail_on = fail_on
+        self.closed = False
+        self.owner = "feature_owner"
+        self.grants = {}  # 表名 -> aclexplode 行
+        self.indexes = {}  # 表名 -> pg_index 行
+
+    @asynccontextmanager
+    async def _transaction(self):
+        self.transaction_depth += 1
+        self.statements.append("BEGIN")
+        try:
+            yield
+        except Exception:
+            self.statements.append("ROLLBACK")
+            raise
+        else:
+            self.statements.append("COMMIT")
+        finally:
+            self.transaction_depth -= 1
+
+    def transaction(self):
+        return self._transaction()
+
+    async def execute(self, sql, *args):
+        sql = " ".join(sql.split())
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("boom")
+        self.statements.append(sql)
+
+    async def fetchval(self, sql, *args):
+        return self.owner
+
+    async def fetch(self, sql, *args):
+        if "aclexplode" in sql:
+            return self.grants.get(args[0], [])
+        if "pg_index" in sql:
+            return self.indexes.get(args[0], [])
+        return [
+            {"column_name": "ts_code", "data_type": "character varying"},
+            {"column_name": "trade_date", "data_type": "date"},
+            {"column_name": "value", "data_type": "numeric"},
+            {"column_name": "updated_at", "data_type": "timestamp with time zone"},
+        ]
+
+    async def copy_records_to_table(self, table_name, records, columns, timeout=None):
+        assert self.transaction_depth > 0
+        self.copies.append((table_name, list(records), list(columns)))
+        return f"COPY {len(self.copies[-1][1])}"
+
+    async def close(self):
+        self.closed = True
+
+
+class _Feature(PythonFeatureTable):
+    name = "demo_feature"
+
+    def __init__(self, frame, **kwargs):
+        super().__init__(db_manager=_FakeDBManager(), **kwargs)
+        self.frame = frame
+        self.logged = []
+
+    def get_create_sql(self) -> str:
+        return "CREATE TABLE features.mv_demo_feature (ts_code TEXT)"
+
+    async def compute(self, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.frame
+
+    async def _log_refresh(self, **kwargs):
+        self.logged.append(kwargs)
+
+
+class _FakeDBManager:
+    connection_string = "postgresql://fake"
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "ts_code": ["000001.SZ", "000002.SZ", "000003.SZ"],
+            "trade_date": ["20240102", "20240103", None],
+            "value": [1.5, np.nan, np.int64(3)],
+        }
+    )
+
+
+@pytest.fixture
+def fake_conn(monkeypatch):
+    conn = _FakeConn()
+
+    async def _connect(*args, **kwargs):
+        return conn
+
+    import asyncpg
+
+    monkeypatch.setattr(asyncpg, "connect", _connect)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_insert_dataframe_copies_into_staging_then_merges(fake_conn):
+    feature = _Feature(_frame())
+
+    await feature._insert_dataframe(fake_conn, _frame())
+
+    assert len(fake_conn.copies) == 1
+    staging, records, columns = fake_conn.copies[0]
+    assert staging == "_stg_mv_demo_feature"
+    assert columns == ["ts_code", "trade_date", "value"]
+    assert records == [
+        ("000001.SZ", date(2024, 1, 2), 1.5),
+        ("000002.SZ", date(2024, 1, 3), None),
+        ("000003.SZ", None, 3.0),
+    ]
+    statements = fake_conn.statements
+    assert statements[0] == "BEGIN"
+    assert statements[1].startswith('CREATE TEMPORARY TABLE "_stg_mv_demo_feature"')
+    assert statements[2] == (
+        'INSERT INTO "features"."mv_demo_feature" ("ts_code", "trade_date", "value") '
+        'SELECT "ts_code", "trade_date", "value" FROM "_stg_mv_demo_feature"'
+    )
+    assert statements[-1] == "COMMIT"
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_deletes_and_inserts_in_one_transaction(fake_conn):
+    feature = _Feature(_frame())
+
+    result = await feature.refresh("incremental")
+
+    assert result["row_count"] == 3
+    statements = fake_conn.statements
+    delete_idx = next(i for i, s in enumerate(statements) if s.startswith("DELETE FROM"))
+    insert_idx = next(i for i, s in enumerate(statements) if s.startswith("INSERT INTO"))
+    assert statements[delete_idx - 1] == "BEGIN"
+    assert delete_idx < insert_idx
+    assert statements[insert_idx + 1 :].count("COMMIT") == 2  # savepoint + 外层事务
+    assert fake_conn.closed
+
+
+@pytest.mark.asyncio
+async def test_full_refresh_truncate_mode_is_transactional(fake_conn):
+    feature = _Feature(_frame())
+
+    result = await feature.refresh("full")
+
+    assert result["full_refresh_mode"] == "truncate"
+    statements = fake_conn.statements
+    assert statements[0] == "BEGIN"
+    assert statements[1] == "TRUNCATE TABLE features.mv_demo_feature;"
+    assert statements[-1] == "COMMIT"
+
+
+@pytest.mark.asyncio
+async def test_full_refresh_swap_mode_renames_shadow_table(fake_conn):
+    feature = _Feature(_frame())
+    feature.full_refresh_mode = "swap"
+
+    await feature.refresh("full")
+
+    statements = fake_conn.statements
+    assert statements[:2] == [
+        'DROP TABLE IF EXISTS "features"."mv_demo_feature__swap"',
+        'CREATE TABLE "features"."mv_demo_feature__swap" '
+        "(LIKE features.mv_demo_feature INCLUDING ALL)",
+    ]
+    assert fake_conn.copies[0][0] == "_stg_mv_demo_feature__swap"
+    assert any(
+        s.startswith('INSERT INTO "features"."mv_demo_feature__swap"') for s in statements
+    )
+    assert statements[-7:] == [
+        "BEGIN",
+        'ALTER TABLE "features"."mv_demo_feature__swap" OWNER TO feature_owner',
+        'DROP TABLE IF EXISTS "features"."mv_demo_feature__old"',
+        'ALTER TABLE features.mv_demo_feature RENAME TO "mv_demo_feature__old"',
+        'ALTER TABLE "features"."mv_demo_feature__swap" RENAME TO "mv_demo_feature"',
+        'DROP TABLE "features"."mv_demo_feature__old"',
+        "COMMIT",
+    ]
+
+
+def _grant(grantee, privilege, attname=None, grantable=False):
+    return {"grantee": grantee, "attname": attname, "privilege_type": privilege, "is_grantable": grantable}
+
+
+def _index(name, table, columns, unique=False):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    return {
+        "index_name": name,
+        "definition": f"CREATE {kind} {name} ON features.{table} USING btree ({columns})",
+        "indisunique": unique,
+    }
+
+
+@pytest.mark.asyncio
+async def test_full_refresh_swap_keeps_grants_and_index_names(fake_conn):
+    shadow = '"features"."mv_demo_feature__swap"'
+    fake_conn.grants = {
+        "features.mv_demo_feature": [
+            _grant("reader", "SELECT"),
+            _grant("PUBLIC", "SELECT", attname="ts_code"),
+            _grant("writer", "INSERT", grantable=True),
+        ],
+        # 影子表由默认权限带来的授权需先撤销
+        shadow: [_grant("etl", "SELECT")],
+    }
+    fake_conn.indexes = {
+        "features.mv_demo_feature": [
+            _index("idx_mv_demo_feature_trade_date", "mv_demo_feature", "trade_date"),
+            _index("mv_demo_feature_pkey", "mv_demo_feature", "ts_code, trade_date", unique=True),
+        ],
+        shadow: [
+            _index("mv_demo_feature__swap_pkey", "mv_demo_feature__swap", "ts_code, trade_date", unique=True),
+            _index("mv_demo_feature__swap_trade_date_idx", "mv_demo_feature__swap", "trade_date"),
+        ],
+    }
+    feature = _Feature(_frame())
+    feature.full_refresh_mode = "swap"
+
+    await feature.refresh("full")
+
+    begin = len(fake_conn.statements) - fake_conn.statements[::-1].index("BEGIN") - 1
+    assert fake_conn.statements[begin + 1:begin + 6] == [
+        f"ALTER TABLE {shadow} OWNER TO feature_owner",
+        f"REVOKE ALL ON {shadow} FROM etl",
+        f"GRANT SELECT ON {shadow} TO reader",
+        f"GRANT SELECT (ts_code) ON {shadow} TO PUBLIC",
+        f"GRANT INSERT ON {shadow} TO writer WITH GRANT OPTION",
+    ]
+    assert fake_conn.statements[-4:] == [
+        'DROP TABLE "features"."mv_demo_feature__old"',
+        'ALTER INDEX "features"."mv_demo_feature__swap_pkey" RENAME TO "mv_demo_feature_pkey"',
+        'ALTER INDEX "features"."mv_demo_feature__swap_trade_date_idx" '
+        'RENAME TO "idx_mv_demo_feature_trade_date"',
+        "COMMIT",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_full_refresh_swap_failure_drops_shadow_and_keeps_table(fake_conn):
+    fake_conn.fail_on = "RENAME TO \"mv_demo_feature__old\""
+    feature = _Feature(_frame())
+    feature.full_refresh_mode = "swap"
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await feature.refresh("full")
+
+    assert "ROLLBACK" in fake_conn.statements
+    assert fake_conn.statements[-1] == 'DROP TABLE IF EXISTS "features"."mv_demo_feature__swap"'
+    assert feature.logged[-1]["success"] is False
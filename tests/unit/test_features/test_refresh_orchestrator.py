@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from alphahome.features.storage.refresh_orchestrator import (
+    FeatureRefreshOrchestrator,
+    build_recipe_dependencies,
+)
+
+
+class _FakeDBManager:
+    def __init__(self, matviews=None):
+        self.matviews = matviews or {}
+
+    async def fetch(self, sql, *args):
+        assert "relkind = 'm'" in sql
+        return [
+            {"view_name": name, "can_concurrent": can}
+            for name, can in self.matviews.items()
+        ]
+
+
+def _recipe(name, source_tables, refresh_strategy="full", delay=0.02, events=None, fail=False):
+    class _Recipe:
+        materialized_view_name = ""
+
+        def __init__(self, db_manager=None):
+            self.db_manager = db_manager
+
+        @property
+        def view_name(self):
+            return f"mv_{self.name}"
+
+        @property
+        def full_name(self):
+            return f"features.{self.view_name}"
+
+        async def refresh(self, strategy=None):
+            events.append(("start", self.name, strategy))
+            await asyncio.sleep(delay)
+            events.append(("end", self.name, strategy))
+            if fail:
+                raise RuntimeError(f"{self.name} boom")
+            return {"status": "success", "row_count": 1}
+
+    _Recipe.name = name
+    _Recipe.source_tables = source_tables
+    _Recipe.refresh_strategy = refresh_strategy
+    return _Recipe
+
+
+def test_build_recipe_dependencies_from_source_tables():
+    events = []
+    recipes = {
+        "base": _recipe("base", ["rawdata.stock_daily"], events=events),
+        "derived": _recipe("derived", ["features.mv_base", "rawdata.x"], events=events),
+        "short_ref": _recipe("short_ref", ["MV_DERIVED"], events=events),
+        "other": _recipe("other", ["rawdata.index_daily"], events=events),
+    }
+
+    assert build_recipe_dependencies(recipes) == {
+        "base": set(),
+        "derived": {"base"},
+        "short_ref": {"derived"},
+        "other": set(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_independent_recipes_concurrently():
+    events = []
+    recipes = [
+        _recipe("base", ["rawdata.a"], events=events),
+        _recipe("derived", ["features.mv_base"], events=events),
+        _recipe("other", ["rawdata.b"], events=events),
+        _recipe("third", ["rawdata.c"], events=events),
+    ]
+    orchestrator = FeatureRefreshOrchestrator(_FakeDBManager(), max_concurrency=3)
+
+    summary = await orchestrator.refresh(recipes)
+
+    assert [r["name"] for r in summary["results"]] == ["base", "derived", "other", "third"]
+    assert summary["success_count"] == 4
+    starts = [e[1] for e in events if e[0] == "start"]
+    assert starts[:3] == ["base", "other", "third"]
+    assert events.index(("end", "base", "full")) < events.index(("start", "derived", "full"))
+    # 三个独立配方并发执行：串行耗时明显大于实际耗时
+    assert summary["serial_seconds"] > summary["wall_seconds"]
+    assert summary["time_saved_seconds"] == pytest.approx(
+        summary["serial_seconds"] - summary["wall_seconds"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_uses_concurrent_refresh_when_unique_index_exists():
+    events = []
+    recipes = [
+        _recipe("indexed", ["rawdata.a"], events=events),
+        _recipe("plain", ["rawdata.b"], events=events),
+        _recipe("table", ["rawdata.c"], refresh_strategy="incremental", events=events),
+    ]
+    db = _FakeDBManager({"mv_indexed": True, "mv_plain": False})
+
+    await FeatureRefreshOrchestrator(db).refresh(recipes)
+
+    strategies = {name: strategy for kind, name, strategy in events if kind == "start"}
+    assert strategies == {"indexed": "concurrent", "plain": "full", "table": "incremental"}
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_reports_failures_without_stopping_others():
+    events = []
+    recipes = [
+        _recipe("broken", ["rawdata.a"], events=events, fail=True),
+        _recipe("child", ["features.mv_broken"], events=events),
+    ]
+
+    summary = await FeatureRefreshOrchestrator(_FakeDBManager()).refresh(recipes)
+
+    broken, child = summary["results"]
+    assert broken["status"] == "failed"
+    assert "boom" in broken["error_message"]
+    assert child["status"] == "success"
+    assert child["failed_dependencies"] == ["broken"]
+    assert summary["fail_count"] == 1
@@ -0,0 +1,180 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alphahome.features.recipes.python.stock_sma_daily import StockSmaDailyFeature
+from alphahome.features.storage.rolling import RollingFrame, lookback_start_date
+
+
+def _panel(seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frames = []
+    for code, n in (("000003.SZ", 40), ("000001.SZ", 3), ("600000.SH", 55)):
+        close = 10 + rng.standard_normal(n).cumsum()
+        close[rng.random(n) < 0.1] = np.nan
+        frames.append(
+            pd.DataFrame(
+                {
+                    "ts_code": code,
+                    "trade_date": pd.date_range("2024-01-01", periods=n, freq="B"),
+                    "close": close,
+                }
+            )
+        )
+    # 打乱顺序，验证引擎自行排序
+    return pd.concat(frames).sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _expected(df: pd.DataFrame, func) -> np.ndarray:
+    ordered = df.sort_values(["ts_code", "trade_date"], kind="mergesort").reset_index(drop=True)
+    return func(ordered.groupby("ts_code", group_keys=False)["close"]).to_numpy()
+
+
+@pytest.mark.parametrize("window,min_periods", [(1, None), (5, None), (20, None), (10, 3)])
+def test_rolling_mean_and_sum_match_pandas(window, min_periods):
+    df = _panel()
+    frame = RollingFrame(df)
+
+    expected_mean = _expected(
+        df, lambda g: g.rolling(window, min_periods=min_periods or window).mean().reset_index(level=0, drop=True)
+    )
+    expected_sum = _expected(
+        df, lambda g: g.rolling(window, min_periods=min_periods or window).sum().reset_index(level=0, drop=True)
+    )
+
+    np.testing.assert_allclose(
+        frame.rolling_mean("close", window, min_periods), expected_mean, rtol=1e-10, equal_nan=True
+    )
+    np.testing.assert_allclose(
+        frame.rolling_sum("close", window, min_periods), expected_sum, rtol=1e-10, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("window,ddof", [(5, 1), (20, 0)])
+def test_rolling_std_matches_pandas(window, ddof):
+    df = _panel()
+    frame = RollingFrame(df)
+
+    expected = _expected(
+        df, lambda g: g.rolling(window).std(ddof=ddof).reset_index(level=0, drop=True)
+    )
+
+    np.testing.assert_allclose(
+        frame.rolling_std("close", window, ddof=ddof), expected, rtol=1e-8, atol=1e-12, equal_nan=True
+    )
+
+
+def test_ewm_mean_matches_pandas():
+    df = _panel()
+    frame = RollingFrame(df)
+
+    expected = _expected(
+        df, lambda g: g.transform(lambda s: s.ewm(span=12, adjust=False).mean())
+    )
+
+    np.testing.assert_allclose(frame.ewm_mean("close", span=12), expected, rtol=1e-12, equal_nan=True)
+
+
+def test_rolling_frame_handles_empty_input():
+    frame = RollingFrame(pd.DataFrame({"ts_code": [], "trade_date": [], "close": []}))
+
+    assert len(frame.rolling_mean("close", 5)) == 0
+    assert len(frame.ewm_mean("close", span=5)) == 0
+
+
+@pytest.mark.asyncio
+async def test_lookback_start_date_uses_trade_calendar(monkeypatch):
+    from alphahome.fetchers.tools import calendar
+
+    calls = {}
+
+    async def _fake_last_trade_day(date, n, exchange, db_manager):
+        calls.update(date=date, n=n, exchange=exchange, db_manager=db_manager)
+        return "20240102"
+
+    monkeypatch.setattr(calendar, "get_last_trade_day", _fake_last_trade_day)
+
+    assert await lookback_start_date("20240201", 20, db_manager="db") == "20240102"
+    assert calls == {"date": "20240201", "n": 20, "exchange": "SSE", "db_manager": "db"}
+    assert await lookback_start_date("20240201", 0) == "20240201"
+
+
+@pytest.mark.asyncio
+async def test_lookback_start_date_falls_back_without_calendar(monkeypatch):
+    from alphahome.fetchers.tools import calendar
+
+    async def _no_calendar(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(calendar, "get_last_trade_day", _no_calendar)
+
+    assert await lookback_start_date("20240201", 20) == "20231218"
+
+
+class _FakeDBManager:
+    def __init__(self, rows):
+        self.rows = rows
+        self.sql = None
+
+    async def fetch(self, sql, *args):
+        self.sql = sql
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_stock_sma_feature_matches_groupby_apply(monkeypatch):
+    rng = np.random.default_rng(3)
+    rows = []
+    for code in ("000002.SZ", "000001.SZ"):
+        price = 10.0
+        for i in range(45):
+            price += float(rng.standard_normal())
+            rows.append(
+                {
+                    "ts_code": code,
+                    "trade_date": date(2024, 1, 1) + timedelta(days=i),
+                    "close": Decimal(f"{price:.2f}"),
+                }
+            )
+
+    async def _fake_lookback(start_date, trading_days, db_manager=None, exchange="SSE"):
+        assert trading_days == 20
+        return "20240101"
+
+    monkeypatch.setattr(
+        "alphahome.features.storage.python_feature.lookback_start_date", _fake_lookback
+    )
+    db = _FakeDBManager(rows)
+    feature = StockSmaDailyFeature(db_manager=db)
+
+    result = await feature.compute("20240125", "20240210")
+
+    assert "trade_date >= '20240101'" in db.sql
+
+    # 旧实现：逐组 apply
+    df = pd.DataFrame(rows)
+    df["close"] = df["close"].astype(float)
+
+    def calc_sma(group):
+        group = group.sort_values("trade_date")
+        for w in (5, 10, 20):
+            group[f"sma{w}"] = group["close"].rolling(window=w, min_periods=w).mean()
+            group[f"sma{w}_ratio"] = (group["close"] / group[f"sma{w}"] - 1).round(4)
+        return group
+
+    expected = df.groupby("ts_code", group_keys=False).apply(calc_sma)
+    expected = expected[expected["trade_date"].astype(str).str.replace("-", "") >= "20240125"]
+    expected = expected[expected["trade_date"].astype(str).str.replace("-", "") <= "20240210"]
+    expected = expected.dropna(subset=["sma5", "sma10", "sma20"])
+    expected = expected.sort_values(["ts_code", "trade_date"]).reset_index(drop=True)
+
+    assert len(result) == len(expected) == 2 * 17
+    pd.testing.assert_frame_equal(
+        result.drop(columns=["updated_at"]),
+        expected[result.columns.drop("updated_at")],
+        check_exact=False,
+        rtol=1e-10,
+    )
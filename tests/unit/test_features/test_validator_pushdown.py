@@ -0,0 +1,129 @@
+"""
+MaterializedViewValidator 下推模式单测
+
+验证检查配置被编译为单条聚合 SQL，且报告结构与 DataFrame 模式一致。
+"""
+
+import pandas as pd
+import pytest
+
+from alphahome.features.storage.validator import MaterializedViewValidator
+
+
+class _FakeDB:
+    """模拟 PostgreSQL：物化视图只出现在 pg_catalog，不出现在 information_schema.columns"""
+
+    def __init__(self, column_types, stats, relation='"features"."mv_demo"', materialized=False):
+        self.column_types = column_types
+        self.stats = stats
+        self.relation = relation
+        self.materialized = materialized
+        self.queries = []
+
+    async def fetch(self, sql, *args):
+        self.queries.append(sql)
+        if "information_schema" in sql:
+            if self.materialized:
+                return []
+            return [{"column_name": c, "data_type": t} for c, t in self.column_types.items()]
+        if "pg_attribute" in sql:
+            if args[0] != self.relation:
+                return []
+            return [{"column_name": c, "data_type": t} for c, t in self.column_types.items()]
+        return [self.stats]
+
+
+COLUMN_TYPES = {"ts_code": "character varying", "trade_date": "date", "close": "numeric"}
+
+DATA = pd.DataFrame(
+    {
+        "ts_code": ["000001.SZ", "000001.SZ", "000002.SZ", None],
+        "trade_date": ["20240102", "20240102", "20240102", "20240103"],
+        "close": [10.0, None, 12.0, 11.0],
+    }
+)
+
+CHECKS = {
+    "null_check": {"columns": ["ts_code", "close", "not_a_column"], "threshold": 0.1},
+    "outlier_check": {"columns": ["close", "ts_code"], "method": "iqr", "threshold": 1.5},
+    "duplicate_check": {"columns": ["ts_code", "trade_date"]},
+    "type_check": {"columns": {"close": "float64", "trade_date": "date", "missing": "object"}},
+    "row_count_change": {"threshold": 0.2},
+}
+
+# 与 DATA 对应的聚合结果（DBManager.fetch 返回一行）
+STATS = {
+    "row_count": 4,
+    "null_0": 1,
+    "null_1": 1,
+    "nonnull_0": 3,
+    "lower_0": 8.5,
+    "upper_0": 14.5,
+    "outlier_0": 0,
+    "duplicate_count": 2,
+}
+
+
+def test_checks_compile_into_one_aggregate_query():
+    validator = MaterializedViewValidator()
+    plan = validator._compile_pushdown_plan(CHECKS, COLUMN_TYPES)
+    sql = validator._compile_pushdown_sql('"features"."mv_demo"', plan)
+
+    assert plan["null"]["columns"] == ["ts_code", "close"]
+    assert plan["outlier"]["columns"] == ["close"]  # 非数值列与 DataFrame 模式一样被跳过
+    assert 'count(*) FILTER (WHERE "ts_code" IS NULL) AS null_0' in sql
+    assert "percentile_cont(0.25) WITHIN GROUP" in sql
+    assert "percentile_cont(0.75) WITHIN GROUP" in sql
+    assert 'GROUP BY "ts_code", "trade_date" HAVING count(*) > 1' in sql
+    assert sql.count("WITH stats AS") == 1
+    # PG 的 'NaN' 与 DataFrame 模式的 dropna() 一致，不参与边界计算和异常值计数
+    assert """count("close"::double precision) FILTER (WHERE "close"::double precision <> 'NaN') AS nonnull_0""" in sql
+    assert """FILTER (WHERE "close"::double precision <> 'NaN' AND (""" in sql
+
+
+def test_zscore_and_percentile_bounds():
+    validator = MaterializedViewValidator()
+    for method, fragment in (("zscore", "NULLIF(stddev_samp("), ("percentile", "percentile_cont(0.05)")):
+        checks = {"outlier_check": {"columns": ["close"], "method": method, "threshold": 0.05 if method == "percentile" else 3.0}}
+        sql = validator._compile_pushdown_sql('"features"."mv_demo"', validator._compile_pushdown_plan(checks, COLUMN_TYPES))
+        assert fragment in sql
+        assert "GROUP BY" not in sql
+
+
+@pytest.mark.asyncio
+async def test_pushdown_reports_match_dataframe_mode():
+    db = _FakeDB(COLUMN_TYPES, STATS)
+    pushdown = MaterializedViewValidator()
+    reports = await pushdown.validate_in_database(db, "features.mv_demo", CHECKS, previous_row_count=4)
+
+    # 列元数据 + 一条聚合查询
+    assert len(db.queries) == 2
+    by_name = {r["check_name"]: r for r in reports}
+    assert list(by_name) == ["null_check", "outlier_check", "duplicate_check", "type_check", "row_count_change"]
+
+    in_memory = MaterializedViewValidator()
+    assert by_name["null_check"] == await in_memory.validate_null_values(DATA, CHECKS["null_check"])
+    assert by_name["outlier_check"] == await in_memory.validate_outliers(DATA, CHECKS["outlier_check"])
+    assert by_name["duplicate_check"] == await in_memory.validate_duplicates(DATA, CHECKS["duplicate_check"])
+    assert by_name["row_count_change"]["details"]["current_row_count"] == 4
+
+    type_issues = by_name["type_check"]["details"]["columns_with_issues"]
+    assert [i["column"] for i in type_issues] == ["missing"]
+
+
+@pytest.mark.asyncio
+async def test_pushdown_reads_materialized_view_columns_from_pg_catalog():
+    db = _FakeDB(COLUMN_TYPES, STATS, materialized=True)
+    reports = await MaterializedViewValidator().validate_in_database(db, "features.mv_demo", CHECKS)
+
+    assert [r["check_name"] for r in reports][:2] == ["null_check", "outlier_check"]
+    assert "pg_attribute" in db.queries[0]
+    type_issues = {r["check_name"]: r for r in reports}["type_check"]["details"]["columns_with_issues"]
+    assert [i["column"] for i in type_issues] == ["missing"]
+
+
+@pytest.mark.asyncio
+async def test_pushdown_missing_relation_raises():
+    db = _FakeDB(COLUMN_TYPES, STATS)
+    with pytest.raises(ValueError, match="not found"):
+        await MaterializedViewValidator().validate_in_database(db, "features.mv_other", CHECKS)
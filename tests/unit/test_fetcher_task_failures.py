@@ -1,3 +1,5 @@
+import asyncio
+
 import pandas as pd
 import pytest
 
@@ -30,3 +32,87 @@ async def test_execute_batches_raises_when_any_batch_exhausts_retries():
     with pytest.raises(RuntimeError, match="1/2 batches failed"):
         await task._execute_batches(["ok", "bad"])
 
+
+
+class _StreamingFetcherTask(FetcherTask):
+    name = "streaming_fetcher"
+    table_name = "streaming_fetcher"
+
+    def __init__(self, batches, **kwargs):
+        super().__init__(db_connection=object(), update_type="full", **kwargs)
+        self._batches = batches
+        self.saved = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def get_batch_list(self, **kwargs):
+        return list(self._batches)
+
+    async def prepare_params(self, batch):
+        return {"batch": batch}
+
+    async def fetch_batch(self, params, stop_event=None):
+        if params["batch"] == "bad":
+            raise RuntimeError("batch boom")
+        # 已获取但尚未保存的批次数
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return pd.DataFrame({"batch": [params["batch"]]})
+
+    async def _save_data(self, data, stop_event=None):
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        self.saved.append(data["batch"].iloc[0])
+        return {"status": "success", "table": self.table_name, "rows": len(data)}
+
+
+@pytest.mark.asyncio
+async def test_streaming_mode_saves_every_batch_with_bounded_backlog():
+    task = _StreamingFetcherTask(
+        batches=list(range(20)),
+        task_config={"concurrent_limit": 3, "streaming_mode": True, "stream_queue_size": 2},
+    )
+
+    result = await task.execute()
+
+    assert result["status"] == "success"
+    assert result["rows"] == 20
+    assert sorted(task.saved) == list(range(20))
+    # 获取中/等待入队 (3) + 队列 (2) + 保存中 (1)
+    assert task.peak_in_flight <= 6
+
+
+@pytest.mark.asyncio
+async def test_streaming_mode_reports_failed_batches_after_saving_successes():
+    task = _StreamingFetcherTask(
+        batches=["ok", "bad", "ok2"],
+        task_config={"max_retries": 1, "retry_delay": 0, "streaming_mode": True},
+    )
+
+    result = await task.execute()
+
+    assert result["status"] == "error"
+    assert "1/3 batches failed" in result["error"]
+    assert sorted(task.saved) == ["ok", "ok2"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_mode_honours_stop_event():
+    stop_event = asyncio.Event()
+    task = _StreamingFetcherTask(
+        batches=list(range(10)),
+        task_config={"concurrent_limit": 1, "streaming_mode": True, "stream_queue_size": 1},
+    )
+    original_save = task._save_data
+
+    async def save_then_stop(data, **kwargs):
+        result = await original_save(data)
+        stop_event.set()
+        return result
+
+    task._save_data = save_then_stop
+
+    result = await task.execute(stop_event=stop_event)
+
+    assert result["status"] == "cancelled"
+    assert len(task.saved) < 10
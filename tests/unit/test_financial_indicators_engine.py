@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.production.data_updaters.pit.calculators.financial_indicators_calculator import (
+    FinancialIndicatorsCalculator,
+)
+from scripts.production.data_updaters.pit.calculators.financial_indicators_engine import (
+    assess_data_quality_frame,
+    compute_indicator_frame,
+)
+
+AS_OF = date(2024, 4, 30)
+SAVE_COLUMNS = [
+    'ts_code', 'end_date', 'ann_date', 'data_source',
+    'gpa_ttm', 'roe_excl_ttm', 'roa_excl_ttm',
+    'net_margin_ttm', 'operating_margin_ttm', 'roi_ttm',
+    'asset_turnover_ttm', 'equity_multiplier',
+    'debt_to_asset_ratio', 'equity_ratio',
+    'revenue_yoy_growth', 'n_income_yoy_growth', 'operate_profit_yoy_growth',
+    'data_quality', 'calculation_status',
+    'data_completeness', 'balance_sheet_lag',
+]
+
+
+def _random_pit_data(stocks: int = 150, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    quarter_ends = [d.date() for d in pd.date_range('2022-04-01', AS_OF, freq='QE')][::-1]
+    sources = ['report', 'express', 'forecast', 'forecast_direct']
+    rows = []
+    for i in range(stocks):
+        assets = None if rng.random() < 0.05 else Decimal(str(round(rng.uniform(1e8, 1e10), 2)))
+        equity = None if assets is None else Decimal(str(round(float(assets) * rng.uniform(-0.2, 0.9), 2)))
+        kept = [d for d in quarter_ends if rng.random() > 0.2]
+        for j, end in enumerate(kept):
+            ann = AS_OF if j < 2 and i % 3 else min(AS_OF, end + timedelta(days=int(rng.integers(20, 120))))
+
+            def _value(low, high):
+                return None if rng.random() < 0.05 else Decimal(str(round(1e8 * rng.uniform(low, high), 2)))
+
+            rows.append({
+                'ts_code': f"{i:06d}.SZ",
+                'end_date': end,
+                'ann_date': ann,
+                'data_source': sources[int(rng.choice(4, p=[0.7, 0.1, 0.1, 0.1]))],
+                'revenue': _value(-0.05, 1.0),
+                'n_income_attr_p': _value(-0.3, 0.3),
+                'oper_cost': _value(0.0, 0.9),
+                'operate_profit': _value(-0.3, 0.4),
+                'conversion_status': 'RPT_ORIG' if rng.random() < 0.05 else 'SINGLE',
+                'tot_assets': assets,
+                'tot_equity': equity,
+                'data_completeness': 'estimated',
+                'balance_sheet_lag': (quarter_ends[0] - end).days,
+            })
+    return pd.DataFrame(rows)
+
+
+class _FakeContext:
+    def __init__(self, fill_values):
+        self.db_manager = None
+        self.fill_values = fill_values
+        self.queries = []
+
+    def query_dataframe(self, query, params=None):
+        self.queries.append(params)
+        codes = params[0] if isinstance(params[0], list) else [params[0]]
+        rows = [{'ts_code': c, 'revenue_yoy_growth': self.fill_values[c]} for c in codes if c in self.fill_values]
+        return pd.DataFrame(rows, columns=['ts_code', 'revenue_yoy_growth'])
+
+
+def _run(pit_data, engine):
+    context = _FakeContext({f"{i:06d}.SZ": float(i) for i in range(0, 200, 2)})
+    calculator = FinancialIndicatorsCalculator(context)
+    calculator.logger.setLevel(logging.CRITICAL)
+    calculator.enable_cache = False
+    calculator._get_pit_data_for_calculation = (
+        lambda as_of_date, codes: pit_data[pit_data['ts_code'].isin(codes)].reset_index(drop=True)
+    )
+    saved = []
+
+    def _save(records):
+        df = pd.DataFrame(records)
+        for col in SAVE_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        saved.append(calculator._clean_indicators_data(df, SAVE_COLUMNS)[SAVE_COLUMNS])
+
+    calculator._save_indicators_batch = _save
+    result = calculator.calculate_indicators_for_date(
+        str(AS_OF), stock_codes=sorted(pit_data['ts_code'].unique()), batch_size=40,
+        engine=engine, use_parallel=False,
+    )
+    frame = pd.concat(saved, ignore_index=True).astype({'end_date': str, 'ann_date': str})
+    return result, frame.sort_values(['ts_code', 'end_date', 'data_source']).reset_index(drop=True), context
+
+
+def test_vectorized_engine_matches_per_stock_path():
+    pit_data = _random_pit_data()
+
+    legacy_result, legacy, legacy_ctx = _run(pit_data, 'per_stock')
+    result, vectorized, ctx = _run(pit_data, 'vectorized')
+
+    assert len(legacy) > 100
+    pd.testing.assert_frame_equal(legacy, vectorized, check_dtype=False, rtol=1e-9)
+    assert result['success_count'] == legacy_result['success_count'] == len(vectorized)
+    # forecast 营收增长回填：逐记录查询 -> 一次批量查询
+    assert len(legacy_ctx.queries) > 1
+    assert len(ctx.queries) == 1
+
+
+def _stock(rows, assets=Decimal('1000'), equity=Decimal('500')):
+    return pd.DataFrame([
+        {
+            'ts_code': '000001.SZ', 'end_date': end, 'ann_date': ann, 'data_source': source,
+            'revenue': Decimal(rev), 'n_income_attr_p': Decimal(ni), 'oper_cost': Decimal('0'),
+            'operate_profit': Decimal(op), 'conversion_status': None,
+            'tot_assets': assets, 'tot_equity': equity,
+        }
+        for end, ann, source, rev, ni, op in rows
+    ])
+
+
+def test_growth_falls_back_to_latest_report_when_no_close_period():
+    # 最新为快报，±90 天内无同比期；回退到不晚于目标日期的最近正式报告
+    pit_data = _stock([
+        (date(2024, 3, 31), AS_OF, 'express', '150', '30', '0'),
+        (date(2022, 12, 15), date(2023, 3, 1), 'express', '999', '1', '1'),
+        (date(2022, 9, 30), date(2022, 10, 30), 'report', '100', '20', '10'),
+    ])
+
+    frame = compute_indicator_frame(pit_data, str(AS_OF))
+
+    row = frame.iloc[0]
+    assert row['revenue_yoy_growth'] == pytest.approx(50.0)
+    assert row['n_income_yoy_growth'] == pytest.approx(50.0)
+    # 快报经营利润为 0 时回退路径不计算经营利润增长
+    assert np.isnan(row['operate_profit_yoy_growth'])
+    assert row['data_source'] == 'express'
+
+
+def test_quality_assessment_clips_extremes():
+    pit_data = _stock(
+        [(date(2024, 3, 31), AS_OF, 'forecast_direct', '10', '50', '5')],
+        assets=Decimal('10'), equity=Decimal('1'),
+    )
+
+    frame = assess_data_quality_frame(compute_indicator_frame(pit_data, str(AS_OF)))
+
+    row = frame.iloc[0]
+    assert row['data_source'] == 'forecast'
+    assert row['roe_excl_ttm'] == 200
+    assert row['roa_excl_ttm'] == 100
+    assert row['data_quality'] == 'outlier_high'
+    assert row['calculation_status'] == 'success'
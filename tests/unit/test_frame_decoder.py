@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from alphahome.common.db_components.frame_decoder import (
+    BOOL_OID,
+    DATE_OID,
+    NUMERIC_OID,
+    TIMESTAMPTZ_OID,
+    build_copy_query,
+    decode_csv_frame,
+)
+
+COLUMNS = [
+    ("ts_code", 1043),
+    ("trade_date", DATE_OID),
+    ("close", NUMERIC_OID),
+    ("vol", 20),
+    ("is_st", BOOL_OID),
+    ("update_time", TIMESTAMPTZ_OID),
+    ("note", 25),
+]
+
+# COPY ... TO STDOUT WITH (FORMAT csv, HEADER) 的输出：NULL 为空字段
+CSV = (
+    b"ts_code,trade_date,close,vol,is_st,update_time,note\n"
+    b'000001.SZ,2024-01-02,10.50,100,f,2024-01-02 18:00:00+08,NA\n'
+    b'600000.SH,2024-01-03,,200,t,2024-01-03 18:00:00+08,\n'
+)
+
+
+def test_decodes_typed_columns():
+    df = decode_csv_frame(CSV, COLUMNS)
+
+    assert df["close"].dtype == np.float64
+    assert np.isnan(df["close"].iloc[1])
+    assert df["vol"].dtype == np.int64
+    assert df["is_st"].tolist() == [False, True]
+    assert df["trade_date"].dtype == "datetime64[ns]"
+    assert df["trade_date"].iloc[0] == pd.Timestamp("2024-01-02")
+    assert str(df["update_time"].dt.tz) == "UTC"
+    assert df["update_time"].iloc[0] == pd.Timestamp("2024-01-02 10:00", tz="UTC")
+    # 字符串 "NA" 原样保留，空值与 fetch 一样为 None
+    assert df["note"].tolist() == ["NA", None]
+    assert df["ts_code"].tolist() == ["000001.SZ", "600000.SH"]
+
+
+def test_numeric_and_dates_can_be_kept_raw():
+    df = decode_csv_frame(CSV, COLUMNS, numeric_as_float=False, parse_dates=False)
+
+    assert df["close"].tolist()[0] == Decimal("10.50")
+    assert df["close"].tolist()[1] is None
+    assert df["trade_date"].tolist() == ["2024-01-02", "2024-01-03"]
+
+
+def test_empty_result_keeps_columns():
+    df = decode_csv_frame(b"ts_code,close\n", [("ts_code", 1043), ("close", NUMERIC_OID)])
+
+    assert df.empty
+    assert list(df.columns) == ["ts_code", "close"]
+    assert df["close"].dtype == np.float64
+
+
+def test_build_copy_query_strips_trailing_semicolon():
+    assert build_copy_query(" SELECT 1;\n") == "COPY (SELECT 1) TO STDOUT WITH (FORMAT csv, HEADER)"
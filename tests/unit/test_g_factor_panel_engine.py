@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alphahome.fetchers.tools import calendar
+from research.pgs_factor.processors.g_factor_panel_engine import (
+    HISTORY_WINDOW_DAYS,
+    RESULT_COLUMNS,
+    compute_g_factor_panel,
+    universe_frame,
+)
+from research.pgs_factor.processors.production_g_factor_calculator import ProductionGFactorCalculator
+
+
+def _random_history(stocks: int = 12, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    fridays = pd.date_range('2019-01-04', '2022-12-30', freq='W-FRI')
+    rows = []
+    for i in range(stocks):
+        start = int(rng.integers(0, 120))
+        for day in fridays[start:]:
+            if rng.random() < 0.15:
+                continue
+            # 少量非周五记录，制造同比匹配的距离相同/边界情形
+            shift = int(rng.choice([0, 0, 0, 0, 1, -2, 3]))
+            rows.append({
+                'ts_code': f"{i:06d}.SZ",
+                'calc_date': (day + timedelta(days=shift)).date(),
+                'p_score': float(rng.normal(50, 20)),
+                'data_source': str(rng.choice(['report', 'express', 'forecast'])),
+                'ann_date': (day - timedelta(days=int(rng.integers(1, 60)))).date(),
+                'gpa': float(rng.normal()),
+                'roe_excl': float(rng.normal()),
+                'roa_excl': float(rng.normal()),
+                'revenue_yoy_growth': np.nan if rng.random() < 0.1 else float(rng.normal(10, 30)),
+                'n_income_yoy_growth': np.nan if rng.random() < 0.1 else float(rng.normal(5, 40)),
+            })
+    return pd.DataFrame(rows).drop_duplicates(['ts_code', 'calc_date']).sort_values(['ts_code', 'calc_date'])
+
+
+@pytest.fixture(autouse=True)
+def _fresh_calendar_index(monkeypatch):
+    # 进程级日历索引按 id(db_manager) 缓存，每个用例使用独立的假日历
+    monkeypatch.setattr(calendar, '_TRADE_CAL_INDEXES', {})
+
+
+def _calendar_rows(holidays=()):
+    return [
+        {'cal_date': day.date(), 'is_open': int(day.weekday() < 5 and day.strftime('%Y-%m-%d') not in holidays),
+         'update_time': None}
+        for day in pd.date_range('2019-01-01', '2022-12-31')
+    ]
+
+
+class _FakeContext:
+    def __init__(self, history=None, universe=None, holidays=()):
+        self.db_manager = self
+        self.history = history
+        self.universe = universe or {}
+        self.calendar = _calendar_rows(holidays)
+        self.history_queries = []
+        self.inserted = []
+
+    def fetch_sync(self, query, params=None):
+        if 'others_calendar' in query and 'COUNT(*)' not in query:
+            return self.calendar
+        raise AssertionError(f"unexpected query: {query}")
+
+    def query_dataframe(self, query, params=None):
+        if 'get_trading_stocks_optimized' in query:
+            return pd.DataFrame({'ts_code': self.universe.get(params[0], [])})
+        if 'FROM pgs_factors.p_factor' in query:
+            self.history_queries.append(params)
+            codes, start, end = params
+            calc = pd.to_datetime(self.history['calc_date'])
+            mask = self.history['ts_code'].isin(codes) & (calc >= start) & (calc <= end)
+            return self.history[mask].reset_index(drop=True)
+        raise AssertionError(f"unexpected query: {query}")
+
+    def execute_sync(self, query, params=None):
+        if query.strip().startswith('INSERT'):
+            self.inserted.append(params)
+
+
+def _calculator(context=None):
+    calculator = ProductionGFactorCalculator(context or _FakeContext())
+    calculator.logger.setLevel(logging.CRITICAL)
+    return calculator
+
+
+def _legacy(calculator, history, calc_date, codes):
+    start = pd.Timestamp(calc_date) - timedelta(days=HISTORY_WINDOW_DAYS)
+    calc = pd.to_datetime(history['calc_date'])
+    window = history[history['ts_code'].isin(codes) & (calc >= start) & (calc <= calc_date)]
+    return calculator._calculate_g_factors_from_p_data_pit(window.copy(), calc_date)
+
+
+def test_panel_matches_per_date_calculation():
+    history = _random_history()
+    codes = sorted(history['ts_code'].unique())
+    universes = {
+        d.strftime('%Y-%m-%d'): codes[:9] if k % 2 else codes[3:]
+        for k, d in enumerate(pd.date_range('2020-06-05', '2022-12-30', freq='8W-FRI'))
+    }
+    calculator = _calculator()
+
+    panel = compute_g_factor_panel(
+        history, universe_frame(universes),
+        es_params=calculator.es_params, subfactor_weights=calculator.subfactor_weights,
+    )
+
+    assert list(panel.columns) == RESULT_COLUMNS
+    for calc_date, stock_codes in universes.items():
+        expected = _legacy(calculator, history, calc_date, stock_codes)
+        actual = panel[panel['calc_date'] == calc_date].reset_index(drop=True)
+        assert len(actual) == len(expected) > 0
+        pd.testing.assert_frame_equal(
+            actual[RESULT_COLUMNS], expected[RESULT_COLUMNS], check_dtype=False, rtol=1e-9
+        )
+    # 早期日期样本不足，覆盖软阈值/未归一化分支
+    assert panel['g_efficiency_surprise'].notna().sum() > 0
+    assert panel['g_efficiency_surprise'].isna().sum() > 0
+
+
+def test_panel_skips_stocks_without_history_in_window():
+    history = _random_history(stocks=3)
+    universe = universe_frame({'2019-01-04': ['000000.SZ', '999999.SH']})
+
+    panel = compute_g_factor_panel(history, universe)
+
+    assert set(panel['ts_code']) <= {'000000.SZ'}
+    assert compute_g_factor_panel(history.iloc[0:0], universe).empty
+
+
+def test_batch_uses_single_history_query():
+    history = _random_history(stocks=10)
+    codes = sorted(history['ts_code'].unique())
+    universe = {d: codes for d in ['2021-03-05', '2021-03-12', '2021-03-19']}
+    context = _FakeContext(history, universe)
+    calculator = _calculator(context)
+
+    result = calculator.calculate_g_factors_batch_pit('2021-03-01', '2021-03-20', mode='backfill')
+
+    assert len(context.history_queries) == 1
+    assert result['total_dates'] == 3
+    assert result['success_count'] == len(context.inserted) == 30
+    assert {params[1] for params in context.inserted} == set(universe)
+
+
+def test_calculation_dates_are_week_end_trade_days():
+    # 2021-03-12（周五）休市：该周的计算日提前到周四；区间末尾未结束的周不计算
+    calculator = _calculator(_FakeContext(holidays=('2021-03-12',)))
+
+    dates = calculator.generate_calculation_dates('2021-03-01', '2021-03-25', mode='backfill')
+
+    assert dates == ['2021-03-05', '2021-03-11', '2021-03-19']
+
+
+def test_per_date_engine_matches_panel_engine():
+    history = _random_history(stocks=6)
+    codes = sorted(history['ts_code'].unique())
+    universe = {d: codes for d in ['2021-03-05', '2021-03-12', '2021-03-19']}
+    results = {}
+    for engine in ('panel', 'per_date'):
+        context = _FakeContext(history, universe)
+        result = _calculator(context).calculate_g_factors_batch_pit(
+            '2021-03-01', '2021-03-20', mode='backfill', engine=engine
+        )
+        keys = sorted((params[0], params[1]) for params in context.inserted)
+        results[engine] = (result['success_count'], result['failed_count'], keys)
+
+    assert results['per_date'] == results['panel']
+
+
+def test_unknown_engine_raises():
+    calculator = _calculator(_FakeContext(_random_history(stocks=2)))
+
+    with pytest.raises(ValueError, match="未知的计算引擎: fast"):
+        calculator.calculate_g_factors_batch_pit('2021-03-01', '2021-03-20', mode='backfill', engine='fast')
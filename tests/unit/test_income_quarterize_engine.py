@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.production.data_updaters.pit.income_quarterize_engine import (
+    fill_by_announcement,
+    fill_first_by_period,
+    prev_quarter_end,
+    quarterize_frame,
+)
+from scripts.production.data_updaters.pit.pit_income_quarterly_manager import PITIncomeQuarterlyManager
+
+FIELDS = ['revenue', 'oper_cost', 'operate_profit', 'total_profit', 'n_income', 'n_income_attr_p']
+
+
+def _manager() -> PITIncomeQuarterlyManager:
+    manager = PITIncomeQuarterlyManager.__new__(PITIncomeQuarterlyManager)
+    manager.logger = logging.getLogger('test_income_quarterize_engine')
+    return manager
+
+
+def _random_income(stocks: int = 60, seed: int = 11) -> pd.DataFrame:
+    """_preprocess_data 之后、季度化之前的形态：日期为 date，按 (ts_code, end_date, ann_date) 排序"""
+    rng = np.random.default_rng(seed)
+    quarter_ends = [d.date() for d in pd.date_range('2019-01-01', '2023-12-31', freq='QE')]
+    rows = []
+    for i in range(stocks):
+        ts_code = f"{i:06d}.SZ"
+        # 部分股票上市前仅有年报
+        listed_from = quarter_ends[int(rng.integers(0, 12))] if i % 4 == 0 else quarter_ends[0]
+        for end in quarter_ends:
+            if end < listed_from and end.month != 12:
+                continue
+            if rng.random() < 0.1:
+                continue
+            values = {f: None if rng.random() < 0.05 else float(round(rng.uniform(-1e8, 1e9), 2)) for f in FIELDS}
+            ann = end + timedelta(days=int(rng.integers(20, 110)))
+            rows.append({'ts_code': ts_code, 'end_date': end, 'ann_date': ann, 'data_source': 'report', **values})
+            if rng.random() < 0.15:
+                revised = {f: v if v is None else v * 1.01 for f, v in values.items()}
+                rows.append({'ts_code': ts_code, 'end_date': end, 'ann_date': ann + timedelta(days=200),
+                             'data_source': 'report', **revised})
+            for source, share in (('express', 0.2), ('forecast', 0.25)):
+                if rng.random() < share:
+                    early = {f: None if rng.random() < 0.3 else float(round(rng.uniform(0, 1e9), 2)) for f in FIELDS}
+                    rows.append({'ts_code': ts_code, 'end_date': end, 'ann_date': ann - timedelta(days=10),
+                                 'data_source': source, 'conversion_status': 'FC_MID_10K', **early})
+    df = pd.DataFrame(rows)
+    end_dt = pd.to_datetime(df['end_date'])
+    df['year'] = end_dt.dt.year
+    df['quarter'] = (end_dt.dt.month - 1) // 3 + 1
+    return df.sort_values(['ts_code', 'end_date', 'ann_date']).reset_index(drop=True)
+
+
+def test_vectorized_matches_iterative_row_for_row():
+    df = _random_income()
+    manager = _manager()
+    expected = manager._quarterize_to_single(df, engine='iterative')
+    actual = manager._quarterize_to_single(df)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert (actual['conversion_status'] == 'ANNUAL_ONLY').any()
+
+
+def test_unknown_engine_raises():
+    with pytest.raises(ValueError, match="未知的季度化引擎: vector"):
+        _manager()._quarterize_to_single(_random_income(stocks=2), engine='vector')
+
+
+def test_forecast_keeps_mid_when_no_report_baseline():
+    df = pd.DataFrame([
+        {'ts_code': '000001.SZ', 'end_date': date(2023, 3, 31), 'ann_date': date(2023, 4, 20),
+         'data_source': 'report', 'n_income_attr_p': 10.0, 'revenue': 100.0},
+        {'ts_code': '000002.SZ', 'end_date': date(2023, 6, 30), 'ann_date': date(2023, 7, 10),
+         'data_source': 'forecast', 'n_income_attr_p': 30.0, 'revenue': None},
+        {'ts_code': '000001.SZ', 'end_date': date(2023, 6, 30), 'ann_date': date(2023, 7, 12),
+         'data_source': 'express', 'n_income_attr_p': 25.0, 'revenue': 260.0},
+    ])
+    out, stats = quarterize_frame(df)
+    forecast = out.iloc[1]
+    express = out.iloc[2]
+    assert forecast['n_income_attr_p'] == 30.0
+    assert forecast['conversion_status'] == 'FC_MID_KEEP'
+    assert stats['forecast']['missing_prev_cumulative'] == 1
+    assert stats['forecast']['missing_examples'] == [('000002.SZ', date(2023, 3, 31))]
+    assert express['n_income_attr_p'] == 15.0
+    assert express['revenue'] == 160.0
+    assert express['conversion_status'] == 'QTR_DIFF_EXP'
+
+
+def test_prev_quarter_end_matches_scalar_helper():
+    ends = pd.Series([date(2023, 3, 31), date(2023, 5, 15), None, date(2024, 12, 31)])
+    for k in (1, 2, 5):
+        vectorized = prev_quarter_end(ends, k)
+        for value, got in zip(ends, vectorized):
+            expected = PITIncomeQuarterlyManager._prev_quarter_end(value, k)
+            assert (pd.isna(got) and expected is None) or got == expected
+
+
+def test_fill_helpers_only_fill_missing_cells():
+    work = pd.DataFrame({
+        'ts_code': ['A', 'A', 'B'],
+        'end_date': [date(2023, 6, 30)] * 3,
+        'ann_date': [date(2023, 7, 1), date(2023, 7, 5), date(2023, 7, 1)],
+        'data_source': ['express', 'forecast', 'express'],
+        'revenue': [None, 5.0, None],
+        'oper_cost': [None, None, None],
+    })
+    target = work['data_source'].isin(['express', 'forecast'])
+    candidates = pd.DataFrame({
+        'ts_code': ['A', 'A'],
+        'end_date': [date(2023, 6, 30)] * 2,
+        'ann_date': [date(2023, 7, 1), date(2023, 7, 5)],
+        'revenue': [None, '7'],
+        'oper_cost': [3.0, 4.0],
+    })
+    filled = fill_first_by_period(work.copy(), target, candidates, ['revenue', 'oper_cost'])
+    assert filled == 3
+
+    by_period = work.copy()
+    fill_first_by_period(by_period, target, candidates, ['revenue', 'oper_cost'])
+    assert by_period['revenue'].tolist()[:2] == [7.0, 5.0]
+    assert by_period['oper_cost'].tolist()[:2] == [3.0, 3.0]
+    assert pd.isna(by_period.loc[2, 'revenue'])
+
+    by_ann = work.copy()
+    assert fill_by_announcement(by_ann, target, candidates, ['revenue', 'oper_cost', 'total_profit']) == 2
+    assert by_ann['oper_cost'].tolist()[:2] == [3.0, 4.0]
+    assert pd.isna(by_ann.loc[0, 'revenue'])
+    assert by_ann.loc[1, 'revenue'] == 5.0
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.production.factor_calculators.p_factor.p_factor_asof_engine import (
+    DATA_SOURCE_PRIORITY,
+    INDICATOR_COLUMNS,
+    listed_pairs,
+    resolve_asof_indicators,
+)
+
+
+def _random_history(seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    codes = [f"{i:06d}.SZ" for i in range(30)]
+    quarter_ends = pd.date_range("2018-03-31", "2021-12-31", freq="QE")
+    for code in codes:
+        for end in quarter_ends:
+            for source in ("report", "express", "forecast", "other"):
+                if rng.random() < 0.45:
+                    continue
+                lag = int(rng.integers(5, 120))
+                row = {c: None for c in INDICATOR_COLUMNS}
+                row.update(
+                    ts_code=code,
+                    end_date=end.date(),
+                    ann_date=end.date() + timedelta(days=lag),
+                    data_source=source,
+                    gpa_ttm=float(rng.normal()),
+                    roe_excl_ttm=float(rng.normal()),
+                    roa_excl_ttm=float(rng.normal()),
+                    data_quality="normal",
+                    calculation_status="success",
+                )
+                rows.append(row)
+        # 老报告期的更正公告：ann_date 最新但 end_date 过旧
+        stale = {c: None for c in INDICATOR_COLUMNS}
+        stale.update(
+            ts_code=code,
+            end_date=date(2018, 3, 31),
+            ann_date=date(2021, 6, 1) + timedelta(days=int(rng.integers(0, 60))),
+            data_source="report",
+            gpa_ttm=99.0,
+        )
+        rows.append(stale)
+    return pd.DataFrame(rows, columns=INDICATOR_COLUMNS)
+
+
+def _reference(history: pd.DataFrame, pairs: pd.DataFrame) -> pd.DataFrame:
+    """逐日 SQL（ROW_NUMBER 窗口）语义的直接翻译"""
+    frames = []
+    for calc_date, group in pairs.groupby("calc_date"):
+        as_of = pd.Timestamp(calc_date)
+        cutoff = as_of - pd.DateOffset(months=10)
+        df = history[history["ts_code"].isin(group["ts_code"])].copy()
+        df = df[pd.to_datetime(df["ann_date"]) <= as_of]
+        df = df[pd.to_datetime(df["end_date"]) >= cutoff]
+        df["_priority"] = df["data_source"].map(DATA_SOURCE_PRIORITY).fillna(9)
+        df = df.sort_values(
+            ["ts_code", "ann_date", "end_date", "_priority"],
+            ascending=[True, False, False, True],
+            kind="mergesort",
+        )
+        latest = df.groupby("ts_code", sort=True).head(1).drop(columns="_priority")
+        latest.insert(0, "calc_date", calc_date)
+        frames.append(latest)
+    return pd.concat(frames).reset_index(drop=True)
+
+
+def test_resolve_asof_matches_per_date_window_query():
+    history = _random_history()
+    listings = pd.DataFrame(
+        {
+            "ts_code": sorted(history["ts_code"].unique()),
+            "list_date": [date(2017, 1, 1)] * 25 + [date(2020, 1, 1)] * 5,
+            "delist_date": [None] * 28 + [date(2020, 6, 30), date(2021, 3, 1)],
+        }
+    )
+    calc_dates = [d.strftime("%Y-%m-%d") for d in pd.date_range("2018-06-01", "2021-12-31", freq="W-FRI")]
+
+    pairs = listed_pairs(listings, calc_dates)
+    result = resolve_asof_indicators(history, pairs)
+    expected = _reference(history, pairs)
+
+    assert len(result) > 1000
+    pd.testing.assert_frame_equal(result, expected[result.columns], check_dtype=False)
+    # 更正公告未因 ann_date 更新而被选中
+    assert not (result["gpa_ttm"] == 99.0).any()
+
+
+def test_listed_pairs_respects_list_and_delist_dates():
+    listings = pd.DataFrame(
+        {
+            "ts_code": ["B", "A"],
+            "list_date": [date(2020, 1, 10), date(2019, 1, 1)],
+            "delist_date": [None, date(2020, 1, 10)],
+        }
+    )
+
+    pairs = listed_pairs(listings, ["2020-01-09", "2020-01-10"])
+
+    assert pairs.values.tolist() == [["2020-01-09", "A"], ["2020-01-10", "B"]]
+
+
+def test_resolve_asof_handles_unknown_codes_and_empty_history():
+    history = _random_history().head(5)
+    pairs = pd.DataFrame({"calc_date": ["2019-01-04"], "ts_code": ["999999.SH"]})
+
+    assert resolve_asof_indicators(history, pairs).empty
+    assert resolve_asof_indicators(history.iloc[0:0], pairs).empty
+
+
+class _FakeSyncDB:
+    def __init__(self, history, listings):
+        self.history = history
+        self.listings = listings
+        self.deleted = []
+        self.inserted = 0
+
+    def fetch_sync(self, query, params=None):
+        if "others_calendar" in query:
+            return [
+                {"cal_date": day.date(), "is_open": int(day.weekday() < 5), "update_time": None}
+                for day in pd.date_range("2019-01-01", "2019-02-28")
+            ]
+        if "pit_financial_indicators" in query:
+            return list(self.history.itertuples(index=False, name=None))
+        if "stock_basic" in query:
+            return list(self.listings.itertuples(index=False, name=None))
+        raise RuntimeError("industry lookup unavailable")
+
+    def execute_sync(self, query, params=None):
+        if query.strip().startswith("DELETE"):
+            self.deleted.append(params[0])
+        else:
+            self.inserted += 1
+
+
+def test_calculator_batch_uses_single_history_load(monkeypatch):
+    from pathlib import Path
+    import importlib.util
+
+    from alphahome.fetchers.tools import calendar
+
+    path = Path(__file__).resolve().parents[2] / "scripts/production/factor_calculators/p_factor/production_p_factor_calculator.py"
+    spec = importlib.util.spec_from_file_location("production_p_factor_calculator_test", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    history = _random_history()
+    listings = pd.DataFrame(
+        {"ts_code": sorted(history["ts_code"].unique()), "list_date": date(2017, 1, 1), "delist_date": None}
+    )
+    # 进程级日历索引按 id(db_manager) 缓存，避免复用其它用例加载的索引
+    monkeypatch.setattr(calendar, "_TRADE_CAL_INDEXES", {})
+    calculator = module.ProductionPFactorCalculator.__new__(module.ProductionPFactorCalculator)
+    calculator.db_manager = _FakeSyncDB(history, listings)
+    calculator.logger = calculator._setup_logger()
+    calculator.stats = {"query_time": 0, "calculation_time": 0, "save_time": 0, "total_time": 0}
+    monkeypatch.setattr(calculator, "_get_trading_stock_codes", lambda d: pytest.fail("per-date query"))
+
+    result = calculator.calculate_p_factors_batch_pit("2019-01-01", "2019-01-31", mode="backfill")
+
+    assert result["total_dates"] == 4
+    assert calculator.db_manager.deleted == ["2019-01-04", "2019-01-11", "2019-01-18", "2019-01-25"]
+    assert result["success_count"] == calculator.db_manager.inserted
+    assert result["success_count"] + result["failed_count"] == 4 * 30
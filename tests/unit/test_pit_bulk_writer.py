@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import csv
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.production.data_updaters.pit.base.pit_bulk_writer import bulk_upsert, encode_csv
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.statements.append(query)
+        if 'information_schema.columns' in query:
+            self._result = [(c,) for c in self.conn.integer_columns]
+        elif 'WITH merged AS' in query:
+            if self.conn.fail_merge:
+                raise RuntimeError('merge failed')
+            self._result = [self.conn.counts]
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0]
+
+    def copy_expert(self, sql, file):
+        self.conn.statements.append(sql)
+        self.conn.copied = list(csv.reader(file))
+
+
+class _FakeConnection:
+    def __init__(self, integer_columns=(), counts=(0, 0), fail_merge=False):
+        self.integer_columns = integer_columns
+        self.counts = counts
+        self.fail_merge = fail_merge
+        self.statements = []
+        self.copied = None
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class _FakeDBManager:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _get_sync_connection(self):
+        return self.conn
+
+
+def _frame():
+    return pd.DataFrame({
+        'ts_code': ['000001.SZ', '000001.SZ', '000002.SZ'],
+        'end_date': [date(2024, 3, 31)] * 3,
+        'ann_date': [date(2024, 4, 20)] * 3,
+        'data_source': ['report', 'report', 'express'],
+        'revenue': [1.5, 2.5, np.nan],
+        'year': [2024.0, 2024.0, np.nan],
+        'conversion_status': ['A', 'B', ''],
+    })
+
+
+def test_encode_csv_writes_nulls_and_integer_columns():
+    rows = list(csv.reader(encode_csv(_frame(), ['ts_code', 'revenue', 'year', 'conversion_status'], {'year'})))
+    assert rows[0] == ['000001.SZ', '1.5', '2024', 'A']
+    assert rows[2] == ['000002.SZ', '', '', '']
+
+
+def test_bulk_upsert_copies_deduplicated_rows_and_reports_counts():
+    conn = _FakeConnection(integer_columns=['year'], counts=(1, 1))
+    fields = list(_frame().columns)
+    keys = ['ts_code', 'end_date', 'ann_date', 'data_source']
+
+    result = bulk_upsert(_FakeDBManager(conn), _frame(), 'pgs_factors', 'pit_income_quarterly', fields, keys)
+
+    assert result == {'inserted': 1, 'updated': 1}
+    assert conn.committed and not conn.rolled_back
+    assert [row[-1] for row in conn.copied] == ['B', '']
+    merge_sql = conn.statements[-1]
+    assert 'ON CONFLICT ("ts_code", "end_date", "ann_date", "data_source") DO UPDATE' in merge_sql
+    assert '"revenue" = EXCLUDED."revenue"' in merge_sql
+    assert '"ts_code" = EXCLUDED' not in merge_sql
+    assert 'updated_at = CURRENT_TIMESTAMP' in merge_sql
+
+
+def test_bulk_upsert_plain_insert_and_rollback_on_failure():
+    conn = _FakeConnection(counts=(3, 0))
+    fields = ['ts_code', 'revenue']
+    assert bulk_upsert(_FakeDBManager(conn), _frame(), 'pgs_factors', 'p_factor', fields) == {'inserted': 3, 'updated': 0}
+    assert 'ON CONFLICT' not in conn.statements[-1]
+    assert len(conn.copied) == 3
+
+    failing = _FakeConnection(fail_merge=True)
+    with pytest.raises(RuntimeError):
+        bulk_upsert(_FakeDBManager(failing), _frame(), 'pgs_factors', 'p_factor', fields)
+    assert failing.rolled_back and not failing.committed
@@ -0,0 +1,131 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from alphahome.providers import AlphaDataTool, QueryCache
+
+
+class _FakeDB:
+    """模拟 tushare.stock_daily 查询结果，并记录行情查询次数"""
+
+    def __init__(self):
+        self.update_time = datetime(2024, 6, 3, 18, 0)
+        self.stock_queries = 0
+        self.in_catalog = True
+        self.catalog_error = None
+        self.source_scans = 0
+        self.rows = [
+            {"ts_code": code, "trade_date": day, "open": 1.0, "high": 1.0, "low": 1.0, "close": close,
+             "pre_close": 1.0, "change": 0.0, "pct_chg": 0.0, "vol": 100.0, "amount": 1000.0}
+            for code in ("000001.SZ", "600000.SH")
+            for day, close in (("2024-01-02", 10.0), ("2024-01-03", 10.5), ("2024-01-04", 11.0))
+        ]
+
+    def fetch_sync(self, query, params=None):
+        if "to_regclass" in query:
+            return [{"available": True}]
+        if "table_watermarks" in query:
+            if self.catalog_error:
+                raise self.catalog_error
+            return [{"max_update_time": self.update_time}] if self.in_catalog else []
+        if "MAX(update_time)" in query:
+            self.source_scans += 1
+            return [{"version": self.update_time}]
+        return [{"?column?": 1}]
+
+    def fetch_dataframe_sync(self, query, params=None):
+        self.stock_queries += 1
+        symbols, start, end = set(params[:-2]), params[-2], params[-1]
+        df = pd.DataFrame([r for r in self.rows if r["ts_code"] in symbols and start <= r["trade_date"] <= end])
+        df["trade_date"] = pd.to_datetime(df["trade_date"])
+        return df
+
+
+@pytest.fixture
+def tool():
+    db = _FakeDB()
+    return db, AlphaDataTool(db, cache_manager=QueryCache(use_disk=False, version_ttl=0))
+
+
+def test_sub_range_and_symbol_subset_are_served_from_cache(tool):
+    db, data_tool = tool
+    full = data_tool.get_stock_data(["000001.SZ", "600000.SH"], "2024-01-01", "2024-01-31")
+    assert db.stock_queries == 1
+
+    subset = data_tool.get_stock_data("600000.SH", "2024-01-03", "2024-01-04")
+    assert db.stock_queries == 1
+    expected = full[(full["ts_code"] == "600000.SH") & (full["trade_date"] >= "2024-01-03")].reset_index(drop=True)
+    pd.testing.assert_frame_equal(subset, expected)
+
+    # 超出已缓存区间时重新查询
+    data_tool.get_stock_data("600000.SH", "2023-12-01", "2024-01-04")
+    assert db.stock_queries == 2
+
+
+def test_cached_frames_are_not_shared_with_callers(tool):
+    db, data_tool = tool
+    first = data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    first["close"] = 0.0
+
+    second = data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    assert second["close"].tolist() == [10.0, 10.5, 11.0]
+    assert db.stock_queries == 1
+
+
+def test_source_update_time_change_invalidates_entries(tool):
+    db, data_tool = tool
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    db.update_time = datetime(2024, 6, 4, 18, 0)
+
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    assert db.stock_queries == 2
+
+
+def test_version_scans_source_only_when_table_not_in_catalog(tool):
+    db, data_tool = tool
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    assert db.source_scans == 0
+
+    db.in_catalog = False
+    db.update_time = datetime(2024, 6, 4, 18, 0)
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    assert db.source_scans == 1
+    assert db.stock_queries == 2
+
+
+def test_catalog_error_keeps_cached_version_without_scanning_source(tool):
+    db, data_tool = tool
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+
+    db.catalog_error = RuntimeError("connection reset")
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    assert db.source_scans == 0
+    assert db.stock_queries == 1
+
+
+def test_memory_tier_is_bounded_by_bytes():
+    db = _FakeDB()
+    cache = QueryCache(use_disk=False, memory_limit_bytes=1, version_ttl=0)
+    data_tool = AlphaDataTool(db, cache_manager=cache)
+
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+    data_tool.get_stock_data("000001.SZ", "2024-01-01", "2024-01-31")
+
+    assert db.stock_queries == 2
+    assert cache.stats()["memory_bytes"] == 0
+
+
+def test_disk_tier_survives_new_cache_instance(tmp_path):
+    pytest.importorskip("pyarrow")
+    db = _FakeDB()
+    AlphaDataTool(db, cache_manager=QueryCache(cache_dir=tmp_path, version_ttl=0)).get_stock_data(
+        "000001.SZ", "2024-01-01", "2024-01-31"
+    )
+
+    fresh = QueryCache(cache_dir=tmp_path, version_ttl=0)
+    df = AlphaDataTool(db, cache_manager=fresh).get_stock_data("000001.SZ", "2024-01-02", "2024-01-03")
+
+    assert db.stock_queries == 1
+    assert len(df) == 2
+    assert fresh.stats()["hits"] == 1
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+from alphahome.common.task_system.task_dag import (
+    TaskDAGScheduler,
+    derive_task_dependencies,
+    find_cycle,
+)
+
+
+async def generate_trade_day_batches(**kwargs):
+    return []
+
+
+async def generate_stock_code_batches(**kwargs):
+    return []
+
+
+class _TradeCalTask:
+    data_source = "tushare"
+
+
+class _StockBasicTask:
+    data_source = "tushare"
+
+    async def get_batch_list(self, **kwargs):
+        return await generate_trade_day_batches(**kwargs)
+
+
+class _DailyTask:
+    data_source = "tushare"
+
+    async def get_batch_list(self, **kwargs):
+        async def _inner():
+            return await generate_trade_day_batches(**kwargs)
+
+        return await _inner()
+
+
+class _DividendTask:
+    data_source = "tushare"
+
+    async def get_batch_list(self, **kwargs):
+        return await generate_stock_code_batches(**kwargs)
+
+
+class _DeclaredTask:
+    data_source = "akshare"
+    dependencies = ["tushare_stock_daily", "not_in_run_set"]
+
+
+def test_derive_task_dependencies_from_metadata():
+    deps = derive_task_dependencies(
+        {
+            "tushare_others_tradecal": _TradeCalTask,
+            "tushare_stock_basic": _StockBasicTask,
+            "tushare_stock_daily": _DailyTask,
+            "tushare_stock_dividend": _DividendTask,
+            "akshare_declared": _DeclaredTask,
+        }
+    )
+
+    assert deps == {
+        "tushare_others_tradecal": set(),
+        "tushare_stock_basic": {"tushare_others_tradecal"},
+        "tushare_stock_daily": {"tushare_others_tradecal"},
+        "tushare_stock_dividend": {"tushare_stock_basic"},
+        "akshare_declared": {"tushare_stock_daily"},
+    }
+
+
+def test_derive_task_dependencies_ignores_providers_outside_run_set():
+    deps = derive_task_dependencies({"tushare_stock_daily": _DailyTask})
+
+    assert deps == {"tushare_stock_daily": set()}
+
+
+def test_find_cycle():
+    assert find_cycle({"a": {"b"}, "b": set()}) is None
+    assert find_cycle({"a": {"b"}, "b": {"a"}}) == ["a", "b", "a"]
+
+
+class _Recorder:
+    def __init__(self, durations, failures=()):
+        self.durations = durations
+        self.failures = set(failures)
+        self.events = []
+        self.active = {}
+        self.max_active = {}
+
+    def source_of(self, name):
+        return name.split("_")[0]
+
+    async def run_task(self, name):
+        source = self.source_of(name)
+        self.active[source] = self.active.get(source, 0) + 1
+        self.max_active[source] = max(self.max_active.get(source, 0), self.active[source])
+        self.events.append(("start", name))
+        try:
+            await asyncio.sleep(self.durations.get(name, 0))
+            if name in self.failures:
+                raise RuntimeError(f"{name} boom")
+            return {"task_name": name, "status": "success"}
+        finally:
+            self.active[source] -= 1
+            self.events.append(("end", name))
+
+
+@pytest.mark.asyncio
+async def test_scheduler_respects_dependencies_and_overlaps_sources():
+    recorder = _Recorder(
+        {
+            "tushare_tradecal": 0.02,
+            "tushare_daily": 0.01,
+            "akshare_macro": 0.03,
+        }
+    )
+    scheduler = TaskDAGScheduler(
+        run_task=recorder.run_task,
+        dependencies={"tushare_daily": {"tushare_tradecal"}},
+        source_of=recorder.source_of,
+        source_limits={"tushare": 2, "akshare": 1},
+    )
+
+    results = await scheduler.run(["tushare_daily", "akshare_macro", "tushare_tradecal"])
+
+    assert [r["task_name"] for r in results] == [
+        "tushare_daily",
+        "akshare_macro",
+        "tushare_tradecal",
+    ]
+    events = recorder.events
+    assert events.index(("end", "tushare_tradecal")) < events.index(("start", "tushare_daily"))
+    # 不同数据源同时运行：akshare 在 tushare 任务结束前已经开始
+    assert events.index(("start", "akshare_macro")) < events.index(("end", "tushare_tradecal"))
+    # 依赖满足后立即启动，不必等待其他数据源
+    assert events.index(("start", "tushare_daily")) < events.index(("end", "akshare_macro"))
+
+
+@pytest.mark.asyncio
+async def test_scheduler_enforces_per_source_limits():
+    names = [f"tushare_{i}" for i in range(6)] + [f"akshare_{i}" for i in range(3)]
+    recorder = _Recorder({name: 0.01 for name in names})
+    scheduler = TaskDAGScheduler(
+        run_task=recorder.run_task,
+        dependencies={},
+        source_of=recorder.source_of,
+        source_limits={"tushare": 2, "akshare": 3},
+    )
+
+    await scheduler.run(names)
+
+    assert recorder.max_active == {"tushare": 2, "akshare": 3}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_dependents_after_failed_dependency():
+    recorder = _Recorder({}, failures={"tushare_basic"})
+    scheduler = TaskDAGScheduler(
+        run_task=recorder.run_task,
+        dependencies={"tushare_dividend": {"tushare_basic"}},
+        source_of=recorder.source_of,
+        source_limits={"tushare": 1},
+    )
+
+    results = await scheduler.run(["tushare_basic", "tushare_dividend"])
+
+    assert results[0]["status"] == "error"
+    assert "boom" in results[0]["error"]
+    assert results[1]["status"] == "success"
+    assert results[1]["failed_dependencies"] == ["tushare_basic"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rejects_cycles():
+    recorder = _Recorder({})
+    scheduler = TaskDAGScheduler(
+        run_task=recorder.run_task,
+        dependencies={"tushare_a": {"tushare_b"}, "tushare_b": {"tushare_a"}},
+        source_of=recorder.source_of,
+        source_limits={},
+    )
+
+    with pytest.raises(ValueError, match="依赖存在环"):
+        await scheduler.run(["tushare_a", "tushare_b"])
+    assert recorder.events == []
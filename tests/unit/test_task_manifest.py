@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from alphahome.common.task_system import UnifiedTaskFactory
+from alphahome.common.task_system.task_manifest import build_manifest, load_manifest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_manifest_file_is_up_to_date():
+    expected = {entry["name"]: entry for entry in build_manifest()["tasks"]}
+    assert load_manifest() == expected, "请运行 python -m alphahome.common.task_system.task_manifest 重新生成"
+
+
+def test_manifest_matches_registered_task_classes():
+    manifest = load_manifest()
+    for name, entry in manifest.items():
+        importlib.import_module(entry["module"])
+        task_class = UnifiedTaskFactory._task_registry[name]
+        assert task_class.__name__ == entry["class_name"]
+        assert task_class.__module__ == entry["module"]
+        assert task_class.task_type == entry["type"]
+        assert task_class.data_source == entry["data_source"]
+        assert task_class.table_name == entry["table_name"]
+        assert task_class.date_column == entry["date_column"]
+
+
+def test_importing_fetchers_does_not_import_task_modules():
+    code = (
+        "import sys, alphahome.fetchers, alphahome.fetchers.tasks\n"
+        "loaded = [m for m in sys.modules if m.startswith('alphahome.fetchers.tasks.') and m.count('.') > 3]\n"
+        "print(len(loaded))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "0"
+
+
+def test_manifest_check_runs_without_numpy_or_pandas():
+    # sys.modules 中置 None 使对应 import 失败，模拟未安装重量级依赖的环境
+    code = (
+        "import sys, runpy\n"
+        "sys.modules.update(numpy=None, pandas=None)\n"
+        "sys.argv = ['task_manifest', '--check']\n"
+        "runpy.run_module('alphahome.common.task_system.task_manifest', run_name='__main__')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_factory_answers_from_manifest_and_imports_on_demand(monkeypatch):
+    manifest = {
+        "fake_manifest_task": {
+            "name": "fake_manifest_task",
+            "module": "alphahome.fetchers.tasks.not_a_module",
+            "class_name": "FakeManifestTask",
+            "type": "fetch",
+            "data_source": "tushare",
+            "domain": "stock",
+            "table_name": "fake_table",
+            "date_column": "trade_date",
+            "description": "",
+            "source_tables": [],
+            "dependencies": [],
+        }
+    }
+    monkeypatch.setattr(UnifiedTaskFactory, "_task_manifest", manifest)
+    monkeypatch.setattr(UnifiedTaskFactory, "_initialized", True)
+
+    assert "fake_manifest_task" in UnifiedTaskFactory.get_all_task_names()
+    assert "fake_manifest_task" in UnifiedTaskFactory.get_task_names_by_type("fetch")
+    info = UnifiedTaskFactory.get_task_info("fake_manifest_task")
+    assert info["data_source"] == "tushare"
+    assert info["table_name"] == "fake_table"
+    assert info["class_name"] == "FakeManifestTask"
+
+    # 仅在需要任务类时才导入模块
+    with pytest.raises(ModuleNotFoundError):
+        UnifiedTaskFactory.get_task_class("fake_manifest_task")
+    with pytest.raises(ValueError):
+        UnifiedTaskFactory.get_task_class("missing_task")
+
+
+@pytest.mark.asyncio
+async def test_gui_collection_list_is_built_without_instantiating_tasks(monkeypatch):
+    from alphahome.gui.services import task_registry_service
+
+    manifest = {
+        "fake_stock_daily": {
+            "name": "fake_stock_daily",
+            "module": "alphahome.fetchers.tasks.not_a_module",
+            "class_name": "FakeStockDailyTask",
+            "type": "fetch",
+            "data_source": "tushare",
+            "domain": None,
+            "table_name": "fake_stock_daily",
+            "date_column": "trade_date",
+            "description": "假任务",
+            "source_tables": [],
+            "dependencies": [],
+        }
+    }
+    monkeypatch.setattr(UnifiedTaskFactory, "_task_manifest", manifest)
+    monkeypatch.setattr(UnifiedTaskFactory, "_task_registry", {})
+    monkeypatch.setattr(UnifiedTaskFactory, "_initialized", True)
+    monkeypatch.setattr(UnifiedTaskFactory, "_db_manager", None)
+    monkeypatch.setattr(task_registry_service, "_collection_task_cache", [])
+
+    async def _no_instances(*args, **kwargs):
+        raise AssertionError("刷新任务列表不应实例化任务")
+
+    monkeypatch.setattr(UnifiedTaskFactory, "get_task", _no_instances)
+    monkeypatch.setattr(UnifiedTaskFactory, "create_task_instance", _no_instances)
+
+    await task_registry_service.handle_get_collection_tasks()
+
+    assert task_registry_service.get_cached_collection_tasks() == [
+        {
+            "name": "fake_stock_daily",
+            "type": "stock",
+            "data_source": "tushare",
+            "description": "假任务",
+            "selected": False,
+            "table_name": "fake_stock_daily",
+            "date_column": "trade_date",
+            "latest_update_time": "N/A (DB Error)",
+        }
+    ]
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from alphahome.fetchers.sources.tinysoft import tinysoft_api
+from alphahome.fetchers.sources.tinysoft.tinysoft_api import TinySoftAPI, TinySoftAPIError
+
+QUERY_LATENCY = 0.05
+
+
+class _FakeResult:
+    def __init__(self, code=0, message="", df=None):
+        self._code = code
+        self._message = message
+        self._df = df
+
+    def error(self):
+        return self._code
+
+    def message(self):
+        return self._message
+
+    def dataframe(self):
+        return self._df
+
+
+class _FakeClient:
+    """模拟 pyTSL.Client：记录调用线程，同一客户端被并发调用时报错。"""
+
+    instances = []
+
+    def __init__(self, *args):
+        self.logined = 0
+        self.login_calls = 0
+        self.threads = set()
+        self.busy = False
+        self.expire_once = False
+        _FakeClient.instances.append(self)
+
+    def _enter(self):
+        assert not self.busy, "同一 pyTSL.Client 被并发调用"
+        self.busy = True
+        self.threads.add(threading.get_ident())
+
+    def is_logined(self):
+        return self.logined
+
+    def login(self):
+        self.login_calls += 1
+        self.logined = 1
+        return 1
+
+    def logout(self):
+        self.logined = 0
+
+    def last_error(self):
+        return ""
+
+    def query(self, **kwargs):
+        self._enter()
+        try:
+            if self.expire_once:
+                self.expire_once = False
+                self.logined = 0
+                return _FakeResult(-13, "not login")
+            time.sleep(QUERY_LATENCY)
+            return _FakeResult(df=pd.DataFrame({"StockID": [kwargs["stock"]], "close": [1.0]}))
+        finally:
+            self.busy = False
+
+
+class _FakePyTSL:
+    Client = _FakeClient
+
+
+@pytest.fixture(autouse=True)
+def fake_pytsl(monkeypatch):
+    _FakeClient.instances = []
+    monkeypatch.setattr(tinysoft_api, "pyTSL", _FakePyTSL)
+
+
+def _api(**kwargs):
+    params = {"user": "u", "password": "p", "request_interval": 0.0}
+    params.update(kwargs)
+    return TinySoftAPI(**params)
+
+
+async def _backfill(api, symbols):
+    return await asyncio.gather(
+        *[
+            api.query(stock=symbol, cycle="1分钟线", begin_time="20240102", end_time="20240102")
+            for symbol in symbols
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_backfill_scales_with_pool_size():
+    symbols = [f"SZ{i:06d}" for i in range(16)]
+
+    start = time.perf_counter()
+    await _backfill(_api(pool_size=1), symbols)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frames = await _backfill(_api(pool_size=4), symbols)
+    pooled = time.perf_counter() - start
+
+    assert [f["StockID"].iloc[0] for f in frames] == symbols
+    assert pooled < single / 2.5
+    pooled_clients = _FakeClient.instances[1:]
+    assert len(pooled_clients) == 4
+    # 每个会话的所有调用都在同一个专用线程中执行
+    assert all(len(client.threads) == 1 for client in pooled_clients)
+    assert len(set().union(*(client.threads for client in pooled_clients))) == 4
+
+
+@pytest.mark.asyncio
+async def test_request_interval_is_per_session():
+    api = _api(pool_size=2, request_interval=0.2)
+
+    start = time.perf_counter()
+    await _backfill(api, ["SZ000001", "SZ000002"])
+    await _backfill(api, ["SZ000003", "SZ000004"])
+    elapsed = time.perf_counter() - start
+
+    # 两个会话各自间隔 0.2s，总耗时约为一次间隔而不是三次
+    assert 0.2 <= elapsed < 0.45
+
+
+@pytest.mark.asyncio
+async def test_global_rate_limit_spans_sessions():
+    api = _api(pool_size=4, max_requests_per_second=20)
+
+    start = time.perf_counter()
+    await _backfill(api, [f"SZ{i:06d}" for i in range(8)])
+    elapsed = time.perf_counter() - start
+
+    assert elapsed >= 7 / 20
+
+
+@pytest.mark.asyncio
+async def test_auth_error_relogins_only_that_session():
+    api = _api(pool_size=2)
+    await api.login()
+    expired, healthy = _FakeClient.instances
+    expired.expire_once = True
+
+    await _backfill(api, ["SZ000001", "SZ000002", "SZ000003"])
+
+    assert expired.login_calls == 2
+    assert healthy.login_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_health_check_relogins_idle_session():
+    api = _api(pool_size=1, health_check_interval=0.0)
+    await _backfill(api, ["SZ000001"])
+    client = _FakeClient.instances[0]
+    client.logined = 0  # 服务端会话过期
+
+    await _backfill(api, ["SZ000002"])
+
+    assert client.login_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_query_error_is_raised():
+    api = _api()
+    await api.login()
+
+    def failing_query(**kwargs):
+        return _FakeResult(-2, "bad stock")
+
+    _FakeClient.instances[0].query = failing_query
+    with pytest.raises(TinySoftAPIError, match="bad stock"):
+        await _backfill(api, ["XX000001"])
+
+
+@pytest.mark.asyncio
+async def test_logout_during_request_does_not_return_session():
+    api = _api(pool_size=1)
+    await api.login()
+    old_client = _FakeClient.instances[0]
+
+    # 第一个请求占用唯一的会话，第二个请求在等待空闲会话时客户端池被注销
+    requests = asyncio.ensure_future(_backfill(api, ["SZ000001", "SZ000002"]))
+    await asyncio.sleep(QUERY_LATENCY / 2)
+    await api.logout()
+    frames = await requests
+
+    assert [f["StockID"].iloc[0] for f in frames] == ["SZ000001", "SZ000002"]
+    assert old_client.logined == 0
+    # 等待中的请求改用新建的客户端池，旧会话没有归还到新池
+    assert len(_FakeClient.instances) == 2
+    assert api._idle_sessions.qsize() == 1
+    assert api._sessions[0].client is _FakeClient.instances[1]
@@ -1,5 +1,9 @@
+from datetime import date, timedelta
+
 import pandas as pd
 import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
 
 from alphahome.fetchers.tasks.stock.tinysoft_stock_industry_versioned import (
     TinySoftStockIndustryVersionedTask,
@@ -195,3 +199,119 @@ def test_process_data_uses_effective_window_when_kwargs_missing():
     processed = task.process_data(raw)
     assert len(processed) == 1
     assert str(processed.iloc[0]["trade_date"]) == "2026-03-02"
+
+
+def _reference_snapshots(task, g, *, start_bound, end_bound, include_empty, source_table_id):
+    """逐快照日过滤 + 排序的原始实现，作为扫描算法的对照。"""
+    rows = []
+    g = g.dropna(subset=["entry_date_dt"])
+    if g.empty:
+        return rows
+    snapshot_dates = set(g["entry_date_dt"].dt.date.dropna().tolist())
+    if start_bound:
+        snapshot_dates.add(start_bound)
+    for snap_date in sorted(snapshot_dates):
+        if start_bound and snap_date < start_bound:
+            continue
+        if end_bound and snap_date > end_bound:
+            continue
+        snap_ts = pd.Timestamp(snap_date)
+        active = g[
+            (g["entry_date_dt"] <= snap_ts)
+            & (g["remove_date_dt"].isna() | (g["remove_date_dt"] >= snap_ts))
+        ].copy()
+        if active.empty:
+            continue
+        out = {"trade_date": snap_date}
+        for level, name_key, code_key in [
+            (1, "industry_l1", "level1_code"),
+            (2, "industry_l2", "level2_code"),
+            (3, "industry_l3", "level3_code"),
+        ]:
+            out[name_key] = out[code_key] = None
+            level_df = active[active["level"] == level].copy()
+            if level_df.empty:
+                continue
+            level_df["latest_flag"] = level_df["latest_flag"].fillna(0)
+            level_df = level_df.sort_values(["entry_date_dt", "latest_flag", "industry_attr_code"])
+            last = level_df.iloc[-1]
+            out[name_key] = task._clean_text(last.get("industry_attr_name"))
+            out[code_key] = task._clean_text(last.get("industry_attr_code"))
+        out["industry_code"] = out["level3_code"] or out["level2_code"] or out["level1_code"]
+        if not include_empty and not any(
+            [out["industry_l1"], out["industry_l2"], out["industry_l3"], out["industry_code"]]
+        ):
+            continue
+        rows.append(out)
+    return rows
+
+
+_DAY0 = date(2020, 1, 1)
+
+# 单条版本记录：入选日期（可缺失）、剔除日期相对入选日期的偏移（可缺失，含早于入选日期的脏数据）
+_version_records = st.lists(
+    st.fixed_dictionaries(
+        {
+            "level": st.integers(1, 3),
+            "entry_offset": st.one_of(st.none(), st.integers(0, 39)),
+            "remove_delta": st.one_of(st.none(), st.integers(-3, 15)),
+            "industry_attr_code": st.sampled_from(["A1", "A2", "B1", None]),
+            "industry_attr_name": st.sampled_from(["行业甲", "行业乙", "", None]),
+            "latest_flag": st.sampled_from([0, 1, None]),
+        }
+    ),
+    min_size=1,
+    max_size=25,
+)
+_snapshot_bounds = st.one_of(st.none(), st.dates(min_value=_DAY0, max_value=_DAY0 + timedelta(days=45)))
+
+
+def _version_group(records):
+    entries, removes = [], []
+    for record in records:
+        entry = None if record["entry_offset"] is None else _DAY0 + timedelta(days=record["entry_offset"])
+        entries.append(entry)
+        removes.append(
+            None if entry is None or record["remove_delta"] is None
+            else entry + timedelta(days=record["remove_delta"])
+        )
+    return pd.DataFrame(
+        {
+            "ts_code": "000001.SZ",
+            "tsl_code": "SZ000001",
+            "source_attr_code": "SWHY",
+            "source_attr_name": "申万行业",
+            "level": [r["level"] for r in records],
+            "industry_attr_code": [r["industry_attr_code"] for r in records],
+            "industry_attr_name": [r["industry_attr_name"] for r in records],
+            "latest_flag": [r["latest_flag"] for r in records],
+            "entry_date_dt": pd.to_datetime(pd.Series(entries, dtype=object)),
+            "remove_date_dt": pd.to_datetime(pd.Series(removes, dtype=object)),
+        }
+    )
+
+
+@settings(max_examples=300, deadline=None)
+@given(
+    records=_version_records,
+    start_bound=_snapshot_bounds,
+    end_bound=_snapshot_bounds,
+    include_empty=st.booleans(),
+)
+def test_build_snapshots_matches_reference_on_random_histories(records, start_bound, end_bound, include_empty):
+    task = _make_task()
+    group = _version_group(records)
+    kwargs = dict(
+        start_bound=start_bound,
+        end_bound=end_bound,
+        include_empty=include_empty,
+        source_table_id=139,
+    )
+
+    rows = task._build_snapshots(group, **kwargs)
+    expected = _reference_snapshots(task, group, **kwargs)
+
+    keys = ["trade_date", "industry_l1", "industry_l2", "industry_l3",
+            "level1_code", "level2_code", "level3_code", "industry_code"]
+    assert [{k: row[k] for k in keys} for row in rows] == expected
+    assert all(row["industry_source"] == "SWHY" and row["source_table_id"] == 139 for row in rows)
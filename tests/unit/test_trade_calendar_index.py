@@ -0,0 +1,195 @@
+import datetime
+import random
+
+import pytest
+
+from alphahome.fetchers.tools import calendar
+from alphahome.fetchers.tools.calendar_index import TradeCalendarIndex
+
+
+def _random_calendar(seed, start=datetime.date(2023, 12, 20), days=400):
+    rng = random.Random(seed)
+    cal_dates = [start + datetime.timedelta(days=i) for i in range(days)]
+    is_open = [int(d.weekday() < 5 and rng.random() > 0.05) for d in cal_dates]
+    return cal_dates, is_open
+
+
+def _ymd(d):
+    return d.strftime("%Y%m%d")
+
+
+def test_index_matches_linear_scan():
+    cal_dates, is_open = _random_calendar(7)
+    index = TradeCalendarIndex("SSE", cal_dates, is_open)
+    trade_days = [_ymd(d) for d, flag in zip(cal_dates, is_open) if flag]
+    rng = random.Random(11)
+
+    for _ in range(300):
+        day = cal_dates[rng.randrange(len(cal_dates))]
+        other = cal_dates[rng.randrange(len(cal_dates))]
+        start, end = sorted([_ymd(day), _ymd(other)])
+        n = rng.randint(1, 30)
+        after = [t for t in trade_days if t > _ymd(day)]
+        before = [t for t in trade_days if t < _ymd(day)]
+
+        assert index.is_trade_day(day) == (_ymd(day) in trade_days)
+        assert index.next_trade_day(day, n) == (after[n - 1] if len(after) >= n else None)
+        assert index.prev_trade_day(_ymd(day), n) == (before[-n] if len(before) >= n else None)
+        assert index.shift(day, -n) == index.prev_trade_day(day, n)
+        assert index.trade_days_between(start, end) == [t for t in trade_days if start <= t <= end]
+        assert index.count_trade_days(start, end) == len(index.trade_days_between(start, end))
+
+
+def test_index_does_not_guess_outside_coverage():
+    index = TradeCalendarIndex(
+        "SSE",
+        ["20240105", "20240106", "20240107", "20240108"],
+        [1, 0, 0, 1],
+    )
+
+    assert index.is_trade_day("20240110") is None
+    assert index.next_trade_day("20240105") == "20240108"
+    assert index.next_trade_day("20240108") is None
+    assert index.next_trade_day("20240101") is None
+    assert index.prev_trade_day("20240109") == "20240108"
+    assert index.prev_trade_day("20240120") is None
+    assert index.shift("2024-01-08", 0) == "20240108"
+    assert index.shift("20240106", 0) is None
+
+
+def test_period_end_trade_days():
+    cal_dates, is_open = _random_calendar(3)
+    index = TradeCalendarIndex("SSE", cal_dates, is_open)
+    trade_days = [d for d, flag in zip(cal_dates, is_open) if flag]
+    coverage_end = cal_dates[-1]
+
+    def expected(key, start, end):
+        last_day_by_period = {}
+        for d in trade_days:
+            last_day_by_period[key(d)] = d
+        # 日历未覆盖到周期结束的最后一个周期不计入
+        if key(coverage_end + datetime.timedelta(days=1)) == key(coverage_end):
+            last_day_by_period.pop(key(coverage_end), None)
+        return [_ymd(d) for d in last_day_by_period.values() if start <= _ymd(d) <= end]
+
+    keys = {
+        "W": lambda d: d.isocalendar()[:2],
+        "M": lambda d: (d.year, d.month),
+        "Q": lambda d: (d.year, (d.month - 1) // 3),
+        "Y": lambda d: d.year,
+    }
+    for freq, key in keys.items():
+        for start, end in [("20231220", "20250201"), ("20240115", "20240915")]:
+            assert index.period_end_trade_days(start, end, freq=freq) == expected(key, start, end)
+
+    # 2025-01-23 结束的日历中，2025 年 1 月尚未结束
+    assert index.end == "20250122"
+    assert index.period_end_trade_days("20241201", "20250131", freq="M") == [
+        _ymd(max(d for d in trade_days if d.month == 12 and d.year == 2024))
+    ]
+    with pytest.raises(ValueError):
+        index.period_end_trade_days("20240101", "20241231", freq="D")
+
+
+class _FakeCalendarDb:
+    def __init__(self, cal_dates, is_open):
+        self.rows = [
+            {"cal_date": d, "is_open": flag, "update_time": datetime.datetime(2024, 1, 1)}
+            for d, flag in zip(cal_dates, is_open)
+        ]
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        if "COUNT(*)" in query:
+            return [
+                {
+                    "row_count": len(self.rows),
+                    "max_date": max(r["cal_date"] for r in self.rows),
+                    "max_update_time": max(r["update_time"] for r in self.rows),
+                }
+            ]
+        return list(self.rows)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    calendar._TRADE_CAL_INDEXES.clear()
+    calendar._TRADE_CAL_CACHE.clear()
+    db = _FakeCalendarDb(*_random_calendar(5))
+    token = calendar.set_calendar_db_manager(db)
+    yield db
+    calendar.reset_calendar_db_manager(token)
+    calendar._TRADE_CAL_INDEXES.clear()
+
+
+@pytest.mark.asyncio
+async def test_calendar_functions_share_one_load(fake_db):
+    days = await calendar.get_trade_days_between("20240101", "20240131")
+    assert days
+    assert await calendar.is_trade_day(days[0])
+    assert await calendar.get_next_trade_day(days[0]) == days[1]
+    assert await calendar.get_last_trade_day(days[1]) == days[0]
+    assert await calendar.shift_trade_day(days[0], 2) == days[2]
+    assert await calendar.count_trade_days("20240101", "20240131") == len(days)
+    assert await calendar.get_month_ends("20240101", "20240229") == [
+        days[-1],
+        (await calendar.get_period_end_trade_days("20240201", "20240229"))[0],
+    ]
+
+    assert len(fake_db.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_index_reloads_when_calendar_table_changes(fake_db, monkeypatch):
+    index = await calendar.get_trade_calendar_index()
+    monkeypatch.setattr(calendar, "TRADE_CAL_INDEX_REFRESH_SECONDS", 0.0)
+
+    # 版本未变：只执行一次版本查询，复用已加载的索引
+    assert await calendar.get_trade_calendar_index() is index
+    assert len(fake_db.queries) == 2
+
+    fake_db.rows[10]["is_open"] = 1 - fake_db.rows[10]["is_open"]
+    fake_db.rows[10]["update_time"] = datetime.datetime(2024, 6, 1)
+    reloaded = await calendar.get_trade_calendar_index()
+
+    assert reloaded is not index
+    assert reloaded.is_trade_day(fake_db.rows[10]["cal_date"]) == bool(fake_db.rows[10]["is_open"])
+
+
+@pytest.mark.asyncio
+async def test_invalidate_trade_calendar(fake_db):
+    index = await calendar.get_trade_calendar_index("SSE")
+    await calendar.get_trade_calendar_index("HK")
+    assert set(k[0] for k in calendar._TRADE_CAL_INDEXES) == {"SSE", "HKEX"}
+
+    calendar.invalidate_trade_calendar("HK")
+    assert set(k[0] for k in calendar._TRADE_CAL_INDEXES) == {"SSE"}
+
+    calendar.invalidate_trade_calendar()
+    assert await calendar.get_trade_calendar_index("SSE") is not index
+
+
+class _FakeSyncCalendarDb:
+    mode = "sync"
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def fetch_sync(self, query, params=None):
+        self.queries.append((query, params))
+        return list(self.rows)
+
+
+def test_sync_index_uses_psycopg2_placeholders_and_shared_cache(fake_db):
+    db = _FakeSyncCalendarDb(fake_db.rows)
+
+    index = calendar.get_trade_calendar_index_sync(db)
+
+    assert calendar.get_trade_calendar_index_sync(db) is index
+    assert len(db.queries) == 1
+    query, params = db.queries[0]
+    assert "%s" in query and "$1" not in query
+    assert params == ("SSE",)
+    assert calendar._TRADE_CAL_INDEXES[("SSE", calendar._db_cache_key(db))] is index
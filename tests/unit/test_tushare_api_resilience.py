@@ -259,3 +259,96 @@ async def test_offset_split_raises_on_failed_subrange(monkeypatch):
             end_date="20240131",
             limit=5000,
         )
+
+
+class _PagedClientSession:
+    """按 offset 返回分页数据的假 session；超过 offset_cap 的请求返回 50101。"""
+
+    def __init__(self, *, total_rows: int, offset_cap: int = 10**9):
+        self.total_rows = total_rows
+        self.offset_cap = offset_cap
+        self.requested_offsets = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def post(self, url, json):
+        params = json["params"]
+        offset, limit = params["offset"], params["limit"]
+        self.requested_offsets.append(offset)
+
+        def _enter():
+            if offset > self.offset_cap:
+                return _FakeResponse(200, {"code": 50101, "msg": "offset不能大于100000"})
+            rows = [[i] for i in range(offset, min(offset + limit, self.total_rows))]
+            return _FakeResponse(200, {"code": 0, "data": {"fields": ["seq"], "items": rows}})
+
+        return _FakeRequestContext(_enter)
+
+
+def _patch_paged_session(monkeypatch, api, session):
+    async def _no_wait(_api_name: str):
+        return None
+
+    monkeypatch.setattr(api, "_wait_for_rate_limit_slot", _no_wait)
+    monkeypatch.setattr(
+        tushare_api_module.aiohttp, "ClientSession", lambda *args, **kwargs: session
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("total_rows", [0, 7, 10, 23])
+async def test_parallel_pagination_matches_sequential(monkeypatch, total_rows):
+    api = TushareAPI(token="test", logger=logging.getLogger("test"))
+    sequential_session = _PagedClientSession(total_rows=total_rows)
+    _patch_paged_session(monkeypatch, api, sequential_session)
+    sequential = await api.query(api_name="daily", fields="seq", limit=5)
+
+    parallel_session = _PagedClientSession(total_rows=total_rows)
+    _patch_paged_session(monkeypatch, api, parallel_session)
+    parallel = await api.query(api_name="daily", fields="seq", limit=5, page_parallelism=3)
+
+    assert parallel.equals(sequential)
+    assert len(parallel) == total_rows
+    if total_rows:
+        assert parallel["seq"].tolist() == list(range(total_rows))
+    assert parallel_session.requested_offsets[:3] == [0, 5, 10]
+
+
+@pytest.mark.asyncio
+async def test_parallel_pagination_ignores_errors_after_short_page(monkeypatch):
+    api = TushareAPI(token="test", logger=logging.getLogger("test"), page_parallelism=4)
+    # offset 10 已是短页，其后推测请求（offset 15）返回的 50101 不应影响结果
+    session = _PagedClientSession(total_rows=12, offset_cap=10)
+    _patch_paged_session(monkeypatch, api, session)
+
+    df = await api.query(
+        api_name="daily", fields="seq", limit=5, start_date="20240101", end_date="20240131"
+    )
+
+    assert df["seq"].tolist() == list(range(12))
+
+
+@pytest.mark.asyncio
+async def test_parallel_pagination_splits_on_in_order_50101(monkeypatch):
+    api = TushareAPI(token="test", logger=logging.getLogger("test"), page_parallelism=3)
+    session = _PagedClientSession(total_rows=100, offset_cap=10)
+    _patch_paged_session(monkeypatch, api, session)
+
+    captured = {}
+
+    async def _fake_split(**kwargs):
+        captured.update(kwargs)
+        return pd.DataFrame({"seq": [-1]})
+
+    monkeypatch.setattr(api, "_handle_offset_limit_error", _fake_split)
+
+    df = await api.query(
+        api_name="daily", fields="seq", limit=5, start_date="20240101", end_date="20240131"
+    )
+
+    assert df["seq"].tolist() == [-1]
+    assert captured["start_date"] == "20240101"
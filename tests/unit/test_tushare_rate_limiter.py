@@ -0,0 +1,204 @@
+import asyncio
+import logging
+
+import pytest
+
+from alphahome.fetchers.sources.tushare import rate_limiter as rate_limiter_module
+from alphahome.fetchers.sources.tushare import tushare_api as tushare_api_module
+from alphahome.fetchers.sources.tushare.rate_limiter import (
+    TokenBucket,
+    TushareRateLimiter,
+    limit_for_points,
+)
+from alphahome.fetchers.sources.tushare.tushare_api import TushareAPI
+
+
+class _FakeClock:
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = _FakeClock()
+    bucket = TokenBucket(limit_per_minute=60, burst=5, clock=clock)
+
+    waits = [bucket.reserve() for _ in range(7)]
+
+    assert waits[:5] == [0.0] * 5
+    # 补充速率 (60 - 5) / 60 每秒，排队请求依次顺延
+    rate = 55 / 60
+    assert waits[5] == pytest.approx(1 / rate)
+    assert waits[6] == pytest.approx(2 / rate)
+
+    stats = bucket.stats()
+    assert stats["total_requests"] == 7
+    assert stats["throttled_requests"] == 2
+    assert stats["requests_last_minute"] == 5
+    assert stats["queued"] == 2
+
+
+def test_token_bucket_never_exceeds_limit_within_window():
+    clock = _FakeClock()
+    bucket = TokenBucket(limit_per_minute=120, burst=20, clock=clock)
+
+    send_times = [clock.now + bucket.reserve() for _ in range(400)]
+
+    for i, start in enumerate(send_times):
+        in_window = sum(1 for t in send_times[i:] if t < start + 60)
+        assert in_window <= 120
+
+
+def test_token_bucket_penalize_blocks_until_released():
+    clock = _FakeClock()
+    bucket = TokenBucket(limit_per_minute=60, burst=10, clock=clock)
+
+    bucket.penalize(30)
+
+    assert bucket.blocked_for() == pytest.approx(30)
+    assert bucket.reserve() == pytest.approx(30 + 60 / 50)
+    assert bucket.stats()["rejections"] == 1
+
+    clock.advance(120)
+    assert bucket.blocked_for() == 0
+    assert bucket.reserve() == 0
+
+
+def test_limit_for_points_tiers():
+    assert limit_for_points(120) == 50
+    assert limit_for_points(2000) == 200
+    assert limit_for_points(4999) == 200
+    assert limit_for_points(5000) == 500
+    assert limit_for_points(20000) == 1000
+
+
+def test_rate_limiter_resolves_limits_from_points_and_overrides():
+    limiter = TushareRateLimiter(
+        points=2000,
+        endpoints={"eco_cal": 30, "moneyflow": {"per_minute": 150, "burst": 3}},
+    )
+
+    # 内置接口上限不超过积分档位
+    assert limiter.bucket("daily").limit_per_minute == 200
+    assert limiter.bucket("trade_cal").limit_per_minute == 100
+    # 配置覆盖优先
+    assert limiter.bucket("eco_cal").limit_per_minute == 30
+    moneyflow = limiter.bucket("moneyflow")
+    assert (moneyflow.limit_per_minute, moneyflow.burst) == (150, 3)
+    # 未知接口使用档位默认值
+    assert limiter.bucket("fina_indicator").limit_per_minute == 200
+
+    limiter.configure(points=5000)
+    assert limiter.bucket("daily").limit_per_minute == 500
+    assert limiter.bucket("eco_cal").limit_per_minute == 20
+
+
+def test_rate_limiter_defaults_without_points_keep_builtin_limits():
+    limiter = TushareRateLimiter()
+
+    assert limiter.bucket("daily").limit_per_minute == 800
+    assert limiter.bucket("unknown_api").limit_per_minute == 100
+    assert set(limiter.get_stats()) == {"daily", "unknown_api"}
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_acquire_sleeps_for_reserved_wait(monkeypatch):
+    clock = _FakeClock()
+    limiter = TushareRateLimiter(endpoints={"daily": {"per_minute": 60, "burst": 1}}, clock=clock)
+    sleeps = []
+
+    async def _fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", _fake_sleep)
+
+    assert await limiter.acquire("daily") == 0
+    waited = await limiter.acquire("daily")
+
+    assert waited == pytest.approx(60 / 59)
+    assert sleeps == [pytest.approx(60 / 59)]
+
+
+def test_tushare_api_instances_share_process_limiter():
+    first = TushareAPI(token="a", logger=logging.getLogger("test"))
+    second = TushareAPI(token="b", logger=logging.getLogger("test"))
+
+    assert first._rate_limiter is second._rate_limiter
+    assert first._rate_limiter is rate_limiter_module.get_rate_limiter()
+
+
+class _RateLimitedOnceSession:
+    def __init__(self):
+        self.post_calls = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def post(self, url, json):
+        session = self
+
+        class _Ctx:
+            async def __aenter__(self_inner):
+                session.post_calls += 1
+
+                class _Resp:
+                    status = 200
+
+                    async def json(self_resp):
+                        if session.post_calls == 1:
+                            return {"code": 40203, "msg": "每分钟最多访问该接口"}
+                        return {
+                            "code": 0,
+                            "data": {"fields": ["date"], "items": [["20260122"]]},
+                        }
+
+                return _Resp()
+
+            async def __aexit__(self_inner, exc_type, exc, tb):
+                return False
+
+        return _Ctx()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_penalizes_shared_bucket(monkeypatch):
+    clock = _FakeClock()
+    limiter = TushareRateLimiter(clock=clock)
+    api = TushareAPI(
+        token="test",
+        logger=logging.getLogger("test"),
+        rate_limit_delay=65,
+        rate_limiter=limiter,
+    )
+    sleeps = []
+
+    async def _fake_sleep_with_stop(seconds, stop_event=None):
+        sleeps.append(seconds)
+        clock.advance(seconds)
+
+    async def _fake_sleep(seconds):
+        clock.advance(seconds)
+
+    monkeypatch.setattr(api, "_sleep_with_stop", _fake_sleep_with_stop)
+    monkeypatch.setattr(rate_limiter_module.asyncio, "sleep", _fake_sleep)
+    session = _RateLimitedOnceSession()
+    monkeypatch.setattr(
+        tushare_api_module.aiohttp, "ClientSession", lambda *a, **k: session
+    )
+
+    df = await api.query(api_name="eco_cal", fields="date", limit=5000)
+
+    assert session.post_calls == 2
+    assert sleeps == [pytest.approx(65)]
+    assert df.iloc[0]["date"] == "20260122"
+    stats = api.get_rate_limit_stats("eco_cal")
+    assert stats["rejections"] == 1
+    assert stats["total_requests"] == 2
@@ -0,0 +1,279 @@
+import logging
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from alphahome.common.db_components.database_operations_mixin import DatabaseOperationsMixin
+from alphahome.common.db_components.utility_mixin import UtilityMixin
+from alphahome.common.db_components.watermark_catalog_mixin import WatermarkCatalogMixin
+from alphahome.common.task_system.base_task import BaseTask
+
+
+class _Resolver:
+    @staticmethod
+    def get_schema_and_table(target):
+        return "tushare", target
+
+
+class _Conn:
+    def __init__(self, column_types, scan_row=None, fail_on=None):
+        self.column_types = column_types
+        self.scan_row = scan_row
+        self.fail_on = fail_on
+        self.executed = []
+        self.catalog_row = None
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql, *args):
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("boom")
+        self.executed.append(sql)
+        if "INSERT INTO" in sql and "table_watermarks" in sql:
+            self.catalog_row = {
+                "schema_name": args[0], "table_name": args[1], "task_name": args[2],
+                "date_column": args[3], "date_type": args[4], "max_date": args[5],
+                "max_update_time": args[6], "row_count": args[7],
+                "write_seq": 0, "synced_seq": 0, "tracked": True,
+            }
+
+    async def fetchval(self, sql, *args):
+        # 写入触发器尚未安装
+        return False
+
+    async def fetch(self, sql, *args):
+        return [{"column_name": c, "data_type": t} for c, t in self.column_types.items() if c in args[2]]
+
+    async def fetchrow(self, sql, *args):
+        if "table_watermarks" in sql:
+            return self.catalog_row
+        return self.scan_row
+
+
+class _Pool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+class _WatermarkStub(UtilityMixin, WatermarkCatalogMixin):
+    def __init__(self, conn, catalog=None, table_exists_result=True):
+        self.resolver = _Resolver()
+        self.logger = logging.getLogger("test.watermark_catalog")
+        self.pool = _Pool(conn)
+        self._watermark_catalog_ready = True
+        self._catalog = catalog or {}
+        self._table_exists_result = table_exists_result
+        self.fetch_val_calls = 0
+
+    async def table_exists(self, target):
+        return self._table_exists_result
+
+    async def fetch_val(self, query):
+        self.fetch_val_calls += 1
+        return None
+
+    async def fetch_one(self, query, *args):
+        return self._catalog.get((args[0], args[1])) or self.pool.conn.catalog_row
+
+    async def fetch(self, query, *args):
+        return [row for key, row in self._catalog.items() if key in set(zip(*args))]
+
+
+def _row(max_date, row_count, date_type="date", date_column="trade_date", write_seq=3, synced_seq=3):
+    return {
+        "schema_name": "tushare", "table_name": "stock_daily", "task_name": None,
+        "date_column": date_column, "date_type": date_type, "max_date": max_date,
+        "max_update_time": datetime(2024, 6, 3, 18, 0), "row_count": row_count,
+        "write_seq": write_seq, "synced_seq": synced_seq, "tracked": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_latest_date_reads_catalog_without_scanning_table():
+    conn = _Conn({})
+    db = _WatermarkStub(conn, catalog={("tushare", "stock_daily"): _row(datetime(2024, 5, 31), 100)})
+
+    assert await db.get_latest_date("stock_daily", "trade_date") == date(2024, 5, 31)
+    assert await db.get_latest_date("stock_daily", "update_time") == datetime(2024, 6, 3, 18, 0)
+    assert db.fetch_val_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_record_falls_back_to_scan():
+    conn = _Conn({"trade_date": "date"})
+    # 有未同步的写入（如 executemany、外部作业）
+    stale = _row(datetime(2024, 5, 31), 100, write_seq=4, synced_seq=3)
+    db = _WatermarkStub(conn, catalog={("tushare", "stock_daily"): stale})
+
+    assert await db.get_latest_date("stock_daily", "trade_date") is None
+    assert db.fetch_val_calls == 1
+    assert conn.executed == []
+
+
+@pytest.mark.asyncio
+async def test_read_path_never_seeds_or_locks():
+    conn = _Conn({"trade_date": "date"}, scan_row={"max_date": datetime(2024, 5, 31), "max_update_time": None, "row_count": 42})
+    db = _WatermarkStub(conn)
+
+    assert await db.get_latest_date("stock_daily", "trade_date") is None
+    assert db.fetch_val_calls == 1
+    assert conn.executed == []
+    assert conn.catalog_row is None
+
+
+@pytest.mark.asyncio
+async def test_write_path_seeds_under_share_lock_with_write_trigger():
+    scan = {"max_date": datetime(2024, 5, 31), "max_update_time": None, "row_count": 42}
+    conn = _Conn({"trade_date": "date"}, scan_row=scan)
+    db = _WatermarkStub(conn)
+
+    row = await db.ensure_table_watermark("stock_daily", "trade_date")
+
+    assert row["row_count"] == 42
+    trigger = next(i for i, sql in enumerate(conn.executed) if sql.startswith("CREATE TRIGGER"))
+    lock = next(i for i, sql in enumerate(conn.executed) if "IN SHARE MODE" in sql)
+    assert trigger < lock
+    assert "FOR EACH STATEMENT" in conn.executed[trigger]
+    assert await db.get_latest_date("stock_daily", "trade_date") == date(2024, 5, 31)
+    assert db.fetch_val_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_unsupported_date_type_falls_back_to_scan_without_lock():
+    conn = _Conn({"trade_date": "character varying"})
+    db = _WatermarkStub(conn)
+
+    assert await db.get_latest_date("stock_daily", "trade_date") is None
+    assert not any("LOCK TABLE" in sql for sql in conn.executed)
+    assert db.fetch_val_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_advance_drops_record_instead_of_failing_write():
+    conn = _Conn({}, fail_on="GREATEST")
+    db = _WatermarkStub(conn)
+
+    await db._advance_watermark(conn, "tushare", "stock_daily", "trade_date", "2024-06-03", None, 10)
+
+    assert any(sql.startswith("DELETE FROM") for sql in conn.executed)
+
+
+@pytest.mark.asyncio
+async def test_audit_reports_and_repairs_drift():
+    scan = {"max_date": datetime(2024, 6, 3), "max_update_time": datetime(2024, 6, 3, 18, 0), "row_count": 120}
+    conn = _Conn({"trade_date": "date", "update_time": "timestamp without time zone"}, scan_row=scan)
+    db = _WatermarkStub(conn, catalog={("tushare", "stock_daily"): _row(datetime(2024, 5, 31), 100)})
+
+    issues = await db.audit_table_watermarks([("stock_daily", "trade_date")], repair=True)
+
+    assert [i["status"] for i in issues] == ["mismatch"]
+    assert conn.catalog_row["max_date"] == datetime(2024, 6, 3)
+    assert conn.catalog_row["row_count"] == 120
+
+
+@pytest.mark.asyncio
+async def test_audit_reports_and_repairs_stale_records():
+    scan = {"max_date": datetime(2024, 5, 31), "max_update_time": datetime(2024, 6, 3, 18, 0), "row_count": 100}
+    conn = _Conn({"trade_date": "date", "update_time": "timestamp without time zone"}, scan_row=scan)
+    stale = _row(datetime(2024, 5, 31), 100, write_seq=5, synced_seq=4)
+    db = _WatermarkStub(conn, catalog={("tushare", "stock_daily"): stale})
+
+    issues = await db.audit_table_watermarks([("stock_daily", "trade_date")], repair=True)
+
+    assert [i["status"] for i in issues] == ["stale"]
+    assert any("IN SHARE MODE" in sql for sql in conn.executed)
+
+
+class _CopyConn:
+    """copy_from_dataframe 的写入连接：记录写入 SQL 和水位推进参数"""
+
+    def __init__(self):
+        self.write_sql = None
+        self.advance_args = None
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql, *args):
+        if "GREATEST" in sql:
+            self.advance_args = args
+
+    async def copy_records_to_table(self, table, records, columns, timeout=None):
+        return f"COPY {len(list(records))}"
+
+    async def fetchval(self, sql, *args):
+        # 目标表有 update_time 列（由列默认值填充）
+        return "pg_attribute" in sql and args[0] == '"tushare"."stock_daily"'
+
+    async def fetchrow(self, sql, *args):
+        self.write_sql = sql
+        return {"inserted_rows": 2, "max_date": "2024-06-03", "max_update_time": "2024-06-04 09:30:00"}
+
+
+class _TaskResolver:
+    @staticmethod
+    def get_schema_and_table(target):
+        return "tushare", getattr(target, "table_name", target)
+
+
+class _CopyStub(DatabaseOperationsMixin, WatermarkCatalogMixin):
+    def __init__(self, conn):
+        self.resolver = _TaskResolver()
+        self.logger = logging.getLogger("test.watermark_catalog")
+        self.pool = _Pool(conn)
+        self._watermark_catalog_ready = True
+        self._enable_performance_monitoring = False
+
+
+class _InsertModeTask(BaseTask):
+    task_type = "fetch"
+    name = "test_insert_mode_watermark"
+    table_name = "stock_daily"
+    date_column = "trade_date"
+    use_insert_mode = True
+    schema_def = {"ts_code": {"type": "VARCHAR(10)"}, "trade_date": {"type": "DATE"}}
+
+    async def _fetch_data(self, stop_event=None, **kwargs):
+        return pd.DataFrame()
+
+
+@pytest.mark.asyncio
+async def test_insert_mode_save_advances_update_time_watermark():
+    conn = _CopyConn()
+    task = _InsertModeTask(_CopyStub(conn))
+    data = pd.DataFrame({"ts_code": ["000001.SZ", "000002.SZ"], "trade_date": ["20240603", "20240603"]})
+
+    # INSERT 模式不传 timestamp_column，update_time 来自列默认值
+    assert await task._save_to_database(data) == 2
+
+    assert '"update_time" AS wm_update_time' in conn.write_sql
+    assert "ON CONFLICT" not in conn.write_sql
+    assert conn.advance_args[3:] == ("2024-06-03", "2024-06-04 09:30:00", 2)
+
+
+@pytest.mark.asyncio
+async def test_save_seeds_watermark_before_writing():
+    from unittest.mock import AsyncMock
+
+    from alphahome.common.db_manager import DBManager
+
+    db = AsyncMock(spec=DBManager)
+    db.pool = None
+    db.is_schema_synced.return_value = True
+    db.copy_from_dataframe.return_value = 1
+    task = _InsertModeTask(db)
+
+    await task._save_data(pd.DataFrame({"ts_code": ["000001.SZ"], "trade_date": ["20240603"]}))
+
+    db.ensure_table_watermark.assert_awaited_once_with(task, "trade_date")
+    called = [name for name, _, _ in db.method_calls]
+    assert called.index("ensure_table_watermark") < called.index("copy_from_dataframe")